@@ -11,6 +11,7 @@ from .core.gli import gli_segment, gli_curves
 from .features.descriptor import global_mgli_descriptor
 from .features.node_features import node_mgli_features
 from .features.pairwise import pairwise_mgli_matrix
+from .features.schema import FeatureSchema, descriptor_batch
 from .presets import (
     flexibility_mgli_pipeline,
     compute_bfactor_mgli,
@@ -31,6 +32,8 @@ __all__ = [
     "global_mgli_descriptor",
     "node_mgli_features",
     "pairwise_mgli_matrix",
+    "FeatureSchema",
+    "descriptor_batch",
     "flexibility_mgli_pipeline",
     "compute_bfactor_mgli",
     "default_dti_mgli_pipeline",
@@ -4,7 +4,7 @@ mGLI特征计算的配置模块
 """
 
 from dataclasses import dataclass, field, asdict
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Union
 import json
 
 
@@ -33,17 +33,24 @@ class MgliConfig:
         
         如果use_rbf=True且rbf_sigma为None，将使用启发式σ
         （例如基于中心之间的平均间隔）
-        
+
+    rbf_cutoff : Optional[float]
+        Truncate each RBF at this many σ; farther pairs get weight 0.
+        在距中心该倍数σ处截断每个RBF，更远的节点对权重为0
+
+    scale_scheme : Optional[str]
+        Registered ``core.scale`` scheme name; None means "rbf" or "bins" by use_rbf.
+        已注册的 ``core.scale`` 方案名；None 时按use_rbf取 "rbf" 或 "bins"
+
     signed : bool
         Whether to keep the signed GLI (True) or use |GLI| (False).
         是否保留有符号的GLI(True)或使用|GLI|(False)
         
     stats : List[str]
-        Statistics to aggregate over node pairs: subset of
-        ["sum", "mean", "max", "min", "median"].
-        
-        在节点对上聚合的统计量：
-        ["sum", "mean", "max", "min", "median"]的子集
+        Statistics over node pairs: "sum", "mean", "max", "min", "median",
+        "std", "var", "count", "q<percent>" or ``register_stat`` names.
+        节点对上的统计量："sum"、"mean"、"max"、"min"、"median"、"std"、"var"、
+        "count"、"q<百分数>" 或 ``register_stat`` 注册的名称
         
     group_mode_A : str
         How to group nodes in structure A:
@@ -57,6 +64,42 @@ class MgliConfig:
     group_mode_B : str
         Same as group_mode_A but for structure B.
         与group_mode_A相同，但用于结构B
+
+    dtype : str
+        Working precision, "float64" or "float32" (|ΔGLI| <= 2e-4 per segment pair).
+        工作精度，"float64" 或 "float32"（每个线段对 |ΔGLI| <= 2e-4）
+
+    far_field_tol : Optional[float]
+        Relative tolerance of the far-field dipole approximation; None keeps the exact kernel.
+        远场偶极近似的相对容差；None 处处使用精确内核
+
+    backend : Optional[str]
+        ``core.backends`` name or "auto" (calibrated); None follows use_gpu.
+        ``core.backends`` 中的名称或 "auto"（按校准选择）；None 由use_gpu决定
+
+    executor : str
+        Parallelism for n_jobs > 1: "thread" or "process" (CPU kernels only).
+        n_jobs > 1 时的并行方式："thread" 或 "process"（仅CPU内核）
+
+    sparse_pairs : bool
+        Keep pairs within max_distance as CSR ``SparsePairs`` (scales must fit inside).
+        以CSR ``SparsePairs`` 保存max_distance以内的节点对（尺度须位于其内）
+
+    top_k : Optional[int]
+        Keep at most top_k largest-|GLI| pairs per node in returned pairwise mGLI.
+        返回的成对mGLI中每个节点最多保留top_k个|GLI|最大的节点对
+
+    memory_budget : Optional[Union[int, str]]
+        Peak memory per A×B tile ("512MB", "4GiB" or bytes); None computes densely.
+        A×B单个分块的峰值内存（"512MB"、"4GiB" 或字节数）；None 为稠密计算
+
+    checkpoint_dir : Optional[str]
+        Directory of per-tile checkpoints so tiled jobs can resume.
+        分块检查点目录，使分块任务可以恢复
+
+    quantile_capacity : Optional[int]
+        Values kept per group for streamed quantiles; None keeps every value.
+        流式分位数每组保留的值数；None 保留全部值
     """
 
     distance_bins: List[float] = field(
@@ -64,6 +107,8 @@ class MgliConfig:
     )
     use_rbf: bool = False
     rbf_sigma: Optional[float] = None
+    rbf_cutoff: Optional[float] = None
+    scale_scheme: Optional[str] = None
     signed: bool = False
     stats: List[str] = field(
         default_factory=lambda: ["sum", "mean", "max", "min", "median"]
@@ -75,6 +120,15 @@ class MgliConfig:
     use_gpu: bool = False
     max_distance: Optional[float] = None
     n_jobs: int = 1
+    dtype: str = "float64"
+    far_field_tol: Optional[float] = None
+    backend: Optional[str] = None
+    executor: str = "thread"
+    sparse_pairs: bool = False
+    top_k: Optional[int] = None
+    memory_budget: Optional[Union[int, str]] = None
+    checkpoint_dir: Optional[str] = None
+    quantile_capacity: Optional[int] = 4096
 
     def to_json(self) -> str:
         """Serialize configuration to JSON string / 将配置序列化为JSON字符串"""
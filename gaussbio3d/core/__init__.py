@@ -7,8 +7,29 @@ Exports commonly used primitives and GLI functions.
 """
 
 from .geometry import Node, Segment, Curve, Structure
-from .gli_segment import gli_segment, gli_segment_batch, gli_segment_batch_accel
-from .pairwise_gli import compute_pairwise_node_gli
+from .gli_segment import (
+    gli_segment,
+    gli_segment_batch,
+    gli_segment_batch_accel,
+    gli_segment_matrix,
+    gli_segment_matrix_accel,
+    gli_segment_batch_nogil,
+    gli_segment_matrix_nogil,
+)
+from .gli_grad import (
+    gli_segment_batch_grad,
+    gli_segment_batch_grad_accel,
+    gli_segment_matrix_vjp,
+    gli_segment_matrix_vjp_accel,
+)
+from .backends import register_backend, available_backends, select_backend, calibrate
+from .pairwise_gli import (
+    compute_pairwise_node_gli,
+    compute_self_pairwise_node_gli,
+    compute_pairwise_node_gli_grad,
+    iter_pairwise_node_gli_tiles,
+)
+from .sparse import SparsePairs
 
 __all__ = [
     "Node",
@@ -18,5 +39,21 @@ __all__ = [
     "gli_segment",
     "gli_segment_batch",
     "gli_segment_batch_accel",
+    "gli_segment_matrix",
+    "gli_segment_matrix_accel",
+    "gli_segment_batch_nogil",
+    "gli_segment_matrix_nogil",
     "compute_pairwise_node_gli",
+    "register_backend",
+    "available_backends",
+    "select_backend",
+    "calibrate",
+    "compute_self_pairwise_node_gli",
+    "gli_segment_batch_grad",
+    "gli_segment_batch_grad_accel",
+    "gli_segment_matrix_vjp",
+    "gli_segment_matrix_vjp_accel",
+    "compute_pairwise_node_gli_grad",
+    "SparsePairs",
+    "iter_pairwise_node_gli_tiles",
 ]
@@ -0,0 +1,317 @@
+"""
+GLI backend registry and batch-size dispatcher
+GLI后端注册表与按批量大小的调度器
+
+Every GLI implementation (numpy, numba, torch, ...) is registered under a
+name with a common (M, N) block signature. ``select_backend`` picks one by
+the number of segment pairs in a block, using thresholds measured once by a
+local calibration run that is persisted to disk.
+
+每个GLI实现（numpy、numba、torch等）以统一的 (M, N) 矩阵块签名注册。
+``select_backend`` 按矩阵块中的线段对数量选择实现，阈值由一次本地校准测得并持久化到磁盘。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .gli_segment import (
+    _HAS_NUMBA,
+    gli_segment_matrix,
+    gli_segment_matrix_accel,
+    gli_segment_matrix_nogil,
+)
+
+MatrixFn = Callable[..., np.ndarray]
+
+# Block sizes (segment pairs) timed by the calibration run
+# 校准运行中计时的矩阵块大小（线段对数量）
+CALIBRATION_SIZES = (16, 128, 1024, 8192, 65536, 262144)
+
+
+@dataclass
+class GliBackend:
+    """
+    A registered GLI block implementation.
+    已注册的GLI矩阵块实现。
+
+    Attributes / 属性
+    ----------
+    name : str
+        Registry key / 注册名
+    matrix : callable
+        fn(A0, A1, B0, B1, signed=False) -> (M, N) GLI block
+    nogil : callable, optional
+        Variant safe to call from a thread pool without serializing on the
+        GIL or oversubscribing cores; defaults to ``matrix``.
+        可在线程池中调用的变体；默认为 ``matrix``。
+    """
+
+    name: str
+    matrix: MatrixFn
+    nogil: Optional[MatrixFn] = None
+
+    def block_fn(self, threaded: bool = False) -> MatrixFn:
+        if threaded and self.nogil is not None:
+            return self.nogil
+        return self.matrix
+
+
+_REGISTRY: Dict[str, GliBackend] = {}
+
+
+def register_backend(
+    name: str,
+    matrix: MatrixFn,
+    nogil: Optional[MatrixFn] = None,
+) -> GliBackend:
+    """
+    Register (or replace) a GLI backend under ``name``.
+    以 ``name`` 注册（或替换）GLI后端。
+
+    Registering invalidates the in-process calibration so the next
+    ``select_backend("auto")`` call takes the new backend into account.
+    注册会使进程内校准失效，下次自动选择时会考虑新后端。
+    """
+    backend = GliBackend(name=name, matrix=matrix, nogil=nogil)
+    _REGISTRY[name] = backend
+    global _TABLE
+    _TABLE = None
+    return backend
+
+
+def available_backends() -> List[str]:
+    """Names of registered backends / 已注册后端名称"""
+    return list(_REGISTRY.keys())
+
+
+def get_backend(name: str) -> GliBackend:
+    """Look up a backend by name / 按名称查找后端"""
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown GLI backend: {name!r} (available: {', '.join(_REGISTRY)})"
+        ) from None
+
+
+register_backend("numpy", gli_segment_matrix)
+if _HAS_NUMBA:
+    register_backend("numba", gli_segment_matrix_accel, nogil=gli_segment_matrix_nogil)
+
+try:
+    import torch  # type: ignore
+
+    from .gpu import gli_segment_matrix_torch
+
+    def _torch_cpu(A0, A1, B0, B1, signed=False):
+        return gli_segment_matrix_torch(A0, A1, B0, B1, signed=signed, device="cpu")
+
+    register_backend("torch-cpu", _torch_cpu)
+    if torch.cuda.is_available():
+
+        def _torch_cuda(A0, A1, B0, B1, signed=False):
+            return gli_segment_matrix_torch(A0, A1, B0, B1, signed=signed, device="cuda")
+
+        register_backend("torch-cuda", _torch_cuda)
+except Exception:
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Calibration / 校准
+# ---------------------------------------------------------------------------
+
+# Calibration tables by dispatch mode: "unthreaded" times ``matrix`` (called
+# from the main thread), "threaded" times ``nogil`` (called from row threads)
+# 按调度模式划分的校准表："unthreaded" 对主线程调用的 ``matrix`` 计时，
+# "threaded" 对行线程调用的 ``nogil`` 计时
+CALIBRATION_MODES = ("unthreaded", "threaded")
+
+_TABLE: Optional[Dict[str, List[tuple]]] = None
+_LOCK = threading.Lock()
+
+
+def calibration_path() -> str:
+    """
+    File that stores calibration thresholds.
+    存储校准阈值的文件。
+
+    ``$GAUSSBIO3D_CACHE_DIR/gli_backends.json`` if set, otherwise
+    ``~/.cache/gaussbio3d/gli_backends.json``.
+    """
+    base = os.environ.get("GAUSSBIO3D_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "gaussbio3d"
+    )
+    return os.path.join(base, "gli_backends.json")
+
+
+def _machine_key() -> Dict[str, object]:
+    return dict(
+        host=platform.node(),
+        machine=platform.machine(),
+        cpus=os.cpu_count(),
+        numpy=np.__version__,
+        backends=sorted(_REGISTRY.keys()),
+    )
+
+
+def _time_backend(fn: MatrixFn, m: int, n: int, repeats: int, rng: np.random.Generator) -> float:
+    A0 = rng.normal(size=(m, 3)) * 5.0
+    A1 = A0 + rng.normal(size=(m, 3))
+    B0 = rng.normal(size=(n, 3)) * 5.0
+    B1 = B0 + rng.normal(size=(n, 3))
+    fn(A0, A1, B0, B1)  # warm-up (JIT / device init) / 预热
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(A0, A1, B0, B1)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _save_tables(tables: Dict[str, List[tuple]]) -> None:
+    """
+    Persist calibration tables atomically (temporary file + ``os.replace``).
+    以原子方式（临时文件 + ``os.replace``）保存校准表。
+    """
+    path = calibration_path()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(dict(key=_machine_key(), tables=tables), fh, indent=2)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def calibrate(
+    sizes: Sequence[int] = CALIBRATION_SIZES,
+    repeats: int = 3,
+    save: bool = True,
+) -> Dict[str, List[tuple]]:
+    """
+    Time every registered backend on blocks of the given sizes, once per
+    dispatch mode.
+    在给定大小的矩阵块上按调度模式分别对每个已注册后端计时。
+
+    "unthreaded" times ``GliBackend.block_fn(False)`` (the kernel used by a
+    single-threaded row loop) and "threaded" times ``block_fn(True)`` (the
+    GIL-free serial kernel each row thread runs when n_jobs > 1), so the
+    table used for a block is measured on the function actually dispatched.
+    "unthreaded" 对 ``GliBackend.block_fn(False)``（单线程行循环使用的内核）计时，
+    "threaded" 对 ``block_fn(True)``（n_jobs > 1 时每个行线程运行的无GIL串行内核）计时，
+    因此每个矩阵块所用的表都基于实际调度的函数测得。
+
+    Returns / 返回
+    -------
+    tables : dict of mode -> list of (n_pairs, backend_name)
+        The fastest backend for each calibrated block size, ascending.
+        每种模式下每个校准大小最快的后端（按大小升序）。
+    """
+    rng = np.random.default_rng(0)
+    tables: Dict[str, List[tuple]] = {mode: [] for mode in CALIBRATION_MODES}
+    for size in sorted(int(s) for s in sizes):
+        m = max(1, int(round(np.sqrt(size))))
+        n = max(1, size // m)
+        for mode in CALIBRATION_MODES:
+            timings = {}
+            for name, backend in _REGISTRY.items():
+                try:
+                    fn = backend.block_fn(mode == "threaded")
+                    timings[name] = _time_backend(fn, m, n, repeats, rng)
+                except Exception:
+                    continue
+            if timings:
+                tables[mode].append((m * n, min(timings, key=timings.get)))
+
+    global _TABLE
+    _TABLE = tables
+    if save:
+        _save_tables(tables)
+    return tables
+
+
+def _load_table() -> Optional[Dict[str, List[tuple]]]:
+    path = calibration_path()
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if data.get("key") != _machine_key():
+        return None
+    tables = {}
+    for mode in CALIBRATION_MODES:
+        try:
+            table = [(int(n), str(name)) for n, name in data.get("tables", {}).get(mode, [])]
+        except (AttributeError, TypeError, ValueError):
+            return None
+        if not table or any(name not in _REGISTRY for _, name in table):
+            return None
+        tables[mode] = table
+    return tables
+
+
+def _calibration_table(threaded: bool = False) -> List[tuple]:
+    global _TABLE
+    if _TABLE is None:
+        with _LOCK:
+            if _TABLE is None:
+                _TABLE = _load_table() or calibrate()
+    return _TABLE["threaded" if threaded else "unthreaded"]
+
+
+def select_backend(
+    n_pairs: int,
+    backend: str = "auto",
+    threaded: bool = False,
+    table: Optional[List[tuple]] = None,
+) -> GliBackend:
+    """
+    Resolve a backend for a block of ``n_pairs`` segment pairs.
+    为包含 ``n_pairs`` 个线段对的矩阵块确定后端。
+
+    ``backend="auto"`` uses the calibrated threshold table (running the
+    calibration once and persisting it if no valid table is on disk); any
+    other value is looked up in the registry. ``threaded`` selects the table
+    measured on the GIL-free kernels that row threads dispatch; ``table``
+    overrides it with a table resolved elsewhere (e.g. by the parent of a
+    process pool, so workers never calibrate concurrently).
+    ``backend="auto"`` 使用校准阈值表（磁盘上无有效表时运行一次校准并保存）；
+    其他值直接在注册表中查找。``threaded`` 选用基于行线程所调度的无GIL内核测得的表；
+    ``table`` 以在别处（例如进程池的父进程）确定的表代替，使工作进程不会并发校准。
+    """
+    if backend != "auto":
+        return get_backend(backend)
+    if table is None:
+        table = _calibration_table(threaded)
+    for size, name in table:
+        if n_pairs <= size:
+            return _REGISTRY[name]
+    return _REGISTRY[table[-1][1]]
+
+
+__all__ = [
+    "GliBackend",
+    "register_backend",
+    "available_backends",
+    "get_backend",
+    "calibrate",
+    "calibration_path",
+    "select_backend",
+    "CALIBRATION_SIZES",
+    "CALIBRATION_MODES",
+]
@@ -8,16 +8,85 @@ This module defines the core geometric abstractions:
 - Segment: oriented line segment / 线段：有向线段
 - Curve: polyline made of segments / 曲线：由线段组成的折线
 - Structure: collection of nodes and curves / 结构：节点和曲线的集合
+
+A Structure stores its data as arrays (struct of arrays): one contiguous
+(N, 3) coordinate array, interned element / group codes, columnar node
+metadata, (M, 3) segment start / end arrays with their node ids, and a CSR
+node→segment incidence index. ``Node``, ``Segment`` and ``Curve`` objects
+returned by a Structure are lightweight views into these arrays; objects
+created directly are standalone and are copied in by ``add_node`` /
+``add_curve``.
+
+Structure以数组形式（结构体数组）存储数据：连续的 (N, 3) 坐标数组、驻留的元素/组编码、
+按列存储的节点元数据、(M, 3) 线段起止点数组及其节点ID，以及CSR形式的节点→线段关联索引。
+Structure返回的 ``Node``、``Segment``、``Curve`` 是这些数组上的轻量视图；直接创建的对象
+是独立的，由 ``add_node``/``add_curve`` 复制进结构。
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from collections.abc import Mapping, MutableMapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 import numpy as np
 
+# Marks a metadata key that a node does not have / 标记节点缺少的元数据键
+_MISSING = object()
+
+
+def _reserve(arr: np.ndarray, size: int) -> np.ndarray:
+    """Grow ``arr`` along axis 0 to hold ``size`` rows (amortized doubling) / 按倍增扩容"""
+    if arr.shape[0] >= size:
+        return arr
+    out = np.zeros((max(size, 2 * arr.shape[0], 16),) + arr.shape[1:], dtype=arr.dtype)
+    out[: arr.shape[0]] = arr
+    return out
+
+
+class _Column:
+    """
+    One metadata key for all nodes, stored categorically: an int32 code per
+    node (-1 = missing) into a table of distinct values.
+    所有节点的某一元数据键，以分类方式存储：每节点一个int32编码（-1表示缺失），指向不同值的表。
+    """
+
+    __slots__ = ("codes", "values", "index")
+
+    def __init__(self, n: int):
+        self.codes = np.full(n, -1, dtype=np.int32)
+        self.values: List[Any] = []
+        self.index: Dict[Any, int] = {}
+
+    def code(self, value: Any) -> int:
+        if value is _MISSING:
+            return -1
+        try:
+            # keep 1, 1.0 and True apart / 区分 1、1.0 与 True
+            key = (type(value), value)
+            code = self.index.get(key)
+        except TypeError:  # unhashable values are stored individually / 不可哈希的值单独存储
+            key, code = None, None
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            if key is not None:
+                self.index[key] = code
+        return code
+
+    def extend(self, n_old: int, values: Optional[List[Any]], k: int) -> None:
+        self.codes = _reserve(self.codes, n_old + k)
+        if values is None:
+            self.codes[n_old:n_old + k] = -1
+        else:
+            self.codes[n_old:n_old + k] = [self.code(v) for v in values]
+
+    def get(self, i: int) -> Any:
+        c = self.codes[i]
+        return _MISSING if c < 0 else self.values[c]
+
+    def set(self, i: int, value: Any) -> None:
+        self.codes[i] = self.code(value)
+
 
-@dataclass
 class Node:
     """
     A generic node in a biomolecular structure.
@@ -26,78 +95,235 @@ class Node:
     Can represent an atom, residue, or base, depending on usage.
     可以表示原子、残基或碱基，取决于使用场景。
 
+    Nodes obtained from ``Structure.nodes`` are views: reading or assigning
+    an attribute reads or writes the structure's arrays (``coord`` is a row
+    view of ``Structure.coords``).
+    从 ``Structure.nodes`` 获得的节点是视图：读写属性即读写结构的数组
+    （``coord`` 是 ``Structure.coords`` 的行视图）。
+
     Attributes / 属性
     ----------
     id : int
         Unique integer ID (0..N-1).
         唯一整数ID (0..N-1)
-        
+
     coord : np.ndarray
         3D coordinate, shape (3,).
         3D坐标，形状为(3,)
-        
+
     element : str
         Chemical element symbol (C, N, O, S, P, ...).
         化学元素符号 (C, N, O, S, P, ...)
-        
+
     group : str
         Higher-level group label (e.g. residue class, base type, functional group).
         更高层次的组标签（如残基类别、碱基类型、官能团）
-        
+
     metadata : dict
         Arbitrary extra information (residue name, chain ID, etc.).
         任意额外信息（残基名称、链ID等）
     """
 
-    id: int
-    coord: np.ndarray
-    element: str
-    group: str = ""
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    __slots__ = ("_struct", "_index", "_id", "_coord", "_element", "_group", "_metadata")
+
+    def __init__(
+        self,
+        id: int,
+        coord: np.ndarray,
+        element: str,
+        group: str = "",
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self._struct: Optional[Structure] = None
+        self._index = -1
+        self._id = id
+        self._coord = coord
+        self._element = element
+        self._group = group
+        self._metadata = {} if metadata is None else metadata
+
+    @classmethod
+    def _view(cls, struct: "Structure", index: int) -> "Node":
+        node = cls.__new__(cls)
+        node._struct = struct
+        node._index = index
+        return node
+
+    @property
+    def id(self) -> int:
+        if self._struct is None:
+            return self._id
+        return int(self._struct._node_ids[self._index])
+
+    @id.setter
+    def id(self, value: int) -> None:
+        if self._struct is None:
+            self._id = value
+        else:
+            self._struct._node_ids[self._index] = value
+
+    @property
+    def coord(self) -> np.ndarray:
+        if self._struct is None:
+            return self._coord
+        return self._struct._coords[self._index]
+
+    @coord.setter
+    def coord(self, value: np.ndarray) -> None:
+        if self._struct is None:
+            self._coord = value
+        else:
+            self._struct._coords[self._index] = value
+            self._struct._touch()
+
+    @property
+    def element(self) -> str:
+        if self._struct is None:
+            return self._element
+        return self._struct.vocab[self._struct._elem[self._index]]
+
+    @element.setter
+    def element(self, value: str) -> None:
+        if self._struct is None:
+            self._element = value
+        else:
+            self._struct._elem[self._index] = self._struct._code(value)
+
+    @property
+    def group(self) -> str:
+        if self._struct is None:
+            return self._group
+        return self._struct.vocab[self._struct._group[self._index]]
+
+    @group.setter
+    def group(self, value: str) -> None:
+        if self._struct is None:
+            self._group = value
+        else:
+            self._struct._group[self._index] = self._struct._code(value)
+
+    @property
+    def metadata(self) -> MutableMapping:
+        if self._struct is None:
+            return self._metadata
+        return _NodeMetadata(self._struct, self._index)
+
+    def __repr__(self) -> str:
+        return (
+            f"Node(id={self.id}, coord={np.asarray(self.coord)!r}, "
+            f"element={self.element!r}, group={self.group!r})"
+        )
 
 
-@dataclass
 class Segment:
     """
     A directed 3D line segment.
     有向3D线段。
 
+    Segments obtained from a Structure are views of its segment arrays.
+    从Structure获得的线段是其线段数组的视图。
+
     Attributes / 属性
     ----------
     start : np.ndarray
         Start coordinate (3,).
         起始坐标 (3,)
-        
+
     end : np.ndarray
         End coordinate (3,).
         终止坐标 (3,)
-        
+
     start_node_id : Optional[int]
         ID of the node at or near the start (if any).
         起始处或附近节点的ID（如果有）
-        
+
     end_node_id : Optional[int]
         ID of the node at or near the end (if any).
         终止处或附近节点的ID（如果有）
-        
+
     start_type : str
         Type label for start (e.g. element).
         起始类型标签（如元素）
-        
+
     end_type : str
         Type label for end (e.g. element).
         终止类型标签（如元素）
     """
 
-    start: np.ndarray
-    end: np.ndarray
-    start_node_id: Optional[int] = None
-    end_node_id: Optional[int] = None
-    start_type: str = ""
-    end_type: str = ""
+    __slots__ = ("_struct", "_index", "_start", "_end", "_start_node_id", "_end_node_id", "_start_type", "_end_type")
+
+    def __init__(
+        self,
+        start: np.ndarray,
+        end: np.ndarray,
+        start_node_id: Optional[int] = None,
+        end_node_id: Optional[int] = None,
+        start_type: str = "",
+        end_type: str = "",
+    ):
+        self._struct: Optional[Structure] = None
+        self._index = -1
+        self._start = start
+        self._end = end
+        self._start_node_id = start_node_id
+        self._end_node_id = end_node_id
+        self._start_type = start_type
+        self._end_type = end_type
+
+    @classmethod
+    def _view(cls, struct: "Structure", index: int) -> "Segment":
+        seg = cls.__new__(cls)
+        seg._struct = struct
+        seg._index = index
+        return seg
+
+    @property
+    def start(self) -> np.ndarray:
+        if self._struct is None:
+            return self._start
+        return self._struct._seg_start[self._index]
+
+    @property
+    def end(self) -> np.ndarray:
+        if self._struct is None:
+            return self._end
+        return self._struct._seg_end[self._index]
+
+    def _node_id(self, side: int) -> Optional[int]:
+        nid = int(self._struct._seg_nodes[self._index, side])
+        return None if nid < 0 else nid
+
+    @property
+    def start_node_id(self) -> Optional[int]:
+        if self._struct is None:
+            return self._start_node_id
+        return self._node_id(0)
+
+    @property
+    def end_node_id(self) -> Optional[int]:
+        if self._struct is None:
+            return self._end_node_id
+        return self._node_id(1)
+
+    @property
+    def start_type(self) -> str:
+        if self._struct is None:
+            return self._start_type
+        return self._struct.vocab[self._struct._seg_types[self._index, 0]]
+
+    @property
+    def end_type(self) -> str:
+        if self._struct is None:
+            return self._end_type
+        return self._struct.vocab[self._struct._seg_types[self._index, 1]]
+
+    def __repr__(self) -> str:
+        return (
+            f"Segment(start={np.asarray(self.start)!r}, end={np.asarray(self.end)!r}, "
+            f"start_node_id={self.start_node_id}, end_node_id={self.end_node_id})"
+        )
 
 
-@dataclass
 class Curve:
     """
     A polyline curve composed of segments.
@@ -108,22 +334,197 @@ class Curve:
     segments : List[Segment]
         The segments forming this curve.
         构成此曲线的线段
-        
+
     curve_type : str
         E.g. "backbone", "sidechain", "ring".
         例如 "backbone"（主链）、"sidechain"（侧链）、"ring"（环）
-        
+
     metadata : dict
         Additional info (chain id, residue ids involved, etc.).
         附加信息（链ID、涉及的残基ID等）
     """
 
-    segments: List[Segment]
-    curve_type: str = "generic"
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    __slots__ = ("_struct", "_index", "_segments", "_curve_type", "_metadata")
+
+    def __init__(
+        self,
+        segments: List[Segment],
+        curve_type: str = "generic",
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self._struct: Optional[Structure] = None
+        self._index = -1
+        self._segments = segments
+        self._curve_type = curve_type
+        self._metadata = {} if metadata is None else metadata
+
+    @classmethod
+    def _view(cls, struct: "Structure", index: int) -> "Curve":
+        curve = cls.__new__(cls)
+        curve._struct = struct
+        curve._index = index
+        return curve
+
+    @property
+    def segment_range(self) -> Tuple[int, int]:
+        """(start, stop) segment indices in the owning Structure / 在所属结构中的线段索引范围"""
+        if self._struct is None:
+            raise ValueError("curve is not part of a Structure")
+        ptr = self._struct._curve_ptr
+        return ptr[self._index], ptr[self._index + 1]
+
+    @property
+    def segments(self) -> List[Segment]:
+        if self._struct is None:
+            return self._segments
+        lo, hi = self.segment_range
+        return [Segment._view(self._struct, s) for s in range(lo, hi)]
+
+    @property
+    def curve_type(self) -> str:
+        if self._struct is None:
+            return self._curve_type
+        return self._struct._curve_types[self._index]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._struct is None:
+            return self._metadata
+        return self._struct._curve_meta[self._index]
+
+    def __repr__(self) -> str:
+        return f"Curve(curve_type={self.curve_type!r}, n_segments={len(self.segments)})"
+
+
+class _NodeMetadata(MutableMapping):
+    """Metadata dict of one node, backed by the structure's columns / 单节点元数据视图"""
+
+    __slots__ = ("_struct", "_index")
+
+    def __init__(self, struct: "Structure", index: int):
+        self._struct = struct
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        col = self._struct._meta.get(key)
+        value = _MISSING if col is None else col.get(self._index)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        col = self._struct._meta.get(key)
+        if col is None:
+            col = self._struct._meta[key] = _Column(self._struct._coords.shape[0])
+        col.set(self._index, value)
+
+    def __delitem__(self, key: str) -> None:
+        self[key]  # KeyError if absent / 不存在时抛出KeyError
+        self._struct._meta[key].set(self._index, _MISSING)
+
+    def __iter__(self) -> Iterator[str]:
+        for key, col in self._struct._meta.items():
+            if col.codes[self._index] >= 0:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _NodeList(Sequence):
+    """``Structure.nodes``: Node views by index / 按索引的节点视图序列"""
+
+    def __init__(self, struct: "Structure"):
+        self._struct = struct
+
+    def __len__(self) -> int:
+        return self._struct.n_nodes
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            return [Node._view(self._struct, k) for k in range(*i.indices(n))]
+        i = int(i)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("node index out of range")
+        return Node._view(self._struct, i)
+
+    def append(self, node: Node) -> None:
+        self._struct.add_node(node)
+
+
+class _CurveList(Sequence):
+    """``Structure.curves``: Curve views by index / 按索引的曲线视图序列"""
+
+    def __init__(self, struct: "Structure"):
+        self._struct = struct
+
+    def __len__(self) -> int:
+        return len(self._struct._curve_types)
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            return [Curve._view(self._struct, k) for k in range(*i.indices(n))]
+        i = int(i)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("curve index out of range")
+        return Curve._view(self._struct, i)
+
+    def append(self, curve: Curve) -> None:
+        self._struct.add_curve(curve)
+
+
+class _SegmentList(Sequence):
+    """``Structure.segments``: all Segment views in curve order / 按曲线顺序的全部线段视图"""
+
+    def __init__(self, struct: "Structure"):
+        self._struct = struct
+
+    def __len__(self) -> int:
+        return self._struct.n_segments
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            return [Segment._view(self._struct, k) for k in range(*i.indices(n))]
+        i = int(i)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("segment index out of range")
+        return Segment._view(self._struct, i)
+
+
+class _NodeSegments(Mapping):
+    """``Structure.node_segments``: node id -> incident Segment views / 节点ID -> 关联线段视图"""
+
+    def __init__(self, struct: "Structure"):
+        self._struct = struct
+
+    def __getitem__(self, node_id: int) -> List[Segment]:
+        ptr, seg_ids = self._struct._full_incidence()
+        node_id = int(node_id)
+        if not 0 <= node_id < ptr.size - 1 or ptr[node_id] == ptr[node_id + 1]:
+            raise KeyError(node_id)
+        return [Segment._view(self._struct, int(s)) for s in seg_ids[ptr[node_id]:ptr[node_id + 1]]]
+
+    def __iter__(self) -> Iterator[int]:
+        ptr, _ = self._struct._full_incidence()
+        return iter(int(i) for i in np.flatnonzero(np.diff(ptr)))
+
+    def __len__(self) -> int:
+        ptr, _ = self._struct._full_incidence()
+        return int(np.count_nonzero(np.diff(ptr)))
 
 
-@dataclass
 class Structure:
     """
     A biomolecular structure represented by nodes and curves.
@@ -131,72 +532,460 @@ class Structure:
 
     Attributes / 属性
     ----------
-    nodes : List[Node]
-        Node list.
-        节点列表
-        
-    curves : List[Curve]
+    nodes : Sequence[Node]
+        Node views, in index order.
+        节点视图，按索引顺序
+
+    curves : Sequence[Curve]
         Curves describing geometry (backbone, sidechains, rings, etc.).
         描述几何的曲线（主链、侧链、环等）
-        
-    node_segments : Dict[int, List[Segment]]
-        Mapping from node id to the list of segments incident to that node.
-        Used to compute local GLI per node pair.
-        
-        从节点ID到该节点关联的线段列表的映射。
+
+    node_segments : Mapping[int, List[Segment]]
+        Mapping from node id to the list of segments incident to that node,
+        derived from the curves. Used to compute local GLI per node pair.
+
+        从节点ID到该节点关联线段列表的映射，由曲线导出。
         用于计算每个节点对的局部GLI。
-        
+
     metadata : dict
         Global metadata (e.g. structure type, PDB ID).
         全局元数据（如结构类型、PDB ID）
+
+    parent, parent_index : Optional
+        For a sub-structure from ``within``: the structure it was taken from
+        and, per node, its index there; None otherwise.
+        由 ``within`` 得到的子结构：来源结构及每个节点在其中的索引；否则为None
+
+    Array views (no copies) / 数组视图（不复制）:
+    ``coords`` (N, 3), ``element_codes`` / ``group_codes`` (N,) into
+    ``vocab``, ``segment_starts`` / ``segment_ends`` (M, 3),
+    ``segment_node_ids`` (M, 2) with -1 for "no node", and
+    ``node_segment_csr()`` for the incidence index. Views of the arrays stay
+    valid until nodes or curves are added.
+    数组视图在添加节点或曲线之前保持有效。
     """
 
-    nodes: List[Node] = field(default_factory=list)
-    curves: List[Curve] = field(default_factory=list)
-    node_segments: Dict[int, List[Segment]] = field(default_factory=dict)
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    def __init__(
+        self,
+        nodes: Optional[Iterable[Node]] = None,
+        curves: Optional[Iterable[Curve]] = None,
+        node_segments: Optional[Dict[int, List[Segment]]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        ``node_segments`` is accepted for compatibility only: incidence is
+        always derived from the segment node ids of ``curves``.
+        ``node_segments`` 仅为兼容而保留：关联关系始终由 ``curves`` 中线段的节点ID导出。
+        """
+        self.metadata: Dict[str, Any] = {} if metadata is None else metadata
+        # interned strings for element / group / segment type codes
+        # 元素/组/线段类型编码对应的驻留字符串
+        self.vocab: List[str] = []
+        self._vocab_index: Dict[str, int] = {}
+        # nodes / 节点
+        self._n = 0
+        self._coords = np.zeros((0, 3), dtype=np.float64)
+        self._node_ids = np.zeros(0, dtype=np.int64)
+        self._elem = np.zeros(0, dtype=np.int32)
+        self._group = np.zeros(0, dtype=np.int32)
+        self._meta: Dict[str, _Column] = {}
+        # segments and curves / 线段与曲线
+        self._m = 0
+        self._seg_start = np.zeros((0, 3), dtype=np.float64)
+        self._seg_end = np.zeros((0, 3), dtype=np.float64)
+        self._seg_nodes = np.zeros((0, 2), dtype=np.int64)
+        self._seg_types = np.zeros((0, 2), dtype=np.int32)
+        self._curve_ptr: List[int] = [0]
+        self._curve_types: List[str] = []
+        self._curve_meta: List[Dict[str, Any]] = []
+        self._incidence: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        # Cached spatial indices keyed by cutoff (see core.neighbors)
+        # 按截断距离缓存的空间索引（见 core.neighbors）
+        self._cell_lists: Dict[Any, Any] = {}
+        self.parent: Optional[Structure] = None
+        self.parent_index: Optional[np.ndarray] = None
+        for node in nodes or ():
+            self.add_node(node)
+        for curve in curves or ():
+            self.add_curve(curve)
 
-    def add_curve(self, curve: Curve) -> None:
+    # ------------------------------------------------------------------
+    # interning / 驻留
+    # ------------------------------------------------------------------
+    def _code(self, s: str) -> int:
+        code = self._vocab_index.get(s)
+        if code is None:
+            code = self._vocab_index[s] = len(self.vocab)
+            self.vocab.append(s)
+        return code
+
+    def _codes(self, strings: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self._code(s) for s in strings), dtype=np.int32)
+
+    def _touch(self) -> None:
+        """Drop caches that depend on node coordinates / 丢弃依赖节点坐标的缓存"""
+        self._cell_lists.clear()
+
+    # ------------------------------------------------------------------
+    # building / 构建
+    # ------------------------------------------------------------------
+    def add_nodes(
+        self,
+        coords: np.ndarray,
+        elements: Iterable[str],
+        groups: Optional[Iterable[str]] = None,
+        metadata: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[np.ndarray] = None,
+    ) -> None:
         """
-        Add a curve to the structure and update node_segments mapping.
-        向结构添加曲线并更新node_segments映射。
-        
+        Append nodes from arrays in one step.
+        从数组一次性追加节点。
+
         Parameters / 参数
         ----------
-        curve : Curve
-            The curve to add / 要添加的曲线
+        coords : np.ndarray
+            (k, 3) coordinates / 坐标
+        elements : Iterable[str]
+            Element symbols / 元素符号
+        groups : Iterable[str], optional
+            Group labels (default "") / 组标签（默认 ""）
+        metadata : list of dict, optional
+            Per-node metadata, stored by column / 每节点元数据，按列存储
+        ids : np.ndarray, optional
+            Node ids (default: their indices) / 节点ID（默认等于索引）
         """
-        self.curves.append(curve)
-        # update node_segments mapping / 更新node_segments映射
-        for seg in curve.segments:
-            if seg.start_node_id is not None:
-                self.node_segments.setdefault(seg.start_node_id, []).append(seg)
-            if seg.end_node_id is not None:
-                self.node_segments.setdefault(seg.end_node_id, []).append(seg)
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        k = coords.shape[0]
+        elem = self._codes(elements)
+        group = self._codes(groups) if groups is not None else np.full(k, self._code(""), dtype=np.int32)
+        if elem.size != k or group.size != k:
+            raise ValueError("coords, elements and groups must have the same length")
+        n, end = self._n, self._n + k
+        self._coords = _reserve(self._coords, end)
+        self._node_ids = _reserve(self._node_ids, end)
+        self._elem = _reserve(self._elem, end)
+        self._group = _reserve(self._group, end)
+        self._coords[n:end] = coords
+        self._node_ids[n:end] = np.arange(n, end) if ids is None else np.asarray(ids, dtype=np.int64)
+        self._elem[n:end] = elem
+        self._group[n:end] = group
+        if metadata is not None:
+            if len(metadata) != k:
+                raise ValueError("metadata must have one entry per node")
+            for m in metadata:
+                for key in m:
+                    if key not in self._meta:
+                        self._meta[key] = _Column(n)
+        for key, col in self._meta.items():
+            values = None if metadata is None else [m.get(key, _MISSING) for m in metadata]
+            col.extend(n, values, k)
+        self._n = end
+        self._incidence = None
+        self._touch()
 
     def add_node(self, node: Node) -> None:
         """
         Add a node to the structure.
         向结构添加节点。
-        
+
         Parameters / 参数
         ----------
         node : Node
             The node to add / 要添加的节点
         """
-        self.nodes.append(node)
+        self.add_nodes(
+            np.asarray(node.coord, dtype=np.float64)[None, :],
+            [node.element],
+            [node.group],
+            metadata=[dict(node.metadata)],
+            ids=np.array([node.id], dtype=np.int64),
+        )
+
+    def add_segments(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        start_node_ids: Optional[np.ndarray] = None,
+        end_node_ids: Optional[np.ndarray] = None,
+        start_types: Optional[Iterable[str]] = None,
+        end_types: Optional[Iterable[str]] = None,
+        curve_type: str = "generic",
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Append one curve given as segment arrays; node ids of -1 (or None
+        entries) mean "no node".
+        以线段数组形式追加一条曲线；节点ID为-1（或None）表示无节点。
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 3)
+        k = starts.shape[0]
+
+        def _ids(ids) -> np.ndarray:
+            if ids is None:
+                return np.full(k, -1, dtype=np.int64)
+            return np.fromiter((-1 if v is None else v for v in ids), dtype=np.int64, count=k)
+
+        def _types(types) -> np.ndarray:
+            if types is None:
+                return np.full(k, self._code(""), dtype=np.int32)
+            return self._codes(types)
+
+        m, end = self._m, self._m + k
+        self._seg_start = _reserve(self._seg_start, end)
+        self._seg_end = _reserve(self._seg_end, end)
+        self._seg_nodes = _reserve(self._seg_nodes, end)
+        self._seg_types = _reserve(self._seg_types, end)
+        self._seg_start[m:end] = starts
+        self._seg_end[m:end] = ends
+        self._seg_nodes[m:end, 0] = _ids(start_node_ids)
+        self._seg_nodes[m:end, 1] = _ids(end_node_ids)
+        self._seg_types[m:end, 0] = _types(start_types)
+        self._seg_types[m:end, 1] = _types(end_types)
+        self._m = end
+        self._curve_ptr.append(end)
+        self._curve_types.append(curve_type)
+        self._curve_meta.append({} if metadata is None else metadata)
+        self._incidence = None
+
+    def add_curve(self, curve: Curve) -> None:
+        """
+        Add a curve to the structure and update node_segments mapping.
+        向结构添加曲线并更新node_segments映射。
+
+        Parameters / 参数
+        ----------
+        curve : Curve
+            The curve to add / 要添加的曲线
+        """
+        segs = curve.segments
+        self.add_segments(
+            np.array([np.asarray(s.start, dtype=np.float64) for s in segs]).reshape(-1, 3),
+            np.array([np.asarray(s.end, dtype=np.float64) for s in segs]).reshape(-1, 3),
+            [s.start_node_id for s in segs],
+            [s.end_node_id for s in segs],
+            [s.start_type for s in segs],
+            [s.end_type for s in segs],
+            curve_type=curve.curve_type,
+            metadata=curve.metadata,
+        )
+
+    # ------------------------------------------------------------------
+    # object views / 对象视图
+    # ------------------------------------------------------------------
+    @property
+    def nodes(self) -> _NodeList:
+        return _NodeList(self)
+
+    @property
+    def curves(self) -> _CurveList:
+        return _CurveList(self)
+
+    @property
+    def segments(self) -> _SegmentList:
+        """All segments in curve order / 按曲线顺序的全部线段"""
+        return _SegmentList(self)
+
+    @property
+    def node_segments(self) -> _NodeSegments:
+        return _NodeSegments(self)
+
+    # ------------------------------------------------------------------
+    # array views / 数组视图
+    # ------------------------------------------------------------------
+    @property
+    def n_nodes(self) -> int:
+        return self._n
+
+    @property
+    def n_segments(self) -> int:
+        return self._m
 
     @property
     def coords(self) -> np.ndarray:
         """
         Return a (N,3) array of node coordinates.
         返回节点坐标的(N,3)数组。
-        
+
+        This is a view of the node storage, not a copy; use ``set_coords``
+        to move nodes so cached spatial indices are refreshed.
+        这是节点存储的视图而非副本；移动节点请使用 ``set_coords`` 以刷新缓存的空间索引。
+
         Returns / 返回
         -------
         np.ndarray
             Coordinate array, shape (N, 3) / 坐标数组，形状为(N, 3)
         """
-        if not self.nodes:
-            return np.zeros((0, 3), dtype=float)
-        return np.stack([n.coord for n in self.nodes], axis=0)
+        return self._coords[: self._n]
+
+    def set_coords(self, coords: np.ndarray) -> None:
+        """Overwrite node coordinates in place / 就地覆盖节点坐标"""
+        self._coords[: self._n] = coords
+        self._touch()
+
+    @property
+    def node_ids(self) -> np.ndarray:
+        return self._node_ids[: self._n]
+
+    @property
+    def element_codes(self) -> np.ndarray:
+        """(N,) codes into ``vocab`` / 指向 ``vocab`` 的编码"""
+        return self._elem[: self._n]
+
+    @property
+    def group_codes(self) -> np.ndarray:
+        """(N,) codes into ``vocab`` / 指向 ``vocab`` 的编码"""
+        return self._group[: self._n]
+
+    @property
+    def segment_starts(self) -> np.ndarray:
+        return self._seg_start[: self._m]
+
+    @property
+    def segment_ends(self) -> np.ndarray:
+        return self._seg_end[: self._m]
+
+    @property
+    def segment_node_ids(self) -> np.ndarray:
+        """(M, 2) start / end node ids, -1 where absent / 起止节点ID，缺失为-1"""
+        return self._seg_nodes[: self._m]
+
+    @property
+    def segment_type_codes(self) -> np.ndarray:
+        """(M, 2) start / end type codes into ``vocab`` / 起止类型编码"""
+        return self._seg_types[: self._m]
+
+    def node_metadata(self, key: str, default: Any = None) -> List[Any]:
+        """One metadata column for all nodes / 所有节点的某一元数据列"""
+        col = self._meta.get(key)
+        if col is None:
+            return [default] * self._n
+        values = col.values + [default]
+        return [values[c] for c in col.codes[: self._n]]
+
+    def _full_incidence(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._incidence is None:
+            flat = self._seg_nodes[: self._m].reshape(-1)  # (start, end) per segment
+            entries = np.flatnonzero(flat >= 0)
+            keys = flat[entries]
+            size = max(self._n, int(keys.max()) + 1 if keys.size else 0)
+            order = np.argsort(keys, kind="stable")
+            ptr = np.zeros(size + 1, dtype=np.int64)
+            np.cumsum(np.bincount(keys, minlength=size), out=ptr[1:])
+            self._incidence = (ptr, entries[order] // 2)
+        return self._incidence
+
+    def node_segment_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        CSR node→segment incidence over node indices 0..N-1: segment ids of
+        node i are ``seg_ids[indptr[i]:indptr[i+1]]``, in insertion order (a
+        segment appears once per endpoint it has on the node).
+        节点索引0..N-1上的CSR节点→线段关联：节点i的线段ID为 ``seg_ids[indptr[i]:indptr[i+1]]``，
+        按插入顺序排列（线段在该节点上的每个端点各出现一次）。
+        """
+        ptr, seg_ids = self._full_incidence()
+        indptr = ptr[: self._n + 1]
+        return indptr, seg_ids[: indptr[-1]]
+
+    # ------------------------------------------------------------------
+    # neighborhoods / 邻域
+    # ------------------------------------------------------------------
+    def within(self, other: "Structure | np.ndarray", radius: float) -> "Structure":
+        """
+        Sub-structure of the nodes within ``radius`` of any node of ``other``
+        (a Structure or an (n, 3) array of points), e.g. a binding pocket or
+        an interface.
+        与 ``other``（结构或 (n, 3) 点数组）任一节点距离不超过 ``radius`` 的节点构成的子结构，
+        例如结合口袋或界面。
+
+        Nodes keep their order and are reindexed 0..k-1 (``parent_index``
+        maps them back). Curves are clipped to the segments with at least one
+        retained endpoint node; segment geometry is unchanged and endpoint
+        ids of dropped nodes become -1, so every retained node keeps all of
+        its incident segments and its pairwise GLI is unchanged. Candidates
+        come from the structure's cached cell list.
+        节点保持顺序并重新索引为0..k-1（``parent_index`` 映射回原索引）。曲线裁剪为至少有
+        一个保留端点节点的线段；线段几何不变，被删除节点的端点ID变为-1，因此每个保留节点
+        保留其全部关联线段，其成对GLI不变。候选节点来自结构缓存的单元格列表。
+        """
+        from .neighbors import structure_cell_list
+
+        points = other.coords if isinstance(other, Structure) else np.asarray(other, dtype=np.float64)
+        mask = np.zeros(self._n, dtype=bool)
+        if self._n and points.shape[0] and radius >= 0:
+            grid = structure_cell_list(self, max(float(radius), 1e-6))
+            _, idx, _ = grid.query(points.reshape(-1, 3), float(radius))
+            mask[idx] = True
+        keep = np.flatnonzero(mask)
+        k = keep.size
+
+        sub = type(self).__new__(type(self))
+        Structure.__init__(sub, metadata=dict(self.metadata))
+        sub.vocab = list(self.vocab)
+        sub._vocab_index = dict(self._vocab_index)
+        sub._n = k
+        sub._coords = self._coords[keep]
+        sub._node_ids = np.arange(k, dtype=np.int64)
+        sub._elem = self._elem[keep]
+        sub._group = self._group[keep]
+        for key, col in self._meta.items():
+            new = _Column(0)
+            new.codes = col.codes[keep]
+            new.values = list(col.values)
+            new.index = dict(col.index)
+            sub._meta[key] = new
+
+        # node ids address node indices (see node_segment_csr)
+        # 节点ID即节点索引（见 node_segment_csr）
+        remap = np.full(self._n + 1, -1, dtype=np.int64)
+        remap[keep] = np.arange(k)
+        nodes = self._seg_nodes[: self._m]
+        nodes = np.where((nodes >= 0) & (nodes < self._n), nodes, self._n)
+        seg_nodes = remap[nodes]
+        seg_keep = np.flatnonzero((seg_nodes >= 0).any(axis=1))
+        sub._m = seg_keep.size
+        sub._seg_start = self._seg_start[seg_keep]
+        sub._seg_end = self._seg_end[seg_keep]
+        sub._seg_nodes = seg_nodes[seg_keep]
+        sub._seg_types = self._seg_types[seg_keep]
+        n_curves = len(self._curve_types)
+        curve_of = np.repeat(np.arange(n_curves), np.diff(self._curve_ptr))
+        counts = np.bincount(curve_of[seg_keep], minlength=n_curves)
+        kept_curves = np.flatnonzero(counts)
+        sub._curve_ptr = [0] + np.cumsum(counts[kept_curves]).tolist()
+        sub._curve_types = [self._curve_types[c] for c in kept_curves]
+        sub._curve_meta = [dict(self._curve_meta[c]) for c in kept_curves]
+
+        sub.parent = self
+        sub.parent_index = keep
+        return sub
+
+    # ------------------------------------------------------------------
+    # persistence / 持久化
+    # ------------------------------------------------------------------
+    def save(self, path: str) -> str:
+        """
+        Write this structure to a binary structure file (see
+        ``gaussbio3d.io.structure_file``).
+        将结构写入二进制结构文件（见 ``gaussbio3d.io.structure_file``）。
+        """
+        from ..io.structure_file import save_structure
+
+        return save_structure(self, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "Structure":
+        """
+        Read a structure file; arrays are memory-mapped copy-on-write unless
+        ``mmap=False``. Called on a subclass, returns that subclass.
+        读取结构文件；除非 ``mmap=False``，数组以写时复制方式内存映射。在子类上调用时返回该子类。
+        """
+        from ..io.structure_file import load_structure
+
+        return load_structure(path, mmap=mmap, cls=None if cls is Structure else cls)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(n_nodes={self._n}, n_curves={len(self._curve_types)}, "
+            f"n_segments={self._m}, metadata={self.metadata!r})"
+        )
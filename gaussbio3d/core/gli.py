@@ -13,7 +13,7 @@ from __future__ import annotations
 import numpy as np
 from typing import Tuple
 from .geometry import Segment, Curve, Structure
-from .gli_segment import gli_segment
+from .gli_segment import gli_segment, gli_segment_matrix_accel as gli_segment_matrix
 from .pairwise_gli import compute_pairwise_node_gli
 
 
@@ -34,8 +34,10 @@ def gli_curves(curve1: Curve, curve2: Curve, signed: bool = False) -> float:
     float
         Total GLI between the two curves / 两条曲线之间的总GLI
     """
-    total = 0.0
-    for s1 in curve1.segments:
-        for s2 in curve2.segments:
-            total += gli_segment(s1, s2, signed=signed)
-    return total
+    if not curve1.segments or not curve2.segments:
+        return 0.0
+    A0 = np.stack([s.start for s in curve1.segments], axis=0).astype(float)
+    A1 = np.stack([s.end for s in curve1.segments], axis=0).astype(float)
+    B0 = np.stack([s.start for s in curve2.segments], axis=0).astype(float)
+    B1 = np.stack([s.end for s in curve2.segments], axis=0).astype(float)
+    return float(gli_segment_matrix(A0, A1, B0, B1, signed=signed).sum())
@@ -0,0 +1,452 @@
+"""
+Analytic coordinate gradients of segment-level GLI
+线段级GLI的解析坐标梯度
+
+Reverse-mode derivatives of the spherical-quadrilateral GLI kernel with
+respect to the four segment endpoints (a0, a1, b0, b1), in vectorized numpy
+and (optionally) allocation-free numba form. The chirality sign of signed
+GLI is piecewise constant and contributes no gradient; at |n_k·n_{k+1}| = 1
+the arcsin derivative is clamped to stay finite.
+
+球面四边形GLI内核对四个线段端点 (a0, a1, b0, b1) 的反向模式导数，提供numpy矢量化
+与（可选）无堆分配的numba实现。有符号GLI的手性符号分段为常数，不贡献梯度；
+在 |n_k·n_{k+1}| = 1 处arcsin导数被截断以保持有限。
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+from .gli_segment import _HAS_NUMBA, MATRIX_TILE_PAIRS, _kernel_dtype, _rows_per_tile
+
+if _HAS_NUMBA:
+    import numba  # type: ignore
+
+# Floor on 1 - x^2 inside d/dx arcsin(x) / arcsin导数中 1 - x^2 的下限
+_ASIN_EPS = 1e-12
+
+
+def _norm_safe(v: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    n = np.linalg.norm(v, axis=-1, keepdims=True)
+    small = n < 1e-12
+    return np.where(small, 1.0, n), small
+
+
+def _unit_bwd(g: np.ndarray, u: np.ndarray, n: np.ndarray, small: np.ndarray) -> np.ndarray:
+    # u = v / |v| (or u = v when |v| < 1e-12, matching the forward kernel)
+    proj = g - np.sum(g * u, axis=-1, keepdims=True) * u
+    return np.where(small, g, proj / n)
+
+
+def _gli_grad_broadcast(
+    a0: np.ndarray,
+    a1: np.ndarray,
+    b0: np.ndarray,
+    b1: np.ndarray,
+    signed: bool,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    GLI and its endpoint gradients over broadcastable endpoint arrays.
+    对可广播端点数组计算GLI及其端点梯度。
+    """
+    r00 = b0 - a0
+    r01 = b1 - a0
+    r10 = b0 - a1
+    r11 = b1 - a1
+
+    l00, s00 = _norm_safe(r00)
+    l01, s01 = _norm_safe(r01)
+    l10, s10 = _norm_safe(r10)
+    l11, s11 = _norm_safe(r11)
+    u00 = r00 / l00
+    u01 = r01 / l01
+    u10 = r10 / l10
+    u11 = r11 / l11
+
+    c0 = np.cross(u00, u01)
+    c1 = np.cross(u01, u11)
+    c2 = np.cross(u11, u10)
+    c3 = np.cross(u10, u00)
+    m0, t0 = _norm_safe(c0)
+    m1, t1 = _norm_safe(c1)
+    m2, t2 = _norm_safe(c2)
+    m3, t3 = _norm_safe(c3)
+    n0 = c0 / m0
+    n1 = c1 / m1
+    n2 = c2 / m2
+    n3 = c3 / m3
+
+    d0 = np.sum(n0 * n1, axis=-1)
+    d1 = np.sum(n1 * n2, axis=-1)
+    d2 = np.sum(n2 * n3, axis=-1)
+    d3 = np.sum(n3 * n0, axis=-1)
+    x0, x1, x2, x3 = (np.clip(d, -1.0, 1.0) for d in (d0, d1, d2, d3))
+    area = np.arcsin(x0) + np.arcsin(x1) + np.arcsin(x2) + np.arcsin(x3)
+
+    if signed:
+        triple = np.sum(np.cross(a1 - a0, b1 - b0) * r00, axis=-1)
+        sign = np.where(np.abs(triple) > 1e-12, np.sign(triple), 1.0)
+        gli = sign * area / (4.0 * np.pi)
+        g_area = sign / (4.0 * np.pi)
+    else:
+        gli = np.abs(area) / (4.0 * np.pi)
+        g_area = np.sign(area) / (4.0 * np.pi)
+
+    def _asin_bwd(d, x):
+        inside = np.abs(d) < 1.0
+        return np.where(inside, g_area / np.sqrt(np.maximum(1.0 - x * x, _ASIN_EPS)), 0.0)[..., None]
+
+    g_d0 = _asin_bwd(d0, x0)
+    g_d1 = _asin_bwd(d1, x1)
+    g_d2 = _asin_bwd(d2, x2)
+    g_d3 = _asin_bwd(d3, x3)
+
+    g_c0 = _unit_bwd(g_d0 * n1 + g_d3 * n3, n0, m0, t0)
+    g_c1 = _unit_bwd(g_d0 * n0 + g_d1 * n2, n1, m1, t1)
+    g_c2 = _unit_bwd(g_d1 * n1 + g_d2 * n3, n2, m2, t2)
+    g_c3 = _unit_bwd(g_d2 * n2 + g_d3 * n0, n3, m3, t3)
+
+    # c = p × q  =>  dp = q × g,  dq = g × p
+    g_u00 = np.cross(u01, g_c0) + np.cross(g_c3, u10)
+    g_u01 = np.cross(g_c0, u00) + np.cross(u11, g_c1)
+    g_u11 = np.cross(g_c1, u01) + np.cross(u10, g_c2)
+    g_u10 = np.cross(g_c2, u11) + np.cross(u00, g_c3)
+
+    g_r00 = _unit_bwd(g_u00, u00, l00, s00)
+    g_r01 = _unit_bwd(g_u01, u01, l01, s01)
+    g_r10 = _unit_bwd(g_u10, u10, l10, s10)
+    g_r11 = _unit_bwd(g_u11, u11, l11, s11)
+
+    g_a0 = -(g_r00 + g_r01)
+    g_a1 = -(g_r10 + g_r11)
+    g_b0 = g_r00 + g_r10
+    g_b1 = g_r01 + g_r11
+    return gli, g_a0, g_a1, g_b0, g_b1
+
+
+def gli_segment_batch_grad(
+    a0: np.ndarray,
+    a1: np.ndarray,
+    b0: np.ndarray,
+    b1: np.ndarray,
+    signed: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized GLI with analytic gradients over batches of segment endpoints.
+    对线段端点批次的矢量化GLI及其解析梯度。
+
+    Parameters
+    ----------
+    a0, a1, b0, b1 : np.ndarray
+        Arrays of shape (N, 3) for segment endpoints.
+        线段端点数组，形状为 (N, 3)
+    signed : bool
+        Whether to keep sign (chirality) / 是否保留符号（手性）
+
+    Returns
+    -------
+    gli : np.ndarray
+        GLI values of shape (N,) / GLI值，形状为 (N,)
+    g_a0, g_a1, g_b0, g_b1 : np.ndarray
+        dGLI/d(endpoint), each of shape (N, 3) / 各端点梯度，形状为 (N, 3)
+    """
+    assert a0.shape == a1.shape == b0.shape == b1.shape
+    assert a0.ndim == 2 and a0.shape[1] == 3
+    return _gli_grad_broadcast(a0, a1, b0, b1, signed)
+
+
+def gli_segment_matrix_vjp(
+    A0: np.ndarray,
+    A1: np.ndarray,
+    B0: np.ndarray,
+    B1: np.ndarray,
+    W: np.ndarray,
+    signed: bool = False,
+    max_pairs: int = MATRIX_TILE_PAIRS,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (M, N) GLI block and its vector-Jacobian product with weights W.
+    (M, N) GLI矩阵块及其与权重W的向量-雅可比积。
+
+    Returns G (M, N) and the gradients of sum(W * G) with respect to
+    A0, A1 (M, 3) and B0, B1 (N, 3), tiled over rows of A.
+    返回 G (M, N) 以及 sum(W * G) 对 A0、A1 (M, 3) 与 B0、B1 (N, 3) 的梯度。
+    """
+    M = A0.shape[0]
+    N = B0.shape[0]
+    dt = _kernel_dtype(A0, A1, B0, B1)
+    G = np.zeros((M, N), dtype=dt)
+    dA0 = np.zeros((M, 3), dtype=dt)
+    dA1 = np.zeros((M, 3), dtype=dt)
+    dB0 = np.zeros((N, 3), dtype=dt)
+    dB1 = np.zeros((N, 3), dtype=dt)
+    if M == 0 or N == 0:
+        return G, dA0, dA1, dB0, dB1
+    step = _rows_per_tile(N, max_pairs)
+    for s in range(0, M, step):
+        e = min(M, s + step)
+        g, ga0, ga1, gb0, gb1 = _gli_grad_broadcast(
+            A0[s:e, None, :], A1[s:e, None, :], B0[None, :, :], B1[None, :, :], signed
+        )
+        w = W[s:e, :, None]
+        G[s:e] = g
+        dA0[s:e] = np.sum(w * ga0, axis=1)
+        dA1[s:e] = np.sum(w * ga1, axis=1)
+        dB0 += np.sum(w * gb0, axis=0)
+        dB1 += np.sum(w * gb1, axis=0)
+    return G, dA0, dA1, dB0, dB1
+
+
+if _HAS_NUMBA:
+    from .gli_segment import _cross3_nb, _unit3_nb
+
+    @numba.njit(fastmath=True, nogil=True, cache=True, inline="always")
+    def _unit_bwd3_nb(gx, gy, gz, ux, uy, uz, n):
+        if n < 1e-12:
+            return gx, gy, gz
+        p = gx * ux + gy * uy + gz * uz
+        return (gx - p * ux) / n, (gy - p * uy) / n, (gz - p * uz) / n
+
+    @numba.njit(fastmath=True, nogil=True, cache=True, inline="always")
+    def _asin_bwd_nb(d, g_area):
+        if d >= 1.0 or d <= -1.0:
+            return 0.0
+        return g_area / math.sqrt(max(1.0 - d * d, _ASIN_EPS))
+
+    @numba.njit(fastmath=True, nogil=True, cache=True)
+    def _gli_pair_grad_nb(A0, A1, i, B0, B1, j, signed):
+        a0x, a0y, a0z = A0[i, 0], A0[i, 1], A0[i, 2]
+        a1x, a1y, a1z = A1[i, 0], A1[i, 1], A1[i, 2]
+        b0x, b0y, b0z = B0[j, 0], B0[j, 1], B0[j, 2]
+        b1x, b1y, b1z = B1[j, 0], B1[j, 1], B1[j, 2]
+
+        r00x, r00y, r00z = b0x - a0x, b0y - a0y, b0z - a0z
+        r01x, r01y, r01z = b1x - a0x, b1y - a0y, b1z - a0z
+        r10x, r10y, r10z = b0x - a1x, b0y - a1y, b0z - a1z
+        r11x, r11y, r11z = b1x - a1x, b1y - a1y, b1z - a1z
+        l00 = math.sqrt(r00x * r00x + r00y * r00y + r00z * r00z)
+        l01 = math.sqrt(r01x * r01x + r01y * r01y + r01z * r01z)
+        l10 = math.sqrt(r10x * r10x + r10y * r10y + r10z * r10z)
+        l11 = math.sqrt(r11x * r11x + r11y * r11y + r11z * r11z)
+        u00x, u00y, u00z = _unit3_nb(r00x, r00y, r00z)
+        u01x, u01y, u01z = _unit3_nb(r01x, r01y, r01z)
+        u10x, u10y, u10z = _unit3_nb(r10x, r10y, r10z)
+        u11x, u11y, u11z = _unit3_nb(r11x, r11y, r11z)
+
+        c0x, c0y, c0z = _cross3_nb(u00x, u00y, u00z, u01x, u01y, u01z)
+        c1x, c1y, c1z = _cross3_nb(u01x, u01y, u01z, u11x, u11y, u11z)
+        c2x, c2y, c2z = _cross3_nb(u11x, u11y, u11z, u10x, u10y, u10z)
+        c3x, c3y, c3z = _cross3_nb(u10x, u10y, u10z, u00x, u00y, u00z)
+        m0 = math.sqrt(c0x * c0x + c0y * c0y + c0z * c0z)
+        m1 = math.sqrt(c1x * c1x + c1y * c1y + c1z * c1z)
+        m2 = math.sqrt(c2x * c2x + c2y * c2y + c2z * c2z)
+        m3 = math.sqrt(c3x * c3x + c3y * c3y + c3z * c3z)
+        n0x, n0y, n0z = _unit3_nb(c0x, c0y, c0z)
+        n1x, n1y, n1z = _unit3_nb(c1x, c1y, c1z)
+        n2x, n2y, n2z = _unit3_nb(c2x, c2y, c2z)
+        n3x, n3y, n3z = _unit3_nb(c3x, c3y, c3z)
+
+        d0 = n0x * n1x + n0y * n1y + n0z * n1z
+        d1 = n1x * n2x + n1y * n2y + n1z * n2z
+        d2 = n2x * n3x + n2y * n3y + n2z * n3z
+        d3 = n3x * n0x + n3y * n0y + n3z * n0z
+        area = (
+            math.asin(min(1.0, max(-1.0, d0)))
+            + math.asin(min(1.0, max(-1.0, d1)))
+            + math.asin(min(1.0, max(-1.0, d2)))
+            + math.asin(min(1.0, max(-1.0, d3)))
+        )
+
+        if signed:
+            tx, ty, tz = _cross3_nb(
+                a1x - a0x, a1y - a0y, a1z - a0z,
+                b1x - b0x, b1y - b0y, b1z - b0z,
+            )
+            triple = tx * r00x + ty * r00y + tz * r00z
+            sign = math.copysign(1.0, triple) if abs(triple) > 1e-12 else 1.0
+            gli = sign * area / (4.0 * math.pi)
+            g_area = sign / (4.0 * math.pi)
+        else:
+            gli = abs(area) / (4.0 * math.pi)
+            if area > 0.0:
+                g_area = 1.0 / (4.0 * math.pi)
+            elif area < 0.0:
+                g_area = -1.0 / (4.0 * math.pi)
+            else:
+                g_area = 0.0
+
+        g0 = _asin_bwd_nb(d0, g_area)
+        g1 = _asin_bwd_nb(d1, g_area)
+        g2 = _asin_bwd_nb(d2, g_area)
+        g3 = _asin_bwd_nb(d3, g_area)
+
+        gc0x, gc0y, gc0z = _unit_bwd3_nb(
+            g0 * n1x + g3 * n3x, g0 * n1y + g3 * n3y, g0 * n1z + g3 * n3z, n0x, n0y, n0z, m0
+        )
+        gc1x, gc1y, gc1z = _unit_bwd3_nb(
+            g0 * n0x + g1 * n2x, g0 * n0y + g1 * n2y, g0 * n0z + g1 * n2z, n1x, n1y, n1z, m1
+        )
+        gc2x, gc2y, gc2z = _unit_bwd3_nb(
+            g1 * n1x + g2 * n3x, g1 * n1y + g2 * n3y, g1 * n1z + g2 * n3z, n2x, n2y, n2z, m2
+        )
+        gc3x, gc3y, gc3z = _unit_bwd3_nb(
+            g2 * n2x + g3 * n0x, g2 * n2y + g3 * n0y, g2 * n2z + g3 * n0z, n3x, n3y, n3z, m3
+        )
+
+        # c = p × q  =>  dp = q × g,  dq = g × p
+        p1x, p1y, p1z = _cross3_nb(u01x, u01y, u01z, gc0x, gc0y, gc0z)
+        p2x, p2y, p2z = _cross3_nb(gc3x, gc3y, gc3z, u10x, u10y, u10z)
+        gu00x, gu00y, gu00z = p1x + p2x, p1y + p2y, p1z + p2z
+        p1x, p1y, p1z = _cross3_nb(gc0x, gc0y, gc0z, u00x, u00y, u00z)
+        p2x, p2y, p2z = _cross3_nb(u11x, u11y, u11z, gc1x, gc1y, gc1z)
+        gu01x, gu01y, gu01z = p1x + p2x, p1y + p2y, p1z + p2z
+        p1x, p1y, p1z = _cross3_nb(gc1x, gc1y, gc1z, u01x, u01y, u01z)
+        p2x, p2y, p2z = _cross3_nb(u10x, u10y, u10z, gc2x, gc2y, gc2z)
+        gu11x, gu11y, gu11z = p1x + p2x, p1y + p2y, p1z + p2z
+        p1x, p1y, p1z = _cross3_nb(gc2x, gc2y, gc2z, u11x, u11y, u11z)
+        p2x, p2y, p2z = _cross3_nb(u00x, u00y, u00z, gc3x, gc3y, gc3z)
+        gu10x, gu10y, gu10z = p1x + p2x, p1y + p2y, p1z + p2z
+
+        g00x, g00y, g00z = _unit_bwd3_nb(gu00x, gu00y, gu00z, u00x, u00y, u00z, l00)
+        g01x, g01y, g01z = _unit_bwd3_nb(gu01x, gu01y, gu01z, u01x, u01y, u01z, l01)
+        g10x, g10y, g10z = _unit_bwd3_nb(gu10x, gu10y, gu10z, u10x, u10y, u10z, l10)
+        g11x, g11y, g11z = _unit_bwd3_nb(gu11x, gu11y, gu11z, u11x, u11y, u11z, l11)
+
+        return (
+            gli,
+            -(g00x + g01x), -(g00y + g01y), -(g00z + g01z),
+            -(g10x + g11x), -(g10y + g11y), -(g10z + g11z),
+            g00x + g10x, g00y + g10y, g00z + g10z,
+            g01x + g11x, g01y + g11y, g01z + g11z,
+        )
+
+    @numba.njit(fastmath=True, parallel=True, cache=True)
+    def _gli_segment_batch_grad_numba(a0, a1, b0, b1, signed):
+        N = a0.shape[0]
+        gli = np.empty(N, dtype=a0.dtype)
+        grads = np.empty((4, N, 3), dtype=a0.dtype)
+        for k in numba.prange(N):
+            r = _gli_pair_grad_nb(a0, a1, k, b0, b1, k, signed)
+            gli[k] = r[0]
+            grads[0, k, 0] = r[1]
+            grads[0, k, 1] = r[2]
+            grads[0, k, 2] = r[3]
+            grads[1, k, 0] = r[4]
+            grads[1, k, 1] = r[5]
+            grads[1, k, 2] = r[6]
+            grads[2, k, 0] = r[7]
+            grads[2, k, 1] = r[8]
+            grads[2, k, 2] = r[9]
+            grads[3, k, 0] = r[10]
+            grads[3, k, 1] = r[11]
+            grads[3, k, 2] = r[12]
+        return gli, grads
+
+    @numba.njit(fastmath=True, nogil=True, cache=True)
+    def _gli_segment_matrix_vjp_numba(A0, A1, B0, B1, W, signed):
+        M = A0.shape[0]
+        N = B0.shape[0]
+        G = np.empty((M, N), dtype=A0.dtype)
+        dA = np.zeros((2, M, 3), dtype=A0.dtype)
+        dB = np.zeros((2, N, 3), dtype=A0.dtype)
+        for i in range(M):
+            for j in range(N):
+                r = _gli_pair_grad_nb(A0, A1, i, B0, B1, j, signed)
+                G[i, j] = r[0]
+                w = W[i, j]
+                if w == 0.0:
+                    continue
+                dA[0, i, 0] += w * r[1]
+                dA[0, i, 1] += w * r[2]
+                dA[0, i, 2] += w * r[3]
+                dA[1, i, 0] += w * r[4]
+                dA[1, i, 1] += w * r[5]
+                dA[1, i, 2] += w * r[6]
+                dB[0, j, 0] += w * r[7]
+                dB[0, j, 1] += w * r[8]
+                dB[0, j, 2] += w * r[9]
+                dB[1, j, 0] += w * r[10]
+                dB[1, j, 1] += w * r[11]
+                dB[1, j, 2] += w * r[12]
+        return G, dA, dB
+
+    def gli_segment_batch_grad_accel(
+        a0: np.ndarray,
+        a1: np.ndarray,
+        b0: np.ndarray,
+        b1: np.ndarray,
+        signed: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Accelerated batch GLI gradients using numba when available.
+        当可用时，使用numba的加速批量GLI梯度。
+        """
+        dt = _kernel_dtype(a0, a1, b0, b1)
+        a0 = np.ascontiguousarray(a0, dtype=dt)
+        a1 = np.ascontiguousarray(a1, dtype=dt)
+        b0 = np.ascontiguousarray(b0, dtype=dt)
+        b1 = np.ascontiguousarray(b1, dtype=dt)
+        gli, grads = _gli_segment_batch_grad_numba(a0, a1, b0, b1, signed)
+        return gli, grads[0], grads[1], grads[2], grads[3]
+
+    def gli_segment_matrix_vjp_accel(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        W: np.ndarray,
+        signed: bool = False,
+        max_pairs: int = MATRIX_TILE_PAIRS,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Accelerated GLI block vector-Jacobian product using numba when available.
+        当可用时，使用numba的加速GLI矩阵块向量-雅可比积。
+        """
+        dt = _kernel_dtype(A0, A1, B0, B1)
+        A0 = np.ascontiguousarray(A0, dtype=dt)
+        A1 = np.ascontiguousarray(A1, dtype=dt)
+        B0 = np.ascontiguousarray(B0, dtype=dt)
+        B1 = np.ascontiguousarray(B1, dtype=dt)
+        W = np.ascontiguousarray(W, dtype=dt)
+        G, dA, dB = _gli_segment_matrix_vjp_numba(A0, A1, B0, B1, W, signed)
+        return G, dA[0], dA[1], dB[0], dB[1]
+else:
+
+    def gli_segment_batch_grad_accel(
+        a0: np.ndarray,
+        a1: np.ndarray,
+        b0: np.ndarray,
+        b1: np.ndarray,
+        signed: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Fallback to numpy vectorized gradients when numba is unavailable.
+        当numba不可用时，回退到numpy矢量化梯度。
+        """
+        return gli_segment_batch_grad(a0, a1, b0, b1, signed)
+
+    def gli_segment_matrix_vjp_accel(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        W: np.ndarray,
+        signed: bool = False,
+        max_pairs: int = MATRIX_TILE_PAIRS,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Fallback to the numpy vector-Jacobian product when numba is unavailable.
+        当numba不可用时，回退到numpy向量-雅可比积。
+        """
+        return gli_segment_matrix_vjp(A0, A1, B0, B1, W, signed, max_pairs=max_pairs)
+
+
+__all__ = [
+    "gli_segment_batch_grad",
+    "gli_segment_batch_grad_accel",
+    "gli_segment_matrix_vjp",
+    "gli_segment_matrix_vjp_accel",
+]
@@ -22,6 +22,21 @@ except Exception:
     _HAS_NUMBA = False
 
 
+# Default cap on segment pairs evaluated per tile in gli_segment_matrix
+# gli_segment_matrix 每块计算的线段对数量默认上限
+MATRIX_TILE_PAIRS = 1 << 18
+
+
+def _kernel_dtype(*arrays: np.ndarray) -> np.dtype:
+    """
+    float32 if every input is float32, else float64 (the reference precision).
+    所有输入均为float32时返回float32，否则返回float64（参考精度）。
+    """
+    if arrays and all(np.asarray(a).dtype == np.float32 for a in arrays):
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
 def _unit(v: np.ndarray) -> np.ndarray:
     n = np.linalg.norm(v, axis=-1, keepdims=True)
     n = np.where(n < 1e-12, 1.0, n)
@@ -102,7 +117,24 @@ def gli_segment_batch(
     """
     assert a0.shape == a1.shape == b0.shape == b1.shape
     assert a0.ndim == 2 and a0.shape[1] == 3
+    return _gli_broadcast(a0, a1, b0, b1, signed)
+
 
+def _gli_broadcast(
+    a0: np.ndarray,
+    a1: np.ndarray,
+    b0: np.ndarray,
+    b1: np.ndarray,
+    signed: bool = False,
+) -> np.ndarray:
+    """
+    GLI kernel over endpoint arrays that broadcast against each other.
+    对可相互广播的端点数组计算GLI的核心内核。
+
+    The last axis holds xyz; all leading axes follow numpy broadcasting,
+    e.g. (M, 1, 3) against (1, N, 3) yields an (M, N) block.
+    最后一维为xyz，前导维度遵循numpy广播规则。
+    """
     r00 = b0 - a0
     r01 = b1 - a0
     r10 = b0 - a1
@@ -137,26 +169,164 @@ def gli_segment_batch(
     return np.abs(gli) if not signed else gli
 
 
-if _HAS_NUMBA:
+def _rows_per_tile(n_cols: int, max_pairs: int) -> int:
+    return max(1, int(max_pairs) // max(1, int(n_cols)))
 
-    @numba.njit(fastmath=True, parallel=True)
-    def _unit_nb(v: np.ndarray) -> np.ndarray:
-        n = math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
-        if n < 1e-12:
-            n = 1.0
-        return np.array([v[0] / n, v[1] / n, v[2] / n])
 
-    @numba.njit(fastmath=True)
-    def _cross_nb(a: np.ndarray, b: np.ndarray) -> np.ndarray:
-        return np.array([
-            a[1] * b[2] - a[2] * b[1],
-            a[2] * b[0] - a[0] * b[2],
-            a[0] * b[1] - a[1] * b[0],
-        ])
+def gli_segment_matrix(
+    A0: np.ndarray,
+    A1: np.ndarray,
+    B0: np.ndarray,
+    B1: np.ndarray,
+    signed: bool = False,
+    max_pairs: int = MATRIX_TILE_PAIRS,
+) -> np.ndarray:
+    """
+    Segment-by-segment GLI block between M segments of A and N segments of B.
+    A的M条线段与B的N条线段之间的逐线段GLI矩阵块。
 
-    @numba.njit(fastmath=True)
-    def _dot_nb(a: np.ndarray, b: np.ndarray) -> float:
-        return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+    Computed by broadcasting (M, 1, 3) against (1, N, 3) without building
+    repeated/tiled endpoint copies. Rows of A are processed in tiles so that
+    at most ``max_pairs`` segment pairs are live at once.
+
+    通过 (M,1,3) 与 (1,N,3) 广播计算，无需 repeat/tile 复制端点；
+    按A的行分块，使同时存在的线段对不超过 ``max_pairs``。
+
+    Parameters
+    ----------
+    A0, A1 : np.ndarray
+        Start/end points of A segments, shape (M, 3).
+    B0, B1 : np.ndarray
+        Start/end points of B segments, shape (N, 3).
+    signed : bool
+        Whether to keep sign (chirality) / 是否保留符号（手性）
+    max_pairs : int
+        Memory cap on segment pairs evaluated per tile / 每块线段对数量上限
+
+    Returns
+    -------
+    np.ndarray
+        GLI block of shape (M, N) / 形状为 (M, N) 的GLI矩阵块
+    """
+    assert A0.shape == A1.shape and B0.shape == B1.shape
+    assert A0.ndim == 2 and A0.shape[1] == 3 and B0.ndim == 2 and B0.shape[1] == 3
+    M = A0.shape[0]
+    N = B0.shape[0]
+    out = np.empty((M, N), dtype=_kernel_dtype(A0, A1, B0, B1))
+    if M == 0 or N == 0:
+        return out
+    b0 = B0[None, :, :]
+    b1 = B1[None, :, :]
+    step = _rows_per_tile(N, max_pairs)
+    for s in range(0, M, step):
+        e = min(M, s + step)
+        out[s:e] = _gli_broadcast(A0[s:e, None, :], A1[s:e, None, :], b0, b1, signed)
+    return out
+
+
+def far_field_factor(tol: float) -> float:
+    """
+    Near-field radius, in units of the longer segment length, for a tolerance.
+    给定容差下的近场半径（以较长线段长度为单位）。
+
+    The dipole term misses the exact GLI by at most ~0.25 (L/|r|)^2 relative
+    to the pair scale |t_a||t_b| / (4π|r|^2), for L/|r| <= 0.5; pairs with
+    |r| >= factor * L therefore stay within ``tol`` of that scale.
+    偶极项相对尺度 |t_a||t_b|/(4π|r|^2) 的误差不超过约 0.25 (L/|r|)^2。
+    """
+    if tol <= 0:
+        raise ValueError(f"far_field_tol must be positive, got {tol}")
+    return max(2.0, 0.5 / math.sqrt(float(tol)))
+
+
+def _gli_far_field_broadcast(
+    a0: np.ndarray,
+    a1: np.ndarray,
+    b0: np.ndarray,
+    b1: np.ndarray,
+    signed: bool,
+    factor: float,
+) -> np.ndarray:
+    ta = a1 - a0
+    tb = b1 - b0
+    r = 0.5 * ((b0 + b1) - (a0 + a1))
+    d = np.linalg.norm(r, axis=-1)
+    lmax = np.maximum(np.linalg.norm(ta, axis=-1), np.linalg.norm(tb, axis=-1))
+    near = d < factor * lmax
+
+    # Dipole term at the midpoints / 中点处的偶极项
+    d3 = np.where(d > 0, d, 1.0) ** 3
+    gli = np.sum(np.cross(ta, tb) * r, axis=-1) / (4.0 * np.pi * d3)
+    gli = np.broadcast_to(gli, near.shape).copy()
+
+    # Exact kernel inside the near-field radius / 近场内使用精确内核
+    if near.any():
+        idx = np.nonzero(near)
+        sel = lambda x: np.broadcast_to(x, near.shape + (3,))[idx]
+        gli[idx] = _gli_broadcast(sel(a0), sel(a1), sel(b0), sel(b1), True)
+    return np.abs(gli) if not signed else gli
+
+
+def gli_segment_matrix_far_field(
+    A0: np.ndarray,
+    A1: np.ndarray,
+    B0: np.ndarray,
+    B1: np.ndarray,
+    signed: bool = False,
+    tol: float = 1e-3,
+    max_pairs: int = MATRIX_TILE_PAIRS,
+) -> np.ndarray:
+    """
+    (M, N) GLI block with a far-field dipole approximation for distant pairs.
+    对远距线段对使用远场偶极近似的 (M, N) GLI矩阵块。
+
+    Pairs whose midpoint separation |r| exceeds ``far_field_factor(tol)``
+    times the longer segment length use (t_a × t_b)·r / (4π|r|^3); closer
+    pairs use the exact spherical-quadrilateral kernel. The error of each
+    approximated pair is at most ``tol`` * |t_a||t_b| / (4π|r|^2).
+
+    中点距离 |r| 超过 ``far_field_factor(tol)`` 倍较长线段长度的线段对使用
+    (t_a × t_b)·r / (4π|r|^3)，其余使用精确的球面四边形内核；
+    近似误差不超过 ``tol`` * |t_a||t_b| / (4π|r|^2)。
+    """
+    assert A0.shape == A1.shape and B0.shape == B1.shape
+    assert A0.ndim == 2 and A0.shape[1] == 3 and B0.ndim == 2 and B0.shape[1] == 3
+    factor = far_field_factor(tol)
+    M = A0.shape[0]
+    N = B0.shape[0]
+    out = np.empty((M, N), dtype=_kernel_dtype(A0, A1, B0, B1))
+    if M == 0 or N == 0:
+        return out
+    b0 = B0[None, :, :]
+    b1 = B1[None, :, :]
+    step = _rows_per_tile(N, max_pairs)
+    for s in range(0, M, step):
+        e = min(M, s + step)
+        out[s:e] = _gli_far_field_broadcast(
+            A0[s:e, None, :], A1[s:e, None, :], b0, b1, signed, factor
+        )
+    return out
+
+
+def gli_segment_batch_far_field(
+    a0: np.ndarray,
+    a1: np.ndarray,
+    b0: np.ndarray,
+    b1: np.ndarray,
+    signed: bool = False,
+    tol: float = 1e-3,
+) -> np.ndarray:
+    """
+    (N,) GLI of paired segments with the far-field dipole approximation of
+    ``gli_segment_matrix_far_field``.
+    使用 ``gli_segment_matrix_far_field`` 远场偶极近似的成对线段 (N,) GLI。
+    """
+    assert a0.shape == a1.shape == b0.shape == b1.shape
+    assert a0.ndim == 2 and a0.shape[1] == 3
+    return _gli_far_field_broadcast(a0, a1, b0, b1, signed, far_field_factor(tol))
+
+
+if _HAS_NUMBA:
 
     @numba.njit(fastmath=True)
     def _asin_clamp_nb(x: float) -> float:
@@ -166,7 +336,162 @@ if _HAS_NUMBA:
             x = 1.0
         return math.asin(x)
 
-    @numba.njit(fastmath=True, parallel=True)
+    # Scalar-register helpers: 3-vectors travel as (x, y, z) tuples, which
+    # numba keeps on the stack, so the kernels below never touch the heap.
+    # 标量寄存器辅助函数：三维向量以 (x, y, z) 元组传递，不产生堆分配。
+
+    @numba.njit(fastmath=True, nogil=True, cache=True, inline="always")
+    def _unit3_nb(x: float, y: float, z: float):
+        n = math.sqrt(x * x + y * y + z * z)
+        if n < 1e-12:
+            n = 1.0
+        return x / n, y / n, z / n
+
+    @numba.njit(fastmath=True, nogil=True, cache=True, inline="always")
+    def _cross3_nb(ax: float, ay: float, az: float, bx: float, by: float, bz: float):
+        return ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx
+
+    @numba.njit(fastmath=True, nogil=True, cache=True, inline="always")
+    def _unit_cross3_nb(ax: float, ay: float, az: float, bx: float, by: float, bz: float):
+        cx, cy, cz = _cross3_nb(ax, ay, az, bx, by, bz)
+        return _unit3_nb(cx, cy, cz)
+
+    @numba.njit(fastmath=True, nogil=True, cache=True)
+    def _gli_pair_nb(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        i: int,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        j: int,
+        signed: bool,
+    ) -> float:
+        a0x, a0y, a0z = A0[i, 0], A0[i, 1], A0[i, 2]
+        a1x, a1y, a1z = A1[i, 0], A1[i, 1], A1[i, 2]
+        b0x, b0y, b0z = B0[j, 0], B0[j, 1], B0[j, 2]
+        b1x, b1y, b1z = B1[j, 0], B1[j, 1], B1[j, 2]
+
+        r00x, r00y, r00z = b0x - a0x, b0y - a0y, b0z - a0z
+        u00x, u00y, u00z = _unit3_nb(r00x, r00y, r00z)
+        u01x, u01y, u01z = _unit3_nb(b1x - a0x, b1y - a0y, b1z - a0z)
+        u10x, u10y, u10z = _unit3_nb(b0x - a1x, b0y - a1y, b0z - a1z)
+        u11x, u11y, u11z = _unit3_nb(b1x - a1x, b1y - a1y, b1z - a1z)
+
+        n0x, n0y, n0z = _unit_cross3_nb(u00x, u00y, u00z, u01x, u01y, u01z)
+        n1x, n1y, n1z = _unit_cross3_nb(u01x, u01y, u01z, u11x, u11y, u11z)
+        n2x, n2y, n2z = _unit_cross3_nb(u11x, u11y, u11z, u10x, u10y, u10z)
+        n3x, n3y, n3z = _unit_cross3_nb(u10x, u10y, u10z, u00x, u00y, u00z)
+
+        area = (
+            _asin_clamp_nb(n0x * n1x + n0y * n1y + n0z * n1z)
+            + _asin_clamp_nb(n1x * n2x + n1y * n2y + n1z * n2z)
+            + _asin_clamp_nb(n2x * n3x + n2y * n3y + n2z * n3z)
+            + _asin_clamp_nb(n3x * n0x + n3y * n0y + n3z * n0z)
+        )
+
+        gli = area / (4.0 * math.pi)
+        if not signed:
+            return abs(gli)
+        tx, ty, tz = _cross3_nb(
+            a1x - a0x, a1y - a0y, a1z - a0z,
+            b1x - b0x, b1y - b0y, b1z - b0z,
+        )
+        triple = tx * r00x + ty * r00y + tz * r00z
+        if abs(triple) > 1e-12:
+            return math.copysign(1.0, triple) * gli
+        return gli
+
+    @numba.njit(fastmath=True, nogil=True, cache=True)
+    def gli_segment_batch_numba_nogil(
+        a0: np.ndarray,
+        a1: np.ndarray,
+        b0: np.ndarray,
+        b1: np.ndarray,
+        signed: bool = False,
+    ) -> np.ndarray:
+        N = a0.shape[0]
+        out = np.empty(N, dtype=a0.dtype)
+        for k in range(N):
+            out[k] = _gli_pair_nb(a0, a1, k, b0, b1, k, signed)
+        return out
+
+    @numba.njit(fastmath=True, nogil=True, cache=True)
+    def gli_segment_matrix_numba_nogil(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        signed: bool = False,
+    ) -> np.ndarray:
+        M = A0.shape[0]
+        N = B0.shape[0]
+        out = np.empty((M, N), dtype=A0.dtype)
+        for i in range(M):
+            for j in range(N):
+                out[i, j] = _gli_pair_nb(A0, A1, i, B0, B1, j, signed)
+        return out
+
+    @numba.njit(fastmath=True, nogil=True, cache=True)
+    def _gli_pair_far_field_nb(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        i: int,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        j: int,
+        signed: bool,
+        factor: float,
+    ) -> float:
+        tax, tay, taz = A1[i, 0] - A0[i, 0], A1[i, 1] - A0[i, 1], A1[i, 2] - A0[i, 2]
+        tbx, tby, tbz = B1[j, 0] - B0[j, 0], B1[j, 1] - B0[j, 1], B1[j, 2] - B0[j, 2]
+        rx = 0.5 * ((B0[j, 0] + B1[j, 0]) - (A0[i, 0] + A1[i, 0]))
+        ry = 0.5 * ((B0[j, 1] + B1[j, 1]) - (A0[i, 1] + A1[i, 1]))
+        rz = 0.5 * ((B0[j, 2] + B1[j, 2]) - (A0[i, 2] + A1[i, 2]))
+        d2 = rx * rx + ry * ry + rz * rz
+        l2 = max(tax * tax + tay * tay + taz * taz, tbx * tbx + tby * tby + tbz * tbz)
+        if d2 < factor * factor * l2 or d2 == 0.0:
+            return _gli_pair_nb(A0, A1, i, B0, B1, j, signed)
+        cx, cy, cz = _cross3_nb(tax, tay, taz, tbx, tby, tbz)
+        gli = (cx * rx + cy * ry + cz * rz) / (4.0 * math.pi * d2 * math.sqrt(d2))
+        if not signed:
+            return abs(gli)
+        return gli
+
+    @numba.njit(fastmath=True, parallel=True, cache=True)
+    def gli_segment_matrix_far_field_numba(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        signed: bool,
+        factor: float,
+    ) -> np.ndarray:
+        M = A0.shape[0]
+        N = B0.shape[0]
+        out = np.empty((M, N), dtype=A0.dtype)
+        for i in numba.prange(M):
+            for j in range(N):
+                out[i, j] = _gli_pair_far_field_nb(A0, A1, i, B0, B1, j, signed, factor)
+        return out
+
+    @numba.njit(fastmath=True, nogil=True, cache=True)
+    def gli_segment_matrix_far_field_numba_nogil(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        signed: bool,
+        factor: float,
+    ) -> np.ndarray:
+        M = A0.shape[0]
+        N = B0.shape[0]
+        out = np.empty((M, N), dtype=A0.dtype)
+        for i in range(M):
+            for j in range(N):
+                out[i, j] = _gli_pair_far_field_nb(A0, A1, i, B0, B1, j, signed, factor)
+        return out
+
+    @numba.njit(fastmath=True, parallel=True, cache=True)
     def gli_segment_batch_numba(
         a0: np.ndarray,
         a1: np.ndarray,
@@ -175,46 +500,77 @@ if _HAS_NUMBA:
         signed: bool = False,
     ) -> np.ndarray:
         N = a0.shape[0]
-        out = np.empty(N, dtype=np.float64)
+        out = np.empty(N, dtype=a0.dtype)
         for k in numba.prange(N):
-            r00 = b0[k] - a0[k]
-            r01 = b1[k] - a0[k]
-            r10 = b0[k] - a1[k]
-            r11 = b1[k] - a1[k]
-
-            u00 = _unit_nb(r00)
-            u01 = _unit_nb(r01)
-            u10 = _unit_nb(r10)
-            u11 = _unit_nb(r11)
-
-            n0 = _unit_nb(_cross_nb(u00, u01))
-            n1 = _unit_nb(_cross_nb(u01, u11))
-            n2 = _unit_nb(_cross_nb(u11, u10))
-            n3 = _unit_nb(_cross_nb(u10, u00))
-
-            area = (
-                _asin_clamp_nb(_dot_nb(n0, n1))
-                + _asin_clamp_nb(_dot_nb(n1, n2))
-                + _asin_clamp_nb(_dot_nb(n2, n3))
-                + _asin_clamp_nb(_dot_nb(n3, n0))
-            )
-
-            sign = 1.0
-            if signed:
-                t1 = a1[k] - a0[k]
-                t2 = b1[k] - b0[k]
-                triple = _dot_nb(_cross_nb(t1, t2), r00)
-                if abs(triple) > 1e-12:
-                    sign = math.copysign(1.0, triple)
-                else:
-                    sign = 1.0
-
-            gli = sign * area / (4.0 * math.pi)
-            if not signed:
-                gli = abs(gli)
-            out[k] = gli
+            out[k] = _gli_pair_nb(a0, a1, k, b0, b1, k, signed)
+        return out
+
+    @numba.njit(fastmath=True, parallel=True, cache=True)
+    def gli_segment_matrix_numba(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        signed: bool = False,
+    ) -> np.ndarray:
+        M = A0.shape[0]
+        N = B0.shape[0]
+        out = np.empty((M, N), dtype=A0.dtype)
+        for i in numba.prange(M):
+            for j in range(N):
+                out[i, j] = _gli_pair_nb(A0, A1, i, B0, B1, j, signed)
         return out
 
+    def gli_segment_matrix_accel(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        signed: bool = False,
+        max_pairs: int = MATRIX_TILE_PAIRS,
+    ) -> np.ndarray:
+        """
+        Accelerated (M, N) GLI block using numba when available.
+        当可用时，使用numba的加速 (M, N) GLI矩阵块。
+
+        The numba kernel keeps no pair temporaries, so ``max_pairs`` is
+        accepted only for signature compatibility.
+        numba内核无线段对临时数组，``max_pairs`` 仅为签名兼容保留。
+        """
+        dt = _kernel_dtype(A0, A1, B0, B1)
+        A0 = np.ascontiguousarray(A0, dtype=dt)
+        A1 = np.ascontiguousarray(A1, dtype=dt)
+        B0 = np.ascontiguousarray(B0, dtype=dt)
+        B1 = np.ascontiguousarray(B1, dtype=dt)
+        return gli_segment_matrix_numba(A0, A1, B0, B1, signed)
+
+    def gli_segment_matrix_far_field_accel(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        signed: bool = False,
+        tol: float = 1e-3,
+        max_pairs: int = MATRIX_TILE_PAIRS,
+        nogil: bool = False,
+    ) -> np.ndarray:
+        """
+        Accelerated far-field GLI block using numba when available.
+        当可用时，使用numba的加速远场GLI矩阵块。
+
+        ``nogil=True`` selects the serial GIL-free kernel for thread pools.
+        ``nogil=True`` 选择适用于线程池的串行无GIL内核。
+        """
+        factor = far_field_factor(tol)
+        dt = _kernel_dtype(A0, A1, B0, B1)
+        A0 = np.ascontiguousarray(A0, dtype=dt)
+        A1 = np.ascontiguousarray(A1, dtype=dt)
+        B0 = np.ascontiguousarray(B0, dtype=dt)
+        B1 = np.ascontiguousarray(B1, dtype=dt)
+        if nogil:
+            return gli_segment_matrix_far_field_numba_nogil(A0, A1, B0, B1, signed, factor)
+        return gli_segment_matrix_far_field_numba(A0, A1, B0, B1, signed, factor)
+
     def gli_segment_batch_accel(
         a0: np.ndarray,
         a1: np.ndarray,
@@ -226,7 +582,53 @@ if _HAS_NUMBA:
         Accelerated batch GLI using numba when available.
         当可用时，使用numba的加速批量GLI。
         """
+        dt = _kernel_dtype(a0, a1, b0, b1)
+        a0 = np.ascontiguousarray(a0, dtype=dt)
+        a1 = np.ascontiguousarray(a1, dtype=dt)
+        b0 = np.ascontiguousarray(b0, dtype=dt)
+        b1 = np.ascontiguousarray(b1, dtype=dt)
         return gli_segment_batch_numba(a0, a1, b0, b1, signed)
+
+    def gli_segment_batch_nogil(
+        a0: np.ndarray,
+        a1: np.ndarray,
+        b0: np.ndarray,
+        b1: np.ndarray,
+        signed: bool = False,
+    ) -> np.ndarray:
+        """
+        Allocation-free serial numba batch GLI that releases the GIL.
+        无堆分配、释放GIL的串行numba批量GLI。
+
+        Intended for callers that parallelize with threads themselves; the
+        compiled kernel is cached on disk so worker processes skip the JIT.
+        适用于自行使用线程并行的调用方；编译结果缓存到磁盘，工作进程无需重新编译。
+        """
+        dt = _kernel_dtype(a0, a1, b0, b1)
+        a0 = np.ascontiguousarray(a0, dtype=dt)
+        a1 = np.ascontiguousarray(a1, dtype=dt)
+        b0 = np.ascontiguousarray(b0, dtype=dt)
+        b1 = np.ascontiguousarray(b1, dtype=dt)
+        return gli_segment_batch_numba_nogil(a0, a1, b0, b1, signed)
+
+    def gli_segment_matrix_nogil(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        signed: bool = False,
+        max_pairs: int = MATRIX_TILE_PAIRS,
+    ) -> np.ndarray:
+        """
+        Allocation-free serial numba (M, N) GLI block that releases the GIL.
+        无堆分配、释放GIL的串行numba (M, N) GLI矩阵块。
+        """
+        dt = _kernel_dtype(A0, A1, B0, B1)
+        A0 = np.ascontiguousarray(A0, dtype=dt)
+        A1 = np.ascontiguousarray(A1, dtype=dt)
+        B0 = np.ascontiguousarray(B0, dtype=dt)
+        B1 = np.ascontiguousarray(B1, dtype=dt)
+        return gli_segment_matrix_numba_nogil(A0, A1, B0, B1, signed)
 else:
 
     def gli_segment_batch_accel(
@@ -242,8 +644,52 @@ else:
         """
         return gli_segment_batch(a0, a1, b0, b1, signed)
 
+    def gli_segment_matrix_accel(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        signed: bool = False,
+        max_pairs: int = MATRIX_TILE_PAIRS,
+    ) -> np.ndarray:
+        """
+        Fallback to the numpy broadcast block when numba is unavailable.
+        当numba不可用时，回退到numpy广播矩阵块。
+        """
+        return gli_segment_matrix(A0, A1, B0, B1, signed, max_pairs=max_pairs)
+
+    def gli_segment_matrix_far_field_accel(
+        A0: np.ndarray,
+        A1: np.ndarray,
+        B0: np.ndarray,
+        B1: np.ndarray,
+        signed: bool = False,
+        tol: float = 1e-3,
+        max_pairs: int = MATRIX_TILE_PAIRS,
+        nogil: bool = False,
+    ) -> np.ndarray:
+        """
+        Fallback to the numpy far-field block when numba is unavailable.
+        当numba不可用时，回退到numpy远场矩阵块。
+        """
+        return gli_segment_matrix_far_field(A0, A1, B0, B1, signed, tol=tol, max_pairs=max_pairs)
+
+    # numpy already releases the GIL inside its ufunc loops
+    # numpy 在 ufunc 循环内部已释放GIL
+    gli_segment_batch_nogil = gli_segment_batch_accel
+    gli_segment_matrix_nogil = gli_segment_matrix_accel
+
 __all__ = [
     "gli_segment",
     "gli_segment_batch",
     "gli_segment_batch_accel",
+    "gli_segment_matrix",
+    "gli_segment_matrix_accel",
+    "gli_segment_batch_nogil",
+    "gli_segment_matrix_nogil",
+    "gli_segment_matrix_far_field",
+    "gli_segment_batch_far_field",
+    "gli_segment_matrix_far_field_accel",
+    "far_field_factor",
+    "MATRIX_TILE_PAIRS",
 ]
\ No newline at end of file
@@ -13,6 +13,8 @@ from __future__ import annotations
 
 import numpy as np
 
+from .gli_segment import MATRIX_TILE_PAIRS, _kernel_dtype
+
 try:
     import torch  # type: ignore
     _HAS_TORCH = True
@@ -26,6 +28,10 @@ def _unit_t(x: "torch.Tensor") -> "torch.Tensor":
     return x / n
 
 
+def _torch_dtype(np_dtype: np.dtype) -> "torch.dtype":
+    return torch.float32 if np_dtype == np.float32 else torch.float64
+
+
 def _asin_clamp_t(x: "torch.Tensor") -> "torch.Tensor":
     return torch.arcsin(torch.clamp(x, -1.0, 1.0))
 
@@ -62,12 +68,25 @@ def gli_segment_batch_torch(
     if device is None:
         device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    # Convert to torch tensors
-    a0_t = torch.as_tensor(a0, dtype=torch.float64, device=device)
-    a1_t = torch.as_tensor(a1, dtype=torch.float64, device=device)
-    b0_t = torch.as_tensor(b0, dtype=torch.float64, device=device)
-    b1_t = torch.as_tensor(b1, dtype=torch.float64, device=device)
+    # Convert to torch tensors (float32 inputs stay float32)
+    dt = _torch_dtype(_kernel_dtype(a0, a1, b0, b1))
+    a0_t = torch.as_tensor(a0, dtype=dt, device=device)
+    a1_t = torch.as_tensor(a1, dtype=dt, device=device)
+    b0_t = torch.as_tensor(b0, dtype=dt, device=device)
+    b1_t = torch.as_tensor(b1, dtype=dt, device=device)
+
+    gli = _gli_core_t(a0_t, a1_t, b0_t, b1_t, signed)
+    out = gli.detach().cpu().numpy()
+    return out
+
 
+def _gli_core_t(
+    a0_t: "torch.Tensor",
+    a1_t: "torch.Tensor",
+    b0_t: "torch.Tensor",
+    b1_t: "torch.Tensor",
+    signed: bool,
+) -> "torch.Tensor":
     r00 = b0_t - a0_t
     r01 = b1_t - a0_t
     r10 = b0_t - a1_t
@@ -78,10 +97,10 @@ def gli_segment_batch_torch(
     u10 = _unit_t(r10)
     u11 = _unit_t(r11)
 
-    n0 = _unit_t(torch.cross(u00, u01))
-    n1 = _unit_t(torch.cross(u01, u11))
-    n2 = _unit_t(torch.cross(u11, u10))
-    n3 = _unit_t(torch.cross(u10, u00))
+    n0 = _unit_t(torch.linalg.cross(u00, u01, dim=-1))
+    n1 = _unit_t(torch.linalg.cross(u01, u11, dim=-1))
+    n2 = _unit_t(torch.linalg.cross(u11, u10, dim=-1))
+    n3 = _unit_t(torch.linalg.cross(u10, u00, dim=-1))
 
     area = (
         _asin_clamp_t(torch.sum(n0 * n1, dim=-1))
@@ -93,18 +112,117 @@ def gli_segment_batch_torch(
     if signed:
         t1 = a1_t - a0_t
         t2 = b1_t - b0_t
-        triple = torch.sum(torch.cross(t1, t2) * r00, dim=-1)
-        sign = torch.where(torch.abs(triple) > 1e-12, torch.sign(triple), torch.tensor(1.0, device=device))
+        triple = torch.sum(torch.linalg.cross(t1, t2, dim=-1) * r00, dim=-1)
+        one = torch.ones((), device=triple.device, dtype=triple.dtype)
+        sign = torch.where(torch.abs(triple) > 1e-12, torch.sign(triple), one)
     else:
-        sign = torch.tensor(1.0, device=device)
+        sign = 1.0
 
     gli = sign * area / (4.0 * np.pi)
     if not signed:
         gli = torch.abs(gli)
+    return gli
 
-    out = gli.detach().cpu().numpy()
+
+def gli_segment_matrix_torch(
+    A0: np.ndarray,
+    A1: np.ndarray,
+    B0: np.ndarray,
+    B1: np.ndarray,
+    signed: bool = False,
+    device: str | None = None,
+    max_pairs: int = MATRIX_TILE_PAIRS,
+) -> np.ndarray:
+    """
+    Torch-based (M, N) GLI block between M segments of A and N segments of B.
+    基于Torch的A的M条线段与B的N条线段之间的 (M, N) GLI矩阵块。
+
+    Uses broadcasting over (M, 1, 3) x (1, N, 3), tiled over rows of A
+    so that at most ``max_pairs`` pairs live on the device at once.
+
+    Parameters
+    ----------
+    A0,A1 : np.ndarray
+        Arrays of shape (M,3)
+    B0,B1 : np.ndarray
+        Arrays of shape (N,3)
+    signed : bool
+        Whether to keep sign
+    device : str, optional
+        Torch device (e.g., "cuda"). If None, uses cuda if available.
+    max_pairs : int
+        Memory cap on segment pairs evaluated per tile
+
+    Returns
+    -------
+    np.ndarray
+        GLI block of shape (M, N)
+    """
+    if not _HAS_TORCH:
+        raise ImportError("PyTorch is required for GPU GLI (pip install torch)")
+
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    M = A0.shape[0]
+    N = B0.shape[0]
+    np_dt = _kernel_dtype(A0, A1, B0, B1)
+    out = np.empty((M, N), dtype=np_dt)
+    if M == 0 or N == 0:
+        return out
+
+    dt = _torch_dtype(np_dt)
+    A0_t = torch.as_tensor(A0, dtype=dt, device=device)
+    A1_t = torch.as_tensor(A1, dtype=dt, device=device)
+    b0_t = torch.as_tensor(B0, dtype=dt, device=device)[None, :, :]
+    b1_t = torch.as_tensor(B1, dtype=dt, device=device)[None, :, :]
+
+    step = max(1, int(max_pairs) // N)
+    for s in range(0, M, step):
+        e = min(M, s + step)
+        blk = _gli_core_t(A0_t[s:e, None, :], A1_t[s:e, None, :], b0_t, b1_t, signed)
+        out[s:e] = blk.detach().cpu().numpy()
     return out
 
 
-__all__ = ["gli_segment_batch_torch"]
+def gli_segment_batch_grad_torch(
+    a0: np.ndarray,
+    a1: np.ndarray,
+    b0: np.ndarray,
+    b1: np.ndarray,
+    signed: bool = False,
+    device: str | None = None,
+):
+    """
+    Torch autograd GLI gradients for segment endpoint arrays.
+    基于Torch自动微分的线段端点数组GLI梯度。
+
+    Each GLI value depends only on its own row of endpoints, so one backward
+    pass of the summed GLI yields the per-pair gradients.
+    每个GLI值只依赖自身一行端点，因此对GLI之和做一次反向传播即得到逐对梯度。
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (gli (N,), g_a0, g_a1, g_b0, g_b1 each (N,3)), as ``gli_segment_batch_grad``
+    """
+    if not _HAS_TORCH:
+        raise ImportError("PyTorch is required for GPU GLI (pip install torch)")
+
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    dt = _torch_dtype(_kernel_dtype(a0, a1, b0, b1))
+    ts = [
+        torch.as_tensor(x, dtype=dt, device=device).detach().clone().requires_grad_(True)
+        for x in (a0, a1, b0, b1)
+    ]
+    gli = _gli_core_t(*ts, signed)
+    grads = torch.autograd.grad(gli.sum(), ts)
+    out = [gli.detach().cpu().numpy()]
+    out.extend(g.detach().cpu().numpy() for g in grads)
+    return tuple(out)
+
+
+__all__ = ["gli_segment_batch_torch", "gli_segment_matrix_torch", "gli_segment_batch_grad_torch"]
 
@@ -0,0 +1,305 @@
+"""
+Cell-list neighbor search
+基于单元格列表的近邻搜索
+
+A uniform grid over a point set answers "all points within a cutoff" for a
+batch of query points in O(N + pairs) without materializing a dense
+distance matrix. Grids are built once per structure and cached, so one
+structure can be queried against many partners.
+
+在点集上建立均匀网格，对一批查询点在 O(N + 点对数) 内找出截断距离内的全部点，
+无需构造稠密距离矩阵。网格按结构构建一次并缓存，可与多个配体/伙伴重复查询。
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .geometry import Structure
+from .gli_segment import _HAS_NUMBA
+
+if _HAS_NUMBA:
+    import numba  # type: ignore
+
+# Cells are padded so a query at the design cutoff only needs adjacent cells
+# even after rounding (and float32 distances) / 单元格略微放大，保证设计截断距离下只需相邻单元格
+_CELL_PAD = 1.0 + 1e-5
+
+# Query points processed per chunk (bounds temporary memory)
+# 每块处理的查询点数（限制临时内存）
+QUERY_CHUNK = 4096
+
+# Rows of the (rows, N_B) distance tile / 距离矩阵分块的行数
+DISTANCE_TILE_PAIRS = 1 << 20
+
+
+class CellList:
+    """
+    Uniform-grid spatial index over a fixed set of points.
+    固定点集上的均匀网格空间索引。
+
+    Parameters / 参数
+    ----------
+    coords : np.ndarray
+        Indexed points, shape (N, 3) / 被索引的点，形状为 (N, 3)
+    cutoff : float
+        Design query radius; cells have edge ``cutoff`` (slightly padded).
+        Larger radii can still be queried by scanning more cells.
+        设计查询半径；单元格边长约为 ``cutoff``。更大的半径也可查询（扫描更多单元格）。
+    """
+
+    def __init__(self, coords: np.ndarray, cutoff: float):
+        if cutoff is None or cutoff <= 0:
+            raise ValueError(f"cutoff must be positive, got {cutoff}")
+        self.coords = np.asarray(coords)
+        self.cutoff = float(cutoff)
+        self.cell_size = self.cutoff * _CELL_PAD
+        n = self.coords.shape[0]
+        if n == 0:
+            self.origin = np.zeros(3)
+            self.dims = np.ones(3, dtype=np.int64)
+            self.order = np.zeros(0, dtype=np.int64)
+            self.sorted_coords = self.coords
+            self.cell_keys = np.zeros(0, dtype=np.int64)
+            self.cell_start = np.zeros(1, dtype=np.int64)
+            return
+        pts = self.coords.astype(np.float64, copy=False)
+        self.origin = pts.min(axis=0)
+        cells = self._cell_index(pts)
+        self.dims = cells.max(axis=0) + 1
+        keys = self._linear_key(cells)
+        # Points sorted by cell; CSR over occupied cells
+        # 按单元格排序的点；占用单元格上的CSR
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_coords = np.ascontiguousarray(self.coords[self.order])
+        sorted_keys = keys[self.order]
+        self.cell_keys, first = np.unique(sorted_keys, return_index=True)
+        self.cell_start = np.append(first, n).astype(np.int64)
+
+    def _cell_index(self, pts: np.ndarray) -> np.ndarray:
+        return np.floor((pts - self.origin) / self.cell_size).astype(np.int64)
+
+    def _linear_key(self, cells: np.ndarray) -> np.ndarray:
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+
+    def matches(self, coords: np.ndarray) -> bool:
+        """Whether the index was built on these coordinates / 索引是否基于这些坐标构建"""
+        return coords.shape == self.coords.shape and np.array_equal(coords, self.coords)
+
+    def query(
+        self,
+        points: np.ndarray,
+        cutoff: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All indexed points within ``cutoff`` of each query point.
+        每个查询点在 ``cutoff`` 内的全部被索引点。
+
+        Returns / 返回
+        -------
+        ptr : np.ndarray
+            CSR row pointer, shape (Q+1,) / CSR行指针
+        idx : np.ndarray
+            Indexed point ids, ascending within each row / 被索引点ID（每行内升序）
+        dist : np.ndarray
+            Euclidean distances in the common precision of points and index
+            (computed exactly as ``np.linalg.norm(p - q)``).
+            欧氏距离，精度与输入一致（与 ``np.linalg.norm(p - q)`` 计算方式相同）
+        """
+        cutoff = self.cutoff if cutoff is None else float(cutoff)
+        points = np.asarray(points)
+        Q = points.shape[0]
+        dt = np.result_type(points.dtype, self.coords.dtype)
+        ptr = np.zeros(Q + 1, dtype=np.int64)
+        if Q == 0 or self.coords.shape[0] == 0:
+            return ptr, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=dt)
+
+        reach = max(1, int(np.ceil(cutoff / self.cell_size)))
+        r = np.arange(-reach, reach + 1, dtype=np.int64)
+        offsets = np.stack(np.meshgrid(r, r, r, indexing="ij"), axis=-1).reshape(-1, 3)
+
+        if _HAS_NUMBA:
+            pts = np.ascontiguousarray(points, dtype=dt)
+            cells = self._cell_index(pts.astype(np.float64, copy=False))
+            idx, dist = _query_numba(
+                pts, cells, self.sorted_coords.astype(dt, copy=False), self.order,
+                self.cell_keys, self.cell_start, self.dims, offsets, dt.type(cutoff), ptr,
+            )
+            return ptr, idx, dist
+
+        idx_parts = []
+        dist_parts = []
+        counts = np.zeros(Q, dtype=np.int64)
+        for s in range(0, Q, QUERY_CHUNK):
+            e = min(Q, s + QUERY_CHUNK)
+            qi, pj, d = self._query_chunk(points[s:e], offsets, cutoff)
+            qi += s
+            idx_parts.append(pj)
+            dist_parts.append(d)
+            counts[s:e] = np.bincount(qi - s, minlength=e - s)
+        np.cumsum(counts, out=ptr[1:])
+        return ptr, np.concatenate(idx_parts), np.concatenate(dist_parts).astype(dt, copy=False)
+
+    def _query_chunk(
+        self,
+        pts: np.ndarray,
+        offsets: np.ndarray,
+        cutoff: float,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        q = pts.shape[0]
+        cells = self._cell_index(pts.astype(np.float64, copy=False))  # (q,3)
+        nb = cells[:, None, :] + offsets[None, :, :]  # (q,O,3)
+        inside = np.all((nb >= 0) & (nb < self.dims), axis=-1)
+        qi = np.broadcast_to(np.arange(q, dtype=np.int64)[:, None], inside.shape)[inside]
+        keys = self._linear_key(nb[inside])
+        pos = np.searchsorted(self.cell_keys, keys)
+        pos_c = np.minimum(pos, self.cell_keys.size - 1)
+        hit = self.cell_keys[pos_c] == keys
+        qi = qi[hit]
+        lo = self.cell_start[pos_c[hit]]
+        lens = self.cell_start[pos_c[hit] + 1] - lo
+        total = int(lens.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=pts.dtype)
+        # Expand every (query, cell) range into candidate pairs
+        # 将每个 (查询点, 单元格) 区间展开为候选点对
+        shift = np.repeat(lo - np.concatenate(([0], np.cumsum(lens)[:-1])), lens)
+        pj = self.order[np.arange(total, dtype=np.int64) + shift]
+        qi = np.repeat(qi, lens)
+        d = np.linalg.norm(pts[qi] - self.coords[pj], axis=-1)
+        keep = d <= cutoff
+        qi, pj, d = qi[keep], pj[keep], d[keep]
+        # qi is already grouped; order pj within each row by one int64 key
+        # qi 已按行分组；用单个int64键对每行内的pj排序
+        srt = np.argsort(qi * self.coords.shape[0] + pj)
+        return qi[srt], pj[srt], d[srt]
+
+
+if _HAS_NUMBA:
+
+    @numba.njit(nogil=True, cache=True)
+    def _query_pass(pts, cells, sorted_coords, order, cell_keys, cell_start, dims, offsets,
+                    cutoff, ptr, out_idx, out_d, fill):
+        # Counting pass (fill=False) writes row counts into ptr[1:]; the
+        # filling pass writes ids/distances at ptr[i] and sorts each row.
+        # 计数遍（fill=False）将每行计数写入 ptr[1:]；填充遍按 ptr[i] 写入并对每行排序。
+        Q = pts.shape[0]
+        for i in range(Q):
+            pos = ptr[i] if fill else 0
+            cnt = 0
+            for o in range(offsets.shape[0]):
+                cx = cells[i, 0] + offsets[o, 0]
+                cy = cells[i, 1] + offsets[o, 1]
+                cz = cells[i, 2] + offsets[o, 2]
+                if cx < 0 or cy < 0 or cz < 0 or cx >= dims[0] or cy >= dims[1] or cz >= dims[2]:
+                    continue
+                key = (cx * dims[1] + cy) * dims[2] + cz
+                c = np.searchsorted(cell_keys, key)
+                if c >= cell_keys.shape[0] or cell_keys[c] != key:
+                    continue
+                for p in range(cell_start[c], cell_start[c + 1]):
+                    dx = pts[i, 0] - sorted_coords[p, 0]
+                    dy = pts[i, 1] - sorted_coords[p, 1]
+                    dz = pts[i, 2] - sorted_coords[p, 2]
+                    d = np.sqrt(dx * dx + dy * dy + dz * dz)
+                    if d <= cutoff:
+                        if fill:
+                            out_idx[pos + cnt] = order[p]
+                            out_d[pos + cnt] = d
+                        cnt += 1
+            if fill:
+                if cnt > 1:
+                    srt = np.argsort(out_idx[pos:pos + cnt])
+                    out_idx[pos:pos + cnt] = out_idx[pos:pos + cnt][srt]
+                    out_d[pos:pos + cnt] = out_d[pos:pos + cnt][srt]
+            else:
+                ptr[i + 1] = cnt
+
+    def _query_numba(pts, cells, sorted_coords, order, cell_keys, cell_start, dims, offsets, cutoff, ptr):
+        dummy_idx = np.zeros(0, dtype=np.int64)
+        dummy_d = np.zeros(0, dtype=pts.dtype)
+        _query_pass(pts, cells, sorted_coords, order, cell_keys, cell_start, dims, offsets,
+                    cutoff, ptr, dummy_idx, dummy_d, False)
+        np.cumsum(ptr, out=ptr)
+        out_idx = np.empty(ptr[-1], dtype=np.int64)
+        out_d = np.empty(ptr[-1], dtype=pts.dtype)
+        _query_pass(pts, cells, sorted_coords, order, cell_keys, cell_start, dims, offsets,
+                    cutoff, ptr, out_idx, out_d, True)
+        return out_idx, out_d
+
+
+def neighbor_pairs(
+    coords_A: np.ndarray,
+    coords_B: np.ndarray,
+    cutoff: float,
+    index_B: Optional[CellList] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    CSR (ptr, idx, dist) of B points within ``cutoff`` of each A point.
+    每个A点在 ``cutoff`` 内的B点，CSR格式 (ptr, idx, dist)。
+
+    ``index_B`` reuses a prebuilt grid over ``coords_B``.
+    ``index_B`` 复用已构建的 ``coords_B`` 网格。
+    """
+    if index_B is None:
+        index_B = CellList(coords_B, cutoff)
+    return index_B.query(coords_A, cutoff)
+
+
+def structure_cell_list(
+    struct: Structure,
+    cutoff: float,
+    coords: Optional[np.ndarray] = None,
+) -> CellList:
+    """
+    Cached cell list over the node coordinates of ``struct``.
+    ``struct`` 节点坐标上的缓存单元格列表。
+
+    The grid is stored on the structure per cutoff and rebuilt only if the
+    coordinates changed. ``coords`` may pass already stacked (or shifted)
+    node coordinates to index instead.
+    网格按截断距离缓存于结构上，仅在坐标变化时重建；``coords`` 可传入已堆叠（或平移）的坐标。
+    """
+    if coords is None:
+        coords = struct.coords
+    cache = struct._cell_lists
+    key = (float(cutoff), coords.dtype.str)
+    grid = cache.get(key)
+    if grid is None or not grid.matches(coords):
+        grid = CellList(coords.copy(), cutoff)
+        cache[key] = grid
+    return grid
+
+
+def pairwise_distances(
+    coords_A: np.ndarray,
+    coords_B: np.ndarray,
+    max_pairs: int = DISTANCE_TILE_PAIRS,
+) -> np.ndarray:
+    """
+    Dense (N_A, N_B) distance matrix built in row tiles, without the
+    (N_A, N_B, 3) difference temporary; values match ``np.linalg.norm``.
+    按行分块构建稠密 (N_A, N_B) 距离矩阵，避免 (N_A, N_B, 3) 差值临时数组；
+    数值与 ``np.linalg.norm`` 一致。
+    """
+    N_A = coords_A.shape[0]
+    N_B = coords_B.shape[0]
+    dt = np.result_type(coords_A.dtype, coords_B.dtype, np.float32)
+    out = np.empty((N_A, N_B), dtype=dt)
+    step = max(1, int(max_pairs) // max(N_B, 1))
+    for s in range(0, N_A, step):
+        e = min(N_A, s + step)
+        out[s:e] = np.linalg.norm(coords_A[s:e, None, :] - coords_B[None, :, :], axis=-1)
+    return out
+
+
+__all__ = [
+    "CellList",
+    "neighbor_pairs",
+    "structure_cell_list",
+    "pairwise_distances",
+    "QUERY_CHUNK",
+]
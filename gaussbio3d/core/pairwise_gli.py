@@ -11,124 +11,1005 @@ implemented with vectorized batch calls.
 from __future__ import annotations
 
 import numpy as np
-from typing import Tuple, Optional, List
+from typing import Iterator, Tuple, Optional, List, Union
 
 from .geometry import Structure
-from .gli_segment import gli_segment_batch_accel as gli_segment_batch
+from .gli_segment import gli_segment_matrix_accel as gli_segment_matrix
+from .gli_segment import gli_segment_matrix_nogil, gli_segment_matrix_far_field_accel
+from .gli_grad import gli_segment_matrix_vjp_accel
+from .backends import _calibration_table, get_backend, select_backend
+from .neighbors import pairwise_distances, structure_cell_list
+from .sparse import SparsePairs
+from .parallel import SharedArrays, row_blocks, worker_context
 try:
     # Optional GPU backend (PyTorch)
-    from .gpu import gli_segment_batch_torch  # type: ignore
+    from .gpu import gli_segment_matrix_torch  # type: ignore
     _HAS_TORCH = True
 except Exception:
     _HAS_TORCH = False
 
 
-def compute_pairwise_node_gli(
+def _node_segment_arrays(
+    struct: Structure,
+    n_nodes: int,
+    dtype: np.dtype = np.dtype(np.float64),
+    origin: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Concatenate the segments incident to each node, in node order.
+    按节点顺序拼接每个节点的关联线段。
+
+    Returns offsets (n_nodes+1,) and start/end arrays (n_segs, 3) so that
+    node i owns rows offsets[i]:offsets[i+1]; gathered from the structure's
+    CSR incidence and segment arrays. Endpoints are shifted by ``origin``
+    (if given) before casting to ``dtype``.
+    """
+    offsets, seg_ids = struct.node_segment_csr()
+    offsets = offsets[: n_nodes + 1]
+    seg_ids = seg_ids[: offsets[-1]]
+    if seg_ids.size == 0:
+        return offsets, np.zeros((0, 3), dtype=dtype), np.zeros((0, 3), dtype=dtype)
+    S0 = struct.segment_starts[seg_ids]
+    S1 = struct.segment_ends[seg_ids]
+    if origin is not None:
+        S0 = S0 - origin
+        S1 = S1 - origin
+    return offsets, S0.astype(dtype), S1.astype(dtype)
+
+
+def _gather_ranges(offsets: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """
+    Concatenate ranges offsets[k]:offsets[k+1] for k in idx without a Python loop.
+    无Python循环地拼接 idx 中每个 k 对应的区间 offsets[k]:offsets[k+1]。
+    """
+    lo = offsets[idx]
+    lens = offsets[idx + 1] - lo
+    total = int(lens.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    shift = np.repeat(lo - np.concatenate(([0], np.cumsum(lens)[:-1])), lens)
+    return np.arange(total, dtype=np.int64) + shift
+
+
+def resolve_dtype(dtype) -> np.dtype:
+    """
+    Validate a precision option ("float32" / "float64" or a numpy dtype).
+    校验精度选项（"float32"/"float64"或numpy dtype）。
+    """
+    dt = np.dtype(dtype if dtype is not None else np.float64)
+    if dt not in (np.dtype(np.float32), np.dtype(np.float64)):
+        raise ValueError(f"dtype must be float32 or float64, got {dt}")
+    return dt
+
+
+def float32_origin(coords: np.ndarray, dtype: np.dtype) -> Optional[np.ndarray]:
+    """
+    Origin to subtract before casting coordinates to float32, else None.
+    转换为float32前需减去的坐标原点；float64时返回None。
+
+    GLI and distances are translation invariant; re-centering keeps float32
+    rounding relative to the structure size rather than to absolute PDB
+    coordinates, which cuts the per-pair error by roughly 4x.
+    GLI与距离具有平移不变性；重新居中使float32舍入误差取决于结构尺寸而非绝对坐标。
+    """
+    if dtype != np.float32 or coords.shape[0] == 0:
+        return None
+    return coords.mean(axis=0)
+
+
+def _endpoint_ids(S0: np.ndarray, S1: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intern segment endpoints: identical coordinates get the same integer id.
+    端点驻留：坐标相同的端点获得相同的整数ID。
+    """
+    n = S0.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    _, inv = np.unique(np.concatenate([S0, S1], axis=0), axis=0, return_inverse=True)
+    inv = inv.reshape(-1)
+    return inv[:n], inv[n:]
+
+
+def _shares_endpoint(
+    ia0: np.ndarray,
+    ia1: np.ndarray,
+    ib0: np.ndarray,
+    ib1: np.ndarray,
+) -> np.ndarray:
+    """
+    (ni, L) mask of segment pairs that share an endpoint (or coincide),
+    from interned endpoint ids.
+    根据端点ID计算共享端点（或重合）的线段对的 (ni, L) 掩码。
+
+    Such pairs are coplanar, so their GLI is 0, but the spherical-quadrilateral
+    kernel degenerates on them (e.g. it returns 1/8 for two segments meeting
+    at a point).
+    这类线段对共面，GLI应为0，但球面四边形内核在其上退化（例如相交于一点时返回1/8）。
+    """
+    a0 = ia0[:, None]
+    a1 = ia1[:, None]
+    return (a0 == ib0) | (a0 == ib1) | (a1 == ib0) | (a1 == ib1)
+
+
+def _candidate_csr(
     struct_A: Structure,
     struct_B: Structure,
+    max_distance: Optional[float],
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Candidate j indices per row i after distance pruning, as CSR
+    (ptr (N_A+1,), idx) from the cached cell list of B; (None, None) means
+    every j is a candidate.
+    基于B的缓存单元格列表得到距离剪枝后每行i的候选j索引（CSR）；(None, None) 表示全部j均为候选。
+    """
+    if max_distance is None or max_distance <= 0:
+        return None, None
+    grid = structure_cell_list(struct_B, max_distance)
+    ptr, idx, _ = grid.query(struct_A.coords, max_distance)
+    return ptr, idx
+
+
+def _row_candidates(ptr: Optional[np.ndarray], idx: Optional[np.ndarray], i: int, n_B: int) -> np.ndarray:
+    if ptr is None:
+        return np.arange(n_B, dtype=np.int64)
+    return idx[ptr[i]:ptr[i + 1]]
+
+
+def _make_block_fn(
+    far_field_tol: Optional[float],
+    backend: Optional[str],
+    use_gpu: bool,
+    serial: bool,
+    table: Optional[List[tuple]] = None,
+):
+    """
+    GLI block kernel for the row loop; ``serial`` selects GIL-free serial
+    kernels for use inside a thread or worker pool, ``table`` a calibration
+    table resolved by the parent process for ``backend="auto"``.
+    行循环使用的GLI矩阵块内核；``serial`` 为线程/进程池选择无GIL串行内核，``table`` 为
+    ``backend="auto"`` 时由父进程确定的校准表。
+    """
+    if far_field_tol is not None:
+        def block_fn(a0s, a1s, b0s, b1s, signed=False):
+            return gli_segment_matrix_far_field_accel(
+                a0s, a1s, b0s, b1s, signed=signed, tol=far_field_tol, nogil=serial
+            )
+        return block_fn
+    if backend is not None:
+        def block_fn(a0s, a1s, b0s, b1s, signed=False):
+            be = select_backend(a0s.shape[0] * b0s.shape[0], backend, threaded=serial, table=table)
+            return be.block_fn(serial)(a0s, a1s, b0s, b1s, signed=signed)
+        return block_fn
+    if use_gpu and _HAS_TORCH:
+        return gli_segment_matrix_torch
+    return gli_segment_matrix_nogil if serial else gli_segment_matrix
+
+
+def _row_gli(
+    i: int,
+    arrays: dict,
+    opts: dict,
+    block_fn,
+    row: np.ndarray,
+    counts_row: Optional[np.ndarray] = None,
+) -> None:
+    """
+    Aggregate node-level GLI of row i into ``row`` from the flat per-node
+    segment arrays in ``arrays``.
+    根据 ``arrays`` 中的扁平每节点线段数组，将第i行的节点级GLI聚合写入 ``row``。
+
+    Dense mode: ``row`` has length N_B. Sparse mode (``opts["sparse"]``):
+    ``row`` and ``counts_row`` are the slots of row i's distance candidates,
+    and ``counts_row`` receives the number of segment pairs aggregated.
+    稠密模式：``row`` 长度为 N_B。稀疏模式：``row`` 与 ``counts_row`` 对应第i行的距离候选，
+    ``counts_row`` 写入参与聚合的线段对数量。
+    """
+    offs_A, S0_A, S1_A = arrays["offs_A"], arrays["S0_A"], arrays["S1_A"]
+    offs_B, S0_B, S1_B = arrays["offs_B"], arrays["S0_B"], arrays["S1_B"]
+    self_mode, agg = opts["self_mode"], opts["agg"]
+    ni = int(offs_A[i + 1] - offs_A[i])
+    if ni == 0:
+        return
+    nseg_B = arrays["nseg_B"]
+    cand = _row_candidates(arrays.get("cand_ptr"), arrays.get("cand_idx"), i, opts["n_B"])
+    sel = nseg_B[cand] > 0
+    if self_mode and opts.get("full_rows"):
+        # whole row i of the symmetric result (row tiles) / 对称结果的完整第i行（行分块）
+        sel &= cand != i
+    elif self_mode:
+        # upper triangle only / 仅上三角
+        sel &= cand > i
+    js = cand[sel]
+    if js.size == 0:
+        return
+    slots = np.flatnonzero(sel) if opts.get("sparse") else js
+    a0s = S0_A[offs_A[i]:offs_A[i + 1]]
+    a1s = S1_A[offs_A[i]:offs_A[i + 1]]
+
+    # Gather all B segments of the candidate nodes into one block
+    # 将候选节点的全部B线段汇集为一个矩阵块
+    cols = _gather_ranges(offs_B, js)
+    b0s = S0_B[cols]
+    b1s = S1_B[cols]
+    blk = block_fn(a0s, a1s, b0s, b1s, signed=opts["signed"])  # (ni, sum nj)
+
+    nj = nseg_B[js]
+    starts = np.concatenate(([0], np.cumsum(nj)[:-1]))
+    if self_mode:
+        rows = slice(offs_A[i], offs_A[i + 1])
+        I0, I1 = arrays["I0"], arrays["I1"]
+        valid = ~_shares_endpoint(I0[rows], I1[rows], I0[cols], I1[cols])
+        counts = np.add.reduceat(valid.sum(axis=0), starts)
+    else:
+        valid = None
+        counts = ni * nj
+    if counts_row is not None:
+        counts_row[slots] = counts
+    if agg == "median":
+        for c, slot in enumerate(slots):
+            vals = blk[:, starts[c]:starts[c] + nj[c]]
+            if valid is not None:
+                vals = vals[valid[:, starts[c]:starts[c] + nj[c]]]
+            if vals.size:
+                row[slot] = float(np.median(vals))
+        return
+    if valid is None:
+        sums = np.add.reduceat(blk.sum(axis=0), starts)
+    else:
+        sums = np.add.reduceat(np.where(valid, blk, 0.0).sum(axis=0), starts)
+    if agg == "sum":
+        row[slots] = sums
+    else:
+        row[slots] = sums / np.maximum(counts, 1)
+
+
+def _row_views(i: int, arrays: dict, opts: dict, out: np.ndarray, cnt: Optional[np.ndarray]):
+    """
+    Output row of i: a dense gij row (of a tile starting at ``opts["row0"]``),
+    or its candidate slots.
+    第i行的输出视图：（起始于 ``opts["row0"]`` 的分块中的）稠密gij行，或其候选槽。
+    """
+    if not opts.get("sparse"):
+        return out[i - opts.get("row0", 0)], None
+    ptr = arrays["cand_ptr"]
+    return out[ptr[i]:ptr[i + 1]], cnt[ptr[i]:ptr[i + 1]]
+
+
+def _process_row_block(spec, out_spec, opts: dict, start: int, stop: int) -> int:
+    """
+    Worker entry point: attach the shared segment arrays and output buffer
+    and fill rows start:stop of the output (dense gij or sparse candidate
+    slots) in place.
+    工作进程入口：附加共享线段数组与输出缓冲区，并就地填写输出（稠密gij或稀疏候选槽）的 start:stop 行。
+    """
+    shared = SharedArrays.attach(spec)
+    buf = SharedArrays.attach(out_spec)
+    try:
+        out = buf["out"]
+        cnt = buf.get("cnt")
+        block_fn = _make_block_fn(
+            opts["far_field_tol"], opts["backend"], False, True, table=opts.get("backend_table")
+        )
+        row = counts_row = None
+        for i in range(start, stop):
+            row, counts_row = _row_views(i, shared.arrays, opts, out, cnt)
+            _row_gli(i, shared.arrays, opts, block_fn, row, counts_row)
+        del out, cnt, row, counts_row
+    finally:
+        buf.close()
+        shared.close()
+    return stop - start
+
+
+class _RowPool:
+    """
+    Process pool over row blocks. The flat segment arrays are published to
+    shared memory and the pool is started once, then reused for every call
+    of ``fill`` (e.g. every row tile); only the output buffer is per call.
+    按行块并行的进程池。扁平线段数组只发布到共享内存一次，进程池只启动一次，之后每次调用
+    ``fill``（例如每个行分块）复用；每次调用只分配输出缓冲区。
+    """
+
+    def __init__(self, arrays: dict, opts: dict, n_jobs: int):
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.n_jobs = int(n_jobs)
+        self.table = None
+        if opts.get("backend") == "auto" and opts.get("far_field_tol") is None:
+            # calibrate (or load the table) once here rather than in every worker
+            # 在此处统一校准（或加载校准表），而非在每个工作进程中各自进行
+            self.table = _calibration_table(True)
+        self.shared = SharedArrays.publish(arrays)
+        try:
+            self.pool = ProcessPoolExecutor(max_workers=self.n_jobs, mp_context=worker_context())
+        except BaseException:
+            self.shared.close()
+            raise
+
+    def fill(
+        self,
+        opts: dict,
+        rows: Tuple[int, int],
+        out_shape: Tuple[int, ...],
+        dt: np.dtype,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Fill the output (and, in sparse mode, segment counts) for rows
+        ``rows[0]:rows[1]`` in row blocks.
+        按行块填写 ``rows[0]:rows[1]`` 行的输出（稀疏模式下还有线段对计数）。
+        """
+        if self.table is not None:
+            opts = dict(opts, backend_table=self.table)
+        empty = dict(out=(out_shape, dt))
+        if opts.get("sparse"):
+            empty["cnt"] = (out_shape, np.dtype(np.int64))
+        buf = SharedArrays.publish({}, empty=empty)
+        try:
+            futures = [
+                self.pool.submit(
+                    _process_row_block, self.shared.spec, buf.spec, opts, rows[0] + s, rows[0] + e
+                )
+                for s, e in row_blocks(rows[1] - rows[0], self.n_jobs)
+            ]
+            for fut in futures:
+                fut.result()
+            out = np.array(buf["out"])
+            cnt = np.array(buf["cnt"]) if opts.get("sparse") else None
+        finally:
+            buf.close()
+        return out, cnt
+
+    def close(self) -> None:
+        try:
+            self.pool.shutdown()
+        finally:
+            self.shared.close()
+
+    def __enter__(self) -> "_RowPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _uses_process_pool(executor: str, n_jobs: int, n_rows: int) -> bool:
+    if executor not in ("thread", "process"):
+        raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+    return executor == "process" and n_jobs is not None and n_jobs > 1 and n_rows > 1
+
+
+def compute_pairwise_node_gli(
+    struct_A: Structure,
+    struct_B: Optional[Structure],
     signed: bool = False,
     agg: str = "mean",
     max_distance: Optional[float] = None,
     n_jobs: int = 1,
     use_gpu: bool = False,
-) -> Tuple[np.ndarray, np.ndarray]:
+    dtype: str = "float64",
+    far_field_tol: Optional[float] = None,
+    backend: Optional[str] = None,
+    executor: str = "thread",
+    sparse: bool = False,
+) -> Union[Tuple[np.ndarray, np.ndarray], SparsePairs]:
     """
     Compute pairwise node-level GLI and distances between two structures.
     计算两个结构之间的成对节点级GLI和距离。
 
     Aggregates GLI over all segment pairs incident to nodes i (in A)
-    and j (in B), using a vectorized cartesian product.
+    and j (in B). Each row i is evaluated as one broadcast segment block
+    against the segments of all candidate nodes j.
+
+    在A中节点i与B中节点j的所有关联线段对上聚合GLI；每一行i对全部候选节点j的线段
+    作为一个广播矩阵块计算。
+
+    If struct_B is None or is struct_A, the symmetric self path
+    ``compute_self_pairwise_node_gli`` is used.
+    如果struct_B为None或就是struct_A，则使用对称的自相互作用路径。
+
+    ``dtype`` ("float64" or "float32") sets the precision of the kernels and
+    of the returned gij/rij matrices.
+    ``dtype``（"float64"或"float32"）决定内核及返回的gij/rij矩阵精度。
+
+    ``far_field_tol`` enables the far-field dipole approximation for
+    well-separated segment pairs (see ``gli_segment_matrix_far_field``);
+    it runs on the CPU kernels and takes precedence over ``use_gpu``.
+    ``far_field_tol`` 为远距线段对启用远场偶极近似，在CPU内核上运行并优先于 ``use_gpu``。
+
+    ``backend`` names a registered GLI backend (see ``core.backends``) or
+    "auto" to pick one per row block by its size from the calibrated
+    thresholds; None keeps the ``use_gpu`` based choice.
+    ``backend`` 指定已注册的GLI后端，或 "auto" 按每行矩阵块大小依据校准阈值选择；
+    None 保持基于 ``use_gpu`` 的选择。
+
+    ``executor`` selects how ``n_jobs > 1`` rows are parallelized: "thread"
+    (a thread pool over rows) or "process" (a process pool over row blocks;
+    segment arrays, incidence offsets and distance candidates are published
+    once via shared memory and workers write into a shared gij buffer, so no
+    Structure/Segment objects are pickled). The process executor runs on
+    the CPU kernels only.
+    ``executor`` 选择 ``n_jobs > 1`` 时的并行方式："thread"（按行的线程池）或 "process"
+    （按行块的进程池；线段数组、关联偏移与距离候选通过共享内存一次性发布，工作进程直接写入
+    共享gij缓冲区，不序列化结构/线段对象）。进程模式仅使用CPU内核。
+
+    ``sparse=True`` returns a ``SparsePairs`` (CSR over rows of A with gli,
+    distance and segment-pair counts) holding only the ``max_distance``
+    candidates instead of dense (gij, rij); memory then scales with the
+    number of contacts. Without ``max_distance`` every pair is stored.
+    ``sparse=True`` 返回 ``SparsePairs``（以A的行为单位的CSR，含gli、距离与线段对计数），
+    仅保存 ``max_distance`` 内的候选而非稠密 (gij, rij)，内存随接触数增长；
+    未设置 ``max_distance`` 时保存所有节点对。
+    """
+    self_mode = struct_B is None or struct_B is struct_A
+    return _pairwise_node_gli(
+        struct_A,
+        struct_A if self_mode else struct_B,
+        self_mode,
+        signed=signed,
+        agg=agg,
+        max_distance=max_distance,
+        n_jobs=n_jobs,
+        use_gpu=use_gpu,
+        dtype=dtype,
+        far_field_tol=far_field_tol,
+        backend=backend,
+        executor=executor,
+        sparse=sparse,
+    )
+
+
+def compute_self_pairwise_node_gli(
+    struct: Structure,
+    signed: bool = False,
+    agg: str = "mean",
+    max_distance: Optional[float] = None,
+    n_jobs: int = 1,
+    use_gpu: bool = False,
+    dtype: str = "float64",
+    far_field_tol: Optional[float] = None,
+    backend: Optional[str] = None,
+    executor: str = "thread",
+    sparse: bool = False,
+) -> Union[Tuple[np.ndarray, np.ndarray], SparsePairs]:
+    """
+    Symmetric node-level self-GLI of one structure.
+    单个结构的对称节点级自GLI。
 
-    使用矢量化笛卡尔积在A中节点i与B中节点j的所有关联线段对上聚合GLI。
+    Each unordered node pair i < j is evaluated once and mirrored into
+    gij[j, i] (GLI is symmetric in its two curves). Segment pairs that share
+    an endpoint are degenerate and excluded from the aggregation, so the
+    diagonal is 0. Options are the same as ``compute_pairwise_node_gli``.
+
+    每个无序节点对 i < j 只计算一次并镜像到 gij[j, i]（GLI关于两条曲线对称）。
+    共享端点的线段对是退化的，不参与聚合，因此对角线为0。参数同 ``compute_pairwise_node_gli``。
     """
+    return _pairwise_node_gli(
+        struct,
+        struct,
+        True,
+        signed=signed,
+        agg=agg,
+        max_distance=max_distance,
+        n_jobs=n_jobs,
+        use_gpu=use_gpu,
+        dtype=dtype,
+        far_field_tol=far_field_tol,
+        backend=backend,
+        executor=executor,
+        sparse=sparse,
+    )
+
+
+def _pairwise_node_gli(
+    struct_A: Structure,
+    struct_B: Structure,
+    self_mode: bool,
+    signed: bool,
+    agg: str,
+    max_distance: Optional[float],
+    n_jobs: int,
+    use_gpu: bool,
+    dtype: str,
+    far_field_tol: Optional[float],
+    backend: Optional[str],
+    executor: str = "thread",
+    sparse: bool = False,
+) -> Union[Tuple[np.ndarray, np.ndarray], SparsePairs]:
+    dt = resolve_dtype(dtype)
     coords_A = struct_A.coords  # (N_A,3)
-    coords_B = struct_B.coords  # (N_B,3)
+    coords_B = coords_A if self_mode else struct_B.coords  # (N_B,3)
+    origin = float32_origin(coords_A, dt)
+    if origin is not None:
+        coords_A = (coords_A - origin).astype(dt)
+        coords_B = coords_A if self_mode else (coords_B - origin).astype(dt)
     N_A = coords_A.shape[0]
     N_B = coords_B.shape[0]
 
     if N_A == 0 or N_B == 0:
-        return np.zeros((N_A, N_B)), np.zeros((N_A, N_B))
+        if sparse:
+            return SparsePairs.empty((N_A, N_B), dtype=dt)
+        return np.zeros((N_A, N_B), dtype=dt), np.zeros((N_A, N_B), dtype=dt)
 
-    # Distances matrix
-    rij = np.linalg.norm(coords_A[:, None, :] - coords_B[None, :, :], axis=-1)
+    arrays, opts = _prepare_rows(
+        struct_A, struct_B, self_mode, N_A, N_B, dt, origin,
+        signed=signed, agg=agg, max_distance=max_distance, use_gpu=use_gpu,
+        far_field_tol=far_field_tol, backend=backend, sparse=sparse,
+    )
+    cand_ptr, cand_idx = arrays["cand_ptr"], arrays["cand_idx"]
+    out, cnt = _fill_rows(arrays, opts, (0, N_A), dt, n_jobs, executor)
 
-    # Pre-extract per-node segment endpoints for reuse
-    seg_endpoints_A = []  # list of (a0s, a1s)
-    for i in range(N_A):
-        segs_i = struct_A.node_segments.get(i, [])
-        if not segs_i:
-            seg_endpoints_A.append((None, None))
-            continue
-        a0s = np.stack([s.start for s in segs_i], axis=0)
-        a1s = np.stack([s.end for s in segs_i], axis=0)
-        seg_endpoints_A.append((a0s, a1s))
-
-    seg_endpoints_B = []  # list of (b0s, b1s)
-    for j in range(N_B):
-        segs_j = struct_B.node_segments.get(j, [])
-        if not segs_j:
-            seg_endpoints_B.append((None, None))
-            continue
-        b0s = np.stack([s.start for s in segs_j], axis=0)
-        b1s = np.stack([s.end for s in segs_j], axis=0)
-        seg_endpoints_B.append((b0s, b1s))
+    if sparse:
+        rows = np.repeat(np.arange(N_A, dtype=np.int64), np.diff(cand_ptr))
+        dist = np.linalg.norm(coords_A[rows] - coords_B[cand_idx], axis=-1)
+        if self_mode:
+            _mirror_sparse(rows, cand_idx, N_B, out, cnt)
+        return SparsePairs(
+            shape=(N_A, N_B),
+            indptr=cand_ptr,
+            indices=cand_idx,
+            gli=out,
+            dist=dist,
+            seg_counts=cnt,
+        )
 
-    gij = np.zeros((N_A, N_B), dtype=float)
+    gij = out
+    if self_mode:
+        # mirror the upper triangle / 镜像上三角
+        gij += gij.T
+    return gij, pairwise_distances(coords_A, coords_B)
 
-    # Precompute candidate j indices per i based on distance pruning
-    j_candidates: List[np.ndarray] = []
-    if max_distance is not None and max_distance > 0:
-        for i in range(N_A):
-            j_candidates.append(np.where(rij[i] <= max_distance)[0])
+
+def _prepare_rows(
+    struct_A: Structure,
+    struct_B: Structure,
+    self_mode: bool,
+    N_A: int,
+    N_B: int,
+    dt: np.dtype,
+    origin: Optional[np.ndarray],
+    signed: bool,
+    agg: str,
+    max_distance: Optional[float],
+    use_gpu: bool,
+    far_field_tol: Optional[float],
+    backend: Optional[str],
+    sparse: bool = False,
+) -> Tuple[dict, dict]:
+    """
+    Flat segment arrays, distance candidates and options shared by all rows.
+    所有行共享的扁平线段数组、距离候选与选项。
+    """
+    # Pre-extract per-node segment endpoints, concatenated in node order
+    # 按节点顺序拼接的每节点线段端点
+    offs_A, S0_A, S1_A = _node_segment_arrays(struct_A, N_A, dt, origin)
+    if self_mode:
+        offs_B, S0_B, S1_B = offs_A, S0_A, S1_A
+        I0, I1 = _endpoint_ids(S0_A, S1_A)
+    else:
+        offs_B, S0_B, S1_B = _node_segment_arrays(struct_B, N_B, dt, origin)
+        I0 = I1 = None
+
+    # Candidate j indices per row as CSR, from distance pruning
+    # 基于距离剪枝的每行候选j索引（CSR）
+    cand_ptr, cand_idx = _candidate_csr(struct_A, struct_B, max_distance)
+    if sparse and cand_ptr is None:
+        # no cutoff: every pair is a candidate / 无截断：所有节点对都是候选
+        cand_ptr = np.arange(N_A + 1, dtype=np.int64) * N_B
+        cand_idx = np.tile(np.arange(N_B, dtype=np.int64), N_A)
+    arrays = dict(
+        offs_A=offs_A, S0_A=S0_A, S1_A=S1_A,
+        offs_B=offs_B, S0_B=S0_B, S1_B=S1_B, nseg_B=np.diff(offs_B),
+        I0=I0, I1=I1,
+        cand_ptr=cand_ptr, cand_idx=cand_idx,
+    )
+    opts = dict(
+        n_B=N_B, self_mode=self_mode, signed=signed, agg=agg, sparse=sparse,
+        far_field_tol=far_field_tol, backend=backend, use_gpu=use_gpu,
+    )
+    if backend not in (None, "auto"):
+        get_backend(backend)  # fail early on unknown names / 尽早报告未知后端
+    return arrays, opts
+
+
+def _fill_rows(
+    arrays: dict,
+    opts: dict,
+    rows: Tuple[int, int],
+    dt: np.dtype,
+    n_jobs: int,
+    executor: str,
+    pool: Optional[_RowPool] = None,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Compute rows ``rows[0]:rows[1]``: a dense (rows, N_B) gij block, or in
+    sparse mode the candidate slots of all rows with their segment counts.
+    With ``executor="process"`` an open ``pool`` is reused, otherwise one is
+    started for this call.
+    计算 ``rows[0]:rows[1]`` 行：稠密 (rows, N_B) gij块；稀疏模式下为全部行的候选槽及线段对计数。
+    ``executor="process"`` 时复用已打开的 ``pool``，否则为本次调用启动一个进程池。
+    """
+    start, stop = rows
+    sparse = opts.get("sparse")
+    if sparse:
+        out_shape: Tuple[int, ...] = (arrays["cand_idx"].size,)
     else:
-        for i in range(N_A):
-            j_candidates.append(np.arange(N_B, dtype=int))
-
-    def _compute_row(i: int) -> Tuple[int, np.ndarray]:
-        a0s, a1s = seg_endpoints_A[i]
-        row = np.zeros(N_B, dtype=float)
-        if a0s is None:
-            return i, row
-        ni = a0s.shape[0]
-        js = j_candidates[i]
-        for j in js:
-            b0s, b1s = seg_endpoints_B[j]
-            if b0s is None:
-                continue
-            nj = b0s.shape[0]
-
-            # Cartesian product of segments: (ni * nj, 3)
-            A0 = np.repeat(a0s, nj, axis=0)
-            A1 = np.repeat(a1s, nj, axis=0)
-            B0 = np.tile(b0s, (ni, 1))
-            B1 = np.tile(b1s, (ni, 1))
-
-            if use_gpu and _HAS_TORCH:
-                vals = gli_segment_batch_torch(A0, A1, B0, B1, signed=signed)
-            else:
-                vals = gli_segment_batch(A0, A1, B0, B1, signed=signed)
-
-            if vals.size == 0:
-                continue
-            if agg == "mean":
-                row[j] = float(vals.mean())
-            elif agg == "median":
-                row[j] = float(np.median(vals))
-            elif agg == "sum":
-                row[j] = float(vals.sum())
-            else:
-                row[j] = float(vals.mean())
-        return i, row
-
-    if n_jobs is None or n_jobs <= 1:
-        for i in range(N_A):
-            ii, row = _compute_row(i)
-            gij[ii] = row
+        out_shape = (stop - start, opts["n_B"])
+        opts = dict(opts, row0=start)
+    if _uses_process_pool(executor, n_jobs, stop - start):
+        if pool is not None:
+            return pool.fill(opts, rows, out_shape, dt)
+        with _RowPool(arrays, opts, n_jobs) as pool:
+            return pool.fill(opts, rows, out_shape, dt)
+
+    out = np.zeros(out_shape, dtype=dt)
+    cnt = np.zeros(out_shape, dtype=np.int64) if sparse else None
+    # Row threads each run a serial GIL-free kernel instead of nesting the
+    # parallel numba kernel inside the thread pool.
+    # 多线程时每个线程运行串行无GIL内核，避免在线程池中嵌套并行numba内核。
+    threaded = n_jobs is not None and n_jobs > 1
+    block_fn = _make_block_fn(opts["far_field_tol"], opts["backend"], opts["use_gpu"], threaded)
+
+    def _compute_row(i: int) -> None:
+        row, counts_row = _row_views(i, arrays, opts, out, cnt)
+        _row_gli(i, arrays, opts, block_fn, row, counts_row)
+
+    if not threaded:
+        for i in range(start, stop):
+            _compute_row(i)
     else:
-        # Lightweight threading; numpy releases GIL
+        # Lightweight threading; numpy releases GIL. Rows write disjoint
+        # output slices. / 轻量线程；各行写入互不重叠的输出切片
         from concurrent.futures import ThreadPoolExecutor
         with ThreadPoolExecutor(max_workers=int(n_jobs)) as ex:
-            for ii, row in ex.map(_compute_row, range(N_A)):
-                gij[ii] = row
+            list(ex.map(_compute_row, range(start, stop)))
+    return out, cnt
+
+
+def iter_pairwise_node_gli_tiles(
+    struct_A: Structure,
+    struct_B: Optional[Structure],
+    tile_rows: int,
+    signed: bool = False,
+    agg: str = "mean",
+    max_distance: Optional[float] = None,
+    n_jobs: int = 1,
+    use_gpu: bool = False,
+    dtype: str = "float64",
+    far_field_tol: Optional[float] = None,
+    backend: Optional[str] = None,
+    executor: str = "thread",
+    tiles: Optional[List[Tuple[int, int]]] = None,
+) -> Iterator[Tuple[int, int, np.ndarray, np.ndarray]]:
+    """
+    Row tiles of the dense (gij, rij) result, without materializing it.
+    逐行分块生成稠密 (gij, rij) 结果，而不构造完整矩阵。
+
+    Yields ``(start, stop, gij[start:stop], rij[start:stop])`` for row tiles
+    of ``tile_rows`` rows of A (or only the given ``tiles``, e.g. those not
+    yet checkpointed). Segment arrays and distance candidates are prepared
+    once (with ``executor="process"`` they are also published to shared
+    memory once and one worker pool serves every tile); peak memory is one
+    (tile_rows, N_B) block. Options are the same as
+    ``compute_pairwise_node_gli``. In self mode each tile holds whole rows
+    of the symmetric matrix, so pairs below the diagonal are evaluated
+    directly and agree with the mirrored dense result to rounding.
+
+    按A的 ``tile_rows`` 行分块（或仅给定的 ``tiles``，例如尚未检查点的分块）生成
+    ``(start, stop, gij[start:stop], rij[start:stop])``。线段数组与距离候选只准备一次
+    （``executor="process"`` 时也只发布到共享内存一次，所有分块共用一个进程池）；
+    峰值内存为一个 (tile_rows, N_B) 块。参数同 ``compute_pairwise_node_gli``。
+    自模式下每个分块包含对称矩阵的完整行，对角线以下的节点对直接计算，与镜像的稠密结果
+    在舍入误差内一致。
+    """
+    self_mode = struct_B is None or struct_B is struct_A
+    struct_B = struct_A if self_mode else struct_B
+    dt = resolve_dtype(dtype)
+    coords_A = struct_A.coords
+    coords_B = coords_A if self_mode else struct_B.coords
+    origin = float32_origin(coords_A, dt)
+    if origin is not None:
+        coords_A = (coords_A - origin).astype(dt)
+        coords_B = coords_A if self_mode else (coords_B - origin).astype(dt)
+    N_A = coords_A.shape[0]
+    N_B = coords_B.shape[0]
+    if tiles is None:
+        step = max(1, int(tile_rows))
+        tiles = [(s, min(s + step, N_A)) for s in range(0, N_A, step)]
+    if not tiles:
+        return
+    if N_B == 0:
+        for start, stop in tiles:
+            empty = np.zeros((stop - start, 0), dtype=dt)
+            yield start, stop, empty, empty.copy()
+        return
+    arrays, opts = _prepare_rows(
+        struct_A, struct_B, self_mode, N_A, N_B, dt, origin,
+        signed=signed, agg=agg, max_distance=max_distance, use_gpu=use_gpu,
+        far_field_tol=far_field_tol, backend=backend,
+    )
+    opts["full_rows"] = True
+    # one process pool and one shared copy of the segment arrays for all tiles
+    # 所有分块共用一个进程池与一份共享线段数组
+    pool = None
+    if any(_uses_process_pool(executor, n_jobs, stop - start) for start, stop in tiles):
+        pool = _RowPool(arrays, opts, n_jobs)
+    try:
+        for start, stop in tiles:
+            gij, _ = _fill_rows(arrays, opts, (start, stop), dt, n_jobs, executor, pool)
+            yield start, stop, gij, pairwise_distances(coords_A[start:stop], coords_B)
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def _mirror_sparse(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    n: int,
+    vals: np.ndarray,
+    counts: np.ndarray,
+) -> None:
+    """
+    Fill lower-triangle entries (j < i) of a symmetric sparse self result
+    from their computed upper-triangle partners (i < j), in place.
+    就地用已计算的上三角对应项 (i < j) 填充对称稀疏自结果的下三角项 (j < i)。
+    """
+    upper = cols > rows
+    lower = cols < rows
+    key_up = rows[upper] * n + cols[upper]  # ascending (CSR order) / 升序（CSR顺序）
+    key_lo = cols[lower] * n + rows[lower]
+    if key_up.size == 0 or key_lo.size == 0:
+        return
+    pos = np.minimum(np.searchsorted(key_up, key_lo), key_up.size - 1)
+    found = key_up[pos] == key_lo
+    up_idx = np.flatnonzero(upper)[pos[found]]
+    lo_idx = np.flatnonzero(lower)[found]
+    vals[lo_idx] = vals[up_idx]
+    counts[lo_idx] = counts[up_idx]
+
+
+def _endpoint_node_map(
+    struct: Structure,
+    n_nodes: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Express every segment endpoint row of ``_node_segment_arrays`` as a
+    weighted combination of node coordinates.
+    将 ``_node_segment_arrays`` 中每个线段端点行表示为节点坐标的加权组合。
+
+    Returns (rows, side, nodes, weights): endpoint ``side`` (0=start, 1=end)
+    of row ``rows[k]`` depends on node ``nodes[k]`` with ``weights[k]``.
+    Endpoints carrying a node id map to that node. Endpoints without one
+    (e.g. ligand half-bond midpoints) map to the centroid of the nodes at the
+    other end of every segment sharing that point, if it coincides with it;
+    otherwise they are treated as fixed.
+    带节点ID的端点映射到该节点；无节点ID的端点（如配体半键中点）若与共享该点的各线段另一端
+    节点的质心重合，则映射到这些节点的质心，否则视为固定点。
+    """
+    coords = struct.coords
+    offsets, seg_ids = struct.node_segment_csr()
+    seg_ids = seg_ids[: offsets[n_nodes]]
+    ends = (struct.segment_starts, struct.segment_ends)
+    ids = struct.segment_node_ids
+    n_rows = seg_ids.size
+
+    # Open endpoints (no node id) whose segment has a node at the other end,
+    # grouped by exact coordinates with the set of those partner nodes
+    # 无节点ID、另一端有节点的开放端点，按精确坐标分组，并记录这些伙伴节点
+    part_pts = [ends[s][(ids[:, s] < 0) & (ids[:, 1 - s] >= 0)] for s in (0, 1)]
+    part_ids = [ids[(ids[:, s] < 0) & (ids[:, 1 - s] >= 0), 1 - s] for s in (0, 1)]
+    r_all = np.arange(n_rows, dtype=np.int64)
+    open_rows = [r_all[ids[seg_ids, s] < 0] for s in (0, 1)]
+    query_pts = [ends[s][seg_ids[open_rows[s]]] for s in (0, 1)]
+    pts = np.concatenate(part_pts + query_pts, axis=0)
+    n_part = part_pts[0].shape[0] + part_pts[1].shape[0]
+    if pts.shape[0]:
+        _, inv = np.unique(pts, axis=0, return_inverse=True)
+        inv = inv.reshape(-1)
+    else:
+        inv = np.zeros(0, dtype=np.int64)
+    n_groups = int(inv.max()) + 1 if inv.size else 0
+    pairs = np.unique(
+        np.stack([inv[:n_part], np.concatenate(part_ids)], axis=1).reshape(-1, 2), axis=0
+    )  # (group, partner), sorted / 已排序
+    cnt = np.bincount(pairs[:, 0], minlength=n_groups)
+    first = np.concatenate(([0], np.cumsum(cnt)[:-1])).astype(np.int64)
+    centroid = np.zeros((n_groups, 3))
+    np.add.at(centroid, pairs[:, 0], coords[pairs[:, 1]])
+    group_pt = np.zeros((n_groups, 3))
+    group_pt[inv] = pts
+    has = cnt > 0
+    centroid[has] /= cnt[has, None]
+    resolved = has & np.all(np.isclose(centroid, group_pt), axis=1)
+
+    rows: List[np.ndarray] = []
+    side: List[np.ndarray] = []
+    nodes: List[np.ndarray] = []
+    weights: List[np.ndarray] = []
+    q0 = n_part
+    for s in (0, 1):
+        nid = ids[seg_ids, s]
+        fixed = nid >= 0
+        rows.append(r_all[fixed])
+        side.append(np.full(int(fixed.sum()), s, dtype=np.int64))
+        nodes.append(nid[fixed])
+        weights.append(np.ones(int(fixed.sum())))
+        # open endpoints map to the centroid of their partner nodes
+        # 开放端点映射到其伙伴节点的质心
+        g = inv[q0:q0 + open_rows[s].size]
+        q0 += open_rows[s].size
+        ok = resolved[g]
+        g, r = g[ok], open_rows[s][ok]
+        rep = cnt[g]
+        pos = np.repeat(first[g] - np.concatenate(([0], np.cumsum(rep)[:-1])), rep) + np.arange(int(rep.sum()))
+        rows.append(np.repeat(r, rep))
+        side.append(np.full(int(rep.sum()), s, dtype=np.int64))
+        nodes.append(pairs[pos, 1])
+        weights.append(np.repeat(1.0 / np.maximum(rep, 1), rep))
+    rows_a, side_a, nodes_a, w_a = (np.concatenate(x) for x in (rows, side, nodes, weights))
+    order = np.lexsort((nodes_a, side_a, rows_a))
+    return (
+        rows_a[order].astype(np.int64),
+        side_a[order],
+        nodes_a[order].astype(np.int64),
+        w_a[order].astype(float),
+    )
+
+
+def _scatter_to_nodes(
+    struct: Structure,
+    n_nodes: int,
+    dS0: np.ndarray,
+    dS1: np.ndarray,
+) -> np.ndarray:
+    rows, side, nodes, weights = _endpoint_node_map(struct, n_nodes)
+    grad = np.zeros((n_nodes, 3), dtype=dS0.dtype)
+    if rows.size:
+        dS = np.stack([dS0, dS1], axis=0)
+        np.add.at(grad, nodes, weights[:, None].astype(dS0.dtype) * dS[side, rows])
+    return grad
+
+
+def _aggregation_weights(
+    blk: Optional[np.ndarray],
+    valid: Optional[np.ndarray],
+    ni: int,
+    nj: np.ndarray,
+    starts: np.ndarray,
+    agg: str,
+) -> np.ndarray:
+    """
+    (ni, L) weights w such that row value gij[i, js[c]] = sum(w * blk) over
+    the columns of candidate c: 1 (sum), 1/count (mean) or the median
+    subgradient (1, or 1/2 on the two middle values).
+    使得 gij[i, js[c]] = sum(w * blk) 的 (ni, L) 权重：sum为1，mean为1/计数，
+    median为次梯度（中位值处为1，偶数个时两个中间值各1/2）。
+    """
+    L = int(nj.sum())
+    mask = np.ones((ni, L), dtype=bool) if valid is None else valid
+    if agg == "sum":
+        return mask.astype(float)
+    if agg != "median":
+        counts = np.add.reduceat(mask.sum(axis=0), starts)
+        return mask / np.repeat(np.maximum(counts, 1), nj)[None, :]
+    W = np.zeros((ni, L))
+    for c in range(nj.size):
+        sl = slice(starts[c], starts[c] + nj[c])
+        sub_mask = mask[:, sl]
+        vals = blk[:, sl][sub_mask]
+        k = vals.size
+        if k == 0:
+            continue
+        order = np.argsort(vals, kind="stable")
+        mids = [order[k // 2]] if k % 2 else [order[k // 2 - 1], order[k // 2]]
+        flat = np.zeros(k)
+        flat[mids] = 1.0 / len(mids)
+        sub = np.zeros(sub_mask.shape)
+        sub[sub_mask] = flat
+        W[:, sl] = sub
+    return W
+
+
+def compute_pairwise_node_gli_grad(
+    struct_A: Structure,
+    struct_B: Optional[Structure],
+    grad_output: Optional[np.ndarray] = None,
+    signed: bool = False,
+    agg: str = "mean",
+    max_distance: Optional[float] = None,
+    dtype: str = "float64",
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairwise node-level GLI and its gradient with respect to node coordinates.
+    成对节点级GLI及其对节点坐标的梯度。
+
+    Returns ``gij`` (same as ``compute_pairwise_node_gli``) together with the
+    gradients of ``sum(grad_output * gij)`` with respect to the node
+    coordinates of A (N_A, 3) and B (N_B, 3); ``grad_output`` defaults to
+    all ones. Segment-level gradients come from the analytic kernel
+    (``gli_segment_matrix_vjp``) and are scattered onto nodes through
+    ``node_segments``. In self mode (struct_B None or struct_A) both
+    returned gradients are the same total gradient of the one structure.
+
+    返回 ``gij``（与 ``compute_pairwise_node_gli`` 相同）以及 ``sum(grad_output * gij)``
+    对A (N_A, 3) 和B (N_B, 3) 节点坐标的梯度；``grad_output`` 默认为全1。线段级梯度由解析
+    内核计算，并通过 ``node_segments`` 散射到节点。自模式下两个返回梯度相同。
+
+    Distance pruning (``max_distance``) is treated as fixed: pairs outside
+    the cutoff contribute neither value nor gradient. Median aggregation
+    uses the subgradient of the selected middle value(s).
+    距离剪枝视为固定：截断外的节点对不贡献数值和梯度。median聚合使用所选中间值的次梯度。
+    """
+    self_mode = struct_B is None or struct_B is struct_A
+    if self_mode:
+        struct_B = struct_A
+    dt = resolve_dtype(dtype)
+    coords_A = struct_A.coords
+    coords_B = struct_B.coords
+    origin = float32_origin(coords_A, dt)
+    N_A = coords_A.shape[0]
+    N_B = coords_B.shape[0]
+    gij = np.zeros((N_A, N_B), dtype=dt)
+    if N_A == 0 or N_B == 0:
+        return gij, np.zeros((N_A, 3), dtype=dt), np.zeros((N_B, 3), dtype=dt)
+    if grad_output is None:
+        grad_output = np.ones((N_A, N_B), dtype=dt)
+    else:
+        grad_output = np.asarray(grad_output, dtype=dt)
+        if grad_output.shape != (N_A, N_B):
+            raise ValueError(f"grad_output must have shape {(N_A, N_B)}, got {grad_output.shape}")
+    if self_mode:
+        # gij is mirrored from the upper triangle / gij由上三角镜像得到
+        grad_output = grad_output + grad_output.T
+
+    rij = pairwise_distances(coords_A, coords_B)
+    cand_ptr, cand_idx = _candidate_csr(struct_A, struct_B, max_distance)
+
+    offs_A, S0_A, S1_A = _node_segment_arrays(struct_A, N_A, dt, origin)
+    if self_mode:
+        offs_B, S0_B, S1_B = offs_A, S0_A, S1_A
+        I0, I1 = _endpoint_ids(S0_A, S1_A)
+    else:
+        offs_B, S0_B, S1_B = _node_segment_arrays(struct_B, N_B, dt, origin)
+    nseg_B = np.diff(offs_B)
+
+    dS0_A = np.zeros_like(S0_A)
+    dS1_A = np.zeros_like(S1_A)
+    dS0_B = dS0_A if self_mode else np.zeros_like(S0_B)
+    dS1_B = dS1_A if self_mode else np.zeros_like(S1_B)
+
+    for i in range(N_A):
+        ni = int(offs_A[i + 1] - offs_A[i])
+        if ni == 0:
+            continue
+        js = _row_candidates(cand_ptr, cand_idx, i, N_B)
+        if self_mode:
+            js = js[js > i]
+        js = js[nseg_B[js] > 0]
+        if js.size == 0:
+            continue
+        rows = slice(offs_A[i], offs_A[i + 1])
+        cols = _gather_ranges(offs_B, js)
+        a0s, a1s = S0_A[rows], S1_A[rows]
+        b0s, b1s = S0_B[cols], S1_B[cols]
+        nj = nseg_B[js]
+        starts = np.concatenate(([0], np.cumsum(nj)[:-1]))
+        valid = ~_shares_endpoint(I0[rows], I1[rows], I0[cols], I1[cols]) if self_mode else None
+
+        blk = gli_segment_matrix(a0s, a1s, b0s, b1s, signed=signed) if agg == "median" else None
+        W = _aggregation_weights(blk, valid, ni, nj, starts, agg)
+        Wg = W * np.repeat(grad_output[i, js], nj)[None, :]
+        G, dA0, dA1, dB0, dB1 = gli_segment_matrix_vjp_accel(a0s, a1s, b0s, b1s, Wg, signed=signed)
+        gij[i, js] = np.add.reduceat((W * G).sum(axis=0), starts)
+
+        dS0_A[rows] += dA0
+        dS1_A[rows] += dA1
+        np.add.at(dS0_B, cols, dB0)
+        np.add.at(dS1_B, cols, dB1)
 
-    return gij, rij
+    grad_A = _scatter_to_nodes(struct_A, N_A, dS0_A, dS1_A)
+    if self_mode:
+        gij += gij.T
+        return gij, grad_A, grad_A
+    grad_B = _scatter_to_nodes(struct_B, N_B, dS0_B, dS1_B)
+    return gij, grad_A, grad_B
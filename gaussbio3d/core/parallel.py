@@ -0,0 +1,139 @@
+"""
+Shared-memory arrays for process-parallel computation
+用于进程并行计算的共享内存数组
+
+Numpy arrays are published once into a single ``multiprocessing.shared_memory``
+block; worker processes receive only a small picklable spec (block name,
+offsets, shapes, dtypes) and attach zero-copy views, so no structure or
+segment objects are pickled per task.
+
+Numpy数组一次性发布到单个 ``multiprocessing.shared_memory`` 块中；工作进程只接收一个
+可序列化的小描述（块名、偏移、形状、dtype）并附加零拷贝视图，因此任务之间不序列化
+结构或线段对象。
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# name -> (byte offset, shape, dtype str) / 名称 -> (字节偏移, 形状, dtype)
+ArraySpec = Dict[str, Tuple[int, Tuple[int, ...], str]]
+
+_ALIGN = 64
+
+
+class SharedArrays:
+    """
+    A set of named numpy arrays living in one shared-memory block.
+    存放于同一共享内存块中的一组具名numpy数组。
+
+    Create in the parent with ``SharedArrays.publish(arrays)`` and release
+    with ``close()`` (which also unlinks the block for the owner). Workers
+    call ``SharedArrays.attach(spec)`` with the ``spec`` of the owner.
+    在父进程中用 ``publish`` 创建并用 ``close`` 释放（所有者会同时删除共享块）；
+    工作进程使用所有者的 ``spec`` 调用 ``attach``。
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: ArraySpec, owner: bool):
+        self._shm = shm
+        self._layout = layout
+        self._owner = owner
+        self.arrays: Dict[str, np.ndarray] = {
+            name: np.ndarray(shape, dtype=np.dtype(dt), buffer=shm.buf, offset=off)
+            for name, (off, shape, dt) in layout.items()
+        }
+
+    @classmethod
+    def publish(
+        cls,
+        arrays: Dict[str, Optional[np.ndarray]],
+        empty: Optional[Dict[str, Tuple[Tuple[int, ...], np.dtype]]] = None,
+    ) -> "SharedArrays":
+        """
+        Copy ``arrays`` (None entries are skipped) into a new shared block and
+        allocate zero-filled ``empty`` arrays given as name -> (shape, dtype).
+        将 ``arrays``（跳过None）复制到新的共享块，并按 name -> (shape, dtype) 分配零初始化数组。
+        """
+        layout: ArraySpec = {}
+        total = 0
+        items = [(k, np.ascontiguousarray(v)) for k, v in arrays.items() if v is not None]
+        shapes = [(k, v.shape, v.dtype) for k, v in items]
+        shapes += [(k, tuple(shape), np.dtype(dt)) for k, (shape, dt) in (empty or {}).items()]
+        for name, shape, dt in shapes:
+            total = -(-total // _ALIGN) * _ALIGN
+            layout[name] = (total, tuple(int(s) for s in shape), dt.str)
+            total += int(np.prod(shape, dtype=np.int64)) * dt.itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(total, 1))
+        out = cls(shm, layout, owner=True)
+        for name, arr in items:
+            out.arrays[name][...] = arr
+        for name in (empty or {}):
+            out.arrays[name].fill(0)
+        return out
+
+    @property
+    def spec(self) -> Tuple[str, ArraySpec]:
+        """Picklable handle for workers / 供工作进程使用的可序列化句柄"""
+        return self._shm.name, self._layout
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, ArraySpec]) -> "SharedArrays":
+        """Attach to a block published by another process / 附加到其他进程发布的共享块"""
+        name, layout = spec
+        # Pool workers share the parent's resource tracker, so attaching does
+        # not create a second owner; only the publisher unlinks the block.
+        # 工作进程与父进程共享资源跟踪器，附加不会产生第二个所有者；仅发布者删除共享块。
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, layout, owner=False)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def get(self, name: str) -> Optional[np.ndarray]:
+        return self.arrays.get(name)
+
+    def close(self) -> None:
+        """Drop views and release the block / 释放视图与共享块"""
+        self.arrays = {}
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def worker_context():
+    """
+    Multiprocessing context for worker pools: "forkserver" where available,
+    since forking a parent whose numba/OpenMP thread pool is already running
+    can deadlock; "spawn" otherwise.
+    工作进程池的多进程上下文：优先使用 "forkserver"（在numba/OpenMP线程池已运行的父进程中
+    fork可能死锁），否则使用 "spawn"。
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def row_blocks(n_rows: int, n_workers: int, blocks_per_worker: int = 4):
+    """
+    Split range(n_rows) into contiguous (start, stop) blocks, a few per worker
+    so uneven rows still balance.
+    将 range(n_rows) 切分为连续的 (start, stop) 块，每个工作进程若干块以平衡负载。
+    """
+    n_blocks = max(1, min(n_rows, int(n_workers) * int(blocks_per_worker)))
+    bounds = np.linspace(0, n_rows, n_blocks + 1).astype(int)
+    return [(int(s), int(e)) for s, e in zip(bounds[:-1], bounds[1:]) if e > s]
+
+
+__all__ = ["SharedArrays", "row_blocks", "worker_context"]
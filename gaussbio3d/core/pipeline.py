@@ -8,12 +8,18 @@ Sklearn-style pipeline to compute multiscale mGLI descriptors with optional proj
 
 from __future__ import annotations
 
+import os
+import warnings
+from collections import deque
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
 import numpy as np
-from typing import Optional, Sequence
 
 from ..config import MgliConfig
 from ..core.geometry import Structure
+from ..core.parallel import worker_context
 from ..features.descriptor import global_mgli_descriptor
+from ..features.schema import FeatureSchema, descriptor_batch
 
 
 class Projector:
@@ -25,18 +31,42 @@ class Projector:
 
 
 class PCAProjector(Projector):
+    """
+    PCA with sklearn when installed, else ``IncrementalPCAProjector`` fitted
+    on X in one pass. With fewer samples or features than ``n_components``,
+    ``fit`` keeps min(n_samples, n_features) components (``n_components_``)
+    and warns.
+    安装sklearn时使用其PCA，否则在X上一次性拟合 ``IncrementalPCAProjector``。
+    样本或特征少于 ``n_components`` 时，``fit`` 保留 min(样本数, 特征数) 个主成分
+    （``n_components_``）并发出警告。
+    """
+
     def __init__(self, n_components: int = 256, whiten: bool = True):
         self.n_components = int(n_components)
         self.whiten = bool(whiten)
         self._model = None
+        self.n_components_: Optional[int] = None
 
     def fit(self, X: np.ndarray) -> "PCAProjector":
+        self._model = None
+        X = np.asarray(X)
+        if X.ndim != 2 or X.size == 0:
+            raise ValueError(f"PCAProjector.fit expects a non-empty 2-D matrix, got shape {X.shape}")
+        k = min(self.n_components, *X.shape)
+        if k < self.n_components:
+            warnings.warn(
+                f"PCAProjector: n_components={self.n_components} exceeds min(n_samples, n_features)="
+                f"{k} of X; keeping {k} components",
+                stacklevel=2,
+            )
+        self.n_components_ = k
         try:
             from sklearn.decomposition import PCA  # type: ignore
-            self._model = PCA(n_components=self.n_components, whiten=self.whiten)
-            self._model.fit(X)
-        except Exception:
-            self._model = None
+        except ImportError:
+            self._model = IncrementalPCAProjector(k, self.whiten, batch_size=X.shape[0])
+        else:
+            self._model = PCA(n_components=k, whiten=self.whiten)
+        self._model.fit(X)
         return self
 
     def transform(self, X: np.ndarray) -> np.ndarray:
@@ -45,40 +75,329 @@ class PCAProjector(Projector):
         return self._model.transform(X)
 
 
+PROJECTOR_STATE_VERSION = 1
+
+
+class IncrementalPCAProjector(Projector):
+    """
+    Out-of-core PCA in pure NumPy.
+    纯NumPy实现的核外PCA。
+
+    ``partial_fit`` folds a chunk of rows into a rank-``n_components`` SVD
+    of the centered data seen so far, as in incremental PCA (Ross et al.,
+    2008; sklearn's ``IncrementalPCA``). Only (n_components + chunk, n_features)
+    arrays are held, so descriptor matrices can be streamed batch by batch
+    (``MGLIPipeline.partial_fit`` / ``fit(pairs, batch_size=...)``). The
+    fitted state is a few arrays: ``save`` / ``load`` (or pickling) let
+    other processes transform with it.
+    ``partial_fit`` 将一批行并入到目前为止中心化数据的秩 ``n_components`` SVD 中，
+    即增量PCA（Ross等, 2008；sklearn的 ``IncrementalPCA``）。只持有
+    (n_components + 批大小, n_features) 的数组，因此描述符矩阵可逐批流式输入。
+    拟合状态仅为少量数组，可通过 ``save``/``load``（或pickle）供其他进程做变换。
+
+    Parameters / 参数
+    ----------
+    n_components : int
+        Number of components kept / 保留的主成分数
+    whiten : bool
+        Scale projections to unit variance / 将投影缩放为单位方差
+    batch_size : int, optional
+        Rows per ``partial_fit`` step in ``fit`` (default 5 * n_components)
+        ``fit`` 中每步 ``partial_fit`` 的行数（默认 5 * n_components）
+    """
+
+    def __init__(self, n_components: int = 256, whiten: bool = True, batch_size: Optional[int] = None):
+        self.n_components = int(n_components)
+        self.whiten = bool(whiten)
+        self.batch_size = batch_size
+        self.reset()
+
+    def reset(self) -> "IncrementalPCAProjector":
+        """Forget the fitted state / 清除拟合状态"""
+        self.n_samples_seen_ = 0
+        self.mean_: Optional[np.ndarray] = None
+        self.components_: Optional[np.ndarray] = None
+        self.singular_values_: Optional[np.ndarray] = None
+        self.explained_variance_: Optional[np.ndarray] = None
+        return self
+
+    @property
+    def fitted(self) -> bool:
+        return self.components_ is not None
+
+    def partial_fit(self, X: np.ndarray) -> "IncrementalPCAProjector":
+        """Fold the rows of X into the fitted state / 将X的行并入拟合状态"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2:
+            raise ValueError(f"expected a 2-D matrix, got shape {X.shape}")
+        n_new = X.shape[0]
+        if n_new == 0:
+            return self
+        if self.mean_ is not None and X.shape[1] != self.mean_.size:
+            raise ValueError(f"X has {X.shape[1]} features, the projector was fitted on {self.mean_.size}")
+        n_seen = self.n_samples_seen_
+        n_total = n_seen + n_new
+        batch_mean = X.mean(axis=0)
+        Xc = X - batch_mean
+        if n_seen:
+            # previous components, the new rows and a mean-shift row
+            # 原有主成分、新行及均值偏移行
+            shift = np.sqrt(n_seen * n_new / n_total) * (self.mean_ - batch_mean)
+            Xc = np.vstack([self.singular_values_[:, None] * self.components_, Xc, shift[None, :]])
+            mean = self.mean_ + (batch_mean - self.mean_) * (n_new / n_total)
+        else:
+            mean = batch_mean
+        _, S, Vt = np.linalg.svd(Xc, full_matrices=False)
+        # deterministic signs: largest entry of each component positive
+        # 确定符号：每个主成分绝对值最大的分量为正
+        signs = np.sign(Vt[np.arange(Vt.shape[0]), np.argmax(np.abs(Vt), axis=1)])
+        Vt *= np.where(signs == 0, 1.0, signs)[:, None]
+        k = min(self.n_components, S.size)
+        self.n_samples_seen_ = n_total
+        self.mean_ = mean
+        self.components_ = Vt[:k].copy()
+        self.singular_values_ = S[:k].copy()
+        self.explained_variance_ = S[:k] ** 2 / max(n_total - 1, 1)
+        return self
+
+    def fit(self, X: np.ndarray) -> "IncrementalPCAProjector":
+        self.reset()
+        step = int(self.batch_size or 5 * self.n_components)
+        for s in range(0, X.shape[0], max(1, step)):
+            self.partial_fit(X[s:s + step])
+        return self
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        if not self.fitted:
+            raise ValueError("IncrementalPCAProjector is not fitted; call fit or partial_fit first")
+        Y = (np.asarray(X, dtype=np.float64) - self.mean_) @ self.components_.T
+        if self.whiten:
+            scale = np.sqrt(self.explained_variance_)
+            Y = np.divide(Y, scale, out=np.zeros_like(Y), where=scale > 0)
+        return Y
+
+    # ------------------------------------------------------------------
+    # persistence / 持久化
+    # ------------------------------------------------------------------
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        """Fitted state as plain arrays / 以普通数组表示的拟合状态"""
+        if not self.fitted:
+            raise ValueError("IncrementalPCAProjector is not fitted")
+        return dict(
+            version=np.asarray(PROJECTOR_STATE_VERSION),
+            n_components=np.asarray(self.n_components),
+            whiten=np.asarray(self.whiten),
+            n_samples_seen=np.asarray(self.n_samples_seen_),
+            mean=self.mean_,
+            components=self.components_,
+            singular_values=self.singular_values_,
+            explained_variance=self.explained_variance_,
+        )
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray]) -> "IncrementalPCAProjector":
+        """Rebuild a projector from ``state_dict`` / 由 ``state_dict`` 重建投影器"""
+        version = int(state.get("version", PROJECTOR_STATE_VERSION))
+        if version != PROJECTOR_STATE_VERSION:
+            raise ValueError(f"unsupported projector state version {version}")
+        proj = cls(int(state["n_components"]), bool(state["whiten"]))
+        proj.n_samples_seen_ = int(state["n_samples_seen"])
+        proj.mean_ = np.asarray(state["mean"], dtype=np.float64)
+        proj.components_ = np.asarray(state["components"], dtype=np.float64)
+        proj.singular_values_ = np.asarray(state["singular_values"], dtype=np.float64)
+        proj.explained_variance_ = np.asarray(state["explained_variance"], dtype=np.float64)
+        return proj
+
+    def save(self, path: str) -> str:
+        """Write the fitted state as .npz (atomically) / 以.npz（原子地）写出拟合状态"""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, **self.state_dict())
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalPCAProjector":
+        """Read a state written by ``save`` / 读取 ``save`` 写出的状态"""
+        with np.load(path) as data:
+            return cls.from_state({k: data[k] for k in data.files})
+
+
 class MGLIPipeline:
+    """
+    Featurize (A, B) structure pairs into global mGLI descriptors, then
+    optionally project them.
+    将 (A, B) 结构对特征化为全局mGLI描述符，并可选地降维。
+
+    Parameters / 参数
+    ----------
+    config : MgliConfig, optional
+        mGLI configuration / mGLI配置
+    projector : Projector, optional
+        Fitted on the training descriptors / 在训练描述符上拟合
+    schema : FeatureSchema, optional
+        Fixed column layout / 固定列布局
+    n_workers : int
+        Pairs featurized in parallel; 1 runs serially. Each worker also uses
+        ``config.n_jobs`` threads, so keep that at 1 when n_workers > 1.
+        并行特征化的结构对数；1 为串行。每个工作者还会使用 ``config.n_jobs`` 个线程，
+        因此 n_workers > 1 时应保持其为1。
+    executor : str
+        "process" or "thread" pool for n_workers > 1 / n_workers > 1 时使用的进程池或线程池
+    """
+
     def __init__(
         self,
         config: Optional[MgliConfig] = None,
         projector: Optional[Projector] = None,
+        schema: Optional[FeatureSchema] = None,
+        n_workers: int = 1,
+        executor: str = "process",
     ):
         self.config = config or MgliConfig()
         self.projector = projector
+        # fixed column layout; descriptors are written into preallocated rows
+        # 固定列布局；描述符直接写入预分配的行
+        self.schema = schema
+        if executor not in ("process", "thread"):
+            raise ValueError(f"executor must be 'process' or 'thread', got {executor!r}")
+        self.n_workers = max(1, int(n_workers))
+        self.executor = executor
 
     def _featurize_one(self, A: Structure, B: Optional[Structure]) -> np.ndarray:
-        return global_mgli_descriptor(A, B, self.config)
+        return global_mgli_descriptor(A, B, self.config, schema=self.schema)
+
+    def _pool(self):
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        if self.executor == "thread":
+            return ThreadPoolExecutor(max_workers=self.n_workers)
+        return ProcessPoolExecutor(max_workers=self.n_workers, mp_context=worker_context())
+
+    def iter_features(self, pairs: Iterable[tuple[Structure, Optional[Structure]]]) -> Iterator[np.ndarray]:
+        """
+        Descriptor of each pair, yielded in input order as soon as it is
+        ready. With n_workers > 1 at most 2 * n_workers pairs are in flight,
+        so ``pairs`` may be a lazy stream (e.g. structures loaded on demand).
+        按输入顺序在就绪后立即产生每个结构对的描述符。n_workers > 1 时最多
+        2 * n_workers 个结构对同时处理，因此 ``pairs`` 可以是惰性流（例如按需加载的结构）。
+        """
+        if self.schema is not None:
+            self.schema.check(self.config)
+        if self.n_workers == 1:
+            for A, B in pairs:
+                yield self._featurize_one(A, B)
+            return
+        with self._pool() as ex:
+            window: deque = deque()
+            try:
+                for A, B in pairs:
+                    window.append(ex.submit(global_mgli_descriptor, A, B, self.config, self.schema))
+                    if len(window) >= 2 * self.n_workers:
+                        yield window.popleft().result()
+                while window:
+                    yield window.popleft().result()
+            finally:
+                # consumer stopped early or a pair failed / 调用方提前停止或某个结构对失败
+                for fut in window:
+                    fut.cancel()
+
+    def _featurize(self, pairs: Sequence[tuple[Structure, Optional[Structure]]]) -> np.ndarray:
+        if self.schema is not None:
+            if self.n_workers == 1:
+                return descriptor_batch(pairs, self.config, self.schema)
+            X = self.schema.allocate(len(pairs))
+            for i, row in enumerate(self.iter_features(pairs)):
+                X[i] = row
+            return X
+        X = list(self.iter_features(pairs))
+        return np.vstack(X) if len(X) else np.zeros((0, 0), dtype=float)
+
+    def _batches(self, pairs: Iterable[tuple[Structure, Optional[Structure]]], batch_size: int) -> Iterator[np.ndarray]:
+        """Descriptor rows stacked into (<= batch_size, n_features) blocks / 描述符行按块堆叠"""
+        rows = []
+        for row in self.iter_features(pairs):
+            rows.append(row)
+            if len(rows) == batch_size:
+                yield np.vstack(rows)
+                rows = []
+        if rows:
+            yield np.vstack(rows)
+
+    def partial_fit(self, pairs: Sequence[tuple[Structure, Optional[Structure]]]) -> "MGLIPipeline":
+        """
+        Featurize one batch of pairs and fold it into the projector (which
+        must provide ``partial_fit``, e.g. ``IncrementalPCAProjector``).
+        特征化一批结构对并并入投影器（投影器须提供 ``partial_fit``，如 ``IncrementalPCAProjector``）。
+        """
+        if not hasattr(self.projector, "partial_fit"):
+            raise TypeError(f"projector {type(self.projector).__name__} has no partial_fit")
+        X = self._featurize(pairs)
+        if X.size:
+            self.projector.partial_fit(X)
+        return self
+
+    def fit(
+        self,
+        pairs: Iterable[tuple[Structure, Optional[Structure]]],
+        batch_size: Optional[int] = None,
+    ) -> "MGLIPipeline":
+        """
+        Fit the projector on the descriptors of ``pairs``. With
+        ``batch_size`` and a projector providing ``partial_fit``, the
+        descriptors are streamed in blocks of that many rows and never held
+        at once (``pairs`` may then be a lazy iterable).
+        在 ``pairs`` 的描述符上拟合投影器。给定 ``batch_size`` 且投影器提供 ``partial_fit`` 时，
+        描述符按该行数分块流式输入，不会同时驻留内存（此时 ``pairs`` 可为惰性可迭代对象）。
+        """
+        if batch_size is not None and hasattr(self.projector, "partial_fit"):
+            if hasattr(self.projector, "reset"):
+                self.projector.reset()
+            for X in self._batches(pairs, int(batch_size)):
+                self.projector.partial_fit(X)
+            return self
+        self._fit(self._featurize(list(pairs)))
+        return self
 
-    def fit(self, pairs: Sequence[tuple[Structure, Optional[Structure]]]) -> "MGLIPipeline":
-        X = [self._featurize_one(a, b) for a, b in pairs]
-        X = np.vstack(X) if len(X) else np.zeros((0, 0), dtype=float)
+    def _fit(self, X: np.ndarray) -> None:
         if self.projector is not None and X.size:
             self.projector.fit(X)
-        return self
 
-    def transform(self, pairs: Sequence[tuple[Structure, Optional[Structure]]]) -> np.ndarray:
-        X = [self._featurize_one(a, b) for a, b in pairs]
-        X = np.vstack(X) if len(X) else np.zeros((0, 0), dtype=float)
+    def _project(self, X: np.ndarray) -> np.ndarray:
         if self.projector is not None and X.size:
             X = self.projector.transform(X)
         return X
 
+    def transform(
+        self,
+        pairs: Iterable[tuple[Structure, Optional[Structure]]],
+        batch_size: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Projected descriptors of ``pairs``; with ``batch_size`` each block of
+        rows is projected as soon as it is featurized, so only the projected
+        matrix is kept.
+        ``pairs`` 的投影描述符；给定 ``batch_size`` 时每块行特征化后立即投影，只保留投影后的矩阵。
+        """
+        if batch_size is not None and self.projector is not None:
+            blocks = [self._project(X) for X in self._batches(pairs, int(batch_size))]
+            return np.vstack(blocks) if blocks else np.zeros((0, 0), dtype=float)
+        return self._project(self._featurize(list(pairs)))
+
     def fit_transform(self, pairs: Sequence[tuple[Structure, Optional[Structure]]]) -> np.ndarray:
-        self.fit(pairs)
-        return self.transform(pairs)
+        """
+        ``fit(pairs)`` then ``transform(pairs)``, featurizing each pair once.
+        等价于 ``fit(pairs)`` 后 ``transform(pairs)``，但每个结构对只特征化一次。
+        """
+        X = self._featurize(pairs)
+        self._fit(X)
+        return self._project(X)
 
 
 __all__ = [
     "Projector",
     "PCAProjector",
+    "IncrementalPCAProjector",
     "MGLIPipeline",
 ]
 
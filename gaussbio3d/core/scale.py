@@ -2,64 +2,274 @@
 Multi-scale weighting schemes for mGLI
 多尺度加权方案（mGLI）
 
-Provides binning and RBF-based radial weighting on pairwise GLI matrices.
-为成对GLI矩阵提供分箱与RBF径向加权。
+A scale scheme maps pair distances r to radial weights Φ_k(r), k < K. The
+descriptor, node-feature and segment J reductions read the weights through
+``ScaleScheme`` in a sparse form: one (pair, k, weight) entry per pair and
+active scale, so memory is O(pairs × active scales) rather than the dense
+(K, n, m) tensor. ``scale_scheme(config)`` picks the scheme named by
+``config.scale_scheme`` (default: hard bins, or RBF with ``use_rbf``); add
+schemes with ``register_scale_scheme``.
+
+尺度方案将节点对距离r映射为径向权重Φ_k(r)（k < K）。描述符、节点特征与线段J的归约通过
+``ScaleScheme`` 以稀疏形式读取权重：每个节点对的每个活跃尺度对应一个 (节点对, k, 权重) 条目，
+内存为 O(节点对 × 活跃尺度) 而非稠密的 (K, n, m) 张量。``scale_scheme(config)`` 选择
+``config.scale_scheme`` 指定的方案（默认：硬分箱，``use_rbf`` 时为RBF）；可用
+``register_scale_scheme`` 添加方案。
 """
 
 from __future__ import annotations
 
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
 import numpy as np
-from typing import Sequence
+
+# (flat pair index, scale, weight or None for all 1) / (扁平节点对索引, 尺度, 权重；全为1时为None)
+ScaleEntries = Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]
+
+
+def _work_dtype(r: np.ndarray) -> np.dtype:
+    """Weights follow float32 distances, else float64 / float32距离使用float32权重，否则float64"""
+    return np.dtype(np.float32) if r.dtype == np.float32 else np.dtype(np.float64)
 
 
 class ScaleScheme:
-    def apply(self, G: np.ndarray, dists: np.ndarray) -> np.ndarray:
+    """
+    Radial weights Φ_k(r) over K scales.
+    K个尺度上的径向权重Φ_k(r)。
+
+    Subclasses implement ``n_scales``, ``entries`` and ``support``;
+    ``masks`` and ``apply`` are derived from ``entries`` and may be
+    overridden with faster per-scale versions.
+    子类实现 ``n_scales``、``entries`` 与 ``support``；``masks`` 与 ``apply`` 由
+    ``entries`` 导出，可用更快的逐尺度版本覆盖。
+    """
+
+    @property
+    def n_scales(self) -> int:
+        raise NotImplementedError
+
+    def entries(self, r: np.ndarray) -> ScaleEntries:
+        """
+        Sparse weights of a distance array: (flat indices into r, scale k,
+        Φ_k(r) or None when every weight is 1) for each pair and scale with
+        Φ_k > 0. Entries of one scale keep the order of r.
+        距离数组的稀疏权重：对每个 Φ_k > 0 的节点对与尺度给出 (r的扁平索引, 尺度k,
+        Φ_k(r)；权重全为1时为None)。同一尺度的条目保持r中的顺序。
+        """
         raise NotImplementedError
 
+    def support(self, dtype=np.float64) -> Optional[float]:
+        """
+        Distance beyond which every weight is 0 in ``dtype`` (None if
+        unbounded).
+        在 ``dtype`` 精度下所有权重均为0的距离（无界时为None）。
+        """
+        raise NotImplementedError
+
+    def masks(self, r: np.ndarray) -> Iterator[Tuple[int, np.ndarray, Optional[np.ndarray]]]:
+        """
+        One scale at a time, shaped like ``r``: (k, mask of Φ_k > 0, Φ_k or
+        None when every weight is 1).
+        逐尺度给出与 ``r`` 同形状的 (k, Φ_k > 0 的掩码, Φ_k；权重全为1时为None)。
+        """
+        r = np.asarray(r)
+        idx, ks, w = self.entries(r)
+        order = np.argsort(ks, kind="stable")
+        bounds = np.searchsorted(ks[order], np.arange(self.n_scales + 1))
+        for k in range(self.n_scales):
+            sel = order[bounds[k]:bounds[k + 1]]
+            mask = np.zeros(r.shape, dtype=bool)
+            mask.reshape(-1)[idx[sel]] = True
+            wk = None
+            if w is not None:
+                wk = np.zeros(r.shape, dtype=w.dtype)
+                wk.reshape(-1)[idx[sel]] = w[sel]
+            yield k, mask, wk
+
+    def apply(self, G: np.ndarray, dists: np.ndarray) -> np.ndarray:
+        """
+        Dense (K,) + G.shape tensor Φ_k(r) * G (compatibility form).
+        稠密的 (K,) + G.shape 张量 Φ_k(r) * G（兼容形式）。
+        """
+        G = np.asarray(G)
+        out = np.zeros((self.n_scales, G.size), dtype=np.result_type(G.dtype, np.float32))
+        idx, ks, w = self.entries(np.asarray(dists))
+        g = G.reshape(-1)[idx]
+        out[ks, idx] = g if w is None else g * w
+        return out.reshape((self.n_scales,) + G.shape)
+
 
 class BinningScaleScheme(ScaleScheme):
+    """
+    Hard bins: Φ_k(r) = 1 for edges[k] <= r < edges[k+1], else 0.
+    硬分箱：edges[k] <= r < edges[k+1] 时Φ_k(r) = 1，否则为0。
+    """
+
     def __init__(self, edges: Sequence[float]):
         self.edges = np.asarray(edges, dtype=float)
         assert self.edges.ndim == 1 and self.edges.size >= 2
 
-    def apply(self, G: np.ndarray, dists: np.ndarray) -> np.ndarray:
-        n, m = G.shape
-        K = self.edges.size - 1
-        out = np.zeros((K, n, m), dtype=float)
-        for k in range(K):
-            mask = (dists >= self.edges[k]) & (dists < self.edges[k + 1])
-            if np.any(mask):
-                out[k][mask] = G[mask]
-        return out
+    @property
+    def n_scales(self) -> int:
+        return self.edges.size - 1
+
+    def bin_index(self, r: np.ndarray) -> np.ndarray:
+        """
+        Bin of each distance, or -1 outside [edges[0], edges[-1]), as the
+        smallest signed integer type (int8 up to 128 bins, then int16).
+        每个距离的分箱索引，区间外为-1；使用最小的有符号整数类型（不超过128个分箱时为int8，否则为int16）。
+        """
+        K = self.n_scales
+        idx = np.searchsorted(self.edges, r, side="right") - 1
+        idx[idx >= K] = -1
+        return idx.astype(np.min_scalar_type(-max(K, 1)))
+
+    def entries(self, r: np.ndarray) -> ScaleEntries:
+        b = self.bin_index(np.asarray(r).reshape(-1))
+        idx = np.flatnonzero(b >= 0)
+        return idx, b[idx], None
+
+    def support(self, dtype=np.float64) -> Optional[float]:
+        return float(np.max(self.edges))
+
+    def masks(self, r: np.ndarray) -> Iterator[Tuple[int, np.ndarray, Optional[np.ndarray]]]:
+        bins = self.bin_index(np.asarray(r))
+        for k in range(self.n_scales):
+            yield k, bins == k, None
 
 
 class RBFScaleScheme(ScaleScheme):
-    def __init__(self, centers: Sequence[float], sigma: float | None = None):
+    """
+    Gaussian RBFs Φ_k(r) = exp(-(r - c_k)² / 2σ²), optionally truncated to
+    |r - c_k| <= cutoff * σ; with a cutoff, exp is evaluated only on the
+    pairs inside each window.
+    高斯RBF Φ_k(r) = exp(-(r - c_k)² / 2σ²)，可截断为 |r - c_k| <= cutoff * σ；
+    设置截断时仅对各窗口内的节点对计算exp。
+
+    Parameters / 参数
+    ----------
+    centers : Sequence[float]
+        RBF centers / RBF中心
+    sigma : float, optional
+        Width; None uses the mean gap of the centers (1.0 for one center
+        or repeated centers)
+        宽度；None 时使用中心的平均间隔（单个或重复中心时为1.0）
+    cutoff : float, optional
+        Truncation in units of σ / 以σ为单位的截断
+    """
+
+    def __init__(self, centers: Sequence[float], sigma: float | None = None, cutoff: float | None = None):
         self.centers = np.asarray(centers, dtype=float)
         assert self.centers.ndim == 1 and self.centers.size >= 1
         if sigma is None:
-            if self.centers.size == 1:
-                sigma = 1.0
-            else:
-                gaps = np.diff(np.sort(self.centers))
-                sigma = float(np.mean(gaps)) or 1.0
+            # heuristic sigma = mean gap or 1.0 / 启发式sigma = 平均间隔或1.0
+            gaps = np.diff(np.sort(self.centers))
+            sigma = (float(gaps.mean()) if gaps.size > 0 else 0.0) or 1.0
         self.sigma = float(sigma)
+        if not self.sigma > 0:
+            raise ValueError(f"rbf sigma must be positive, got {sigma}")
+        if cutoff is not None and cutoff <= 0:
+            raise ValueError(f"rbf cutoff must be positive, got {cutoff}")
+        self.cutoff = None if cutoff is None else float(cutoff)
+
+    @property
+    def n_scales(self) -> int:
+        return self.centers.size
+
+    def _weight(self, r: np.ndarray, c: np.ndarray) -> np.ndarray:
+        return np.exp(-((r - c) ** 2) / (2.0 * self.sigma**2))
+
+    def _active(self, r: np.ndarray, c: np.ndarray, w: np.ndarray) -> np.ndarray:
+        support = w > 0.0
+        if self.cutoff is not None:
+            support &= np.abs(r - c) <= self.cutoff * self.sigma
+        return support
+
+    def entries(self, r: np.ndarray) -> ScaleEntries:
+        r = np.asarray(r).reshape(-1)
+        centers = self.centers.astype(_work_dtype(r))
+        k_type = np.min_scalar_type(-max(self.n_scales, 1))
+        every = np.arange(r.size)
+        parts_i, parts_k, parts_w = [], [], []
+        for k, c in enumerate(centers):
+            idx = every
+            if self.cutoff is not None:
+                # exp only inside the truncation window / 仅在截断窗口内计算exp
+                idx = np.flatnonzero(np.abs(r - c) <= self.cutoff * self.sigma)
+            w = self._weight(r if idx is every else r[idx], c)
+            keep = w > 0.0
+            if not keep.all():
+                idx, w = idx[keep], w[keep]
+            parts_i.append(idx)
+            parts_k.append(np.full(idx.size, k, dtype=k_type))
+            parts_w.append(w)
+        return np.concatenate(parts_i), np.concatenate(parts_k), np.concatenate(parts_w)
+
+    def support(self, dtype=np.float64) -> Optional[float]:
+        # exp(-x²/2) == 0 once x²/2 exceeds -log(smallest subnormal)
+        # 当 x²/2 超过 -log(最小次正规数) 时 exp(-x²/2) 下溢为0
+        cut = np.sqrt(-2.0 * np.log(float(np.finfo(np.dtype(dtype)).smallest_subnormal)))
+        if self.cutoff is not None:
+            cut = min(cut, self.cutoff)
+        return float(np.max(self.centers)) + float(cut) * self.sigma
+
+    def masks(self, r: np.ndarray) -> Iterator[Tuple[int, np.ndarray, Optional[np.ndarray]]]:
+        r = np.asarray(r)
+        centers = self.centers.astype(_work_dtype(r))
+        for k, c in enumerate(centers):
+            w = self._weight(r, c)
+            yield k, self._active(r, c, w), w
 
-    def apply(self, G: np.ndarray, dists: np.ndarray) -> np.ndarray:
-        n, m = G.shape
-        K = self.centers.size
-        out = np.zeros((K, n, m), dtype=float)
-        r = dists[None, :, :]
-        c = self.centers[:, None, None]
-        W = np.exp(-((r - c) ** 2) / (2.0 * self.sigma**2))
-        for k in range(K):
-            out[k] = G * W[k]
-        return out
+
+# name -> factory(config) / 名称 -> 工厂函数(config)
+_SCHEMES: Dict[str, Callable[[Any], ScaleScheme]] = {}
+
+
+def register_scale_scheme(name: str, factory: Callable[[Any], ScaleScheme]) -> None:
+    """
+    Register ``factory(config) -> ScaleScheme`` under ``name``, selected
+    with ``MgliConfig(scale_scheme=name)``.
+    以 ``name`` 注册 ``factory(config) -> ScaleScheme``，通过 ``MgliConfig(scale_scheme=name)`` 选用。
+    """
+    _SCHEMES[name] = factory
+
+
+def available_scale_schemes() -> List[str]:
+    return sorted(_SCHEMES)
+
+
+def scale_scheme(config: Any) -> ScaleScheme:
+    """
+    Scale scheme of a config: ``config.scale_scheme``, or "rbf" / "bins"
+    following ``config.use_rbf``.
+    配置对应的尺度方案：``config.scale_scheme``，或依照 ``config.use_rbf`` 为 "rbf"/"bins"。
+    """
+    name = getattr(config, "scale_scheme", None)
+    if name is None:
+        name = "rbf" if getattr(config, "use_rbf", False) else "bins"
+    try:
+        factory = _SCHEMES[name]
+    except KeyError:
+        raise ValueError(f"unknown scale scheme {name!r}; available: {available_scale_schemes()}") from None
+    return factory(config)
+
+
+register_scale_scheme("bins", lambda config: BinningScaleScheme(config.distance_bins))
+register_scale_scheme(
+    "rbf",
+    lambda config: RBFScaleScheme(
+        config.distance_bins,
+        config.rbf_sigma,
+        cutoff=getattr(config, "rbf_cutoff", None),
+    ),
+)
 
 
 __all__ = [
     "ScaleScheme",
     "BinningScaleScheme",
     "RBFScaleScheme",
+    "register_scale_scheme",
+    "available_scale_schemes",
+    "scale_scheme",
 ]
-
@@ -0,0 +1,188 @@
+"""
+Sparse node-pair results
+稀疏节点对结果
+
+With a distance cutoff only contacting node pairs carry GLI, so pairwise
+results are stored as CSR over rows of A: for every stored pair (i, j) the
+aggregated GLI, the node distance and the number of segment pairs that were
+aggregated. Memory scales with the number of contacts instead of N_A·N_B.
+
+设定距离截断后只有接触的节点对有GLI，因此成对结果以A的行为单位按CSR存储：每个存储的
+节点对 (i, j) 保存聚合GLI、节点距离及参与聚合的线段对数量。内存随接触数而非 N_A·N_B 增长。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class SparsePairs:
+    """
+    CSR node-pair result of ``compute_pairwise_node_gli(..., sparse=True)``.
+    ``compute_pairwise_node_gli(..., sparse=True)`` 的CSR节点对结果。
+
+    Attributes / 属性
+    ----------
+    shape : tuple
+        (N_A, N_B) / 稠密形状
+    indptr : np.ndarray
+        Row pointer, shape (N_A+1,) / 行指针
+    indices : np.ndarray
+        Column (B node) index per stored pair, ascending within a row
+        每个存储节点对的列（B节点）索引，行内升序
+    gli : np.ndarray
+        Aggregated node-level GLI per stored pair / 每个节点对的聚合GLI
+    dist : np.ndarray
+        Node distance per stored pair / 每个节点对的节点距离
+    seg_counts : np.ndarray
+        Segment pairs aggregated into each value / 每个值聚合的线段对数量
+    """
+
+    shape: Tuple[int, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+    gli: np.ndarray
+    dist: np.ndarray
+    seg_counts: np.ndarray
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored pairs / 存储的节点对数量"""
+        return int(self.indices.size)
+
+    def row_indices(self) -> np.ndarray:
+        """Row (A node) index of every stored pair / 每个存储节点对的行索引"""
+        return np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self.indptr))
+
+    def to_dense(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dense (gij, rij); pairs that are not stored get 0 GLI and an infinite
+        distance.
+        稠密 (gij, rij)；未存储的节点对GLI为0，距离为无穷大。
+        """
+        gij = np.zeros(self.shape, dtype=self.gli.dtype)
+        rij = np.full(self.shape, np.inf, dtype=self.dist.dtype)
+        rows = self.row_indices()
+        gij[rows, self.indices] = self.gli
+        rij[rows, self.indices] = self.dist
+        return gij, rij
+
+    def to_scipy(self, values: str = "gli"):
+        """
+        ``scipy.sparse.csr_matrix`` of one stored field ("gli", "dist" or
+        "seg_counts"); requires scipy.
+        某一字段的 ``scipy.sparse.csr_matrix``；需要scipy。
+        """
+        from scipy.sparse import csr_matrix  # type: ignore
+
+        return csr_matrix((getattr(self, values), self.indices, self.indptr), shape=self.shape)
+
+    def transpose(self) -> "SparsePairs":
+        """
+        Pairs seen from B: CSR over rows of B.
+        从B的视角看的节点对：以B的行为单位的CSR。
+        """
+        rows = self.row_indices()
+        order = np.lexsort((rows, self.indices))
+        indptr = np.zeros(self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.shape[1]), out=indptr[1:])
+        return SparsePairs(
+            shape=(self.shape[1], self.shape[0]),
+            indptr=indptr,
+            indices=rows[order],
+            gli=self.gli[order],
+            dist=self.dist[order],
+            seg_counts=self.seg_counts[order],
+        )
+
+    def select(self, keep: np.ndarray) -> "SparsePairs":
+        """Sub-result of the stored pairs where ``keep`` is True / 按布尔掩码筛选节点对"""
+        counts = np.bincount(self.row_indices()[keep], minlength=self.shape[0])
+        indptr = np.zeros(self.shape[0] + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return SparsePairs(
+            shape=self.shape,
+            indptr=indptr,
+            indices=self.indices[keep],
+            gli=self.gli[keep],
+            dist=self.dist[keep],
+            seg_counts=self.seg_counts[keep],
+        )
+
+    def topk(self, k: int, by: str = "abs_gli") -> "SparsePairs":
+        """
+        Keep at most ``k`` pairs per row (A node), for attention-style consumers.
+        每行（A节点）最多保留 ``k`` 个节点对，供注意力类模型使用。
+
+        ``by`` ranks pairs by "abs_gli" (largest |GLI| first), "gli"
+        (largest first) or "dist" (nearest first); ties keep the lower column.
+        ``by`` 按 "abs_gli"（|GLI|最大优先）、"gli"（最大优先）或 "dist"（最近优先）排序；
+        并列时保留列号较小者。
+        """
+        if k is None or k <= 0:
+            raise ValueError(f"k must be a positive integer, got {k}")
+        if by == "abs_gli":
+            score = -np.abs(self.gli)
+        elif by == "gli":
+            score = -self.gli
+        elif by == "dist":
+            score = self.dist
+        else:
+            raise ValueError(f"unknown top-k ranking: {by!r}")
+        rows = self.row_indices()
+        order = np.lexsort((self.indices, score, rows))
+        rank = np.arange(self.nnz) - np.repeat(self.indptr[:-1], np.diff(self.indptr))
+        keep = np.zeros(self.nnz, dtype=bool)
+        keep[order[rank < k]] = True
+        return self.select(keep)
+
+    def reindex(
+        self,
+        rows: Optional[np.ndarray],
+        cols: Optional[np.ndarray],
+        shape: Tuple[int, int],
+    ) -> "SparsePairs":
+        """
+        Place the result inside a larger ``shape``: local row r becomes
+        ``rows[r]`` and column c becomes ``cols[c]`` (None keeps the axis).
+        Both maps must be increasing, e.g. ``Structure.parent_index``.
+        将结果放入更大的 ``shape``：局部行r变为 ``rows[r]``，列c变为 ``cols[c]``
+        （None表示该轴不变）。映射须递增，例如 ``Structure.parent_index``。
+        """
+        row_of = self.row_indices()
+        if rows is not None:
+            row_of = np.asarray(rows, dtype=np.int64)[row_of]
+        indices = self.indices if cols is None else np.asarray(cols, dtype=np.int64)[self.indices]
+        indptr = np.zeros(int(shape[0]) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_of, minlength=int(shape[0])), out=indptr[1:])
+        return SparsePairs(
+            shape=(int(shape[0]), int(shape[1])),
+            indptr=indptr,
+            indices=indices,
+            gli=self.gli,
+            dist=self.dist,
+            seg_counts=self.seg_counts,
+        )
+
+    @classmethod
+    def empty(cls, shape: Tuple[int, int], dtype=np.float64) -> "SparsePairs":
+        return cls(
+            shape=(int(shape[0]), int(shape[1])),
+            indptr=np.zeros(int(shape[0]) + 1, dtype=np.int64),
+            indices=np.zeros(0, dtype=np.int64),
+            gli=np.zeros(0, dtype=dtype),
+            dist=np.zeros(0, dtype=dtype),
+            seg_counts=np.zeros(0, dtype=np.int64),
+        )
+
+
+def apply_topk(pairs: SparsePairs, top_k: Optional[int], by: str = "abs_gli") -> SparsePairs:
+    """``pairs.topk(top_k, by)`` if top_k is set, else pairs / 若设置top_k则保留每行前k个"""
+    return pairs if top_k is None else pairs.topk(top_k, by=by)
+
+
+__all__ = ["SparsePairs", "apply_topk"]
@@ -0,0 +1,523 @@
+"""
+Grouped statistics and mergeable accumulators
+分组统计量与可合并累加器
+
+Descriptor statistics are reductions of values keyed by a group index
+(group pair × radial scale, or node × scale). ``GroupedStats`` is a
+single-pass accumulator over such (key, value) chunks whose partial states
+merge, so values can be pushed per tile, per worker or per sparse chunk
+and the full pair tensors never need to be materialized:
+
+- "sum", "mean", "count": bincount sums and counts
+- "std", "var": Welford / Chan moments (population, as ``np.std``)
+- "max", "min": running extrema
+- "median", "q<percent>" (e.g. "q25", "q90"): exact until a group holds
+  more than ``quantile_capacity`` values, then a bounded-memory sketch of
+  equal-weight centroids
+
+Further statistics can be added with ``register_stat``; unknown names
+raise ``ValueError``. ``grouped_stats`` is the one-shot form (exact
+quantiles) and ``array_stats`` the 1-D form.
+
+描述符统计量是按组索引（组对×径向尺度，或节点×尺度）归约的值。``GroupedStats`` 是此类
+(键, 值) 块上的单遍累加器，其部分状态可合并，因此可按分块、按工作进程或按稀疏块推入，
+无需构造完整的节点对张量：sum/mean/count 由bincount计算；std/var 为Welford/Chan矩
+（总体方差，同 ``np.std``）；max/min 为滚动极值；"median" 与 "q<百分数>" 在组内值数不超过
+``quantile_capacity`` 时精确，超过后为有界内存的等权质心草图。可通过 ``register_stat``
+添加统计量；未知名称引发 ``ValueError``。``grouped_stats`` 为一次性形式（精确分位数），
+``array_stats`` 为一维形式。
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Default entries kept per group by streaming quantiles
+# 流式分位数每组默认保留的条目数
+QUANTILE_CAPACITY = 4096
+
+_QUANTILE_RE = re.compile(r"q(\d+(?:\.\d+)?)")
+
+# name -> (state it reads: "sum" | "moments" | "extrema", finalize)
+# 名称 -> (所读取的状态, 终结函数)
+_STATS: Dict[str, Tuple[str, Callable[["GroupedStats"], np.ndarray]]] = {}
+
+
+def register_stat(
+    name: str,
+    finalize: Callable[["GroupedStats"], np.ndarray],
+    needs: str = "moments",
+) -> None:
+    """
+    Register a statistic computed from an accumulator's state.
+    注册一个由累加器状态计算的统计量。
+
+    ``finalize(acc)`` returns an (n_groups,) array from ``acc.count`` and
+    ``acc.sum`` ("sum"), plus ``acc.mean`` / ``acc.m2`` ("moments") or
+    ``acc.max`` / ``acc.min`` ("extrema"); only groups with values are read.
+    ``finalize(acc)`` 由 ``acc.count``、``acc.sum``（"sum"），以及 ``acc.mean``/``acc.m2``
+    （"moments"）或 ``acc.max``/``acc.min``（"extrema"）返回 (n_groups,) 数组；仅读取有值的组。
+    """
+    if needs not in ("sum", "moments", "extrema"):
+        raise ValueError(f"needs must be 'sum', 'moments' or 'extrema', got {needs!r}")
+    _STATS[name] = (needs, finalize)
+
+
+def _safe_count(acc: "GroupedStats") -> np.ndarray:
+    return np.maximum(acc.count, 1)
+
+
+register_stat("sum", lambda acc: acc.sum, needs="sum")
+register_stat("mean", lambda acc: acc.sum / _safe_count(acc), needs="sum")
+register_stat("count", lambda acc: acc.count.astype(np.float64), needs="sum")
+register_stat("var", lambda acc: acc.m2 / _safe_count(acc))
+register_stat("std", lambda acc: np.sqrt(acc.m2 / _safe_count(acc)))
+register_stat("max", lambda acc: acc.max, needs="extrema")
+register_stat("min", lambda acc: acc.min, needs="extrema")
+
+
+def quantile_level(stat: str) -> Optional[float]:
+    """0.5 for "median", q/100 for "q<q>", else None / 分位数水平，非分位数时为None"""
+    if stat == "median":
+        return 0.5
+    m = _QUANTILE_RE.fullmatch(stat)
+    if m is not None and float(m.group(1)) <= 100.0:
+        return float(m.group(1)) / 100.0
+    return None
+
+
+def check_stats(stats: Sequence[str]) -> None:
+    """Raise ``ValueError`` for unknown statistic names / 未知统计量名称时引发 ``ValueError``"""
+    for st in stats:
+        if st not in _STATS and quantile_level(st) is None:
+            known = ", ".join(sorted(_STATS) + ["median", "q<percent>"])
+            raise ValueError(f"unknown statistic {st!r}; available: {known}")
+
+
+def _exact_quantiles(
+    keys: np.ndarray,
+    vals: np.ndarray,
+    n_groups: int,
+    levels: Sequence[float],
+) -> Dict[float, np.ndarray]:
+    """Per-group quantiles, linear interpolation as ``np.quantile`` / 每组分位数（线性插值）"""
+    res = {q: np.zeros(n_groups) for q in levels}
+    if keys.size == 0:
+        return res
+    v = vals[np.lexsort((vals, keys))]
+    cnt = np.bincount(keys, minlength=n_groups)
+    has = cnt > 0
+    c = cnt[has]
+    start = (np.cumsum(cnt) - cnt)[has]
+    for q in res:
+        if q == 0.5:
+            res[q][has] = 0.5 * (v[start + (c - 1) // 2] + v[start + c // 2])
+            continue
+        h = (c - 1) * q
+        lo = np.floor(h).astype(np.int64)
+        hi = np.minimum(lo + 1, c - 1)
+        a, b = v[start + lo], v[start + hi]
+        res[q][has] = a + (h - lo) * (b - a)
+    return res
+
+
+def _sketch_quantiles(
+    keys: np.ndarray,
+    vals: np.ndarray,
+    wts: np.ndarray,
+    n_groups: int,
+    levels: Sequence[float],
+    lo_val: Optional[np.ndarray] = None,
+    hi_val: Optional[np.ndarray] = None,
+) -> Dict[float, np.ndarray]:
+    """
+    Quantiles of weighted centroids: centroid i sits at rank
+    cw_i - (w_i + 1) / 2 and ranks in between are interpolated, which
+    reduces to ``_exact_quantiles`` for unit weights.
+    加权质心的分位数：质心i位于秩 cw_i - (w_i + 1)/2，其间线性插值；单位权重时与精确分位数一致。
+
+    With the per-group extrema ``lo_val`` / ``hi_val`` the minimum sits at
+    rank 0 and the maximum at rank W - 1, so tail ranks interpolate toward
+    the true order statistics (q0 / q100 are exact) instead of stopping at
+    the outermost centroid means, and every result lies within them.
+    给定每组极值 ``lo_val``/``hi_val`` 时，最小值位于秩0、最大值位于秩 W - 1，尾部秩向真实
+    次序统计量插值（q0/q100精确），而非停在最外侧质心均值处，且所有结果都位于极值之间。
+    """
+    res = {q: np.zeros(n_groups) for q in levels}
+    if keys.size == 0:
+        return res
+    order = np.lexsort((vals, keys))
+    k = keys[order]
+    v = vals[order].astype(np.float64)
+    w = wts[order].astype(np.float64)
+    cnt = np.bincount(k, minlength=n_groups)
+    W = np.bincount(k, weights=w, minlength=n_groups)
+    has = cnt > 0
+    s = (np.cumsum(cnt) - cnt)[has]
+    e = s + cnt[has] - 1
+    before = (np.cumsum(W) - W)[has]
+    last = before + W[has] - 1.0
+    # global positions are monotone, so one searchsorted serves all groups
+    # 全局位置单调，一次searchsorted即可处理所有组
+    P = np.cumsum(w) - (w + 1.0) / 2.0
+    if lo_val is not None:
+        # extrema that were never tracked fall back to the outer centroids
+        # 未跟踪的极值退回到最外侧质心
+        lo = np.where(np.isfinite(lo_val[has]), lo_val[has], v[s])
+        hi = np.where(np.isfinite(hi_val[has]), hi_val[has], v[e])
+    for q in res:
+        H = before + (W[has] - 1.0) * q
+        hi_i = np.clip(np.searchsorted(P, H, side="left"), s, e)
+        lo_i = np.maximum(hi_i - 1, s)
+        span = P[hi_i] - P[lo_i]
+        inner = (hi_i > lo_i) & (P[hi_i] > H) & (span > 0)
+        t = np.where(inner, (H - P[lo_i]) / np.where(span > 0, span, 1.0), 0.0)
+        val = np.where(inner, v[lo_i] + t * (v[hi_i] - v[lo_i]), v[hi_i])
+        if lo_val is not None:
+            head = H < P[s]
+            gap = np.where(head, P[s] - before, 1.0)
+            val = np.where(head, lo + (H - before) / gap * (v[s] - lo), val)
+            tail = H > P[e]
+            gap = np.where(tail, last - P[e], 1.0)
+            val = np.where(tail, v[e] + (H - P[e]) / gap * (hi - v[e]), val)
+            val = lo if q <= 0.0 else hi if q >= 1.0 else np.clip(val, lo, hi)
+        res[q][has] = val
+    return res
+
+
+class GroupedStats:
+    """
+    Single-pass, mergeable per-group accumulator of ``stats`` (see the
+    module docstring).
+    ``stats`` 的单遍、可合并每组累加器（见模块说明）。
+
+    Count and sum are always kept, Welford mean / M2 and extrema only when
+    a requested statistic reads them (extrema also whenever quantiles are
+    requested). Quantiles retain (key, value, weight) entries, exact while a
+    group has at most ``quantile_capacity`` of them; a larger group is
+    compacted to that many equal-weight centroids by rank (rank error about
+    1/capacity per compaction), whose tails are anchored at the tracked
+    extrema so q0 / q100 stay exact and no quantile leaves [min, max].
+    ``quantile_capacity=None`` keeps every value.
+    始终保存计数与和；仅当请求的统计量需要时才保存Welford均值/M2与极值（请求分位数时也保存极值）。
+    分位数保留 (键, 值, 权重) 条目，组内条目数不超过 ``quantile_capacity`` 时精确；更大的组按秩
+    压缩为该数量的等权质心（每次压缩的秩误差约为1/容量），其尾部锚定在跟踪的极值上，因此
+    q0/q100保持精确，且任何分位数都不超出 [min, max]。``quantile_capacity=None`` 保留全部值。
+    """
+
+    def __init__(
+        self,
+        n_groups: int,
+        stats: Sequence[str],
+        dtype=np.float64,
+        quantile_capacity: Optional[int] = QUANTILE_CAPACITY,
+    ):
+        check_stats(stats)
+        self.n_groups = int(n_groups)
+        self.stats = list(stats)
+        self.dtype = np.dtype(dtype)
+        self.quantile_capacity = None if quantile_capacity is None else max(2, int(quantile_capacity))
+        needs = {_STATS[st][0] for st in self.stats if st in _STATS}
+        self._levels = sorted({q for q in map(quantile_level, self.stats) if q is not None})
+        self._moments = "moments" in needs
+        # quantile sketches are bounded by the extrema / 分位数草图以极值为界
+        self._extrema = "extrema" in needs or bool(self._levels)
+        self.count = np.zeros(self.n_groups, dtype=np.int64)
+        self.sum = np.zeros(self.n_groups, dtype=np.float64)
+        self.mean = np.zeros(self.n_groups, dtype=np.float64)
+        self.m2 = np.zeros(self.n_groups, dtype=np.float64)
+        self.max = np.full(self.n_groups, -np.inf)
+        self.min = np.full(self.n_groups, np.inf)
+        self._keys: List[np.ndarray] = []
+        self._vals: List[np.ndarray] = []
+        self._wts: List[Optional[np.ndarray]] = []
+        self._size = 0
+        self._compacted = np.zeros(self.n_groups, dtype=bool)
+
+    @property
+    def keeps_values(self) -> bool:
+        """Whether quantiles are requested (entries are retained) / 是否请求分位数（保留条目）"""
+        return bool(self._levels)
+
+    def _combine(self, count, total, mean, m2) -> None:
+        # Chan et al. parallel update of (count, mean, M2)
+        # Chan等人的 (计数, 均值, M2) 并行合并
+        n = self.count + count
+        if self._moments:
+            frac = np.divide(count, n, out=np.zeros(self.n_groups), where=n > 0)
+            delta = mean - self.mean
+            self.m2 += m2 + delta * delta * self.count * frac
+            self.mean += delta * frac
+        self.count = n
+        self.sum += total
+
+    def update(self, keys: np.ndarray, vals: np.ndarray) -> "GroupedStats":
+        """Add values ``vals`` under group ``keys`` / 在组 ``keys`` 下加入值 ``vals``"""
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+        vals = np.asarray(vals).reshape(-1)
+        if keys.size == 0:
+            return self
+        count = np.bincount(keys, minlength=self.n_groups)
+        total = np.bincount(keys, weights=vals, minlength=self.n_groups)
+        mean = m2 = None
+        if self._moments:
+            # two-pass moments within the chunk / 块内两遍计算矩
+            mean = np.divide(total, count, out=np.zeros(self.n_groups), where=count > 0)
+            dev = vals - mean[keys]
+            m2 = np.bincount(keys, weights=dev * dev, minlength=self.n_groups)
+        self._combine(count, total, mean, m2)
+        if self._extrema:
+            np.maximum.at(self.max, keys, vals)
+            np.minimum.at(self.min, keys, vals)
+        if self.keeps_values:
+            self._keys.append(keys.copy())
+            self._vals.append(vals.astype(self.dtype, copy=True))
+            self._wts.append(None)
+            self._size += keys.size
+            self._maybe_compact()
+        return self
+
+    def merge(self, other: "GroupedStats") -> "GroupedStats":
+        """Fold another partial state into this one / 将另一部分状态合并到本累加器"""
+        if other.n_groups != self.n_groups:
+            raise ValueError("cannot merge accumulators with different group counts")
+        self._combine(other.count, other.sum, other.mean, other.m2)
+        np.maximum(self.max, other.max, out=self.max)
+        np.minimum(self.min, other.min, out=self.min)
+        if self.keeps_values:
+            self._keys.extend(other._keys)
+            self._vals.extend(other._vals)
+            self._wts.extend(other._wts)
+            self._size += other._size
+            self._compacted |= other._compacted
+            self._maybe_compact()
+        return self
+
+    def _entries(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if not self._keys:
+            return (
+                np.zeros(0, dtype=np.int64),
+                np.zeros(0, dtype=self.dtype),
+                np.zeros(0, dtype=np.int64),
+            )
+        wts = [np.ones(k.size, dtype=np.int64) if w is None else w for k, w in zip(self._keys, self._wts)]
+        return np.concatenate(self._keys), np.concatenate(self._vals), np.concatenate(wts)
+
+    def _maybe_compact(self) -> None:
+        cap = self.quantile_capacity
+        if cap is None:
+            return
+        if self._size > max(1 << 16, 2 * cap * int(np.count_nonzero(self.count))):
+            self._compact()
+
+    def _compact(self) -> None:
+        """
+        Cut every group holding more than ``quantile_capacity`` entries into
+        that many equal-weight rank buckets, each kept as its weighted median.
+        将条目数超过 ``quantile_capacity`` 的组按秩切分为该数量的等权桶，每个桶以其加权中位数保留。
+        """
+        cap = self.quantile_capacity
+        keys, vals, wts = self._entries()
+        over = np.bincount(keys, minlength=self.n_groups) > cap
+        big = over[keys]
+        if not big.any():
+            return
+        order = np.lexsort((vals[big], keys[big]))
+        kb = keys[big][order]
+        vb = vals[big][order].astype(np.float64)
+        wb = wts[big][order].astype(np.float64)
+        W = np.bincount(kb, weights=wb, minlength=self.n_groups)
+        rank0 = np.cumsum(wb) - wb - (np.cumsum(W) - W)[kb]
+        bucket = np.minimum(np.floor(rank0 * cap / W[kb]).astype(np.int64), cap - 1)
+        code = kb * cap + bucket
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(code)) + 1))
+        ends = np.concatenate((starts[1:], [code.size])) - 1
+        w_new = np.add.reduceat(wb, starts)
+        # weighted median of each bucket: an observed value, unlike the mean,
+        # which heavy tails drag outward / 每个桶的加权中位数：为实际观测值，不像均值那样被重尾拉偏
+        cw = np.cumsum(wb)
+        mid = np.searchsorted(cw, cw[starts] - wb[starts] + 0.5 * w_new, side="left")
+        v_new = vb[np.clip(mid, starts, ends)]
+        keep = ~big
+        self._keys = [keys[keep], kb[starts]]
+        self._vals = [vals[keep], v_new.astype(self.dtype)]
+        self._wts = [wts[keep], np.rint(w_new).astype(np.int64)]
+        self._size = int(np.count_nonzero(keep)) + starts.size
+        self._compacted |= over
+
+    def _quantiles(self) -> Dict[float, np.ndarray]:
+        keys, vals, wts = self._entries()
+        approx = self._compacted[keys]
+        res = _exact_quantiles(keys[~approx], vals[~approx], self.n_groups, self._levels)
+        if approx.any():
+            sk = _sketch_quantiles(
+                keys[approx], vals[approx], wts[approx], self.n_groups, self._levels,
+                lo_val=self.min, hi_val=self.max,
+            )
+            for q in res:
+                res[q] = np.where(self._compacted, sk[q], res[q])
+        return res
+
+    def result(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        (n_groups, S) statistics; groups without values are 0. With ``out``
+        (e.g. a view of a preallocated batch row) the result is written there.
+        (n_groups, S) 统计量；无值的组为0。给定 ``out``（例如预分配批矩阵某行的视图）时写入其中。
+        """
+        shape = (self.n_groups, len(self.stats))
+        if out is None:
+            out = np.zeros(shape, dtype=self.dtype)
+        else:
+            if out.shape != shape:
+                raise ValueError(f"out has shape {out.shape}, expected {shape}")
+            out[...] = 0
+        has = self.count > 0
+        quantiles = self._quantiles() if self.keeps_values else {}
+        for si, st in enumerate(self.stats):
+            q = quantile_level(st)
+            out[has, si] = (quantiles[q] if q is not None else _STATS[st][1](self))[has]
+        return out
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        """Arrays describing the partial state (e.g. for checkpoints) / 描述部分状态的数组"""
+        keys, vals, wts = self._entries()
+        return dict(
+            count=self.count, sum=self.sum, mean=self.mean, m2=self.m2,
+            max=self.max, min=self.min,
+            keys=keys, vals=vals, wts=wts, compacted=self._compacted,
+        )
+
+    @classmethod
+    def from_state(
+        cls,
+        state: Dict[str, np.ndarray],
+        stats: Sequence[str],
+        dtype=np.float64,
+        quantile_capacity: Optional[int] = QUANTILE_CAPACITY,
+    ) -> "GroupedStats":
+        """Rebuild an accumulator from ``state_dict()`` / 从 ``state_dict()`` 重建累加器"""
+        acc = cls(int(state["count"].shape[0]), stats, dtype, quantile_capacity)
+        for name in ("count", "sum", "mean", "m2", "max", "min"):
+            setattr(acc, name, np.array(state[name], dtype=getattr(acc, name).dtype))
+        if acc.keeps_values and state["keys"].size:
+            acc._keys = [np.array(state["keys"], dtype=np.int64)]
+            acc._vals = [np.array(state["vals"], dtype=acc.dtype)]
+            acc._wts = [np.array(state["wts"], dtype=np.int64)]
+            acc._size = acc._keys[0].size
+            acc._compacted = np.array(state["compacted"], dtype=bool)
+        return acc
+
+
+def grouped_stats(
+    keys: np.ndarray,
+    vals: np.ndarray,
+    n_groups: int,
+    stats: Sequence[str],
+    dtype=np.float64,
+) -> np.ndarray:
+    """
+    Statistics of ``vals`` per group key in one pass, shape (n_groups, S);
+    groups without values stay 0 and quantiles are exact.
+    单遍计算每个组键上 ``vals`` 的统计量，形状为(n_groups, S)；无值的组保持0，分位数为精确值。
+    """
+    return GroupedStats(n_groups, stats, dtype, quantile_capacity=None).update(keys, vals).result()
+
+
+# 1-D reductions taken directly from NumPy / 直接使用NumPy的一维归约
+_DIRECT = {
+    "sum": np.sum, "mean": np.mean, "std": np.std, "var": np.var,
+    "max": np.max, "min": np.min, "median": np.median,
+}
+
+
+def array_stats(vals: np.ndarray, stats: Sequence[str]) -> np.ndarray:
+    """
+    Statistics of one 1-D array, shape (S,), in the precision of ``vals``.
+    一维数组的统计量，形状为(S,)，精度与 ``vals`` 一致。
+    """
+    check_stats(stats)
+    out = np.zeros(len(stats), dtype=vals.dtype)
+    if vals.size == 0:
+        return out
+    for si, st in enumerate(stats):
+        q = quantile_level(st)
+        if st in _DIRECT:
+            out[si] = _DIRECT[st](vals)
+        elif q is not None:
+            out[si] = np.quantile(vals, q)
+        else:
+            out[si] = grouped_stats(np.zeros(vals.size, dtype=np.int64), vals, 1, [st], vals.dtype)[0, 0]
+    return out
+
+
+def masked_row_stats(vals: np.ndarray, mask: np.ndarray, stats: Sequence[str]) -> np.ndarray:
+    """
+    Statistics of each row of ``vals`` over its entries where ``mask`` is
+    set, shape (rows, S), as masked axis reductions in the precision of
+    ``vals``; rows without entries are 0. Quantiles sort each row once
+    (masked entries as NaN, which sort last).
+    对 ``vals`` 每一行在 ``mask`` 为真的条目上计算统计量，形状为 (rows, S)，以精度与 ``vals``
+    一致的掩码轴向归约完成；无条目的行为0。分位数对每行排序一次（掩码外条目为NaN，排在末尾）。
+    """
+    check_stats(stats)
+    out = np.zeros((vals.shape[0], len(stats)), dtype=vals.dtype)
+    cnt = np.count_nonzero(mask, axis=1)
+    has = cnt > 0
+    if not has.any():
+        return out
+    c = np.maximum(cnt, 1)
+    total = np.where(mask, vals, 0).sum(axis=1)
+    mean = total / c
+    var = srt = None
+    for si, st in enumerate(stats):
+        q = quantile_level(st)
+        if st == "sum":
+            res = total
+        elif st == "mean":
+            res = mean
+        elif st == "count":
+            res = cnt
+        elif st in ("std", "var"):
+            if var is None:
+                dev = np.where(mask, vals - mean[:, None], 0)
+                var = (dev * dev).sum(axis=1) / c
+            res = var if st == "var" else np.sqrt(var)
+        elif st == "max":
+            res = np.where(mask, vals, -np.inf).max(axis=1)
+        elif st == "min":
+            res = np.where(mask, vals, np.inf).min(axis=1)
+        elif q is not None:
+            if srt is None:
+                srt = np.sort(np.where(mask, vals, np.nan), axis=1)
+            if q == 0.5:
+                lo, hi = (c - 1) // 2, c // 2
+                res = 0.5 * (_take_rows(srt, lo) + _take_rows(srt, hi))
+            else:
+                h = (c - 1) * q
+                lo = np.floor(h).astype(np.int64)
+                a, b = _take_rows(srt, lo), _take_rows(srt, np.minimum(lo + 1, c - 1))
+                res = a + (h - lo) * (b - a)
+        else:
+            rows, cols = np.nonzero(mask)
+            res = grouped_stats(rows, vals[rows, cols], vals.shape[0], [st], vals.dtype)[:, 0]
+        out[has, si] = res[has]
+    return out
+
+
+def _take_rows(a: np.ndarray, col: np.ndarray) -> np.ndarray:
+    return np.take_along_axis(a, col[:, None], axis=1)[:, 0]
+
+
+__all__ = [
+    "QUANTILE_CAPACITY",
+    "register_stat",
+    "quantile_level",
+    "check_stats",
+    "grouped_stats",
+    "array_stats",
+    "masked_row_stats",
+    "GroupedStats",
+]
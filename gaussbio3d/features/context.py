@@ -0,0 +1,161 @@
+"""
+Shared pairwise context for one structure pair
+单个结构对的共享成对上下文
+
+A task featurizing (A, B) needs the global descriptor, node features of
+both sides and the pairwise matrix, which all derive from the same
+node-level GLI / distances. ``PairContext`` computes
+``compute_pairwise_node_gli(A, B)`` once, on first use, and serves every
+output from it; the B side uses the transposed result (GLI is symmetric in
+its two curves), so the pairwise step runs once instead of four times.
+
+对 (A, B) 特征化的任务需要全局描述符、两侧的节点特征及成对矩阵，它们都来自相同的节点级
+GLI/距离。``PairContext`` 在首次使用时计算一次 ``compute_pairwise_node_gli(A, B)``，
+所有输出都由其导出；B侧使用转置后的结果（GLI关于两条曲线对称），因此成对计算只运行一次而非四次。
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+from ..config import MgliConfig
+from ..core.geometry import Structure
+from ..core.pairwise_gli import compute_pairwise_node_gli
+from ..core.sparse import SparsePairs, apply_topk
+from .descriptor import PairResult, global_mgli_descriptor
+from .node_features import node_mgli_features
+from .schema import FeatureSchema
+
+
+class PairContext:
+    """
+    Lazily computed pairwise GLI of (A, B) under ``config``, with the
+    outputs derived from it.
+    ``config`` 下 (A, B) 延迟计算的成对GLI及由其导出的输出。
+
+    With ``config.memory_budget`` set (and sparse pairs off) the descriptor
+    and node features keep their tiled path, which never holds the full
+    matrices, so each of them recomputes its tiles.
+    设置 ``config.memory_budget``（且未启用稀疏节点对）时，描述符与节点特征保持分块路径
+    （从不持有完整矩阵），因此各自重新计算分块。
+
+    Parameters / 参数
+    ----------
+    struct_A, struct_B : Structure
+        Input structures; struct_B None (or struct_A) is self-mGLI
+        输入结构；struct_B为None（或就是struct_A）时为自mGLI
+    config : MgliConfig
+        Configuration / 配置
+    """
+
+    def __init__(self, struct_A: Structure, struct_B: Optional[Structure], config: MgliConfig):
+        self.struct_A = struct_A
+        self.self_mode = struct_B is None or struct_B is struct_A
+        self.struct_B = struct_A if self.self_mode else struct_B
+        self.config = config
+        self._pairs: Optional[PairResult] = None
+        self._topk: Optional[SparsePairs] = None
+        # context of (B, A); its pairs are the transpose of these
+        # (B, A) 的上下文；其节点对为本上下文的转置
+        self._transposed: Optional[PairContext] = None
+        self._source: Optional[PairContext] = None
+
+    @property
+    def _B(self) -> Optional[Structure]:
+        return None if self.self_mode else self.struct_B
+
+    @property
+    def _sparse(self) -> bool:
+        return bool(getattr(self.config, "sparse_pairs", False))
+
+    @property
+    def _tiled(self) -> bool:
+        return not self._sparse and getattr(self.config, "memory_budget", None) is not None
+
+    def _compute(self, sparse: bool) -> PairResult:
+        config = self.config
+        return compute_pairwise_node_gli(
+            self.struct_A,
+            self._B,
+            signed=config.signed,
+            agg="mean",
+            max_distance=getattr(config, "max_distance", None),
+            n_jobs=getattr(config, "n_jobs", 1),
+            use_gpu=getattr(config, "use_gpu", False),
+            dtype=getattr(config, "dtype", "float64"),
+            far_field_tol=getattr(config, "far_field_tol", None),
+            backend=getattr(config, "backend", None),
+            executor=getattr(config, "executor", "thread"),
+            sparse=sparse,
+        )
+
+    def pairs(self) -> PairResult:
+        """
+        Dense (gij, rij), or SparsePairs with ``config.sparse_pairs``,
+        computed on first use.
+        稠密 (gij, rij)，或 ``config.sparse_pairs`` 时的SparsePairs；首次使用时计算。
+        """
+        if self._pairs is None:
+            if self._source is not None:
+                src = self._source.pairs()
+                self._pairs = src.transpose() if isinstance(src, SparsePairs) else (src[0].T, src[1].T)
+            else:
+                self._pairs = self._compute(self._sparse)
+        return self._pairs
+
+    def transpose(self) -> "PairContext":
+        """
+        Context of (B, A) that shares these pairs, transposed on first use.
+        共享本上下文节点对的 (B, A) 上下文，首次使用时转置。
+        """
+        if self.self_mode:
+            return self
+        if self._transposed is None:
+            t = PairContext(self.struct_B, self.struct_A, self.config)
+            t._source = self
+            t._transposed = self
+            self._transposed = t
+        return self._transposed
+
+    def descriptor(
+        self,
+        schema: Optional[FeatureSchema] = None,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """``global_mgli_descriptor(A, B, config)`` from the shared pairs / 由共享节点对计算全局描述符"""
+        pairs = None if self._tiled else self.pairs()
+        return global_mgli_descriptor(self.struct_A, self._B, self.config, schema=schema, out=out, pairs=pairs)
+
+    def node_features(self, side: str = "A") -> np.ndarray:
+        """
+        ``node_mgli_features`` of side "A" (against B) or "B" (against A).
+        "A" 侧（相对B）或 "B" 侧（相对A）的 ``node_mgli_features``。
+        """
+        if side not in ("A", "B"):
+            raise ValueError(f"side must be 'A' or 'B', got {side!r}")
+        ctx = self if side == "A" else self.transpose()
+        pairs = None if self._tiled else ctx.pairs()
+        return node_mgli_features(ctx.struct_A, ctx._B, self.config, pairs=pairs)
+
+    def pairwise(self) -> np.ndarray | SparsePairs:
+        """
+        ``pairwise_mgli_matrix(A, B)`` with the options of ``config``: gij,
+        or SparsePairs with ``sparse_pairs`` / ``top_k``.
+        按 ``config`` 选项的 ``pairwise_mgli_matrix(A, B)``：gij，或 ``sparse_pairs``/``top_k``
+        时的SparsePairs。
+        """
+        top_k = getattr(self.config, "top_k", None)
+        if self._sparse:
+            return apply_topk(self.pairs(), top_k)
+        if top_k is not None:
+            # the dense pairs do not record which pairs are candidates
+            # 稠密结果不记录候选节点对，因此单独计算稀疏结果
+            if self._topk is None:
+                self._topk = apply_topk(self._compute(True), top_k)
+            return self._topk
+        return self.pairs()[0]
+
+
+__all__ = ["PairContext"]
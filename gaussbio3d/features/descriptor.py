@@ -10,12 +10,24 @@ based on Gauss linking integrals between two biomolecular structures.
 
 from __future__ import annotations
 
-from typing import Dict, Tuple, List
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 import numpy as np
 
 from ..core.geometry import Structure, Node
-from ..core.pairwise_gli import compute_pairwise_node_gli
+from ..core.pairwise_gli import compute_pairwise_node_gli, iter_pairwise_node_gli_tiles
+from ..core.scale import scale_scheme
+from ..core.sparse import SparsePairs
 from ..config import MgliConfig
+from .accumulators import QUANTILE_CAPACITY, GroupedStats
+from .neighborhood import check_sparse_support
+from .tiling import open_checkpoint, tile_bounds, tile_rows_for_budget
+
+if TYPE_CHECKING:
+    from .schema import FeatureSchema
+
+# Result of ``compute_pairwise_node_gli``: dense (gij, rij) or SparsePairs
+# ``compute_pairwise_node_gli`` 的结果：稠密 (gij, rij) 或 SparsePairs
+PairResult = Union[Tuple[np.ndarray, np.ndarray], SparsePairs]
 
 
 def _get_group_key(node: Node, mode: str) -> str:
@@ -65,17 +77,34 @@ def _build_group_indices(
         Mapping from group key to index / 从组键到索引的映射
     node_group_idx : np.ndarray
         Array of group indices per node / 每个节点的组索引数组
+
+    A sub-structure from ``Structure.within`` is indexed over the groups of
+    its parent, so pocket descriptors keep the columns of the full structure.
+    由 ``Structure.within`` 得到的子结构按其来源结构的组编号，口袋描述符因而保持完整结构的列。
+    """
+    if getattr(structure, "parent", None) is not None:
+        group_to_idx, parent_idx = _build_group_indices(structure.parent, mode)
+        return group_to_idx, parent_idx[structure.parent_index]
+    codes = _node_group_codes(structure, mode)
+    # groups numbered by first appearance / 组按首次出现的顺序编号
+    uniq, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty(uniq.size, dtype=np.int64)
+    rank[order] = np.arange(uniq.size)
+    group_to_idx = {structure.vocab[uniq[o]]: i for i, o in enumerate(order)}
+    return group_to_idx, rank[inverse.reshape(-1)]
+
+
+def _node_group_codes(structure: Structure, mode: str) -> np.ndarray:
+    """
+    Per-node vocabulary code of ``_get_group_key`` / 每个节点 ``_get_group_key`` 的词表编码
     """
-    keys: List[str] = []
-    for n in structure.nodes:
-        k = _get_group_key(n, mode)
-        if k not in keys:
-            keys.append(k)
-    group_to_idx = {k: i for i, k in enumerate(keys)}
-    node_group_idx = np.zeros(len(structure.nodes), dtype=int)
-    for i, n in enumerate(structure.nodes):
-        node_group_idx[i] = group_to_idx[_get_group_key(n, mode)]
-    return group_to_idx, node_group_idx
+    if mode == "element":
+        return structure.element_codes
+    group = structure.group_codes
+    if "" not in structure.vocab:
+        return group
+    return np.where(group == structure.vocab.index(""), structure.element_codes, group)
 
 
 def _compute_radial_weights(
@@ -83,60 +112,175 @@ def _compute_radial_weights(
     config: MgliConfig,
 ) -> np.ndarray:
     """
-    Compute radial weights Φ_k(r_ij) for all i,j and k.
-    计算所有i,j和k的径向权重Φ_k(r_ij)。
+    Compute radial weights Φ_k(r_ij) for all i,j and k as a dense tensor.
+    Reductions use the sparse ``ScaleScheme.entries`` form instead.
+    以稠密张量计算所有i,j和k的径向权重Φ_k(r_ij)。归约使用稀疏的 ``ScaleScheme.entries`` 形式。
 
     Parameters / 参数
     ----------
     rij : np.ndarray
-        Distance matrix, shape (N_A, N_B) / 距离矩阵，形状为(N_A, N_B)
+        Distance matrix, shape (N_A, N_B), or any array of distances such as
+        the stored distances of a SparsePairs
+        距离矩阵，形状为(N_A, N_B)，或任意距离数组（如SparsePairs中存储的距离）
     config : MgliConfig
         Configuration / 配置
 
     Returns / 返回
     -------
     weights : np.ndarray
-        Radial weight tensor, shape (K, N_A, N_B)
-        径向权重张量，形状为(K, N_A, N_B)
-    """
-    if config.use_rbf:
-        # RBF mode / RBF模式
-        centers = np.asarray(config.distance_bins, dtype=float)
-        K = centers.shape[0]
-        if config.rbf_sigma is None:
-            # heuristic sigma = mean gap or 1.0 / 启发式sigma = 平均间隔或1.0
-            diffs = np.diff(np.sort(centers))
-            sigma = float(diffs.mean() if diffs.size > 0 else 1.0)
-        else:
-            sigma = float(config.rbf_sigma)
-        r = rij[None, :, :]  # (1,N_A,N_B)
-        c = centers[:, None, None]  # (K,1,1)
-        weights = np.exp(-((r - c) ** 2) / (2.0 * sigma**2))
-        return weights
-    else:
-        # Hard bins mode / 硬分箱模式
-        # distance_bins are edges [R0,...,RK] / distance_bins是边界[R0,...,RK]
-        edges = np.asarray(config.distance_bins, dtype=float)
-        assert edges.ndim == 1 and edges.size >= 2
-        K = edges.size - 1
-        weights = np.zeros((K,) + rij.shape, dtype=float)
-        for k in range(K):
-            mask = (rij >= edges[k]) & (rij < edges[k + 1])
-            weights[k][mask] = 1.0
-        return weights
+        Radial weight tensor, shape (K,) + rij.shape, in the precision of rij
+        径向权重张量，形状为(K,) + rij.shape，精度与rij一致
+    """
+    dt = rij.dtype if rij.dtype == np.float32 else np.dtype(np.float64)
+    scheme = scale_scheme(config)
+    weights = np.zeros((scheme.n_scales, rij.size), dtype=dt)
+    idx, ks, w = scheme.entries(rij)
+    weights[ks, idx] = 1.0 if w is None else w
+    return weights.reshape((scheme.n_scales,) + rij.shape)
+
+
+def _num_scales(config: MgliConfig) -> int:
+    """Number of radial scales K / 径向尺度数量K"""
+    return scale_scheme(config).n_scales
+
+
+def _pairwise_tiles(struct_A: Structure, struct_B: Structure | None, config: MgliConfig, tiles):
+    """
+    ``iter_pairwise_node_gli_tiles`` with the pairwise options of ``config``.
+    使用 ``config`` 中成对计算选项的 ``iter_pairwise_node_gli_tiles``。
+    """
+    return iter_pairwise_node_gli_tiles(
+        struct_A,
+        struct_B,
+        1,
+        signed=config.signed,
+        agg="mean",
+        max_distance=getattr(config, "max_distance", None),
+        n_jobs=getattr(config, "n_jobs", 1),
+        use_gpu=getattr(config, "use_gpu", False),
+        dtype=getattr(config, "dtype", "float64"),
+        far_field_tol=getattr(config, "far_field_tol", None),
+        backend=getattr(config, "backend", None),
+        executor=getattr(config, "executor", "thread"),
+        tiles=tiles,
+    )
+
+
+def _tiled_descriptor(
+    struct_A: Structure,
+    struct_B: Structure,
+    node_group_A: np.ndarray,
+    node_group_B: np.ndarray,
+    G_A: int,
+    G_B: int,
+    config: MgliConfig,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    feat[ga, gb, k, s] over row tiles of A within ``config.memory_budget``;
+    each tile is reduced into a GroupedStats (and checkpointed if enabled).
+    在 ``config.memory_budget`` 内按A的行分块计算 feat[ga, gb, k, s]；每个分块归约到
+    GroupedStats（启用时写入检查点）。
+    """
+    scheme = scale_scheme(config)
+    K = scheme.n_scales
+    stats = config.stats
+    dt = np.dtype(getattr(config, "dtype", "float64"))
+    cap = getattr(config, "quantile_capacity", QUANTILE_CAPACITY)
+    N_A, N_B = len(struct_A.nodes), len(struct_B.nodes)
+    tile_rows = tile_rows_for_budget(N_A, N_B, config.memory_budget, dt.name)
+    ckpt = open_checkpoint("descriptor", struct_A, struct_B, config, tile_rows)
+    n_keys = G_A * G_B * K
+    tiles = tile_bounds(N_A, tile_rows)
+    todo = [t for t in tiles if ckpt is None or not ckpt.has(*t)]
+    computed = _pairwise_tiles(struct_A, struct_B, config, todo)
+    # partial states are merged in tile order, so resumed runs reproduce the
+    # same rounding / 按分块顺序合并部分状态，恢复的运行得到相同的舍入结果
+    total = GroupedStats(n_keys, stats, dt, cap)
+    pending = set(todo)
+    for start, stop in tiles:
+        if (start, stop) not in pending:
+            total.merge(GroupedStats.from_state(ckpt.load(start, stop), stats, dt, cap))
+            continue
+        _, _, gij, rij = next(computed)
+        keys = (node_group_A[start:stop, None] * G_B + node_group_B[None, :]).reshape(-1) * K
+        gli = gij.reshape(-1)
+        idx, ks, w = scheme.entries(rij)
+        acc = GroupedStats(n_keys, stats, dt, cap)
+        acc.update(keys[idx] + ks, gli[idx] if w is None else gli[idx] * w)
+        if ckpt is not None:
+            ckpt.save(start, stop, acc.state_dict())
+        total.merge(acc)
+    return total.result(None if out is None else out.reshape(n_keys, -1)).reshape(-1)
+
+
+def _pair_group_stats(
+    gli: np.ndarray,
+    dist: np.ndarray,
+    keys: np.ndarray,
+    n_groups: int,
+    config: MgliConfig,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    feat[group, k, s] from per-pair values ``gli`` (any shape), their
+    distances and group keys of the same shape: the pairs with positive
+    radial weight at each scale, keyed by (group, k), are reduced into one
+    accumulator (written into the contiguous buffer ``out`` when given).
+    由逐节点对的 ``gli``（任意形状）、其距离及同形状的组键计算 feat[group, k, s]：
+    各尺度上径向权重为正的节点对按 (组, k) 编码，归约到同一个累加器（给定连续缓冲区 ``out`` 时写入其中）。
+    """
+    scheme = scale_scheme(config)
+    K = scheme.n_scales
+    gli = gli.reshape(-1)
+    idx, ks, w = scheme.entries(dist)
+    acc = GroupedStats(n_groups * K, config.stats, gli.dtype, quantile_capacity=None)
+    acc.update(keys.reshape(-1)[idx] * K + ks, gli[idx] if w is None else gli[idx] * w)
+    res = acc.result(None if out is None else out.reshape(n_groups * K, -1))
+    return res.reshape(n_groups, K, -1)
+
+
+def _sparse_descriptor(
+    pairs: SparsePairs,
+    node_group_A: np.ndarray,
+    node_group_B: np.ndarray,
+    G_A: int,
+    G_B: int,
+    config: MgliConfig,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    feat[ga, gb, k, s] over the stored contacts of ``pairs`` only.
+    仅基于 ``pairs`` 中存储的接触计算 feat[ga, gb, k, s]。
+    """
+    keys = node_group_A[pairs.row_indices()] * G_B + node_group_B[pairs.indices]
+    return _pair_group_stats(pairs.gli, pairs.dist, keys, G_A * G_B, config, out).reshape(-1)
 
 
 def global_mgli_descriptor(
     struct_A: Structure,
     struct_B: Structure | None,
     config: MgliConfig,
+    schema: Optional["FeatureSchema"] = None,
+    out: Optional[np.ndarray] = None,
+    pairs: Optional[PairResult] = None,
 ) -> np.ndarray:
     """
     Compute a global multiscale mGLI descriptor between two structures (or self).
     计算两个结构（或自身）之间的全局多尺度mGLI描述符。
 
-    If struct_B is None, we compute self-mGLI of struct_A.
-    如果struct_B为None，则计算struct_A的自mGLI。
+    If struct_B is None, we compute self-mGLI of struct_A through the
+    symmetric path (each node pair once, shared-endpoint segment pairs skipped).
+    如果struct_B为None，则通过对称路径计算struct_A的自mGLI
+    （每个节点对计算一次，跳过共享端点的线段对）。
+
+    If ``config.sparse_pairs`` is set, node pairs are kept as SparsePairs and
+    the statistics run over the stored contacts (pairs within max_distance).
+    Every radial scale must lie within max_distance (ValueError otherwise,
+    see ``check_sparse_support``), so the result equals the dense one.
+    若设置 ``config.sparse_pairs``，节点对以SparsePairs保存，统计量仅在存储的接触
+    （max_distance以内的节点对）上计算。所有径向尺度必须位于max_distance以内（否则抛出
+    ValueError，见 ``check_sparse_support``），因此结果与稠密结果一致。
 
     Output is a flat vector over:
       - group_A × group_B × radial scale × statistics
@@ -144,6 +288,15 @@ def global_mgli_descriptor(
     输出是一个扁平向量，包含：
       - 组A × 组B × 径向尺度 × 统计量
 
+    Without a schema the groups are those present in the input (numbered by
+    first appearance), so the length varies between inputs. With a
+    ``FeatureSchema`` the groups come from its fixed vocabulary and every
+    cell has a stable column, so descriptors of different complexes stack
+    directly (see ``features.schema.descriptor_batch``).
+    不给定schema时，组为输入中出现的组（按首次出现编号），长度随输入变化。给定
+    ``FeatureSchema`` 时组取自其固定词表，每个单元都有稳定的列，不同复合物的描述符可直接堆叠
+    （见 ``features.schema.descriptor_batch``）。
+
     Parameters / 参数
     ----------
     struct_A, struct_B : Structure
@@ -152,17 +305,55 @@ def global_mgli_descriptor(
     config : MgliConfig
         Configuration for bins / RBF / grouping modes / stats.
         分箱/RBF/分组模式/统计量的配置
+    schema : FeatureSchema, optional
+        Fixed column layout; must match ``config``
+        固定的列布局；须与 ``config`` 一致
+    out : np.ndarray, optional
+        Buffer of the output's length (e.g. a row of a preallocated batch
+        matrix) that receives the descriptor
+        与输出等长的缓冲区（例如预分配批矩阵的一行），用于接收描述符
+    pairs : (gij, rij) or SparsePairs, optional
+        Precomputed ``compute_pairwise_node_gli(A, B)`` result under
+        ``config`` (e.g. from a ``PairContext``); skips the pairwise step
+        ``config`` 下预先计算的 ``compute_pairwise_node_gli(A, B)`` 结果（例如来自
+        ``PairContext``）；跳过成对计算步骤
 
     Returns / 返回
     -------
     feat : np.ndarray
-        1D feature vector / 1D特征向量
+        1D feature vector (``out`` when given) / 1D特征向量（给定时为 ``out``）
     """
     if struct_B is None:
         struct_B = struct_A
 
+    # Build group indices / 构建组索引
+    if schema is not None:
+        schema.check(config)
+        node_group_A = schema.node_groups(struct_A, "A")
+        node_group_B = schema.node_groups(struct_B, "B")
+        G_A, G_B = schema.n_groups_A, schema.n_groups_B
+    else:
+        group_to_idx_A, node_group_A = _build_group_indices(struct_A, config.group_mode_A)
+        group_to_idx_B, node_group_B = _build_group_indices(struct_B, config.group_mode_B)
+        G_A, G_B = len(group_to_idx_A), len(group_to_idx_B)
+
+    n_out = G_A * G_B * _num_scales(config) * len(config.stats)
+    buf = None
+    if out is not None:
+        if out.shape != (n_out,):
+            raise ValueError(f"out has shape {out.shape}, expected ({n_out},)")
+        # reductions write in place into a contiguous buffer
+        # 归约结果原地写入连续缓冲区
+        buf = out if out.flags.c_contiguous else None
+
+    sparse = bool(getattr(config, "sparse_pairs", False))
+    check_sparse_support(config)
+    if pairs is None and not sparse and getattr(config, "memory_budget", None) is not None:
+        feat = _tiled_descriptor(struct_A, struct_B, node_group_A, node_group_B, G_A, G_B, config, buf)
+        return _finish(feat, out, buf)
+
     # Compute pairwise node GLI and distances / 计算成对节点GLI和距离
-    gij, rij = compute_pairwise_node_gli(
+    res = pairs if pairs is not None else compute_pairwise_node_gli(
         struct_A,
         struct_B,
         signed=config.signed,
@@ -170,62 +361,29 @@ def global_mgli_descriptor(
         max_distance=getattr(config, "max_distance", None),
         n_jobs=getattr(config, "n_jobs", 1),
         use_gpu=getattr(config, "use_gpu", False),
+        dtype=getattr(config, "dtype", "float64"),
+        far_field_tol=getattr(config, "far_field_tol", None),
+        backend=getattr(config, "backend", None),
+        executor=getattr(config, "executor", "thread"),
+        sparse=sparse,
     )  # (N_A, N_B), (N_A,N_B)
 
-    # Build group indices / 构建组索引
-    group_to_idx_A, node_group_A = _build_group_indices(struct_A, config.group_mode_A)
-    group_to_idx_B, node_group_B = _build_group_indices(struct_B, config.group_mode_B)
+    if isinstance(res, SparsePairs):
+        feat = _sparse_descriptor(res, node_group_A, node_group_B, G_A, G_B, config, buf)
+        return _finish(feat, out, buf)
+    gij, rij = res
 
-    G_A = len(group_to_idx_A)
-    G_B = len(group_to_idx_B)
+    # feat[ga, gb, k, s]: pairs keyed by group pair, reduced per scale on
+    # the compact radial weights / 节点对按组对编码，基于紧凑径向权重逐尺度归约
+    keys = node_group_A[:, None] * G_B + node_group_B[None, :]
+    feat = _pair_group_stats(gij, rij, keys, G_A * G_B, config, buf)
+    return _finish(feat.reshape(-1), out, buf)
 
-    # Compute radial weights / 计算径向权重
-    weights = _compute_radial_weights(rij, config)  # (K,N_A,N_B)
-    K = weights.shape[0]
 
-    stats = config.stats
-    S = len(stats)
-
-    # Initialize feature tensor / 初始化特征张量
-    # feat[ga, gb, k, s]
-    feat = np.zeros((G_A, G_B, K, S), dtype=float)
-
-    # For each group pair and scale, gather values
-    # 对于每个组对和尺度，收集值
-    for ga in range(G_A):
-        mask_A = node_group_A == ga
-        if not mask_A.any():
-            continue
-        for gb in range(G_B):
-            mask_B = node_group_B == gb
-            if not mask_B.any():
-                continue
-            # Extract submatrices / 提取子矩阵
-            sub_g = gij[mask_A][:, mask_B]          # (nA, nB)
-            sub_r = rij[mask_A][:, mask_B]          # (nA, nB)
-            if sub_g.size == 0:
-                continue
-            for k in range(K):
-                w = weights[k][mask_A][:, mask_B]   # (nA,nB)
-                mask = w > 0.0
-                if not mask.any():
-                    continue
-                vals = (sub_g * w)[mask]
-                if vals.size == 0:
-                    continue
-                # Compute statistics / 计算统计量
-                for si, st in enumerate(stats):
-                    if st == "sum":
-                        feat[ga, gb, k, si] = float(vals.sum())
-                    elif st == "mean":
-                        feat[ga, gb, k, si] = float(vals.mean())
-                    elif st == "max":
-                        feat[ga, gb, k, si] = float(vals.max())
-                    elif st == "min":
-                        feat[ga, gb, k, si] = float(vals.min())
-                    elif st == "median":
-                        feat[ga, gb, k, si] = float(np.median(vals))
-                    else:
-                        feat[ga, gb, k, si] = float(vals.mean())
-
-    return feat.reshape(-1)
+def _finish(feat: np.ndarray, out: Optional[np.ndarray], buf: Optional[np.ndarray]) -> np.ndarray:
+    """Return ``out`` filled with ``feat`` when given / 给定 ``out`` 时写入 ``feat`` 并返回它"""
+    if out is None:
+        return feat
+    if buf is None:
+        out[...] = feat
+    return out
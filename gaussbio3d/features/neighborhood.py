@@ -0,0 +1,146 @@
+"""
+Neighborhood views for pair featurization
+成对特征化的邻域视图
+
+With ``MgliConfig.max_distance`` set, a node of A farther than the
+interaction radius from every node of B has no GLI to B and no radial
+weight, so it cannot change any descriptor, node feature or pairwise value.
+Task helpers therefore featurize ``A.within(B, radius)`` (a pocket or an
+interface) and scatter per-node results back to the rows of the full
+structure, which gives the same outputs as featurizing A whole.
+
+设置 ``MgliConfig.max_distance`` 后，与B所有节点的距离都超过相互作用半径的A节点与B之间
+既无GLI也无径向权重，不会改变任何描述符、节点特征或成对值。因此任务辅助函数对
+``A.within(B, radius)``（口袋或界面）进行特征化，再将逐节点结果散布回完整结构的行，
+输出与对完整A特征化相同。
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import numpy as np
+
+from ..config import MgliConfig
+from ..core.geometry import Structure
+from ..core.scale import scale_scheme
+from ..core.sparse import SparsePairs
+
+# Relative / absolute slack on the radius, so float32 distances at the
+# boundary are never cut / 半径的相对/绝对余量，避免float32边界距离被截断
+_RADIUS_SLACK = 1e-6
+
+
+def check_sparse_support(config: MgliConfig) -> None:
+    """
+    Raise ValueError when ``config.sparse_pairs`` would drop node pairs
+    that still carry radial weight.
+    当 ``config.sparse_pairs`` 会丢弃仍有径向权重的节点对时抛出ValueError。
+
+    The dense statistics count every pair with a positive weight, including
+    pairs beyond ``max_distance`` with GLI 0, while sparse pairs only store
+    the contacts within ``max_distance``. Both agree only when
+    ``ScaleScheme.support`` lies within ``max_distance``: keep the last bin
+    edge (or the RBF centers plus ``rbf_cutoff``·σ) inside it.
+    稠密统计量计入所有权重为正的节点对（包括超过 ``max_distance``、GLI为0的节点对），
+    而稀疏节点对只存储 ``max_distance`` 以内的接触。仅当 ``ScaleScheme.support`` 不超过
+    ``max_distance`` 时两者一致：需使最后一个分箱边界（或RBF中心加 ``rbf_cutoff``·σ）位于其内。
+    """
+    if not getattr(config, "sparse_pairs", False):
+        return
+    max_distance = getattr(config, "max_distance", None)
+    if max_distance is None or max_distance <= 0:
+        return  # every pair is stored / 存储全部节点对
+    support = scale_scheme(config).support(getattr(config, "dtype", "float64"))
+    if support is None or support > max_distance:
+        raise ValueError(
+            f"sparse_pairs stores contacts within max_distance={max_distance}, but the radial "
+            f"scales extend to {support}; pairs in between would be left out of the "
+            "statistics. Keep the last distance bin (or rbf_cutoff) within max_distance, "
+            "or disable sparse_pairs"
+        )
+
+
+def interaction_radius(config: MgliConfig) -> Optional[float]:
+    """
+    Distance beyond which a node pair contributes nothing, or None when
+    ``max_distance`` is unset (every pair may contribute).
+    节点对不再有任何贡献的距离；未设置 ``max_distance`` 时返回None（所有节点对都可能有贡献）。
+
+    Pairs beyond ``max_distance`` still enter the statistics with GLI 0
+    while their radial weight is positive, so the radius also covers
+    ``ScaleScheme.support``: the last bin edge, or for RBF the distance
+    where the weight underflows to 0 in the working precision (or
+    ``rbf_cutoff``); None for an unbounded custom scheme. Sparse pairs
+    require the support to lie within ``max_distance``
+    (``check_sparse_support``).
+    超过 ``max_distance`` 的节点对在径向权重为正时仍以GLI 0计入统计量，因此半径还需覆盖
+    ``ScaleScheme.support``：最后一个分箱边界，或RBF权重在工作精度下下溢为0（或 ``rbf_cutoff``）
+    的距离；无界的自定义方案返回None。稀疏节点对要求该范围位于 ``max_distance`` 以内
+    （``check_sparse_support``）。
+    """
+    max_distance = getattr(config, "max_distance", None)
+    if max_distance is None or max_distance <= 0:
+        return None
+    check_sparse_support(config)
+    support = scale_scheme(config).support(getattr(config, "dtype", "float64"))
+    if support is None:
+        return None
+    radius = max(float(max_distance), support)
+    return radius * (1.0 + _RADIUS_SLACK) + _RADIUS_SLACK
+
+
+def neighborhood(struct: Structure, partner: Structure, config: MgliConfig) -> Structure:
+    """
+    ``struct.within(partner, interaction_radius(config))``, or ``struct``
+    itself when there is no radius or nothing would be dropped.
+    返回 ``struct.within(partner, interaction_radius(config))``；无半径或无节点可删除时返回 ``struct`` 本身。
+    """
+    radius = interaction_radius(config)
+    if radius is None:
+        return struct
+    sub = struct.within(partner, radius)
+    return struct if sub.n_nodes == struct.n_nodes else sub
+
+
+def expand_rows(feat: np.ndarray, sub: Structure) -> np.ndarray:
+    """
+    Per-node features of ``sub`` as rows of its parent (zeros elsewhere).
+    将 ``sub`` 的逐节点特征放回其来源结构的行（其余行为0）。
+    """
+    if sub.parent is None:
+        return feat
+    out = np.zeros((sub.parent.n_nodes,) + feat.shape[1:], dtype=feat.dtype)
+    out[sub.parent_index] = feat
+    return out
+
+
+def expand_pairs(
+    pairs: Union[np.ndarray, SparsePairs],
+    sub_A: Structure,
+    sub_B: Structure,
+) -> Union[np.ndarray, SparsePairs]:
+    """
+    Pairwise result between sub-structures placed in the (N_A, N_B) frame
+    of their parents (missing pairs are 0 / not stored).
+    将子结构间的成对结果放回来源结构的 (N_A, N_B) 坐标系（缺失节点对为0/不存储）。
+    """
+    if sub_A.parent is None and sub_B.parent is None:
+        return pairs
+    rows = sub_A.parent_index
+    cols = sub_B.parent_index
+    shape = (
+        sub_A.n_nodes if sub_A.parent is None else sub_A.parent.n_nodes,
+        sub_B.n_nodes if sub_B.parent is None else sub_B.parent.n_nodes,
+    )
+    if isinstance(pairs, SparsePairs):
+        return pairs.reindex(rows, cols, shape)
+    out = np.zeros(shape, dtype=pairs.dtype)
+    out[np.ix_(
+        np.arange(shape[0]) if rows is None else rows,
+        np.arange(shape[1]) if cols is None else cols,
+    )] = pairs
+    return out
+
+
+__all__ = ["check_sparse_support", "interaction_radius", "neighborhood", "expand_rows", "expand_pairs"]
@@ -10,17 +10,96 @@ in a structure with respect to another structure.
 
 from __future__ import annotations
 
+from typing import Optional
+
 import numpy as np
 from ..core.geometry import Structure
 from ..core.pairwise_gli import compute_pairwise_node_gli
+from ..core.scale import scale_scheme
+from ..core.sparse import SparsePairs
 from ..config import MgliConfig
-from .descriptor import _compute_radial_weights
+from .descriptor import PairResult, _num_scales, _pair_group_stats, _pairwise_tiles
+from .accumulators import check_stats, masked_row_stats
+from .neighborhood import check_sparse_support
+from .tiling import open_checkpoint, tile_bounds, tile_rows_for_budget
+
+
+def _sparse_node_features(pairs, config: MgliConfig) -> np.ndarray:
+    """
+    (N_A, K*S) node features over the stored contacts of a SparsePairs.
+    基于SparsePairs存储的接触计算 (N_A, K*S) 节点特征。
+    """
+    N_A = pairs.shape[0]
+    rows = pairs.row_indices()
+    # rows whose GLI is all zero stay zero, as in the dense loop
+    # GLI全为零的行保持为零，与稠密循环一致
+    active = np.bincount(rows, weights=(pairs.gli != 0), minlength=N_A) > 0
+    live = active[rows]
+    feat = _pair_group_stats(pairs.gli[live], pairs.dist[live], rows[live], N_A, config)
+    return feat.reshape(N_A, -1)
+
+
+def _node_stats_block(gij: np.ndarray, rij: np.ndarray, config: MgliConfig) -> np.ndarray:
+    """
+    (rows, K, S) statistics for complete rows of gij and their distances,
+    as masked row reductions per radial scale (pairs with positive weight).
+    Rows whose GLI is all zero stay zero.
+    根据gij的完整行及其距离计算 (rows, K, S) 统计量：每个径向尺度上对权重为正的节点对做掩码行归约。
+    GLI全为零的行保持为零。
+    """
+    stats = config.stats
+    check_stats(stats)
+    scheme = scale_scheme(config)
+    K = scheme.n_scales
+    N_A = gij.shape[0]
+    # result: (N_A, K, S)
+    feat = np.zeros((N_A, K, len(stats)), dtype=gij.dtype)
+    active = np.flatnonzero(np.any(gij != 0, axis=1))
+    if active.size == 0:
+        return feat
+    if active.size < N_A:
+        gij, rij = gij[active], rij[active]
+    # For each radial scale / 对于每个径向尺度
+    for k, mask, w in scheme.masks(rij):
+        feat[active, k] = masked_row_stats(gij if w is None else gij * w, mask, stats)
+    return feat
+
+
+def _tiled_node_features(struct_A: Structure, struct_B: Structure | None, config: MgliConfig) -> np.ndarray:
+    """
+    (N_A, K*S) node features over row tiles of A within ``config.memory_budget``.
+    Each tile holds complete rows, so its statistics are final and only the
+    (rows, K*S) result is kept (and checkpointed if enabled).
+    在 ``config.memory_budget`` 内按A的行分块计算 (N_A, K*S) 节点特征。每个分块包含完整行，
+    其统计量即为最终结果，只保留（并在启用时检查点保存）(rows, K*S) 结果。
+    """
+    K = _num_scales(config)
+    S = len(config.stats)
+    dt = np.dtype(getattr(config, "dtype", "float64"))
+    N_A = len(struct_A.nodes)
+    N_B = N_A if struct_B is None else len(struct_B.nodes)
+    tile_rows = tile_rows_for_budget(N_A, N_B, config.memory_budget, dt.name)
+    ckpt = open_checkpoint("node", struct_A, struct_B, config, tile_rows)
+    feat = np.zeros((N_A, K * S), dtype=dt)
+    todo = []
+    for start, stop in tile_bounds(N_A, tile_rows):
+        if ckpt is not None and ckpt.has(start, stop):
+            feat[start:stop] = ckpt.load(start, stop)["feat"]
+        else:
+            todo.append((start, stop))
+    for start, stop, gij, rij in _pairwise_tiles(struct_A, struct_B, config, todo):
+        block = _node_stats_block(gij, rij, config)
+        feat[start:stop] = block.reshape(stop - start, -1)
+        if ckpt is not None:
+            ckpt.save(start, stop, dict(feat=feat[start:stop]))
+    return feat
 
 
 def node_mgli_features(
     struct_A: Structure,
-    struct_B: Structure,
+    struct_B: Structure | None,
     config: MgliConfig,
+    pairs: Optional[PairResult] = None,
 ) -> np.ndarray:
     """
     Compute node-level mGLI feature vectors for structure A
@@ -47,13 +126,32 @@ def node_mgli_features(
       - K是径向尺度的数量
       - S是config.stats中统计量的数量
 
+    With ``config.sparse_pairs`` the statistics run over the stored contacts
+    of a SparsePairs result, as in global_mgli_descriptor (every radial
+    scale must lie within max_distance).
+    设置 ``config.sparse_pairs`` 时，统计量与global_mgli_descriptor一样在SparsePairs
+    存储的接触上计算（所有径向尺度必须位于max_distance以内）。
+
+    With ``config.memory_budget`` the rows are computed in tiles (optionally
+    checkpointed to ``config.checkpoint_dir``), with the same output.
+    设置 ``config.memory_budget`` 时按行分块计算（可选地写入 ``config.checkpoint_dir``
+    检查点），输出相同。
+
     Parameters / 参数
     ----------
     struct_A, struct_B : Structure
-        Input structures (e.g. Protein and Ligand).
-        输入结构（例如蛋白质和配体）
+        Input structures (e.g. Protein and Ligand). If struct_B is None
+        (or is struct_A), the symmetric self-GLI path is used.
+        输入结构（例如蛋白质和配体）。如果struct_B为None（或就是struct_A），
+        则使用对称的自GLI路径。
     config : MgliConfig
         Configuration / 配置
+    pairs : (gij, rij) or SparsePairs, optional
+        Precomputed ``compute_pairwise_node_gli(A, B)`` result under
+        ``config``; a ``PairContext`` passes the transposed (A, B) result
+        for the B side
+        ``config`` 下预先计算的 ``compute_pairwise_node_gli(A, B)`` 结果；
+        ``PairContext`` 为B侧传入转置后的结果
 
     Returns / 返回
     -------
@@ -61,8 +159,13 @@ def node_mgli_features(
         Node-level feature matrix for A, shape (N_A, feat_dim).
         A的节点级特征矩阵，形状为(N_A, feat_dim)
     """
+    sparse = bool(getattr(config, "sparse_pairs", False))
+    check_sparse_support(config)
+    if pairs is None and not sparse and getattr(config, "memory_budget", None) is not None:
+        return _tiled_node_features(struct_A, struct_B, config)
+
     # Compute pairwise GLI and distances / 计算成对GLI和距离
-    gij, rij = compute_pairwise_node_gli(
+    res = pairs if pairs is not None else compute_pairwise_node_gli(
         struct_A,
         struct_B,
         signed=config.signed,
@@ -70,50 +173,20 @@ def node_mgli_features(
         max_distance=getattr(config, "max_distance", None),
         n_jobs=getattr(config, "n_jobs", 1),
         use_gpu=getattr(config, "use_gpu", False),
+        dtype=getattr(config, "dtype", "float64"),
+        far_field_tol=getattr(config, "far_field_tol", None),
+        backend=getattr(config, "backend", None),
+        executor=getattr(config, "executor", "thread"),
+        sparse=sparse,
     )  # (N_A,N_B), (N_A,N_B)
-    
-    # Compute radial weights / 计算径向权重
-    weights = _compute_radial_weights(rij, config)  # (K,N_A,N_B)
-    K = weights.shape[0]
-    stats = config.stats
-    S = len(stats)
+    if isinstance(res, SparsePairs):
+        return _sparse_node_features(res, config)
+    gij, rij = res
 
     N_A = gij.shape[0]
     if N_A == 0:
-        return np.zeros((0, K * S), dtype=float)
-
-    # Initialize result tensor / 初始化结果张量
-    # result: (N_A, K, S)
-    feat = np.zeros((N_A, K, S), dtype=float)
-
-    # For each node in A / 对于A中的每个节点
-    for i in range(N_A):
-        g_row = gij[i]  # (N_B,)
-        if not np.any(g_row):
-            continue
-        # For each radial scale / 对于每个径向尺度
-        for k in range(K):
-            w_row = weights[k, i]  # (N_B,)
-            mask = w_row > 0.0
-            if not mask.any():
-                continue
-            vals = (g_row * w_row)[mask]
-            if vals.size == 0:
-                continue
-            # Compute statistics / 计算统计量
-            for si, st in enumerate(stats):
-                if st == "sum":
-                    feat[i, k, si] = float(vals.sum())
-                elif st == "mean":
-                    feat[i, k, si] = float(vals.mean())
-                elif st == "max":
-                    feat[i, k, si] = float(vals.max())
-                elif st == "min":
-                    feat[i, k, si] = float(vals.min())
-                elif st == "median":
-                    feat[i, k, si] = float(np.median(vals))
-                else:
-                    feat[i, k, si] = float(vals.mean())
+        return np.zeros((0, _num_scales(config) * len(config.stats)), dtype=gij.dtype)
+    feat = _node_stats_block(gij, rij, config)
 
     # Flatten to (N_A, K*S) / 展平为(N_A, K*S)
     return feat.reshape(N_A, -1)
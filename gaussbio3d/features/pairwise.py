@@ -14,17 +14,25 @@ from __future__ import annotations
 import numpy as np
 from ..core.geometry import Structure
 from ..core.pairwise_gli import compute_pairwise_node_gli
+from ..core.sparse import SparsePairs, apply_topk
 
 
 def pairwise_mgli_matrix(
     struct_A: Structure,
-    struct_B: Structure,
+    struct_B: Structure | None,
     signed: bool = False,
     agg: str = "mean",
     max_distance: float | None = None,
     n_jobs: int = 1,
     use_gpu: bool = False,
-) -> np.ndarray:
+    dtype: str = "float64",
+    far_field_tol: float | None = None,
+    backend: str | None = None,
+    executor: str = "thread",
+    sparse: bool = False,
+    top_k: int | None = None,
+    top_k_by: str = "abs_gli",
+) -> np.ndarray | SparsePairs:
     """
     Compute pairwise node-level mGLI matrix between structure A and B.
     计算结构A和B之间的成对节点级mGLI矩阵。
@@ -35,19 +43,38 @@ def pairwise_mgli_matrix(
     Parameters / 参数
     ----------
     struct_A, struct_B : Structure
-        Input structures / 输入结构
+        Input structures. If struct_B is None (or is struct_A), the symmetric
+        self-GLI matrix is returned.
+        输入结构。如果struct_B为None（或就是struct_A），返回对称的自GLI矩阵。
     signed : bool
         Whether to keep signed GLI / 是否保留有符号的GLI
     agg : str
         Aggregation over segments / 线段的聚合方式
+    dtype : str
+        "float64" or "float32" output precision / 输出精度
+    far_field_tol : float, optional
+        Tolerance of the far-field dipole approximation / 远场偶极近似容差
+    backend : str, optional
+        GLI backend name or "auto" / GLI后端名称或 "auto"
+    executor : str
+        "thread" or "process" parallelism for n_jobs > 1 / n_jobs > 1 时的并行方式
+    sparse : bool
+        Return a SparsePairs of the contacting pairs instead of a dense matrix
+        返回接触节点对的SparsePairs而非稠密矩阵
+    top_k : int, optional
+        Keep at most top_k pairs per A node (implies sparse)
+        每个A节点最多保留top_k个节点对（隐含sparse）
+    top_k_by : str
+        Ranking for top_k: "abs_gli", "gli" or "dist" / top_k的排序依据
 
     Returns / 返回
     -------
-    M : np.ndarray
-        (N_A, N_B) matrix of mGLI values.
-        mGLI值的(N_A, N_B)矩阵
+    M : np.ndarray or SparsePairs
+        (N_A, N_B) matrix of mGLI values, or SparsePairs if sparse/top_k.
+        mGLI值的(N_A, N_B)矩阵；sparse/top_k时为SparsePairs
     """
-    gij, _ = compute_pairwise_node_gli(
+    sparse = sparse or top_k is not None
+    res = compute_pairwise_node_gli(
         struct_A,
         struct_B,
         signed=signed,
@@ -55,5 +82,12 @@ def pairwise_mgli_matrix(
         max_distance=max_distance,
         n_jobs=n_jobs,
         use_gpu=use_gpu,
+        dtype=dtype,
+        far_field_tol=far_field_tol,
+        backend=backend,
+        executor=executor,
+        sparse=sparse,
     )
-    return gij
+    if sparse:
+        return apply_topk(res, top_k, by=top_k_by)
+    return res[0]
@@ -0,0 +1,282 @@
+"""
+Fixed feature schema for batch stacking
+用于批量堆叠的固定特征模式
+
+``global_mgli_descriptor`` numbers the groups present in each input, so its
+length and layout vary between complexes. A ``FeatureSchema`` fixes the
+group vocabulary of both sides together with the result-relevant parts of
+an ``MgliConfig``, giving every (group_A, group_B, k, stat) cell a stable
+column. Descriptors are then written straight into preallocated rows of a
+batch matrix, and the schema is saved as JSON next to the features.
+
+``global_mgli_descriptor`` 对每个输入中出现的组编号，因此其长度与布局随复合物变化。
+``FeatureSchema`` 固定两侧的组词表及 ``MgliConfig`` 中影响结果的部分，使每个
+(组A, 组B, k, 统计量) 单元拥有稳定的列。描述符随后直接写入预分配批矩阵的行，
+模式以JSON形式与特征一同保存。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config import MgliConfig
+from ..core.geometry import Structure
+from .descriptor import _node_group_codes, _num_scales, global_mgli_descriptor
+from .tiling import _EXECUTION_FIELDS
+
+# Catch-all group for names outside the vocabulary / 词表之外名称的兜底组
+OTHER = "*"
+
+SCHEMA_VERSION = 1
+
+
+def _result_config(config: MgliConfig) -> Dict[str, Any]:
+    """Config fields that change descriptor values / 影响描述符取值的配置字段"""
+    data = asdict(config)
+    for name in _EXECUTION_FIELDS:
+        data.pop(name, None)
+    # JSON round trip, so arrays / NumPy scalars compare like saved values
+    # 经JSON往返，使数组/NumPy标量与已保存的值可直接比较
+    return json.loads(json.dumps(data, default=lambda o: o.tolist()))
+
+
+@dataclass
+class FeatureSchema:
+    """
+    Stable column layout of global mGLI descriptors.
+    全局mGLI描述符的稳定列布局。
+
+    Column of cell (ga, gb, k, s) is ``((ga * G_B + gb) * K + k) * S + s``,
+    the layout of ``global_mgli_descriptor``. With ``other=True`` a trailing
+    ``"*"`` group on each side collects nodes whose group is not in the
+    vocabulary; otherwise such nodes raise ``ValueError``.
+    单元 (ga, gb, k, s) 的列为 ``((ga * G_B + gb) * K + k) * S + s``，与
+    ``global_mgli_descriptor`` 的布局相同。``other=True`` 时每侧末尾的 ``"*"`` 组收集
+    组名不在词表中的节点；否则此类节点引发 ``ValueError``。
+
+    Attributes / 属性
+    ----------
+    groups_A, groups_B : List[str]
+        Group vocabulary of each side (element symbols or group labels,
+        following ``config.group_mode_A`` / ``group_mode_B``)
+        每侧的组词表（元素符号或组标签，依照 ``config.group_mode_A``/``group_mode_B``）
+    config : Dict[str, Any]
+        Result-relevant ``MgliConfig`` fields / ``MgliConfig`` 中影响结果的字段
+    other : bool
+        Whether a catch-all group is appended / 是否追加兜底组
+    """
+
+    groups_A: List[str]
+    groups_B: List[str]
+    config: Dict[str, Any] = field(default_factory=dict)
+    other: bool = True
+
+    @classmethod
+    def from_config(
+        cls,
+        config: MgliConfig,
+        groups_A: Sequence[str],
+        groups_B: Optional[Sequence[str]] = None,
+        other: bool = True,
+    ) -> "FeatureSchema":
+        """
+        Schema for ``config`` over a fixed vocabulary (``groups_B`` defaults
+        to ``groups_A``).
+        基于固定词表为 ``config`` 构建模式（``groups_B`` 默认为 ``groups_A``）。
+        """
+        groups_B = groups_A if groups_B is None else groups_B
+        for name in (*groups_A, *groups_B):
+            if name == OTHER:
+                raise ValueError(f"group name {OTHER!r} is reserved for the catch-all group")
+        return cls(list(groups_A), list(groups_B), _result_config(config), bool(other))
+
+    @classmethod
+    def from_structures(
+        cls,
+        config: MgliConfig,
+        pairs: Iterable[Tuple[Structure, Optional[Structure]]],
+        other: bool = True,
+    ) -> "FeatureSchema":
+        """
+        Schema whose vocabulary is every group seen in ``pairs`` (A, B or
+        (A, None) for self-mGLI), in first-appearance order.
+        以 ``pairs``（A, B，或自mGLI的 (A, None)）中出现的所有组为词表的模式，按首次出现排序。
+        """
+        seen_A: Dict[str, None] = {}
+        seen_B: Dict[str, None] = {}
+        for A, B in pairs:
+            B = A if B is None else B
+            for struct, mode, seen in ((A, config.group_mode_A, seen_A), (B, config.group_mode_B, seen_B)):
+                codes = _node_group_codes(struct, mode)
+                uniq, first = np.unique(codes, return_index=True)
+                for c in uniq[np.argsort(first)]:
+                    seen.setdefault(struct.vocab[c], None)
+        return cls.from_config(config, list(seen_A), list(seen_B), other)
+
+    # ------------------------------------------------------------------
+    # layout / 布局
+    # ------------------------------------------------------------------
+    @property
+    def names_A(self) -> List[str]:
+        """Group names of side A including the catch-all / A侧组名（含兜底组）"""
+        return self.groups_A + ([OTHER] if self.other else [])
+
+    @property
+    def names_B(self) -> List[str]:
+        """Group names of side B including the catch-all / B侧组名（含兜底组）"""
+        return self.groups_B + ([OTHER] if self.other else [])
+
+    @property
+    def n_groups_A(self) -> int:
+        return len(self.names_A)
+
+    @property
+    def n_groups_B(self) -> int:
+        return len(self.names_B)
+
+    @property
+    def n_scales(self) -> int:
+        return _num_scales(MgliConfig(**self.config))
+
+    @property
+    def stats(self) -> List[str]:
+        return list(self.config["stats"])
+
+    @property
+    def shape(self) -> Tuple[int, int, int, int]:
+        """(G_A, G_B, K, S)"""
+        return (self.n_groups_A, self.n_groups_B, self.n_scales, len(self.stats))
+
+    @property
+    def n_features(self) -> int:
+        return int(np.prod(self.shape))
+
+    def column(self, group_A: str, group_B: str, k: int, stat: str) -> int:
+        """Column of one cell / 单个单元的列号"""
+        G_A, G_B, K, S = self.shape
+        ga = self.names_A.index(group_A)
+        gb = self.names_B.index(group_B)
+        if not 0 <= k < K:
+            raise IndexError(f"scale {k} out of range for {K} scales")
+        return ((ga * G_B + gb) * K + k) * S + self.stats.index(stat)
+
+    def columns(self) -> List[str]:
+        """Column names ``"group_A|group_B|k|stat"`` / 列名"""
+        K = self.n_scales
+        return [
+            f"{ga}|{gb}|{k}|{st}"
+            for ga in self.names_A
+            for gb in self.names_B
+            for k in range(K)
+            for st in self.stats
+        ]
+
+    # ------------------------------------------------------------------
+    # use / 使用
+    # ------------------------------------------------------------------
+    def check(self, config: MgliConfig) -> None:
+        """Raise ``ValueError`` if ``config`` does not give this layout / 配置与本布局不一致时引发"""
+        current = _result_config(config)
+        diff = sorted(k for k in set(current) | set(self.config) if current.get(k) != self.config.get(k))
+        if diff:
+            raise ValueError(f"config does not match the feature schema (fields: {', '.join(diff)})")
+
+    def node_groups(self, structure: Structure, side: str) -> np.ndarray:
+        """
+        Per-node group index of ``structure`` on side "A" or "B".
+        ``structure`` 在 "A" 或 "B" 侧的逐节点组索引。
+        """
+        if side == "A":
+            names, mode = self.groups_A, self.config["group_mode_A"]
+        elif side == "B":
+            names, mode = self.groups_B, self.config["group_mode_B"]
+        else:
+            raise ValueError(f"side must be 'A' or 'B', got {side!r}")
+        index = {name: i for i, name in enumerate(names)}
+        # vocabulary code -> schema group / 词表编码 -> 模式中的组
+        lut = np.array([index.get(v, -1) for v in structure.vocab], dtype=np.int64)
+        groups = lut[_node_group_codes(structure, mode)] if lut.size else np.zeros(0, dtype=np.int64)
+        unknown = groups < 0
+        if unknown.any():
+            if not self.other:
+                missing = sorted({structure.vocab[c] for c in _node_group_codes(structure, mode)[unknown]})
+                raise ValueError(f"groups not in the feature schema (side {side}): {missing}")
+            groups[unknown] = len(names)
+        return groups
+
+    def allocate(self, n_rows: int, dtype=None) -> np.ndarray:
+        """
+        Zeroed (n_rows, n_features) batch matrix in ``dtype`` (default: the
+        schema's working precision).
+        以 ``dtype``（默认为模式的工作精度）分配置零的 (n_rows, n_features) 批矩阵。
+        """
+        dt = np.dtype(self.config.get("dtype", "float64") if dtype is None else dtype)
+        return np.zeros((int(n_rows), self.n_features), dtype=dt)
+
+    # ------------------------------------------------------------------
+    # serialization / 序列化
+    # ------------------------------------------------------------------
+    def to_json(self) -> str:
+        """Serialize the schema to a JSON string / 将模式序列化为JSON字符串"""
+        return json.dumps(dict(version=SCHEMA_VERSION, **asdict(self)))
+
+    @staticmethod
+    def from_json(s: str) -> "FeatureSchema":
+        """Create a schema from a JSON string / 从JSON字符串创建模式"""
+        data: Dict[str, Any] = json.loads(s)
+        version = data.pop("version", SCHEMA_VERSION)
+        if version != SCHEMA_VERSION:
+            raise ValueError(f"unsupported feature schema version {version}")
+        return FeatureSchema(**data)
+
+    def save(self, path: str) -> str:
+        """Write the schema as JSON (e.g. next to saved features) / 将模式写为JSON（例如与特征文件同目录）"""
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(self.to_json())
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    def load(path: str) -> "FeatureSchema":
+        """Read a schema written by ``save`` / 读取 ``save`` 写出的模式"""
+        with open(path, "r", encoding="utf-8") as fh:
+            return FeatureSchema.from_json(fh.read())
+
+    def make_config(self, **overrides) -> MgliConfig:
+        """
+        ``MgliConfig`` reproducing this schema; execution options (n_jobs,
+        memory_budget, ...) may be passed as overrides.
+        重现本模式的 ``MgliConfig``；执行选项（n_jobs、memory_budget等）可作为覆盖参数传入。
+        """
+        return MgliConfig(**{**self.config, **overrides})
+
+
+def descriptor_batch(
+    pairs: Sequence[Tuple[Structure, Optional[Structure]]],
+    config: MgliConfig,
+    schema: FeatureSchema,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    (len(pairs), n_features) descriptors, each written straight into its
+    row of ``out`` (allocated by ``schema.allocate`` when None).
+    返回 (len(pairs), n_features) 描述符，每个直接写入 ``out`` 的对应行
+    （为None时由 ``schema.allocate`` 分配）。
+    """
+    schema.check(config)
+    if out is None:
+        out = schema.allocate(len(pairs))
+    elif out.shape != (len(pairs), schema.n_features):
+        raise ValueError(f"out has shape {out.shape}, expected {(len(pairs), schema.n_features)}")
+    for i, (A, B) in enumerate(pairs):
+        global_mgli_descriptor(A, B, config, schema=schema, out=out[i])
+    return out
+
+
+__all__ = ["OTHER", "FeatureSchema", "descriptor_batch"]
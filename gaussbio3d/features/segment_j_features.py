@@ -10,41 +10,42 @@ into multi-scale statistics. Designed to integrate with descriptor outputs.
 
 from __future__ import annotations
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Tuple
 import numpy as np
 
-from ..core.geometry import Structure, Segment
-from ..core.gli_segment import gli_segment_batch_accel as gli_segment_batch
+from ..core.geometry import Structure
+from ..core.gli_segment import (
+    MATRIX_TILE_PAIRS,
+    gli_segment_batch_accel,
+    gli_segment_batch_far_field,
+    gli_segment_matrix_accel,
+    gli_segment_matrix_far_field_accel,
+)
+from ..core.pairwise_gli import resolve_dtype, float32_origin
+from ..core.backends import get_backend, select_backend
+from ..core.neighbors import neighbor_pairs
+from ..core.scale import scale_scheme
 from ..config import MgliConfig
+from .accumulators import array_stats, check_stats
 
 
-def _collect_segments(struct: Structure) -> Tuple[np.ndarray, np.ndarray, List[Segment]]:
-    a0_list: List[np.ndarray] = []
-    a1_list: List[np.ndarray] = []
-    seg_list: List[Segment] = []
-    for curve in struct.curves:
-        for seg in curve.segments:
-            a0_list.append(seg.start)
-            a1_list.append(seg.end)
-            seg_list.append(seg)
-    if not a0_list:
-        return np.zeros((0, 3)), np.zeros((0, 3)), []
-    return np.stack(a0_list, axis=0), np.stack(a1_list, axis=0), seg_list
+def _collect_segments(
+    struct: Structure,
+    dtype: np.dtype = np.dtype(np.float64),
+    origin: np.ndarray | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    a0 = struct.segment_starts
+    a1 = struct.segment_ends
+    if origin is not None:
+        a0 = a0 - origin
+        a1 = a1 - origin
+    return a0.astype(dtype), a1.astype(dtype)
 
 
 def _segment_midpoints(a0: np.ndarray, a1: np.ndarray) -> np.ndarray:
     return 0.5 * (a0 + a1)
 
 
-def _hard_bin_weights(r: np.ndarray, edges: np.ndarray) -> np.ndarray:
-    K = edges.size - 1
-    W = np.zeros((K,) + r.shape, dtype=float)
-    for k in range(K):
-        mask = (r >= edges[k]) & (r < edges[k + 1])
-        W[k][mask] = 1.0
-    return W
-
-
 def segment_j_features(
     struct_A: Structure,
     struct_B: Structure,
@@ -55,6 +56,12 @@ def segment_j_features(
     Compute multi-scale J features over segment pairs between A and B.
     在A与B的线段对上计算多尺度J特征。
 
+    Each candidate segment pair (all pairs, or midpoints within
+    ``max_distance``) is evaluated once, in blocks, into one flat buffer;
+    scale sums, per-node sums and global statistics are reduced from it.
+    每个候选线段对（全部线段对，或中点距离在 ``max_distance`` 内者）分块计算一次并写入同一扁平缓冲区；
+    尺度和、逐节点和与全局统计量均由其归约得到。
+
     Returns
     -------
     dict with keys:
@@ -64,89 +71,99 @@ def segment_j_features(
     """
     if use_gpu is None:
         use_gpu = getattr(config, "use_gpu", False)
+    dt = resolve_dtype(getattr(config, "dtype", "float64"))
+    signed = getattr(config, "signed", False)
+    far_field_tol = getattr(config, "far_field_tol", None)
+    backend = getattr(config, "backend", None)
+    # Block kernel for all-pairs rows and per-pair kernel for candidate lists
+    # (backends only provide blocks) / 全部线段对使用矩阵块内核，候选列表使用逐对内核（后端仅提供矩阵块）
+    gli_segment_batch = gli_segment_batch_accel
+    if far_field_tol is not None:
+        def gli_segment_matrix(a0, a1, b0, b1, signed=False):
+            return gli_segment_matrix_far_field_accel(a0, a1, b0, b1, signed=signed, tol=far_field_tol)
+
+        def gli_segment_batch(a0, a1, b0, b1, signed=False):
+            return gli_segment_batch_far_field(a0, a1, b0, b1, signed=signed, tol=far_field_tol)
+    elif backend is not None:
+        if backend != "auto":
+            get_backend(backend)
+
+        def gli_segment_matrix(a0, a1, b0, b1, signed=False):
+            be = select_backend(a0.shape[0] * b0.shape[0], backend)
+            return be.matrix(a0, a1, b0, b1, signed=signed)
+    else:
+        gli_segment_matrix = gli_segment_matrix_accel
 
     # Collect segments
-    A0, A1, segs_A = _collect_segments(struct_A)
-    B0, B1, segs_B = _collect_segments(struct_B)
+    origin = float32_origin(struct_A.coords, dt)
+    A0, A1 = _collect_segments(struct_A, dt, origin)
+    B0, B1 = _collect_segments(struct_B, dt, origin)
     M = A0.shape[0]
     N = B0.shape[0]
     if M == 0 or N == 0:
         return dict(
-            local_j=np.zeros((len(struct_A.nodes), 0), dtype=float),
-            cross_scale_corr=np.zeros((0, 0), dtype=float),
-            global_stats=np.zeros((0, 0), dtype=float),
+            local_j=np.zeros((len(struct_A.nodes), 0), dtype=dt),
+            cross_scale_corr=np.zeros((0, 0), dtype=dt),
+            global_stats=np.zeros((0, 0), dtype=dt),
         )
 
-    # Midpoint distances for pruning & binning
+    # Candidate pairs as flat (row, midpoint distance, GLI) arrays; a cutoff
+    # draws them from a cell list, otherwise rows cover all of B
+    # 候选线段对存为扁平 (行, 中点距离, GLI) 数组；设定截断距离时取自单元格列表，否则每行覆盖全部B
     cA = _segment_midpoints(A0, A1)  # (M,3)
     cB = _segment_midpoints(B0, B1)  # (N,3)
-    d = np.linalg.norm(cA[:, None, :] - cB[None, :, :], axis=-1)  # (M,N)
-
-    # Distance pruning
     maxd = getattr(config, "max_distance", None)
     if maxd is not None and maxd > 0:
-        mask_pairs = d <= maxd
-    else:
-        mask_pairs = np.ones((M, N), dtype=bool)
-
-    # Build weights per scale (hard bins or RBF)
-    if getattr(config, "use_rbf", False):
-        centers = np.asarray(config.distance_bins, dtype=float)
-        K = centers.size
-        sigma = float(getattr(config, "rbf_sigma", 1.0))
-        r = d[None, :, :]
-        c = centers[:, None, None]
-        W = np.exp(-((r - c) ** 2) / (2.0 * sigma**2))  # (K,M,N)
+        ptr, cols, dist = neighbor_pairs(cA, cB, maxd)
+        dist = dist.astype(dt, copy=False)
+        rows = np.repeat(np.arange(M), np.diff(ptr))
+        vals = np.empty(cols.size, dtype=dt)
+        for s in range(0, cols.size, MATRIX_TILE_PAIRS):
+            r = rows[s:s + MATRIX_TILE_PAIRS]
+            c = cols[s:s + MATRIX_TILE_PAIRS]
+            vals[s:s + r.size] = gli_segment_batch(A0[r], A1[r], B0[c], B1[c], signed=signed)
     else:
-        edges = np.asarray(config.distance_bins, dtype=float)
-        K = edges.size - 1
-        W = _hard_bin_weights(d, edges)  # (K,M,N)
-
-    # Compute GLI over segment pairs using blocks to limit memory
-    # For simplicity, loop over A segments and vectorize over B per segment
-    # 并对每个A线段在B上矢量化
-    per_scale_sums = np.zeros((K,), dtype=float)
-
-    # Map per-node local contributions
+        rows = np.repeat(np.arange(M), N)
+        dist = np.empty(M * N, dtype=dt)
+        vals = np.empty(M * N, dtype=dt)
+        step = max(1, MATRIX_TILE_PAIRS // N)
+        for s in range(0, M, step):
+            e = min(M, s + step)
+            dist[s * N:e * N] = np.linalg.norm(cA[s:e, None, :] - cB[None, :, :], axis=-1).reshape(-1)
+            vals[s * N:e * N] = gli_segment_matrix(A0[s:e], A1[s:e], B0, B1, signed=signed).reshape(-1)
+
+    # Per-scale terms Φ_k(d) * GLI of every pair (hard bins or RBF), reduced
+    # into segment-row sums and global statistics
+    # 每个线段对的逐尺度项 Φ_k(d) * GLI（硬分箱或RBF），归约为线段行和与全局统计量
+    stats = getattr(config, "stats", ["sum", "mean"])  # reuse
+    check_stats(stats)
+    S = len(stats)
+    scheme = scale_scheme(config)
+    K = scheme.n_scales
+    row_sums = np.zeros((M, K), dtype=dt)
+    global_stats = np.zeros((K, S), dtype=dt)
+    for k, mask, w in scheme.masks(dist):
+        term = np.where(mask, vals if w is None else vals * w, 0.0).astype(dt, copy=False)
+        row_sums[:, k] = np.bincount(rows, weights=term, minlength=M)
+        if term.size:
+            global_stats[k] = array_stats(term, stats)
+    per_scale_sums = row_sums.sum(axis=0)
+
+    # Assign segment sums to incident nodes (-1: no node, e.g. half-bonds)
+    # 将线段和分配到关联节点（-1 表示无节点，如半键）
     N_A_nodes = len(struct_A.nodes)
-    local_j = np.zeros((N_A_nodes, K), dtype=float)
-
-    # Pre-compute segment->node incidence list
-    seg_incidence_A: List[Tuple[int, int]] = []
-    for seg in segs_A:
-        seg_incidence_A.append((getattr(seg, "start_node_id", -1), getattr(seg, "end_node_id", -1)))
-
-    for i in range(M):
-        # Build products for A[i] with all valid B[j]
-        valid_j = np.where(mask_pairs[i])[0]
-        if valid_j.size == 0:
-            continue
-        nj = valid_j.size
-        A0_i = np.repeat(A0[i][None, :], nj, axis=0)
-        A1_i = np.repeat(A1[i][None, :], nj, axis=0)
-        B0_j = B0[valid_j]
-        B1_j = B1[valid_j]
-
-        vals = gli_segment_batch(A0_i, A1_i, B0_j, B1_j, signed=getattr(config, "signed", False))
-
-        # Accumulate per scale using weights
-        for k in range(K):
-            wk = W[k, i, valid_j]
-            if wk.size:
-                s = float(np.sum(vals * wk))
-                per_scale_sums[k] += s
-                # Assign to incident nodes
-                sni, eni = seg_incidence_A[i]
-                if 0 <= sni < N_A_nodes:
-                    local_j[sni, k] += s
-                if 0 <= eni < N_A_nodes:
-                    local_j[eni, k] += s
+    local_j = np.zeros((N_A_nodes, K), dtype=dt)
+    seg_nodes = struct_A.segment_node_ids
+    for end in range(2):
+        ids = seg_nodes[:, end]
+        ok = (ids >= 0) & (ids < N_A_nodes)
+        np.add.at(local_j, ids[ok], row_sums[ok])
 
     # Cross-scale correlation over global sums
     if K > 0:
         v = per_scale_sums.reshape(1, -1)
         if np.all(v == 0.0):
-            cross_corr = np.zeros((K, K), dtype=float)
+            cross_corr = np.zeros((K, K), dtype=dt)
         else:
             # normalize and compute corr matrix
             x = (v - v.mean())
@@ -154,44 +171,7 @@ def segment_j_features(
             x = x / (denom + 1e-12)
             cross_corr = (x.T @ x)
     else:
-        cross_corr = np.zeros((0, 0), dtype=float)
-
-    # Global stats per scale
-    stats = getattr(config, "stats", ["sum", "mean"])  # reuse
-    S = len(stats)
-    # For each scale, we approximate stats over accumulated contributions
-    global_stats = np.zeros((K, S), dtype=float)
-    for k in range(K):
-        # Construct per-pair values filtered by mask
-        vals_k: List[float] = []
-        for i in range(M):
-            valid_j = np.where(mask_pairs[i])[0]
-            if valid_j.size == 0:
-                continue
-            nj = valid_j.size
-            A0_i = np.repeat(A0[i][None, :], nj, axis=0)
-            A1_i = np.repeat(A1[i][None, :], nj, axis=0)
-            B0_j = B0[valid_j]
-            B1_j = B1[valid_j]
-            vals_ij = gli_segment_batch(A0_i, A1_i, B0_j, B1_j, signed=getattr(config, "signed", False))
-            wk = W[k, i, valid_j]
-            vals_k.extend(list(vals_ij * wk))
-        arr = np.asarray(vals_k, dtype=float)
-        if arr.size == 0:
-            continue
-        for si, st in enumerate(stats):
-            if st == "sum":
-                global_stats[k, si] = float(arr.sum())
-            elif st == "mean":
-                global_stats[k, si] = float(arr.mean())
-            elif st == "max":
-                global_stats[k, si] = float(arr.max())
-            elif st == "min":
-                global_stats[k, si] = float(arr.min())
-            elif st == "median":
-                global_stats[k, si] = float(np.median(arr))
-            else:
-                global_stats[k, si] = float(arr.mean())
+        cross_corr = np.zeros((0, 0), dtype=dt)
 
     return dict(
         local_j=local_j,
@@ -0,0 +1,174 @@
+"""
+Memory-budgeted tiling and tile checkpoints
+按内存预算分块与分块检查点
+
+With ``MgliConfig.memory_budget`` set, descriptors and node features are
+computed over row tiles of A×B (see ``iter_pairwise_node_gli_tiles``) and
+each tile is reduced straight into the final accumulators, so neither the
+(N_A, N_B) matrices nor the (K, N_A, N_B) radial weights are materialized.
+With ``MgliConfig.checkpoint_dir`` set, the reduced result of every finished
+tile is written to disk and reused when the same job is run again.
+
+设置 ``MgliConfig.memory_budget`` 后，描述符与节点特征按A×B的行分块计算，每个分块
+直接归约到最终累加器中，不构造 (N_A, N_B) 矩阵及 (K, N_A, N_B) 径向权重。设置
+``MgliConfig.checkpoint_dir`` 后，每个完成分块的归约结果写入磁盘，重新运行相同任务时复用。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, is_dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..core.geometry import Structure
+
+_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+# Options that change how, not what, is computed; excluded from fingerprints
+# so a resumed job may use other parallel settings.
+# 只影响计算方式而非结果的选项；不计入指纹，恢复任务时可使用不同的并行设置。
+_EXECUTION_FIELDS = ("n_jobs", "executor", "use_gpu", "backend", "memory_budget", "checkpoint_dir")
+
+
+def parse_memory_budget(budget: Union[int, float, str, None]) -> Optional[int]:
+    """
+    Budget in bytes from a number or a string such as "512MB" or "4GiB".
+    将数字或 "512MB"、"4GiB" 之类的字符串解析为字节数。
+    """
+    if budget is None:
+        return None
+    if isinstance(budget, (int, float)):
+        value = int(budget)
+    else:
+        m = re.fullmatch(r"\s*([0-9.]+)\s*([kKmMgGtT]?)(i?[bB])?\s*", str(budget))
+        if m is None:
+            raise ValueError(f"cannot parse memory budget {budget!r}")
+        value = int(float(m.group(1)) * _UNITS[m.group(2).lower()])
+    if value <= 0:
+        raise ValueError(f"memory budget must be positive, got {budget!r}")
+    return value
+
+
+def tile_rows_for_budget(
+    n_A: int,
+    n_B: int,
+    memory_budget: Union[int, float, str],
+    dtype: str = "float64",
+) -> int:
+    """
+    Rows of A per tile so that one tile's gij, rij, int16 bin index and the
+    per-scale weights, values, int64 keys / indices of its reduction fit in
+    ``memory_budget``. Radial weights are formed one scale at a time, so
+    the number of scales does not enter.
+    每个分块的A行数，使单个分块的gij、rij、int16分箱索引及归约所需的单尺度权重、值、
+    int64键/索引不超过 ``memory_budget``。径向权重逐尺度生成，因此与尺度数无关。
+    """
+    budget = parse_memory_budget(memory_budget)
+    itemsize = np.dtype(dtype).itemsize
+    per_row = max(1, n_B) * (itemsize * 4 + 2 * np.dtype(np.int64).itemsize + 3)
+    return int(max(1, min(max(n_A, 1), budget // per_row)))
+
+
+def tile_bounds(n_rows: int, tile_rows: int) -> List[Tuple[int, int]]:
+    """Consecutive (start, stop) row tiles / 连续的 (start, stop) 行分块"""
+    step = max(1, int(tile_rows))
+    return [(s, min(s + step, n_rows)) for s in range(0, n_rows, step)]
+
+
+def _structure_digest(h, struct: Structure) -> None:
+    for arr in (struct.coords, struct.segment_starts, struct.segment_ends, struct.segment_node_ids):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    vocab = struct.vocab
+    h.update(json.dumps([[vocab[e], vocab[g]] for e, g in zip(struct.element_codes, struct.group_codes)]).encode())
+
+
+def tile_fingerprint(
+    kind: str,
+    struct_A: Structure,
+    struct_B: Optional[Structure],
+    config,
+    tile_rows: int,
+) -> str:
+    """
+    Hash identifying a tiled job: the result kind, both structures, the
+    result-relevant config fields and the tile size.
+    标识分块任务的哈希：结果类型、两个结构、影响结果的配置字段及分块大小。
+    """
+    h = hashlib.sha1()
+    h.update(f"{kind}:{int(tile_rows)}".encode())
+    _structure_digest(h, struct_A)
+    if struct_B is None or struct_B is struct_A:
+        h.update(b"self")
+    else:
+        _structure_digest(h, struct_B)
+    opts = asdict(config) if is_dataclass(config) else dict(vars(config))
+    for name in _EXECUTION_FIELDS:
+        opts.pop(name, None)
+    h.update(json.dumps(opts, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class TileCheckpoint:
+    """
+    Directory of per-tile ``.npz`` results for one fingerprinted job.
+    单个带指纹任务的分块 ``.npz`` 结果目录。
+
+    Files are written atomically (temporary file + ``os.replace``), so a job
+    killed mid-write leaves no partial tile behind.
+    文件以原子方式写入（临时文件 + ``os.replace``），任务在写入中途被终止时不会留下残缺分块。
+    """
+
+    def __init__(self, directory: str, fingerprint: str):
+        self.directory = directory
+        self.fingerprint = fingerprint
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, start: int, stop: int) -> str:
+        return os.path.join(self.directory, f"{self.fingerprint[:20]}_{start}_{stop}.npz")
+
+    def has(self, start: int, stop: int) -> bool:
+        return os.path.exists(self.path(start, stop))
+
+    def load(self, start: int, stop: int) -> Optional[Dict[str, np.ndarray]]:
+        """Arrays saved for tile start:stop, or None / 分块 start:stop 已保存的数组，或None"""
+        path = self.path(start, stop)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return {k: data[k] for k in data.files}
+
+    def save(self, start: int, stop: int, arrays: Dict[str, np.ndarray]) -> None:
+        path = self.path(start, stop)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp, path)
+
+
+def open_checkpoint(
+    kind: str,
+    struct_A: Structure,
+    struct_B: Optional[Structure],
+    config,
+    tile_rows: int,
+) -> Optional[TileCheckpoint]:
+    """``TileCheckpoint`` under ``config.checkpoint_dir``, or None if unset / 未设置时返回None"""
+    directory = getattr(config, "checkpoint_dir", None)
+    if not directory:
+        return None
+    return TileCheckpoint(directory, tile_fingerprint(kind, struct_A, struct_B, config, tile_rows))
+
+
+__all__ = [
+    "parse_memory_budget",
+    "tile_rows_for_budget",
+    "tile_bounds",
+    "tile_fingerprint",
+    "TileCheckpoint",
+    "open_checkpoint",
+]
@@ -14,9 +14,9 @@ import numpy as np
 from typing import Dict, Any
 
 from ..core.geometry import Structure
-from ..core.pairwise_gli import compute_pairwise_node_gli
+from ..core.neighbors import pairwise_distances, structure_cell_list
 from ..config import MgliConfig
-from ..topology.ph import ph_diagrams_from_distance, ph_persistence_histogram
+from ..topology.ph import ph_diagrams_from_distance, ph_persistence_histogram, sparse_distance_matrix
 from .descriptor import global_mgli_descriptor
 
 
@@ -33,16 +33,16 @@ def topo_features_for_pair(
     if struct_B is None:
         struct_B = struct_A
 
-    # distances only are sufficient for PH
-    _, rij = compute_pairwise_node_gli(
-        struct_A,
-        struct_B,
-        signed=False,
-        agg="mean",
-        max_distance=getattr(config, "max_distance", None),
-        n_jobs=getattr(config, "n_jobs", 1),
-        use_gpu=False,
-    )
+    # distances only are sufficient for PH; with max_distance the Rips
+    # complex is built from cell-list neighbors and truncated at the cutoff
+    # PH只需距离；设置max_distance时由单元格列表近邻构建Rips复形并在截断距离处截断
+    maxd = getattr(config, "max_distance", None)
+    coords_A = struct_A.coords
+    if maxd is not None and maxd > 0:
+        ptr, idx, dist = structure_cell_list(struct_B, maxd).query(coords_A, maxd)
+        rij = sparse_distance_matrix(ptr, idx, dist, (coords_A.shape[0], len(struct_B.nodes)))
+    else:
+        rij = pairwise_distances(coords_A, struct_B.coords)
 
     dgms = ph_diagrams_from_distance(rij, maxdim=2)
     ph_hist = ph_persistence_histogram(dgms)
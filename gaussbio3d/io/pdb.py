@@ -1,16 +1,30 @@
 """
-PDB/mmCIF file I/O using Biopython
-使用Biopython的PDB/mmCIF文件输入/输出
+PDB/mmCIF file I/O
+PDB/mmCIF文件输入/输出
 
 This module provides functions to load protein and nucleic acid structures
 from PDB or mmCIF files and extract atomic coordinates and metadata.
 
+Files are read by native NumPy readers: PDB ATOM/HETATM records are sliced
+by their fixed columns for all lines at once, and for mmCIF only the
+``_atom_site`` loop is tokenized, streaming past every other category. Both
+return ``AtomArrays`` in the order and with the alternate-location choice of
+Biopython's parsers, which remain the fallback for input the native readers
+do not accept.
+
 本模块提供从PDB或mmCIF文件加载蛋白质和核酸结构并提取原子坐标和元数据的函数。
+文件由原生NumPy读取器解析：PDB的ATOM/HETATM记录按固定列对所有行一次性切片；mmCIF只对
+``_atom_site`` 循环分词，流式跳过其他类别。两者均以Biopython解析器的顺序及备用位置选择
+返回 ``AtomArrays``；原生读取器不接受的输入仍回退到Biopython。
 """
 
 from __future__ import annotations
 
-from typing import List, Tuple, Dict
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
 import numpy as np
 
 try:
@@ -20,46 +34,468 @@ except ImportError:  # pragma: no cover
     MMCIFParser = None
 
 
-def load_pdb_atoms(
+# Element symbols recognised in PDB element columns (upper case, as Biopython)
+# PDB元素列中可识别的元素符号（大写，与Biopython一致）
+_ELEMENTS = frozenset(
+    """
+    H D HE LI BE B C N O F NE NA MG AL SI P S CL AR K CA SC TI V CR MN FE CO
+    NI CU ZN GA GE AS SE BR KR RB SR Y ZR NB MO TC RU RH PD AG CD IN SN SB TE
+    I XE CS BA LA CE PR ND PM SM EU GD TB DY HO ER TM YB LU HF TA W RE OS IR
+    PT AU HG TL PB BI PO AT RN FR RA AC TH PA U NP PU AM CM BK CF ES FM MD NO
+    LR RF DB SG BH HS MT
+    """.split()
+)
+
+_WATER = (b"HOH", b"WAT")
+
+# Records of the PDB coordinate section / PDB坐标段的记录
+_PDB_RECORDS = frozenset({b"ATOM  ", b"HETATM", b"MODEL ", b"ENDMDL", b"END", b"END   ", b"CONECT"})
+_PDB_WIDTH = 80
+
+# mmCIF token: quoted string (closed by a quote before whitespace) or bare word
+# mmCIF词元：引号字符串（引号后接空白才闭合）或普通单词
+_CIF_TOKEN = re.compile(rb"'.*?'(?=\s)|\".*?\"(?=\s)|\S+")
+_CIF_NULL = (b".", b"?")
+
+
+@dataclass
+class AtomArrays:
+    """
+    Atoms of a PDB/mmCIF file as parallel arrays.
+    PDB/mmCIF文件的原子，以并行数组表示。
+
+    Attributes / 属性
+    ----------
+    coords : np.ndarray
+        (N, 3) float32 coordinates / 坐标
+    elements : np.ndarray
+        Element symbol per atom / 每个原子的元素符号
+    chain_ids, resnames, atom_names : np.ndarray
+        Chain id, residue name and atom name per atom / 链ID、残基名称与原子名称
+    resids : np.ndarray
+        Residue sequence number (int64) / 残基序号
+    hetflags : np.ndarray
+        "" for standard residues, "W" for water, "H_<resname>" for hetero
+        residues (Biopython residue id field)
+        标准残基为 ""，水为 "W"，杂原子残基为 "H_<残基名>"（Biopython残基ID字段）
+    models : np.ndarray
+        Model index (0-based, int32) / 模型索引
+    """
+
+    coords: np.ndarray
+    elements: np.ndarray
+    chain_ids: np.ndarray
+    resnames: np.ndarray
+    resids: np.ndarray
+    atom_names: np.ndarray
+    hetflags: np.ndarray
+    models: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.coords.shape[0])
+
+    def meta(self) -> List[Dict]:
+        """Per-atom metadata dicts of ``load_pdb_atoms`` / ``load_pdb_atoms`` 的每原子元数据字典"""
+        return [
+            dict(chain_id=c, resname=r, resid=i, atom_name=a, hetflag=h)
+            for c, r, i, a, h in zip(
+                self.chain_ids.tolist(),
+                self.resnames.tolist(),
+                self.resids.tolist(),
+                self.atom_names.tolist(),
+                self.hetflags.tolist(),
+            )
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Native readers / 原生读取器
+# ---------------------------------------------------------------------------
+
+def _text(a: np.ndarray) -> np.ndarray:
+    """ASCII bytes array -> str array / ASCII字节数组 -> 字符串数组"""
+    return a.astype(str)
+
+
+def _floats(a: np.ndarray) -> np.ndarray:
+    """Parse a bytes array as float64; unparsable values become NaN / 解析为float64，无法解析的值为NaN"""
+    try:
+        return a.astype(np.float64)
+    except ValueError:
+        uniq, inv = np.unique(a, return_inverse=True)
+        vals = np.empty(uniq.size)
+        for i, s in enumerate(uniq.tolist()):
+            try:
+                vals[i] = float(s)
+            except ValueError:
+                vals[i] = np.nan
+        return vals[inv.reshape(a.shape)]
+
+
+# place values of the digits of a %8.3f field, in thousandths
+# %8.3f 字段各位数字的位值（以千分之一为单位）
+_FIXED3_PLACES = np.array([10**6, 10**5, 10**4, 10**3, 0, 100, 10, 1], dtype=np.int64)
+
+
+def _fixed3(b: np.ndarray) -> Optional[np.ndarray]:
+    """
+    %8.3f fields given as (M, 8) uint8 rows, or None if any field has
+    another form. The integer number of thousandths divided by 1000 is the
+    correctly rounded value, equal to ``float(field)``.
+    以 (M, 8) uint8 行给出的 %8.3f 字段；存在其他形式时返回None。千分之一的整数个数除以1000
+    即为正确舍入的值，与 ``float(field)`` 相同。
+    """
+    digit = (b >= 48) & (b <= 57)
+    minus = b[:, :4] == 45
+    if not (
+        (b[:, 4] == 46).all()
+        and digit[:, 5:].all()
+        and (digit[:, :4] | minus | (b[:, :4] == 32)).all()
+    ):
+        return None
+    v = np.where(digit, b - 48, 0).astype(np.int64) @ _FIXED3_PLACES
+    return np.where(minus.any(axis=1), -v, v) / 1000.0
+
+
+def _hetflags(is_het: np.ndarray, resnames: np.ndarray) -> np.ndarray:
+    """Biopython residue id field from the HETATM flag / 由HETATM标志得到Biopython残基ID字段"""
+    flags = np.zeros(resnames.shape, dtype=f"S{resnames.dtype.itemsize + 2}")
+    flags[is_het] = np.char.add(b"H_", resnames[is_het])
+    flags[is_het & np.isin(resnames, _WATER)] = b"W"
+    return flags
+
+
+def _read_pdb(path: str) -> Dict[str, np.ndarray]:
+    """
+    ATOM/HETATM records of a PDB file, in file order, by fixed columns (as
+    bytes arrays).
+    按固定列读取PDB文件的ATOM/HETATM记录（文件顺序，字节数组）。
+    """
+    with open(path, "rb") as fh:
+        lines = [ln for ln in fh.read().splitlines() if ln[:6] in _PDB_RECORDS]
+    recs = np.array(lines, dtype=f"S{_PDB_WIDTH}")
+    raw = recs.view(np.uint8).reshape(-1, _PDB_WIDTH)
+    raw[raw == 0] = ord(" ")  # pad short lines / 补齐短行
+
+    head = recs.astype("S6")
+    is_atom = (head == b"ATOM  ") | (head == b"HETATM")
+    is_model = head == b"MODEL "
+    is_endmdl = head == b"ENDMDL"
+    # coordinates end at END / CONECT after the first coordinate record
+    # 坐标段在首个坐标记录之后的 END/CONECT 处结束
+    started = np.maximum.accumulate(is_atom | is_model)
+    stop = np.flatnonzero(started & ((head == b"END   ") | (head == b"CONECT")))
+    n = stop[0] if stop.size else head.size
+    is_atom, is_model, is_endmdl = is_atom[:n], is_model[:n], is_endmdl[:n]
+    # a model opens at MODEL, or at an atom when none is open
+    # 模型在MODEL处开启；没有打开的模型时也在原子处开启
+    closed = np.r_[True, is_endmdl[:-1]] if n else np.zeros(0, dtype=bool)
+    models = np.cumsum(is_model | (is_atom & closed))[is_atom] - 1
+
+    a = raw[:n][is_atom]
+
+    def col(lo: int, hi: int) -> np.ndarray:
+        return np.ascontiguousarray(a[:, lo:hi]).view(f"S{hi - lo}").ravel()
+
+    fullnames = col(12, 16)
+    names = np.char.strip(fullnames)
+    # names with inner blanks keep their padding, as Biopython
+    # 含内部空格的原子名与Biopython一样保留原样
+    odd = (names == b"") | (np.char.find(names, b" ") >= 0)
+    names[odd] = fullnames[odd]
+    resnames = np.char.strip(col(17, 20))
+    block = np.ascontiguousarray(a[:, 30:54]).reshape(-1, 8)
+    xyz = _fixed3(block)
+    if xyz is None:
+        xyz = _floats(block.view("S8").ravel())
+    return dict(
+        models=models.astype(np.int32),
+        chain_ids=col(21, 22),
+        hetflags=_hetflags(head[:n][is_atom] == b"HETATM", resnames),
+        resids=col(22, 26).astype(np.int64),
+        icodes=col(26, 27),
+        resnames=resnames,
+        atom_names=names,
+        fullnames=fullnames,
+        altlocs=col(16, 17),
+        occupancies=_floats(col(54, 60)),
+        elements=np.char.upper(np.char.strip(col(76, 78))),
+        coords=xyz.reshape(-1, 3).astype(np.float32),
+    )
+
+
+def _atom_site_loop(path: str) -> Tuple[List[str], List[bytes]]:
+    """
+    Item names and data lines of the ``_atom_site`` loop, read up to its end.
+    ``_atom_site`` 循环的数据项名称与数据行，只读取到循环结束。
+    """
+    tags: List[str] = []
+    rows: List[bytes] = []
+    state = 0  # 0: searching, 1: after loop_, 2: item names, 3: data / 0搜索 1 loop_之后 2 数据项名 3 数据
+    with open(path, "rb") as fh:
+        for line in fh:
+            s = line.strip()
+            if state == 3:
+                if not s:
+                    continue
+                if s[:1] in (b"#", b"_") or s.startswith((b"loop_", b"data_", b"save_")):
+                    break
+                if s[:1] == b";":
+                    raise ValueError("multi-line text fields in _atom_site are not supported")
+                rows.append(s)
+            elif s.startswith(b"_atom_site.") and state in (1, 2):
+                tags.append(s[11:].split()[0].decode("ascii"))
+                state = 2
+            elif state == 2:
+                state = 3
+                if s:
+                    rows.append(s)
+            elif s == b"loop_":
+                state = 1
+            elif s.startswith(b"_atom_site."):
+                raise ValueError("_atom_site without a loop is not supported")
+            elif state == 1 and s:
+                state = 0
+    if not tags:
+        raise ValueError(f"no _atom_site loop in {path}")
+    return tags, rows
+
+
+def _read_mmcif(path: str) -> Dict[str, np.ndarray]:
+    """
+    Atoms of the ``_atom_site`` loop of an mmCIF file, in file order (as
+    bytes arrays).
+    mmCIF文件 ``_atom_site`` 循环中的原子（文件顺序，字节数组）。
+    """
+    tags, rows = _atom_site_loop(path)
+    block = b"\n".join(rows) + b"\n"
+    if b"'" in block or b'"' in block:
+        tokens = [
+            t[1:-1] if t[:1] in (b"'", b'"') and t[-1:] == t[:1] and len(t) > 1 else t
+            for t in _CIF_TOKEN.findall(block)
+        ]
+    else:
+        tokens = block.split()
+    width = len(tags)
+    if len(tokens) % width:
+        raise ValueError(f"_atom_site has {len(tokens)} values for {width} items")
+    index = {tag: i for i, tag in enumerate(tags)}
+    keep: Optional[np.ndarray] = None
+
+    def col(*names: str, default: Optional[str] = None) -> np.ndarray:
+        # one item at a time, so only the items used are materialized
+        # 逐项构建数组，只物化用到的数据项
+        for name in names:
+            if name in index:
+                a = np.array(tokens[index[name]::width], dtype=bytes)
+                return a if keep is None else a[keep]
+        if default is None:
+            raise ValueError(f"_atom_site.{names[0]} is missing")
+        n = len(tokens) // width if keep is None else int(keep.sum())
+        return np.full(n, default.encode(), dtype=bytes)
+
+    seq = col("auth_seq_id", "label_seq_id")
+    if (seq == b".").any():
+        # atoms without a residue number are skipped / 跳过无残基序号的原子
+        keep = seq != b"."
+        seq = seq[keep]
+
+    def nulls_blank(a: np.ndarray) -> np.ndarray:
+        a[np.isin(a, _CIF_NULL)] = b" "
+        return a
+
+    if "pdbx_PDB_model_num" in index:
+        m = col("pdbx_PDB_model_num").astype(np.int64)
+        models = np.cumsum(np.r_[True, m[1:] != m[:-1]]) - 1 if m.size else m
+    else:
+        models = np.zeros(seq.size, dtype=np.int64)
+    resnames = col("label_comp_id")
+    names = col("label_atom_id")
+    elements = np.char.upper(col("type_symbol", default=""))
+    xyz = np.stack([col(f"Cartn_{c}") for c in "xyz"], axis=1)
+    return dict(
+        models=models.astype(np.int32),
+        chain_ids=col("auth_asym_id", "label_asym_id"),
+        hetflags=_hetflags(col("group_PDB", default="ATOM") == b"HETATM", resnames),
+        resids=seq.astype(np.int64),
+        icodes=nulls_blank(col("pdbx_PDB_ins_code", default=".")),
+        resnames=resnames,
+        atom_names=names,
+        fullnames=names,
+        altlocs=nulls_blank(col("label_alt_id", default=".")),
+        occupancies=_floats(col("occupancy", default="?")),
+        elements=elements,
+        coords=xyz.astype(np.float64).astype(np.float32),
+    )
+
+
+def _factorize(a: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct values of an array and the integer code of each element / 数组的不同取值及每个元素的整数编码"""
+    if a.dtype.kind == "S" and a.dtype.itemsize <= 8:
+        # short strings sort as integers / 短字符串按整数排序
+        uniq, inv = np.unique(a.astype("S8").view(np.uint64), return_inverse=True)
+        uniq = uniq.view("S8")
+    else:
+        uniq, inv = np.unique(a, return_inverse=True)
+    return uniq, inv.reshape(-1).astype(np.int64)
+
+
+def _codes(a: np.ndarray) -> np.ndarray:
+    """Integer codes of an array's values / 数组取值的整数编码"""
+    return _factorize(a)[1]
+
+
+def _groups(*codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group id of each row of the code columns, and the first row of its group.
+    编码列每一行的组ID及其所在组的首行。
+    """
+    key = codes[0]
+    for c in codes[1:]:
+        base = int(c.max()) + 1
+        if int(key.max()) >= (1 << 62) // base:
+            key = _codes(key)  # compact before the key overflows / 键溢出前先压缩
+        key = key * base + c
+    _, first, inv = np.unique(key, return_index=True, return_inverse=True)
+    inv = inv.reshape(-1)
+    return inv, first[inv]
+
+
+def _guess_element(fullname: str, name: str) -> str:
+    """Element from the atom name, as Biopython's ``Atom`` / 与Biopython ``Atom`` 相同，由原子名推断元素"""
+    if fullname[:1].isalpha() and not fullname[2:].isdigit():
+        guess = name.strip()
+    else:
+        guess = name[1:2] if name[:1].isdigit() else name[:1]
+    return guess if guess.upper() in _ELEMENTS else "X"
+
+
+def _assemble(atoms: Dict[str, np.ndarray], chain_id: Optional[str], only_protein: bool) -> AtomArrays:
+    """
+    Biopython's view of raw atom records: atoms grouped by model, chain,
+    residue and atom name in first-appearance order, one atom per name (the
+    highest-occupancy alternate location, first on ties).
+    原始原子记录在Biopython中的视图：按模型、链、残基与原子名的首次出现顺序分组，每个原子名
+    保留一个原子（占有率最高的备用位置，并列时取第一个）。
+    """
+    keep = np.ones(atoms["models"].shape[0], dtype=bool)
+    if chain_id is not None:
+        keep &= atoms["chain_ids"] == chain_id.encode()
+    if only_protein:
+        keep &= atoms["hetflags"] == b""
+    if not keep.all():
+        atoms = {k: v[keep] for k, v in atoms.items()}
+    n = atoms["models"].shape[0]
+    if n == 0:
+        empty = np.zeros(0, dtype="U1")
+        return AtomArrays(
+            np.zeros((0, 3), dtype=np.float32), empty, empty, empty,
+            np.zeros(0, dtype=np.int64), empty, empty, np.zeros(0, dtype=np.int32),
+        )
+
+    # text columns are decoded once per distinct value at the end
+    # 文本列最后按不同取值各解码一次
+    text = {k: _factorize(atoms[k]) for k in ("chain_ids", "hetflags", "resnames", "atom_names")}
+    chain, chain_first = _groups(atoms["models"].astype(np.int64), text["chain_ids"][1])
+    res, res_first = _groups(
+        chain, text["hetflags"][1], atoms["resids"] - atoms["resids"].min(), _codes(atoms["icodes"])
+    )
+    # a residue redefined under another name keeps its first name
+    # 以其他名称重新定义的残基保留首个名称
+    rn = text["resnames"][1]
+    same = rn == rn[res_first]
+    atom, atom_first = _groups(res, text["atom_names"][1])
+
+    # candidates: the first atom of each name plus alternate locations
+    # 候选：每个原子名的首个原子及备用位置
+    rows = np.arange(n)
+    cand = np.flatnonzero(same & ((rows == atom_first) | (atoms["altlocs"] != b" ")))
+    occ = np.nan_to_num(atoms["occupancies"][cand], nan=-np.inf)
+    order = cand[np.lexsort((cand, -occ, atom[cand]))]
+    chosen = order[np.r_[True, atom[order][1:] != atom[order][:-1]]]
+    chosen = chosen[np.lexsort((atom_first[chosen], res_first[chosen], chain_first[chosen]))]
+
+    def column(key: str) -> np.ndarray:
+        uniq, codes = text[key]
+        return _text(uniq)[codes[chosen]]
+
+    uniq, codes = _factorize(atoms["elements"][chosen])
+    elements = _text(uniq)[codes]
+    bad = ~np.isin(elements, list(_ELEMENTS))
+    if bad.any():
+        idx = chosen[bad]
+        uniq, first, inv = np.unique(atoms["fullnames"][idx], return_index=True, return_inverse=True)
+        names = column("atom_names")[bad][first]
+        guesses = [_guess_element(f, a) for f, a in zip(_text(uniq).tolist(), names.tolist())]
+        elements = elements.astype(object)
+        elements[bad] = np.array(guesses, dtype=object)[inv.reshape(-1)]
+        elements = elements.astype(str)
+
+    return AtomArrays(
+        coords=atoms["coords"][chosen],
+        elements=elements,
+        chain_ids=column("chain_ids"),
+        resnames=column("resnames"),
+        resids=atoms["resids"][chosen],
+        atom_names=column("atom_names"),
+        hetflags=column("hetflags"),
+        models=atoms["models"][chosen],
+    )
+
+
+def _is_mmcif(path: str) -> bool:
+    return path.lower().rsplit(".", 1)[-1] in {"cif", "mmcif"}
+
+
+def load_atom_arrays(
     path: str,
     chain_id: str | None = None,
     only_protein: bool = True,
-) -> Tuple[np.ndarray, List[str], List[Dict]]:
+) -> AtomArrays:
     """
-    Load coordinates and metadata from a PDB or mmCIF file using Biopython.
-    使用Biopython从PDB或mmCIF文件加载坐标和元数据。
+    Read a PDB or mmCIF file with the native readers.
+    使用原生读取器读取PDB或mmCIF文件。
+
+    Atoms of all models are returned in Biopython's order; disordered atoms
+    keep the highest-occupancy alternate location and elements missing from
+    the file are guessed from the atom name, as in Biopython.
+    返回所有模型的原子，顺序与Biopython一致；无序原子保留占有率最高的备用位置，文件中缺失的
+    元素与Biopython一样由原子名推断。
 
     Parameters / 参数
     ----------
     path : str
         Path to PDB/mmCIF file / PDB或mmCIF文件路径
     chain_id : str or None
-        If not None, only consider this chain.
-        如果不为None，则只考虑此链
+        If not None, only consider this chain / 如果不为None，则只考虑此链
     only_protein : bool
-        If True, only take standard amino acids.
-        如果为True，则只提取标准氨基酸
+        If True, skip hetero residues and water / 如果为True，则跳过杂原子残基与水
 
-    Returns / 返回
-    -------
-    coords : np.ndarray
-        Atomic coordinates, shape (N_atoms, 3) / 原子坐标，形状为(N_atoms, 3)
-    elements : List[str]
-        Element symbol per atom / 每个原子的元素符号
-    meta : List[dict]
-        Per-atom metadata: residue name, id, chain, atom name, etc.
-        每个原子的元数据：残基名称、ID、链、原子名称等
-        
     Raises / 引发
     ------
-    ImportError
-        If Biopython is not installed / 如果未安装Biopython
+    ValueError
+        If the file cannot be read natively (e.g. hybrid-36 residue numbers
+        or multi-line mmCIF text fields)
+        文件无法被原生读取时（例如hybrid-36残基序号或多行mmCIF文本字段）
     """
+    atoms = _read_mmcif(path) if _is_mmcif(path) else _read_pdb(path)
+    return _assemble(atoms, chain_id, only_protein)
+
+
+# ---------------------------------------------------------------------------
+# Biopython fallback / Biopython回退
+# ---------------------------------------------------------------------------
+
+def _load_pdb_atoms_biopython(
+    path: str,
+    chain_id: str | None = None,
+    only_protein: bool = True,
+) -> Tuple[np.ndarray, List[str], List[Dict]]:
+    """``load_pdb_atoms`` through Biopython's structure objects / 通过Biopython结构对象实现的 ``load_pdb_atoms``"""
     if PDBParser is None and MMCIFParser is None:
         raise ImportError("Biopython is required for structure parsing (pip install biopython).")
 
-    ext = path.lower().rsplit(".", 1)[-1]
-    if ext in {"cif", "mmcif"}:
+    if _is_mmcif(path):
         if MMCIFParser is None:
             raise ImportError("Biopython MMCIFParser not available; please install biopython.")
         parser = MMCIFParser(QUIET=True)
@@ -107,3 +543,61 @@ def load_pdb_atoms(
         return np.zeros((0, 3)), [], []
     coords = np.stack(coords_list, axis=0)
     return coords, elements, meta
+
+
+def load_pdb_atoms(
+    path: str,
+    chain_id: str | None = None,
+    only_protein: bool = True,
+) -> Tuple[np.ndarray, List[str], List[Dict]]:
+    """
+    Load coordinates and metadata from a PDB or mmCIF file.
+    从PDB或mmCIF文件加载坐标和元数据。
+
+    The native readers (``load_atom_arrays``) are used first; files they
+    cannot read fall back to Biopython. ``$GAUSSBIO3D_PDB_PARSER=biopython``
+    always uses Biopython.
+    优先使用原生读取器（``load_atom_arrays``）；其无法读取的文件回退到Biopython。
+    ``$GAUSSBIO3D_PDB_PARSER=biopython`` 时始终使用Biopython。
+
+    Parameters / 参数
+    ----------
+    path : str
+        Path to PDB/mmCIF file / PDB或mmCIF文件路径
+    chain_id : str or None
+        If not None, only consider this chain.
+        如果不为None，则只考虑此链
+    only_protein : bool
+        If True, only take standard amino acids.
+        如果为True，则只提取标准氨基酸
+
+    Returns / 返回
+    -------
+    coords : np.ndarray
+        Atomic coordinates, shape (N_atoms, 3) / 原子坐标，形状为(N_atoms, 3)
+    elements : List[str]
+        Element symbol per atom / 每个原子的元素符号
+    meta : List[dict]
+        Per-atom metadata: residue name, id, chain, atom name, etc.
+        每个原子的元数据：残基名称、ID、链、原子名称等
+
+    Raises / 引发
+    ------
+    ImportError
+        If the native readers fail and Biopython is not installed
+        如果原生读取器失败且未安装Biopython
+    """
+    if os.environ.get("GAUSSBIO3D_PDB_PARSER", "native") != "biopython":
+        try:
+            atoms = load_atom_arrays(path, chain_id=chain_id, only_protein=only_protein)
+        except ValueError:
+            if PDBParser is None and MMCIFParser is None:
+                raise
+        else:
+            if len(atoms) == 0:
+                return np.zeros((0, 3)), [], []
+            return atoms.coords, atoms.elements.tolist(), atoms.meta()
+    return _load_pdb_atoms_biopython(path, chain_id=chain_id, only_protein=only_protein)
+
+
+__all__ = ["AtomArrays", "load_atom_arrays", "load_pdb_atoms"]
@@ -0,0 +1,332 @@
+"""
+Binary structure files and parse cache
+二进制结构文件与解析缓存
+
+A built ``Structure`` is written as one file: a fixed preamble, a JSON header
+(class, vocabulary, curve table, metadata and the layout of every array) and
+the raw arrays, each aligned to 64 bytes, so ``load_structure(mmap=True)``
+maps them straight from the page cache without parsing or copying.
+
+Layout / 布局::
+
+    b"GB3DSTRC"  | uint32 version | uint32 0 | uint64 header bytes
+    header (UTF-8 JSON) | padding | array 0 | padding | array 1 | ...
+
+``cached_build`` wraps the molecule builders (``Protein.from_pdb``,
+``NucleicAcid.from_pdb``, ``Ligand.from_sdf``): the result is stored under a
+key of source path + builder options, together with the source's mtime, size
+and SHA-1, and later builds load it instead of parsing the source again.
+
+构建好的 ``Structure`` 写为单个文件：固定前导、JSON头（类、词表、曲线表、元数据及各数组
+的布局）以及按64字节对齐的原始数组，因此 ``load_structure(mmap=True)`` 可直接从页缓存
+映射数组，无需解析或复制。``cached_build`` 包装分子构建函数：结果按源路径+构建选项的键
+存储，并记录源文件的mtime、大小与SHA-1，之后的构建直接加载而不再解析源文件。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+import os
+import struct as _struct
+from typing import Any, Callable, Dict, Optional, Type, TypeVar, Union
+
+import numpy as np
+
+from ..core.geometry import Structure, _Column
+
+MAGIC = b"GB3DSTRC"
+FORMAT_VERSION = 1
+_PREAMBLE = _struct.Struct("<8sIIQ")
+_ALIGN = 64
+
+S = TypeVar("S", bound=Structure)
+
+
+def _align(n: int) -> int:
+    return -(-n // _ALIGN) * _ALIGN
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"metadata value of type {type(value).__name__} cannot be stored in a structure file")
+
+
+def _arrays(struct: Structure) -> Dict[str, np.ndarray]:
+    indptr, seg_ids = struct.node_segment_csr()
+    arrays = dict(
+        coords=struct.coords,
+        node_ids=struct.node_ids,
+        element_codes=struct.element_codes,
+        group_codes=struct.group_codes,
+        segment_starts=struct.segment_starts,
+        segment_ends=struct.segment_ends,
+        segment_node_ids=struct.segment_node_ids,
+        segment_type_codes=struct.segment_type_codes,
+        incidence_indptr=indptr,
+        incidence_segments=seg_ids,
+    )
+    for key, col in struct._meta.items():
+        arrays[f"meta:{key}"] = col.codes[: struct.n_nodes]
+    return arrays
+
+
+def save_structure(struct: Structure, path: str, extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Write ``struct`` to ``path`` (atomically: temporary file + ``os.replace``).
+    将 ``struct`` 写入 ``path``（原子写入：临时文件 + ``os.replace``）。
+
+    Metadata (structure, curve and node) must be JSON-representable; NumPy
+    scalars are stored as Python numbers and tuples come back as lists.
+    ``extra`` is stored in the header and returned by ``read_header``.
+    元数据（结构、曲线及节点）须可表示为JSON；NumPy标量存为Python数值，元组读回为列表。
+    ``extra`` 存入文件头，由 ``read_header`` 返回。
+    """
+    arrays = {k: np.ascontiguousarray(v) for k, v in _arrays(struct).items()}
+    cls = type(struct)
+    header: Dict[str, Any] = dict(
+        cls=f"{cls.__module__}:{cls.__qualname__}",
+        metadata=struct.metadata,
+        vocab=struct.vocab,
+        curve_ptr=struct._curve_ptr,
+        curve_types=struct._curve_types,
+        curve_meta=struct._curve_meta,
+        node_meta={key: col.values for key, col in struct._meta.items()},
+        extra=extra or {},
+        arrays={},
+    )
+    # offsets depend on the header length, which depends on the offsets;
+    # lay out relative to the data start, then shift by the aligned header
+    # 偏移依赖头长度，头长度又依赖偏移；先相对数据起点布局，再整体平移
+    offset = 0
+    for name, arr in arrays.items():
+        header["arrays"][name] = dict(dtype=arr.dtype.str, shape=list(arr.shape), offset=offset)
+        offset = _align(offset + arr.nbytes)
+    blob = json.dumps(header, default=_json_default).encode()
+    data_start = _align(_PREAMBLE.size + len(blob) + 32)
+    for spec in header["arrays"].values():
+        spec["offset"] += data_start
+    blob = json.dumps(header, default=_json_default).encode()
+    while _PREAMBLE.size + len(blob) > data_start:  # offsets grew by a digit / 偏移位数增加
+        shift = _align(_PREAMBLE.size + len(blob)) - data_start
+        data_start += shift
+        for spec in header["arrays"].values():
+            spec["offset"] += shift
+        blob = json.dumps(header, default=_json_default).encode()
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(blob)))
+        fh.write(blob)
+        for name, arr in arrays.items():
+            fh.seek(header["arrays"][name]["offset"])
+            fh.write(arr.tobytes())
+    os.replace(tmp, path)
+    return path
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """
+    Parsed JSON header of a structure file.
+    结构文件的JSON文件头。
+
+    Raises ``ValueError`` if the file is not a structure file or was written
+    by a newer format version.
+    若文件不是结构文件或由更新的格式版本写入，则引发 ``ValueError``。
+    """
+    with open(path, "rb") as fh:
+        pre = fh.read(_PREAMBLE.size)
+        if len(pre) < _PREAMBLE.size:
+            raise ValueError(f"{path} is not a gaussbio3d structure file")
+        magic, version, _, n = _PREAMBLE.unpack(pre)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a gaussbio3d structure file")
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"{path} uses structure format {version}; this version reads up to {FORMAT_VERSION}"
+            )
+        return json.loads(fh.read(n).decode())
+
+
+def _resolve_class(name: str) -> Type[Structure]:
+    module, _, qualname = name.partition(":")
+    try:
+        obj: Any = importlib.import_module(module)
+        for part in qualname.split("."):
+            obj = getattr(obj, part)
+    except (ImportError, AttributeError):
+        return Structure
+    return obj if isinstance(obj, type) and issubclass(obj, Structure) else Structure
+
+
+def load_structure(path: str, mmap: bool = True, cls: Optional[Type[S]] = None) -> S:
+    """
+    Read a structure file written by ``save_structure``.
+    读取由 ``save_structure`` 写入的结构文件。
+
+    Parameters / 参数
+    ----------
+    path : str
+        Structure file / 结构文件
+    mmap : bool
+        Map the arrays copy-on-write instead of reading them: loading costs
+        only the header, and in-place edits stay private to the process.
+        以写时复制方式映射数组而非读取：加载只需解析文件头，就地修改仅对本进程可见。
+    cls : type, optional
+        Class to instantiate; default is the class that was saved (or
+        ``Structure`` if it cannot be imported).
+        要实例化的类；默认为保存时的类（无法导入时为 ``Structure``）。
+    """
+    header = read_header(path)
+    if mmap:
+        buf = np.memmap(path, dtype=np.uint8, mode="c")
+    else:
+        with open(path, "rb") as fh:
+            buf = np.frombuffer(bytearray(fh.read()), dtype=np.uint8)
+
+    def arr(name: str) -> np.ndarray:
+        spec = header["arrays"][name]
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        if nbytes == 0:
+            return np.zeros(shape, dtype=dtype)
+        off = spec["offset"]
+        return buf[off:off + nbytes].view(dtype).reshape(shape)
+
+    klass = cls if cls is not None else _resolve_class(header["cls"])
+    out = klass.__new__(klass)
+    Structure.__init__(out, metadata=header["metadata"])
+    out.vocab = list(header["vocab"])
+    out._vocab_index = {s: i for i, s in enumerate(out.vocab)}
+    out._coords = arr("coords")
+    out._node_ids = arr("node_ids")
+    out._elem = arr("element_codes")
+    out._group = arr("group_codes")
+    out._n = out._coords.shape[0]
+    for key, values in header["node_meta"].items():
+        col = _Column(0)
+        col.codes = arr(f"meta:{key}")
+        col.values = list(values)
+        for i, v in enumerate(col.values):
+            try:
+                col.index.setdefault((type(v), v), i)
+            except TypeError:
+                pass
+        out._meta[key] = col
+    out._seg_start = arr("segment_starts")
+    out._seg_end = arr("segment_ends")
+    out._seg_nodes = arr("segment_node_ids")
+    out._seg_types = arr("segment_type_codes")
+    out._m = out._seg_start.shape[0]
+    out._curve_ptr = list(header["curve_ptr"])
+    out._curve_types = list(header["curve_types"])
+    out._curve_meta = list(header["curve_meta"])
+    out._incidence = (arr("incidence_indptr"), arr("incidence_segments"))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Parse cache / 解析缓存
+# ---------------------------------------------------------------------------
+
+def parse_cache_dir(cache: Union[bool, str, None] = None) -> Optional[str]:
+    """
+    Directory of the parse cache, or None when caching is off.
+    解析缓存目录；关闭缓存时返回None。
+
+    ``cache`` may be False (off), True (default directory), a directory, or
+    None to follow ``$GAUSSBIO3D_PARSE_CACHE`` (unset / "0": off, "1":
+    default directory, anything else: that directory). The default directory
+    is ``structures/`` under ``$GAUSSBIO3D_CACHE_DIR`` or ``~/.cache/gaussbio3d``.
+    ``cache`` 可为False（关闭）、True（默认目录）、目录路径，或None（依照环境变量
+    ``$GAUSSBIO3D_PARSE_CACHE``：未设置/"0"关闭，"1"默认目录，其他值为目录）。
+    """
+    if cache is None:
+        env = os.environ.get("GAUSSBIO3D_PARSE_CACHE", "")
+        cache = False if env in ("", "0") else (True if env == "1" else env)
+    if cache is False:
+        return None
+    if cache is True:
+        base = os.environ.get("GAUSSBIO3D_CACHE_DIR") or os.path.join(
+            os.path.expanduser("~"), ".cache", "gaussbio3d"
+        )
+        return os.path.join(base, "structures")
+    return str(cache)
+
+
+def _file_sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cached_build(
+    cls: Type[S],
+    path: str,
+    options: Dict[str, Any],
+    build: Callable[[], S],
+    cache: Union[bool, str, None] = None,
+) -> S:
+    """
+    ``build()``, memoized on disk by source file and builder options.
+    以源文件与构建选项为键在磁盘上缓存 ``build()`` 的结果。
+
+    An entry is reused when the source's mtime and size are unchanged, or
+    failing that when its SHA-1 still matches (e.g. after a copy or touch);
+    otherwise the structure is rebuilt and the entry rewritten.
+    源文件mtime与大小未变，或（若变化）SHA-1仍一致（例如复制或touch之后）时复用缓存项；
+    否则重新构建并改写缓存项。
+    """
+    directory = parse_cache_dir(cache)
+    if directory is None:
+        return build()
+    from .. import __version__
+
+    src = os.path.abspath(path)
+    st = os.stat(src)
+    key = hashlib.sha1(
+        json.dumps(
+            [FORMAT_VERSION, __version__, cls.__module__, cls.__qualname__, src, options],
+            sort_keys=True,
+            default=str,
+        ).encode()
+    ).hexdigest()
+    entry = os.path.join(directory, f"{key[:32]}.gb3d")
+
+    sha1 = None
+    if os.path.exists(entry):
+        try:
+            stamp = read_header(entry)["extra"].get("source", {})
+            if stamp.get("mtime_ns") == st.st_mtime_ns and stamp.get("size") == st.st_size:
+                return load_structure(entry, cls=cls)
+            sha1 = _file_sha1(src)
+            if stamp.get("sha1") == sha1:
+                return load_structure(entry, cls=cls)
+        except (OSError, ValueError, KeyError):
+            pass  # unreadable entry: rebuild / 缓存项不可读：重新构建
+
+    struct = build()
+    os.makedirs(directory, exist_ok=True)
+    stamp = dict(mtime_ns=st.st_mtime_ns, size=st.st_size, sha1=sha1 or _file_sha1(src))
+    try:
+        save_structure(struct, entry, extra=dict(source=stamp))
+    except TypeError:
+        pass  # metadata not storable: leave uncached / 元数据不可存储：不缓存
+    return struct
+
+
+__all__ = [
+    "FORMAT_VERSION",
+    "save_structure",
+    "load_structure",
+    "read_header",
+    "parse_cache_dir",
+    "cached_build",
+]
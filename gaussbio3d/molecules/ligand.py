@@ -10,15 +10,14 @@ built from SDF/MOL2/SMILES files using RDKit.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Union
 import numpy as np
 
-from ..core.geometry import Node, Segment, Curve, Structure
+from ..core.geometry import Segment, Curve, Structure
 from ..io import mol as molio
+from ..io.structure_file import cached_build
 
 
-@dataclass
 class Ligand(Structure):
     """
     Ligand / small-molecule Structure.
@@ -31,7 +30,7 @@ class Ligand(Structure):
     """
 
     @classmethod
-    def from_sdf(cls, path: str) -> "Ligand":
+    def from_sdf(cls, path: str, cache: Union[bool, str, None] = None) -> "Ligand":
         """
         Create a Ligand from an SDF file.
         从SDF文件创建配体。
@@ -40,14 +39,21 @@ class Ligand(Structure):
         ----------
         path : str
             Path to SDF file / SDF文件路径
+        cache : bool or str, optional
+            Parse cache: False, True, a directory, or None to follow
+            ``$GAUSSBIO3D_PARSE_CACHE`` (see ``io.structure_file.cached_build``)
+            解析缓存：False、True、目录，或None（依照 ``$GAUSSBIO3D_PARSE_CACHE``）
             
         Returns / 返回
         -------
         Ligand
             Ligand structure / 配体结构
         """
-        mol = molio.load_mol_from_sdf(path)
-        return cls._from_rdkit_mol(mol, source=f"sdf:{path}")
+        return cached_build(
+            cls, path, dict(builder="from_sdf"),
+            lambda: cls._from_rdkit_mol(molio.load_mol_from_sdf(path), source=f"sdf:{path}"),
+            cache,
+        )
 
     @classmethod
     def from_mol2(cls, path: str) -> "Ligand":
@@ -108,19 +114,13 @@ class Ligand(Structure):
         coords, elements = molio.mol_to_coordinates_and_elements(mol)
         bonds = molio.mol_to_bond_pairs(mol)
 
-        nodes: List[Node] = []
-        for i, (coord, elem) in enumerate(zip(coords, elements)):
-            nodes.append(
-                Node(
-                    id=i,
-                    coord=np.asarray(coord, dtype=float),
-                    element=elem,
-                    group=elem,  # default grouping: by element / 默认分组：按元素
-                    metadata=dict(source=source),
-                )
-            )
-
-        struct = cls(nodes=nodes, curves=[], node_segments={}, metadata={"type": "ligand", "source": source})
+        struct = cls(metadata={"type": "ligand", "source": source})
+        struct.add_nodes(
+            np.asarray(coords, dtype=float).reshape(-1, 3),
+            elements,
+            groups=elements,  # default grouping: by element / 默认分组：按元素
+            metadata=[dict(source=source) for _ in elements],
+        )
 
         # Build bond curves: each bond is represented as two half-segments
         # 构建键曲线：每个键表示为两个半线段
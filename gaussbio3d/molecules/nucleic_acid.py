@@ -10,12 +10,12 @@ built from PDB files.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
 import numpy as np
 
-from ..core.geometry import Node, Segment, Curve, Structure
+from ..core.geometry import Segment, Curve, Structure
 from ..io import pdb as pdbio
+from ..io.structure_file import cached_build
 
 
 def _is_nucleic_res(resname: str) -> bool:
@@ -67,7 +67,6 @@ def _base_type(resname: str) -> str:
     return mapping.get(r, "OTHER")
 
 
-@dataclass
 class NucleicAcid(Structure):
     """
     Nucleic acid (DNA/RNA) Structure.
@@ -88,6 +87,7 @@ class NucleicAcid(Structure):
         cls,
         path: str,
         chain_id: Optional[str] = None,
+        cache: Union[bool, str, None] = None,
     ) -> "NucleicAcid":
         """
         Create a NucleicAcid from a PDB file.
@@ -99,36 +99,36 @@ class NucleicAcid(Structure):
             Path to PDB file / PDB文件路径
         chain_id : str, optional
             Chain ID to extract (if None, all chains) / 要提取的链ID（如果为None，则所有链）
+        cache : bool or str, optional
+            Parse cache: False, True, a directory, or None to follow
+            ``$GAUSSBIO3D_PARSE_CACHE`` (see ``io.structure_file.cached_build``)
+            解析缓存：False、True、目录，或None（依照 ``$GAUSSBIO3D_PARSE_CACHE``）
             
         Returns / 返回
         -------
         NucleicAcid
             Nucleic acid structure / 核酸结构
         """
+        return cached_build(
+            cls, path, dict(builder="from_pdb", chain_id=chain_id),
+            lambda: cls._build_from_pdb(path, chain_id), cache,
+        )
+
+    @classmethod
+    def _build_from_pdb(cls, path: str, chain_id: Optional[str]) -> "NucleicAcid":
+        """Parse ``path`` and build the structure (uncached) / 解析并构建结构（不使用缓存）"""
         coords, elements, meta_all = pdbio.load_pdb_atoms(
             path, chain_id=chain_id, only_protein=False
         )
 
-        nodes: List[Node] = []
-        for i, (coord, elem, m) in enumerate(zip(coords, elements, meta_all)):
-            if not _is_nucleic_res(m["resname"]):
-                continue
-            group = _base_type(m["resname"])
-            nodes.append(
-                Node(
-                    id=len(nodes),  # reindex / 重新索引
-                    coord=np.asarray(coord, dtype=float),
-                    element=elem,
-                    group=group,  # group by base type / 按碱基类型分组
-                    metadata=m,
-                )
-            )
-
-        struct = cls(
-            nodes=nodes,
-            curves=[],
-            node_segments={},
-            metadata={"type": "nucleic_acid", "source": path, "chain_id": chain_id},
+        keep = [i for i, m in enumerate(meta_all) if _is_nucleic_res(m["resname"])]
+        struct = cls(metadata={"type": "nucleic_acid", "source": path, "chain_id": chain_id})
+        # nodes are reindexed over the kept atoms / 节点按保留的原子重新索引
+        struct.add_nodes(
+            np.asarray(coords, dtype=float)[keep].reshape(-1, 3),
+            [elements[i] for i in keep],
+            groups=[_base_type(meta_all[i]["resname"]) for i in keep],  # group by base type / 按碱基类型分组
+            metadata=[meta_all[i] for i in keep],
         )
 
         _build_backbone_curves_na(struct)
@@ -10,12 +10,12 @@ built from PDB files.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
 import numpy as np
 
-from ..core.geometry import Node, Segment, Curve, Structure
+from ..core.geometry import Segment, Curve, Structure
 from ..io import pdb as pdbio
+from ..io.structure_file import cached_build
 
 
 def _classify_residue(resname: str) -> str:
@@ -56,7 +56,6 @@ def _classify_residue(resname: str) -> str:
     return "other"  # 其他
 
 
-@dataclass
 class Protein(Structure):
     """
     Protein Structure built from a PDB file.
@@ -77,6 +76,7 @@ class Protein(Structure):
         cls,
         path: str,
         chain_id: Optional[str] = None,
+        cache: Union[bool, str, None] = None,
     ) -> "Protein":
         """
         Create a Protein from a PDB file.
@@ -88,34 +88,34 @@ class Protein(Structure):
             Path to PDB file / PDB文件路径
         chain_id : str, optional
             Chain ID to extract (if None, all chains) / 要提取的链ID（如果为None，则所有链）
+        cache : bool or str, optional
+            Parse cache: False, True, a directory, or None to follow
+            ``$GAUSSBIO3D_PARSE_CACHE`` (see ``io.structure_file.cached_build``)
+            解析缓存：False、True、目录，或None（依照 ``$GAUSSBIO3D_PARSE_CACHE``）
             
         Returns / 返回
         -------
         Protein
             Protein structure / 蛋白质结构
         """
+        return cached_build(
+            cls, path, dict(builder="from_pdb", chain_id=chain_id),
+            lambda: cls._build_from_pdb(path, chain_id), cache,
+        )
+
+    @classmethod
+    def _build_from_pdb(cls, path: str, chain_id: Optional[str]) -> "Protein":
+        """Parse ``path`` and build the structure (uncached) / 解析并构建结构（不使用缓存）"""
         coords, elements, meta = pdbio.load_pdb_atoms(
             path, chain_id=chain_id, only_protein=True
         )
 
-        nodes: List[Node] = []
-        for i, (coord, elem, m) in enumerate(zip(coords, elements, meta)):
-            resclass = _classify_residue(m["resname"])
-            nodes.append(
-                Node(
-                    id=i,
-                    coord=np.asarray(coord, dtype=float),
-                    element=elem,
-                    group=resclass,
-                    metadata=m,
-                )
-            )
-
-        struct = cls(
-            nodes=nodes,
-            curves=[],
-            node_segments={},
-            metadata={"type": "protein", "source": path, "chain_id": chain_id},
+        struct = cls(metadata={"type": "protein", "source": path, "chain_id": chain_id})
+        struct.add_nodes(
+            coords,
+            elements,
+            groups=[_classify_residue(m["resname"]) for m in meta],
+            metadata=meta,
         )
 
         # Build backbone curves (Cα trace per chain) / 构建主链曲线（每条链的Cα追踪）
@@ -15,9 +15,8 @@ from typing import Dict, Any
 from .molecules.protein import Protein
 from .molecules.ligand import Ligand
 from .config import MgliConfig
-from .features.descriptor import global_mgli_descriptor
-from .features.node_features import node_mgli_features
-from .features.pairwise import pairwise_mgli_matrix
+from .features.context import PairContext
+from .features.neighborhood import neighborhood, expand_rows, expand_pairs
 
 
 class Session:
@@ -35,23 +34,20 @@ class Session:
         在复用蛋白质上下文的情况下为给定配体计算特征。
         """
         key = ligand.metadata.get("source", f"ligand:{len(ligand.nodes)}")
+        # With max_distance set only the pocket is featurized; the protein's
+        # cached cell list makes the pocket query cheap for every ligand.
+        # 设置max_distance时只对口袋特征化；蛋白质缓存的单元格列表使每个配体的口袋查询开销很小。
+        pocket = neighborhood(self.protein, ligand, self.config)
+        ctx = PairContext(pocket, ligand, self.config)
         pw_key = f"pairwise_mgli::{key}"
         pairwise_mat = self._cache.get(pw_key)
         if pairwise_mat is None:
-            pairwise_mat = pairwise_mgli_matrix(
-                self.protein,
-                ligand,
-                signed=self.config.signed,
-                agg="mean",
-                max_distance=getattr(self.config, "max_distance", None),
-                n_jobs=getattr(self.config, "n_jobs", 1),
-                use_gpu=getattr(self.config, "use_gpu", False),
-            )
+            pairwise_mat = expand_pairs(ctx.pairwise(), pocket, ligand)
             self._cache[pw_key] = pairwise_mat
 
-        global_feat = global_mgli_descriptor(self.protein, ligand, self.config)
-        prot_node_feat = node_mgli_features(self.protein, ligand, self.config)
-        lig_node_feat = node_mgli_features(ligand, self.protein, self.config)
+        global_feat = ctx.descriptor()
+        prot_node_feat = expand_rows(ctx.node_features("A"), pocket)
+        lig_node_feat = ctx.node_features("B")
         return dict(
             global_feat=global_feat,
             prot_node_feat=prot_node_feat,
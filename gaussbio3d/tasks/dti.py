@@ -15,9 +15,8 @@ from typing import Dict, Any, Optional
 from ..molecules.protein import Protein
 from ..molecules.ligand import Ligand
 from ..config import MgliConfig
-from ..features.descriptor import global_mgli_descriptor
-from ..features.node_features import node_mgli_features
-from ..features.pairwise import pairwise_mgli_matrix
+from ..features.context import PairContext
+from ..features.neighborhood import neighborhood, expand_rows, expand_pairs
 
 
 def compute_dti_features(
@@ -55,7 +54,7 @@ def compute_dti_features(
           "global_feat": np.ndarray,   # global descriptor / 全局描述符
           "prot_node_feat": np.ndarray,# node-level features for protein / 蛋白质的节点级特征
           "lig_node_feat": np.ndarray, # node-level features for ligand / 配体的节点级特征
-          "pairwise_mgli": np.ndarray, # pairwise GLI matrix / 成对GLI矩阵
+          "pairwise_mgli": np.ndarray, # pairwise GLI matrix (SparsePairs if config.sparse_pairs/top_k) / 成对GLI矩阵
         }
     """
     if config is None:
@@ -70,19 +69,16 @@ def compute_dti_features(
     else:
         raise ValueError("Either sdf_path or smiles must be provided.")
 
-    # Compute features / 计算特征
-    global_feat = global_mgli_descriptor(prot, lig, config)
-    prot_node_feat = node_mgli_features(prot, lig, config)
-    lig_node_feat = node_mgli_features(lig, prot, config)
-    pairwise_mat = pairwise_mgli_matrix(
-        prot,
-        lig,
-        signed=config.signed,
-        agg="mean",
-        max_distance=getattr(config, "max_distance", None),
-        n_jobs=getattr(config, "n_jobs", 1),
-        use_gpu=getattr(config, "use_gpu", False),
-    )
+    # Featurize the pocket only; with max_distance set it gives the same
+    # outputs as the whole protein / 仅对口袋特征化；设置max_distance时与完整蛋白质结果相同
+    pocket = neighborhood(prot, lig, config)
+
+    # Compute features from one pairwise GLI pass / 由一次成对GLI计算得到所有特征
+    ctx = PairContext(pocket, lig, config)
+    global_feat = ctx.descriptor()
+    prot_node_feat = expand_rows(ctx.node_features("A"), pocket)
+    lig_node_feat = ctx.node_features("B")
+    pairwise_mat = expand_pairs(ctx.pairwise(), pocket, lig)
 
     return dict(
         global_feat=global_feat,
@@ -15,9 +15,8 @@ from typing import Dict, Any, Optional
 from ..molecules.protein import Protein
 from ..molecules.nucleic_acid import NucleicAcid
 from ..config import MgliConfig
-from ..features.descriptor import global_mgli_descriptor
-from ..features.node_features import node_mgli_features
-from ..features.pairwise import pairwise_mgli_matrix
+from ..features.context import PairContext
+from ..features.neighborhood import neighborhood, expand_rows, expand_pairs
 
 
 def compute_mti_features(
@@ -59,7 +58,7 @@ def compute_mti_features(
           "global_feat": np.ndarray,    # global descriptor / 全局描述符
           "prot_node_feat": np.ndarray, # node-level features for protein / 蛋白质的节点级特征
           "na_node_feat": np.ndarray,   # node-level features for nucleic acid / 核酸的节点级特征
-          "pairwise_mgli": np.ndarray,  # pairwise GLI matrix / 成对GLI矩阵
+          "pairwise_mgli": np.ndarray,  # pairwise GLI matrix (SparsePairs if config.sparse_pairs/top_k) / 成对GLI矩阵
         }
     """
     if config is None:
@@ -69,11 +68,17 @@ def compute_mti_features(
     prot = Protein.from_pdb(protein_pdb, chain_id=protein_chain)
     na = NucleicAcid.from_pdb(na_pdb, chain_id=na_chain)
 
-    # Compute features / 计算特征
-    global_feat = global_mgli_descriptor(prot, na, config)
-    prot_node_feat = node_mgli_features(prot, na, config)
-    na_node_feat = node_mgli_features(na, prot, config)
-    pairwise_mat = pairwise_mgli_matrix(prot, na, signed=config.signed, agg="mean")
+    # Featurize the interface only; with max_distance set it gives the same
+    # outputs as the whole structures / 仅对界面特征化；设置max_distance时与完整结构结果相同
+    prot_if = neighborhood(prot, na, config)
+    na_if = neighborhood(na, prot_if, config)
+
+    # Compute features from one pairwise GLI pass / 由一次成对GLI计算得到所有特征
+    ctx = PairContext(prot_if, na_if, config)
+    global_feat = ctx.descriptor()
+    prot_node_feat = expand_rows(ctx.node_features("A"), prot_if)
+    na_node_feat = expand_rows(ctx.node_features("B"), na_if)
+    pairwise_mat = expand_pairs(ctx.pairwise(), prot_if, na_if)
 
     return dict(
         global_feat=global_feat,
@@ -14,9 +14,8 @@ from typing import Dict, Any, Optional
 
 from ..molecules.protein import Protein
 from ..config import MgliConfig
-from ..features.descriptor import global_mgli_descriptor
-from ..features.node_features import node_mgli_features
-from ..features.pairwise import pairwise_mgli_matrix
+from ..features.context import PairContext
+from ..features.neighborhood import neighborhood, expand_rows, expand_pairs
 
 
 def compute_ppi_features(
@@ -53,7 +52,7 @@ def compute_ppi_features(
           "global_feat": np.ndarray,   # global descriptor / 全局描述符
           "A_node_feat": np.ndarray,   # node-level features for protein A / 蛋白质A的节点级特征
           "B_node_feat": np.ndarray,   # node-level features for protein B / 蛋白质B的节点级特征
-          "pairwise_mgli": np.ndarray, # pairwise GLI matrix / 成对GLI矩阵
+          "pairwise_mgli": np.ndarray, # pairwise GLI matrix (SparsePairs if config.sparse_pairs/top_k) / 成对GLI矩阵
         }
     """
     if config is None:
@@ -63,11 +62,17 @@ def compute_ppi_features(
     prot_A = Protein.from_pdb(pdb_path_A, chain_id=chain_id_A)
     prot_B = Protein.from_pdb(pdb_path_B, chain_id=chain_id_B)
 
-    # Compute features / 计算特征
-    global_feat = global_mgli_descriptor(prot_A, prot_B, config)
-    A_node_feat = node_mgli_features(prot_A, prot_B, config)
-    B_node_feat = node_mgli_features(prot_B, prot_A, config)
-    pairwise_mat = pairwise_mgli_matrix(prot_A, prot_B, signed=config.signed, agg="mean")
+    # Featurize the interface only; with max_distance set it gives the same
+    # outputs as the whole proteins / 仅对界面特征化；设置max_distance时与完整蛋白质结果相同
+    iface_A = neighborhood(prot_A, prot_B, config)
+    iface_B = neighborhood(prot_B, iface_A, config)
+
+    # Compute features from one pairwise GLI pass / 由一次成对GLI计算得到所有特征
+    ctx = PairContext(iface_A, iface_B, config)
+    global_feat = ctx.descriptor()
+    A_node_feat = expand_rows(ctx.node_features("A"), iface_A)
+    B_node_feat = expand_rows(ctx.node_features("B"), iface_B)
+    pairwise_mat = expand_pairs(ctx.pairwise(), iface_A, iface_B)
 
     return dict(
         global_feat=global_feat,
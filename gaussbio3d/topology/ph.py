@@ -20,13 +20,26 @@ except Exception:
     _HAS_RIPSER = False
 
 
-def ph_diagrams_from_distance(rij: np.ndarray, maxdim: int = 2):
+def ph_diagrams_from_distance(rij, maxdim: int = 2):
     if not _HAS_RIPSER:
         raise ImportError("ripser is required for PH (pip install ripser)")
     res = ripser(rij, distance_matrix=True, maxdim=maxdim)
     return res["dgms"]
 
 
+def sparse_distance_matrix(ptr: np.ndarray, idx: np.ndarray, dist: np.ndarray, shape):
+    """
+    Build a scipy COO distance matrix from CSR neighbor lists (see
+    ``core.neighbors``); absent entries are treated by ripser as infinite,
+    i.e. the Rips filtration is truncated at the neighbor cutoff.
+    由CSR近邻列表构建scipy COO距离矩阵；缺失项被ripser视为无穷大，即Rips过滤在截断距离处截断。
+    """
+    from scipy.sparse import coo_matrix  # ripser depends on scipy
+
+    rows = np.repeat(np.arange(ptr.size - 1), np.diff(ptr))
+    return coo_matrix((dist, (rows, idx)), shape=shape)
+
+
 def ph_persistence_histogram(dgms: list[np.ndarray], bins: np.ndarray | None = None) -> np.ndarray:
     """
     Build concatenated histogram of (death - birth) per homology dimension.
@@ -43,5 +56,5 @@ def ph_persistence_histogram(dgms: list[np.ndarray], bins: np.ndarray | None = N
     return np.concatenate(hists, axis=0)
 
 
-__all__ = ["ph_diagrams_from_distance", "ph_persistence_histogram"]
+__all__ = ["ph_diagrams_from_distance", "sparse_distance_matrix", "ph_persistence_histogram"]
 
@@ -0,0 +1,44 @@
+"""
+Shared fixtures for the test suite
+测试套件共享的fixture
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.core.geometry import Curve, Node, Segment, Structure
+
+
+def random_chain(
+    n: int,
+    seed: int,
+    elements: str = "CNOS",
+    shift: float = 0.0,
+    open_ends: bool = True,
+) -> Structure:
+    """
+    Random-walk backbone of ``n`` nodes with a side half-bond on every
+    fourth node, translated by ``shift``.
+    含 ``n`` 个节点的随机游走主链，每四个节点带一个侧链半键，整体平移 ``shift``。
+    """
+    rng = np.random.default_rng(seed)
+    struct = Structure()
+    pts = np.cumsum(rng.normal(0.0, 1.5, (n, 3)), axis=0) + shift
+    for i in range(n):
+        struct.add_node(
+            Node(id=i, coord=pts[i], element=elements[rng.integers(len(elements))], group=f"g{i % 3}")
+        )
+    struct.add_curve(Curve([Segment(pts[i], pts[i + 1], i, i + 1) for i in range(n - 1)], "backbone"))
+    side = [
+        Segment(pts[i], pts[i] + rng.normal(0.0, 1.0, 3), i, None if open_ends else i)
+        for i in range(0, n, 4)
+    ]
+    if side:
+        struct.add_curve(Curve(side, "side"))
+    return struct
+
+
+@pytest.fixture
+def chain():
+    """Factory of random chain structures / 随机链结构工厂"""
+    return random_chain
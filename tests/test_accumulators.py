@@ -0,0 +1,62 @@
+"""
+Streaming statistics against one-shot NumPy reductions
+流式统计量与一次性NumPy归约的对比
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.features.accumulators import GroupedStats, grouped_stats
+
+STATS = ["sum", "mean", "std", "var", "min", "max", "count", "median", "q10", "q90"]
+
+
+def _chunks(n, size):
+    return [slice(s, s + size) for s in range(0, n, size)]
+
+
+def test_chunked_and_merged_match_one_shot():
+    rng = np.random.default_rng(0)
+    keys, vals = rng.integers(0, 5, 3000), rng.normal(size=3000)
+    ref = grouped_stats(keys, vals, 6, STATS)
+    parts = [GroupedStats(6, STATS, quantile_capacity=None).update(keys[c], vals[c]) for c in _chunks(3000, 700)]
+    acc = parts[0]
+    for p in parts[1:]:
+        acc.merge(p)
+    assert np.allclose(acc.result(), ref)
+    assert not ref[5].any()  # empty group stays 0 / 空组保持为0
+
+
+@pytest.mark.parametrize("dist", ["normal", "cauchy"])
+def test_sketch_quantiles_are_bounded_order_statistics(dist):
+    rng = np.random.default_rng(1)
+    n = 200000
+    keys = rng.integers(0, 3, n)
+    vals = rng.normal(size=n) if dist == "normal" else rng.standard_cauchy(n)
+    stats = ["q0", "q1", "median", "q99", "q100"]
+    cap = 64
+    acc = GroupedStats(3, stats, quantile_capacity=cap)
+    for c in _chunks(n, 5000):
+        acc.update(keys[c], vals[c])
+    assert acc._compacted.all()
+    res = acc.result()
+    for g in range(3):
+        x = np.sort(vals[keys == g])
+        # q0 / q100 are the exact extrema / q0/q100为精确极值
+        assert res[g, 0] == x[0] and res[g, -1] == x[-1]
+        assert np.all((res[g] >= x[0]) & (res[g] <= x[-1]))
+        # rank error of the sketch stays within 1/capacity, even for heavy tails
+        # 即使是重尾分布，草图的秩误差也不超过1/容量
+        ranks = np.searchsorted(x, res[g, 1:-1]) / x.size
+        assert np.abs(ranks - np.array([0.01, 0.5, 0.99])).max() <= 1.0 / cap
+
+
+def test_state_round_trip_keeps_extrema_for_quantiles():
+    rng = np.random.default_rng(2)
+    keys, vals = rng.integers(0, 2, 50000), rng.exponential(size=50000)
+    acc = GroupedStats(2, ["q100", "median"], quantile_capacity=32)
+    for c in _chunks(50000, 4000):
+        acc.update(keys[c], vals[c])
+    back = GroupedStats.from_state(acc.state_dict(), ["q100", "median"], quantile_capacity=32)
+    assert np.array_equal(back.result(), acc.result())
+    assert np.allclose(back.result()[:, 0], [vals[keys == g].max() for g in range(2)])
@@ -0,0 +1,92 @@
+"""
+Backend calibration and dispatch
+后端校准与调度
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from gaussbio3d.core import backends
+from gaussbio3d.core.gli_segment import gli_segment_matrix
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Isolated registry and calibration cache / 隔离的注册表与校准缓存"""
+    monkeypatch.setenv("GAUSSBIO3D_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(backends, "_REGISTRY", dict(backends._REGISTRY))
+    monkeypatch.setattr(backends, "_TABLE", None)
+    return tmp_path
+
+
+def test_calibrate_times_dispatched_functions(registry):
+    calls = {"matrix": 0, "nogil": 0}
+
+    def matrix(*args, **kwargs):
+        calls["matrix"] += 1
+        return gli_segment_matrix(*args, **kwargs)
+
+    def nogil(*args, **kwargs):
+        calls["nogil"] += 1
+        return gli_segment_matrix(*args, **kwargs)
+
+    backends.register_backend("spy", matrix, nogil=nogil)
+    tables = backends.calibrate(sizes=(16, 256), repeats=2)
+    assert set(tables) == set(backends.CALIBRATION_MODES)
+    assert all(len(t) == 2 for t in tables.values())
+    # warm-up + repeats per size, once per mode / 每个大小的预热+重复，各模式一次
+    assert calls == {"matrix": 6, "nogil": 6}
+
+
+def test_calibration_file_round_trip(registry):
+    tables = backends.calibrate(sizes=(16, 256), repeats=1)
+    path = backends.calibration_path()
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    assert data["key"] == backends._machine_key()
+    assert not list(registry.glob("*.tmp"))
+    loaded = backends._load_table()
+    assert loaded == {mode: [tuple(e) for e in t] for mode, t in tables.items()}
+
+
+def test_legacy_single_table_is_recalibrated(registry):
+    with open(backends.calibration_path(), "w", encoding="utf-8") as fh:
+        json.dump(dict(key=backends._machine_key(), table=[[16, "numpy"]]), fh)
+    assert backends._load_table() is None
+
+
+def test_select_backend_uses_mode_table(registry, monkeypatch):
+    backends.register_backend("other", gli_segment_matrix)
+    monkeypatch.setattr(
+        backends, "_TABLE", {"unthreaded": [(1024, "numpy")], "threaded": [(1024, "other")]}
+    )
+    assert backends.select_backend(100, "auto").name == "numpy"
+    assert backends.select_backend(100, "auto", threaded=True).name == "other"
+    assert backends.select_backend(100, "numpy", threaded=True).name == "numpy"
+
+
+def _cache_dir(_):
+    import os
+
+    return os.environ.get("GAUSSBIO3D_CACHE_DIR")
+
+
+def test_process_workers_use_the_parent_table(registry, chain):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from gaussbio3d.core.pairwise_gli import compute_pairwise_node_gli
+    from gaussbio3d.core.parallel import worker_context
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=worker_context()) as ex:
+        if ex.submit(_cache_dir, None).result() != str(registry):
+            pytest.skip("worker processes do not see the test cache directory")
+    A, B = chain(40, 1), chain(30, 2)
+    ref, _ = compute_pairwise_node_gli(A, B, backend="numpy")
+    # a table held only in memory: workers calibrating on their own would
+    # write the cache file / 仅在内存中的表：工作进程若自行校准会写出缓存文件
+    backends._TABLE = {mode: [(1 << 30, "numpy")] for mode in backends.CALIBRATION_MODES}
+    gij, _ = compute_pairwise_node_gli(A, B, backend="auto", n_jobs=2, executor="process")
+    assert np.allclose(gij, ref)
+    assert not list(registry.iterdir())
@@ -0,0 +1,49 @@
+"""
+PairContext against separate featurization calls
+PairContext与分别调用特征化函数的对比
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.config import MgliConfig
+from gaussbio3d.core.sparse import SparsePairs
+from gaussbio3d.features.context import PairContext
+from gaussbio3d.features.descriptor import global_mgli_descriptor
+from gaussbio3d.features.node_features import node_mgli_features
+from gaussbio3d.features.pairwise import pairwise_mgli_matrix
+
+
+def _dense(x):
+    return x.to_dense()[0] if isinstance(x, SparsePairs) else np.asarray(x)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(),
+        dict(max_distance=8.0),
+        dict(max_distance=8.0, distance_bins=[0.0, 3.0, 6.0, 8.0], sparse_pairs=True),
+        dict(max_distance=8.0, top_k=5),
+        dict(memory_budget=200000),
+        dict(use_rbf=True, dtype="float32"),
+        dict(stats=["mean", "std", "median", "max"]),
+    ],
+)
+@pytest.mark.parametrize("self_mode", [False, True])
+def test_context_matches_separate_calls(chain, options, self_mode):
+    A = chain(80, 21)
+    B = None if self_mode else chain(40, 22, shift=3.0)
+    config = MgliConfig(**options)
+    tol = 1e-5 if config.dtype == "float32" else 1e-10
+    ctx = PairContext(A, B, config)
+
+    assert np.allclose(ctx.descriptor(), global_mgli_descriptor(A, B, config), atol=tol)
+    assert np.allclose(ctx.node_features("A"), node_mgli_features(A, B, config), atol=tol)
+    other = node_mgli_features(B, A, config) if B is not None else node_mgli_features(A, None, config)
+    assert np.allclose(ctx.node_features("B"), other, atol=tol)
+    pw = pairwise_mgli_matrix(
+        A, B, signed=config.signed, agg="mean", max_distance=config.max_distance,
+        dtype=config.dtype, sparse=config.sparse_pairs, top_k=config.top_k,
+    )
+    assert np.allclose(_dense(ctx.pairwise()), _dense(pw), atol=tol)
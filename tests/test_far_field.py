@@ -0,0 +1,123 @@
+"""
+Far-field dipole approximation against the exact GLI kernel
+远场偶极近似与精确GLI内核的对比
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from gaussbio3d.config import MgliConfig
+from gaussbio3d.core.gli_segment import (
+    far_field_factor,
+    gli_segment_batch_far_field,
+    gli_segment_matrix,
+    gli_segment_matrix_accel,
+    gli_segment_matrix_far_field,
+    gli_segment_matrix_far_field_accel,
+)
+from gaussbio3d.core.pairwise_gli import compute_pairwise_node_gli
+from gaussbio3d.features.descriptor import global_mgli_descriptor
+
+TOL = 1e-2
+
+
+def _segments(rng, n, box):
+    a0 = rng.uniform(0.0, box, (n, 3))
+    a1 = a0 + rng.normal(0.0, 0.8, (n, 3))
+    return a0, a1
+
+
+def _far_mask(A0, A1, B0, B1, tol):
+    """Pairs the approximation applies to, and their error bound / 使用近似的线段对及其误差界"""
+    ta = A1 - A0
+    tb = B1 - B0
+    r = 0.5 * ((B0 + B1)[None, :, :] - (A0 + A1)[:, None, :])
+    d = np.linalg.norm(r, axis=-1)
+    la = np.linalg.norm(ta, axis=-1)[:, None]
+    lb = np.linalg.norm(tb, axis=-1)[None, :]
+    far = d >= far_field_factor(tol) * np.maximum(la, lb)
+    bound = tol * la * lb / (4.0 * math.pi * np.where(d > 0, d, 1.0) ** 2)
+    return far, bound
+
+
+def _far_field_variants():
+    yield "numpy", lambda *s, signed: gli_segment_matrix_far_field(*s, signed=signed, tol=TOL, max_pairs=500)
+    yield "accel", lambda *s, signed: gli_segment_matrix_far_field_accel(*s, signed=signed, tol=TOL)
+    yield "nogil", lambda *s, signed: gli_segment_matrix_far_field_accel(*s, signed=signed, tol=TOL, nogil=True)
+
+
+@pytest.mark.parametrize("signed", [False, True])
+@pytest.mark.parametrize("name,fn", list(_far_field_variants()))
+def test_far_pairs_within_bound(name, fn, signed):
+    rng = np.random.default_rng(0)
+    A0, A1 = _segments(rng, 60, 40.0)
+    B0, B1 = _segments(rng, 50, 40.0)
+    exact = gli_segment_matrix(A0, A1, B0, B1, signed=signed)
+    approx = fn(A0, A1, B0, B1, signed=signed)
+    far, bound = _far_mask(A0, A1, B0, B1, TOL)
+    # both regimes occur / 两种情形都出现
+    assert far.any() and (~far).any()
+    err = np.abs(approx - exact)
+    assert (err[far] <= bound[far] + 1e-15).all()
+    assert err[far].max() > 0
+
+
+@pytest.mark.parametrize("signed", [False, True])
+def test_near_pairs_are_exact(signed):
+    rng = np.random.default_rng(1)
+    A0, A1 = _segments(rng, 40, 15.0)
+    B0, B1 = _segments(rng, 30, 15.0)
+    far, _ = _far_mask(A0, A1, B0, B1, TOL)
+    near = ~far
+    assert near.any()
+    exact = gli_segment_matrix(A0, A1, B0, B1, signed=signed)
+    approx = gli_segment_matrix_far_field(A0, A1, B0, B1, signed=signed, tol=TOL)
+    np.testing.assert_array_equal(approx[near], exact[near])
+    exact_nb = gli_segment_matrix_accel(A0, A1, B0, B1, signed=signed)
+    for nogil in (False, True):
+        approx_nb = gli_segment_matrix_far_field_accel(A0, A1, B0, B1, signed=signed, tol=TOL, nogil=nogil)
+        assert np.allclose(approx_nb[near], exact_nb[near], rtol=0.0, atol=1e-12)
+
+
+@pytest.mark.parametrize("signed", [False, True])
+def test_batch_matches_matrix_diagonal(signed):
+    rng = np.random.default_rng(2)
+    a0, a1 = _segments(rng, 200, 40.0)
+    b0, b1 = _segments(rng, 200, 40.0)
+    batch = gli_segment_batch_far_field(a0, a1, b0, b1, signed=signed, tol=TOL)
+    exact = np.array([gli_segment_matrix(a0[k:k + 1], a1[k:k + 1], b0[k:k + 1], b1[k:k + 1], signed=signed)[0, 0] for k in range(200)])
+    far, bound = _far_mask(a0, a1, b0, b1, TOL)
+    far, bound = np.diagonal(far), np.diagonal(bound)
+    assert far.any() and (~far).any()
+    err = np.abs(batch - exact)
+    assert (err[far] <= bound[far] + 1e-15).all()
+    assert np.allclose(batch[~far], exact[~far], rtol=0.0, atol=1e-15)
+
+
+def test_invalid_tolerance():
+    with pytest.raises(ValueError):
+        far_field_factor(0.0)
+
+
+@pytest.mark.parametrize("signed", [False, True])
+def test_config_path_matches_exact(chain, signed):
+    A = chain(60, 5)
+    B = chain(50, 6, shift=12.0)
+    # a far pair errs by at most tol / (4π factor²); node means and the
+    # mean/max/min statistics keep that bound
+    # 远距线段对误差不超过 tol / (4π factor²)；节点均值及mean/max/min统计量保持该界
+    bound = TOL / (4.0 * math.pi * far_field_factor(TOL) ** 2)
+    g, r = compute_pairwise_node_gli(A, B, signed=signed)
+    g_ff, r_ff = compute_pairwise_node_gli(A, B, signed=signed, far_field_tol=TOL)
+    np.testing.assert_array_equal(r_ff, r)
+    assert np.abs(g_ff - g).max() <= bound
+    assert np.abs(g_ff - g).max() > 0
+
+    exact = MgliConfig(signed=signed, stats=["mean", "max", "min"])
+    approx = MgliConfig(signed=signed, stats=["mean", "max", "min"], far_field_tol=TOL)
+    d = global_mgli_descriptor(A, B, exact)
+    d_ff = global_mgli_descriptor(A, B, approx)
+    assert d_ff.shape == d.shape
+    assert np.abs(d_ff - d).max() <= bound
@@ -0,0 +1,140 @@
+"""
+Structure arrays and the Node / Segment / Curve views over them
+Structure数组及其上的Node/Segment/Curve视图
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.core.geometry import Curve, Node, Segment, Structure, _Column
+from gaussbio3d.core.neighbors import structure_cell_list
+
+
+def incidence_dict(struct):
+    """node id -> segment ids, rebuilt from the segment views / 由线段视图重建的节点ID -> 线段ID"""
+    out = {}
+    for k, seg in enumerate(struct.segments):
+        for nid in (seg.start_node_id, seg.end_node_id):
+            if nid is not None:
+                out.setdefault(nid, []).append(k)
+    return out
+
+
+def test_node_view_writes_reach_the_arrays(chain):
+    st = chain(12, 1)
+    grid = structure_cell_list(st, 4.0)
+    node = st.nodes[3]
+    node.coord = [1.0, 2.0, 3.0]
+    np.testing.assert_array_equal(st.coords[3], [1.0, 2.0, 3.0])
+    # coordinate edits drop cached grids / 修改坐标会丢弃缓存的网格
+    assert structure_cell_list(st, 4.0) is not grid
+    node.coord[2] = 7.0
+    assert st.coords[3, 2] == 7.0
+    node.element = "Fe"
+    node.group = "metal"
+    node.id = 42
+    assert st.vocab[st.element_codes[3]] == "Fe"
+    assert st.vocab[st.group_codes[3]] == "metal"
+    assert st.node_ids[3] == 42
+    assert st.nodes[-9].element == "Fe"
+
+    node.metadata["resname"] = "HEM"
+    node.metadata["charge"] = 2
+    assert st.node_metadata("resname") == [None] * 3 + ["HEM"] + [None] * 8
+    assert dict(st.nodes[3].metadata) == {"resname": "HEM", "charge": 2}
+    del node.metadata["charge"]
+    assert "charge" not in st.nodes[3].metadata
+    assert st.node_metadata("charge", default=0)[3] == 0
+    with pytest.raises(KeyError):
+        del node.metadata["charge"]
+    with pytest.raises(IndexError):
+        st.nodes[12]
+
+
+def test_standalone_objects_are_copied_in():
+    st = Structure()
+    coord = np.array([0.0, 1.0, 2.0])
+    meta = {"resid": 5}
+    node = Node(id=0, coord=coord, element="C", group="g", metadata=meta)
+    st.add_node(node)
+    coord[0] = 99.0
+    meta["resid"] = 6
+    node.element = "N"
+    np.testing.assert_array_equal(st.coords[0], [0.0, 1.0, 2.0])
+    assert st.nodes[0].metadata["resid"] == 5
+    assert st.nodes[0].element == "C"
+
+
+def test_grow_keeps_earlier_nodes():
+    st = Structure()
+    pts = np.random.default_rng(2).normal(size=(100, 3))
+    for i, p in enumerate(pts):
+        st.add_node(Node(id=i, coord=p, element="CN"[i % 2], metadata={"k": i}))
+    np.testing.assert_array_equal(st.coords, pts)
+    assert st.node_metadata("k") == list(range(100))
+    assert [n.element for n in st.nodes[:4]] == ["C", "N", "C", "N"]
+
+
+@pytest.mark.parametrize("open_ends", [False, True])
+def test_node_segment_csr_matches_rebuilt_dict(chain, open_ends):
+    st = chain(25, 3, open_ends=open_ends)
+    # ligand-style half-bonds with -1 ends / 末端为-1的配体式半键
+    pts = st.coords
+    half = []
+    for i, j in [(0, 5), (5, 9), (9, 20)]:
+        mid = 0.5 * (pts[i] + pts[j])
+        half += [Segment(pts[i], mid, i, None), Segment(mid, pts[j], None, j)]
+    st.add_curve(Curve(half, "bonds"))
+    assert (st.segment_node_ids == -1).any()
+
+    want = incidence_dict(st)
+    ptr, seg_ids = st.node_segment_csr()
+    assert ptr.shape == (st.n_nodes + 1,)
+    got = {i: seg_ids[ptr[i]:ptr[i + 1]].tolist() for i in range(st.n_nodes) if ptr[i + 1] > ptr[i]}
+    assert got == want
+    assert sorted(st.node_segments) == sorted(want)
+    for nid, segs in st.node_segments.items():
+        assert [(s.start_node_id, s.end_node_id) for s in segs] == [
+            (st.segments[k].start_node_id, st.segments[k].end_node_id) for k in want[nid]
+        ]
+    # a segment with both ends on one node is listed twice / 两端在同一节点的线段列出两次
+    if not open_ends:
+        assert want[0].count(st.curves[1].segment_range[0]) == 2
+
+    # the index follows later curves / 索引随后续曲线更新
+    st.add_curve(Curve([Segment(pts[1], pts[2], 1, 2)], "extra"))
+    ptr, seg_ids = st.node_segment_csr()
+    assert seg_ids[ptr[2]:ptr[3]].tolist() == incidence_dict(st)[2]
+
+
+def test_segment_and_curve_views(chain):
+    st = chain(9, 4)
+    backbone, side = st.curves
+    assert backbone.curve_type == "backbone" and side.curve_type == "side"
+    assert backbone.segment_range == (0, 8)
+    seg = backbone.segments[2]
+    np.testing.assert_array_equal(seg.start, st.coords[2])
+    np.testing.assert_array_equal(seg.end, st.coords[3])
+    assert (seg.start_node_id, seg.end_node_id) == (2, 3)
+    assert side.segments[0].end_node_id is None
+    assert len(st.segments) == st.n_segments == 8 + 3
+
+
+def test_column_keeps_equal_values_of_different_types():
+    col = _Column(0)
+    col.extend(0, [1, 1.0, True, 1, [1], [1], "1"], 7)
+    values = [col.get(i) for i in range(7)]
+    assert [type(v) for v in values] == [int, float, bool, int, list, list, str]
+    assert col.codes[0] == col.codes[3]
+    assert len({col.codes[0], col.codes[1], col.codes[2], col.codes[6]}) == 4
+    # unhashable values are stored one by one / 不可哈希的值逐个存储
+    assert col.codes[4] != col.codes[5]
+
+
+def test_node_metadata_keeps_value_types(chain):
+    st = chain(6, 5)
+    for node, v in zip(st.nodes, [1, 1.0, True, 0, 0.0, False]):
+        node.metadata["v"] = v
+    got = st.node_metadata("v")
+    assert got == [1, 1.0, True, 0, 0.0, False]
+    assert [type(v) for v in got] == [int, float, bool, int, float, bool]
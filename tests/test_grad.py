@@ -0,0 +1,147 @@
+"""
+Analytic GLI gradients against central finite differences
+解析GLI梯度与中心有限差分的对比
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.core.geometry import Curve, Node, Segment, Structure
+from gaussbio3d.core.gli_grad import gli_segment_matrix_vjp, gli_segment_matrix_vjp_accel
+from gaussbio3d.core.gli_segment import gli_segment_matrix
+from gaussbio3d.core.pairwise_gli import compute_pairwise_node_gli_grad
+
+H = 1e-6
+
+VJPS = [gli_segment_matrix_vjp, gli_segment_matrix_vjp_accel]
+
+
+def _segments(rng, n, offset):
+    a0 = rng.normal(0.0, 2.0, (n, 3)) + offset
+    return a0, a0 + rng.normal(0.0, 1.5, (n, 3))
+
+
+@pytest.mark.parametrize("vjp", VJPS, ids=["numpy", "numba"])
+@pytest.mark.parametrize("signed", [False, True])
+def test_segment_vjp_matches_finite_differences(vjp, signed):
+    rng = np.random.default_rng(0)
+    A0, A1 = _segments(rng, 5, 0.0)
+    B0, B1 = _segments(rng, 4, 3.0)
+    W = rng.normal(size=(5, 4))
+    G, *grads = vjp(A0, A1, B0, B1, W, signed=signed)
+    assert np.allclose(G, gli_segment_matrix(A0, A1, B0, B1, signed=signed), atol=1e-12)
+
+    def loss(*ends):
+        return np.sum(W * gli_segment_matrix(*ends, signed=signed))
+
+    ends = [A0, A1, B0, B1]
+    for k, grad in enumerate(grads):
+        fd = np.zeros_like(grad)
+        for idx in np.ndindex(*grad.shape):
+            plus = [e.copy() for e in ends]
+            minus = [e.copy() for e in ends]
+            plus[k][idx] += H
+            minus[k][idx] -= H
+            fd[idx] = (loss(*plus) - loss(*minus)) / (2 * H)
+        assert np.allclose(grad, fd, atol=1e-6, rtol=1e-5)
+
+
+def test_numba_vjp_matches_numpy():
+    rng = np.random.default_rng(1)
+    A0, A1 = _segments(rng, 30, 0.0)
+    B0, B1 = _segments(rng, 20, 2.0)
+    W = rng.normal(size=(30, 20))
+    for signed in (False, True):
+        ref = gli_segment_matrix_vjp(A0, A1, B0, B1, W, signed=signed)
+        out = gli_segment_matrix_vjp_accel(A0, A1, B0, B1, W, signed=signed)
+        for r, o in zip(ref, out):
+            assert np.allclose(r, o, atol=1e-10)
+
+
+def chain_with_tips(pts, tips):
+    """
+    Backbone through ``pts`` plus side segments from every fourth node to a
+    fixed open end in ``tips``.
+    经过 ``pts`` 的主链，以及每四个节点到 ``tips`` 中固定开放端点的侧链线段。
+    """
+    st = Structure()
+    for i, p in enumerate(pts):
+        st.add_node(Node(id=i, coord=p, element="C"))
+    st.add_curve(Curve([Segment(pts[i], pts[i + 1], i, i + 1) for i in range(len(pts) - 1)], "backbone"))
+    st.add_curve(Curve([Segment(pts[i], tips[k], i, None) for k, i in enumerate(range(0, len(pts), 4))], "side"))
+    return st
+
+
+def half_bonds(pts, bonds):
+    """
+    Ligand-style graph: each bond (i, j) becomes two half-bonds meeting at
+    an unnamed midpoint.
+    配体式图：每个键 (i, j) 变为在无名中点相交的两个半键。
+    """
+    st = Structure()
+    for i, p in enumerate(pts):
+        st.add_node(Node(id=i, coord=p, element="C"))
+    segs = []
+    for i, j in bonds:
+        mid = 0.5 * (pts[i] + pts[j])
+        segs += [Segment(pts[i], mid, i, None), Segment(pts[j], mid, j, None)]
+    st.add_curve(Curve(segs, "bonds"))
+    return st
+
+
+def _node_fd(build, pts, loss, nodes, h=H):
+    fd = np.zeros((len(nodes), 3))
+    for r, i in enumerate(nodes):
+        for ax in range(3):
+            plus, minus = pts.copy(), pts.copy()
+            plus[i, ax] += h
+            minus[i, ax] -= h
+            fd[r, ax] = (loss(build(plus)) - loss(build(minus))) / (2 * h)
+    return fd
+
+
+@pytest.mark.parametrize("signed", [False, True])
+@pytest.mark.parametrize("agg", ["mean", "sum"])
+def test_cross_node_gradient(signed, agg):
+    rng = np.random.default_rng(2)
+    pa = np.cumsum(rng.normal(0.0, 1.5, (12, 3)), axis=0)
+    pb = np.cumsum(rng.normal(0.0, 1.5, (9, 3)), axis=0) + 2.0
+    ta = pa[::4] + rng.normal(0.0, 1.0, (3, 3))
+    tb = pb[::4] + rng.normal(0.0, 1.0, (3, 3))
+    A, B = chain_with_tips(pa, ta), chain_with_tips(pb, tb)
+    W = rng.normal(size=(12, 9))
+    _, gA, gB = compute_pairwise_node_gli_grad(A, B, grad_output=W, signed=signed, agg=agg)
+
+    def loss_pair(a, b):
+        g, _, _ = compute_pairwise_node_gli_grad(a, b, signed=signed, agg=agg)
+        return np.sum(W * g)
+
+    nodes = [0, 3, 4, 8, 11]
+    # open side-chain tips stay fixed in absolute coordinates / 开放侧链端点在绝对坐标中保持固定
+    fd_A = _node_fd(lambda p: chain_with_tips(p, ta), pa, lambda a: loss_pair(a, B), nodes)
+    fd_B = _node_fd(lambda p: chain_with_tips(p, tb), pb, lambda b: loss_pair(A, b), nodes[:4])
+    assert np.allclose(gA[nodes], fd_A, atol=1e-6, rtol=1e-5)
+    assert np.allclose(gB[nodes[:4]], fd_B, atol=1e-6, rtol=1e-5)
+
+
+@pytest.mark.parametrize("signed", [False, True])
+def test_self_half_bond_node_gradient(signed):
+    rng = np.random.default_rng(3)
+    pts = rng.normal(0.0, 2.0, (8, 3))
+    bonds = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (6, 7), (2, 6)]
+    S = half_bonds(pts, bonds)
+    W = rng.normal(size=(8, 8))
+    gij, gA, gB = compute_pairwise_node_gli_grad(S, None, grad_output=W, signed=signed)
+    assert np.allclose(gA, gB)
+    assert np.abs(gij).max() > 0
+
+    def loss(s):
+        g, _, _ = compute_pairwise_node_gli_grad(s, None, signed=signed)
+        return np.sum(W * g)
+
+    # midpoints follow both of their nodes; half-bonds around one node are
+    # coplanar, where the kernel rounds to ~1e-9 instead of 0, so use a
+    # wider step / 中点随其两个节点移动；同一节点周围的半键共面，内核在此舍入为约1e-9
+    # 而非0，因此使用更大的步长
+    fd = _node_fd(lambda p: half_bonds(p, bonds), pts, loss, range(8), h=1e-3)
+    assert np.allclose(gA, fd, atol=5e-5, rtol=1e-4)
@@ -0,0 +1,103 @@
+"""
+Pocket / interface sub-structures against the full structures
+口袋/界面子结构与完整结构的对比
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.config import MgliConfig
+from gaussbio3d.core.pairwise_gli import compute_pairwise_node_gli
+from gaussbio3d.core.sparse import SparsePairs
+from gaussbio3d.features.context import PairContext
+from gaussbio3d.features.neighborhood import expand_pairs, expand_rows, neighborhood
+from gaussbio3d.tasks import dti, ppi
+
+OPTIONS = [
+    dict(max_distance=6.0, distance_bins=[0.0, 2.0, 4.0, 6.0]),
+    dict(max_distance=6.0, distance_bins=[0.0, 2.0, 4.0, 6.0], signed=True, stats=["mean", "median", "max"]),
+    dict(max_distance=6.0, distance_bins=[0.0, 2.0, 4.0, 6.0], sparse_pairs=True),
+]
+
+
+def _dense(x):
+    return x.to_dense()[0] if isinstance(x, SparsePairs) else np.asarray(x)
+
+
+@pytest.fixture
+def complex_(chain):
+    prot = chain(300, 31)
+    lig = chain(20, 32, shift=prot.coords[150])
+    partner = chain(200, 33, shift=prot.coords[150] - [0.0, 0.0, 2.0])
+    return prot, lig, partner
+
+
+@pytest.mark.parametrize("signed", [False, True])
+@pytest.mark.parametrize("max_distance", [None, 5.0])
+def test_within_rows_equal_parent_rows(complex_, signed, max_distance):
+    prot, lig, _ = complex_
+    sub = prot.within(lig, 6.0)
+    assert 0 < sub.n_nodes < prot.n_nodes
+    assert sub.parent is prot
+    np.testing.assert_array_equal(sub.coords, prot.coords[sub.parent_index])
+    g, r = compute_pairwise_node_gli(prot, lig, signed=signed, max_distance=max_distance)
+    g_sub, r_sub = compute_pairwise_node_gli(sub, lig, signed=signed, max_distance=max_distance)
+    np.testing.assert_allclose(g_sub, g[sub.parent_index], rtol=0.0, atol=1e-12)
+    np.testing.assert_array_equal(r_sub, r[sub.parent_index])
+    np.testing.assert_allclose(expand_pairs(g_sub, sub, lig)[sub.parent_index], g[sub.parent_index], atol=1e-12)
+
+
+def test_within_keeps_incident_segments(complex_):
+    prot, lig, _ = complex_
+    sub = prot.within(lig, 6.0)
+    ptr, seg = prot.node_segment_csr()
+    sptr, sseg = sub.node_segment_csr()
+    for k, i in enumerate(sub.parent_index):
+        full = seg[ptr[i]:ptr[i + 1]]
+        kept = sseg[sptr[k]:sptr[k + 1]]
+        np.testing.assert_array_equal(sub.segment_starts[kept], prot.segment_starts[full])
+        np.testing.assert_array_equal(sub.segment_ends[kept], prot.segment_ends[full])
+
+
+def test_empty_neighborhood(complex_):
+    prot, lig, _ = complex_
+    sub = prot.within(lig.coords + 1000.0, 6.0)
+    assert sub.n_nodes == 0 and sub.n_segments == 0
+    np.testing.assert_array_equal(expand_rows(np.zeros((0, 4)), sub), np.zeros((prot.n_nodes, 4)))
+
+
+def _serve(monkeypatch, structures):
+    """Make the task builders return prepared structures / 让任务构建函数返回预先准备的结构"""
+    monkeypatch.setattr(dti.Protein, "from_pdb", classmethod(lambda cls, path, chain_id=None, cache=None: structures[path]))
+    monkeypatch.setattr(dti.Ligand, "from_sdf", classmethod(lambda cls, path, cache=None: structures[path]))
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_dti_pocket_matches_full_protein(complex_, monkeypatch, options):
+    prot, lig, _ = complex_
+    config = MgliConfig(**options)
+    assert 0 < neighborhood(prot, lig, config).n_nodes < prot.n_nodes
+    _serve(monkeypatch, {"p.pdb": prot, "l.sdf": lig})
+    out = dti.compute_dti_features("p.pdb", sdf_path="l.sdf", config=config)
+    full = PairContext(prot, lig, config)
+    assert out["global_feat"].shape == full.descriptor().shape
+    np.testing.assert_allclose(out["global_feat"], full.descriptor(), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(out["prot_node_feat"], full.node_features("A"), atol=1e-12)
+    np.testing.assert_allclose(out["lig_node_feat"], full.node_features("B"), atol=1e-12)
+    np.testing.assert_allclose(_dense(out["pairwise_mgli"]), _dense(full.pairwise()), atol=1e-12)
+
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_ppi_interface_matches_full_proteins(complex_, monkeypatch, options):
+    prot, _, partner = complex_
+    config = MgliConfig(**options)
+    iface = neighborhood(prot, partner, config)
+    assert 0 < iface.n_nodes < prot.n_nodes
+    assert 0 < neighborhood(partner, iface, config).n_nodes < partner.n_nodes
+    _serve(monkeypatch, {"a.pdb": prot, "b.pdb": partner})
+    out = ppi.compute_ppi_features("a.pdb", "b.pdb", config=config)
+    full = PairContext(prot, partner, config)
+    np.testing.assert_allclose(out["global_feat"], full.descriptor(), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(out["A_node_feat"], full.node_features("A"), atol=1e-12)
+    np.testing.assert_allclose(out["B_node_feat"], full.node_features("B"), atol=1e-12)
+    np.testing.assert_allclose(_dense(out["pairwise_mgli"]), _dense(full.pairwise()), atol=1e-12)
@@ -0,0 +1,107 @@
+"""
+Cell-list neighbor search against brute force
+单元格列表近邻搜索与暴力计算的对比
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.core import neighbors
+from gaussbio3d.core.gli_segment import _HAS_NUMBA
+from gaussbio3d.core.neighbors import CellList, neighbor_pairs, pairwise_distances, structure_cell_list
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def query_path(request, monkeypatch):
+    """Run CellList.query on the numba kernel or the chunked numpy fallback / 使用numba内核或分块numpy回退"""
+    if request.param == "numba":
+        if not _HAS_NUMBA:
+            pytest.skip("numba not installed")
+    else:
+        monkeypatch.setattr(neighbors, "_HAS_NUMBA", False)
+        monkeypatch.setattr(neighbors, "QUERY_CHUNK", 7)
+    return request.param
+
+
+def brute_force(points, coords, cutoff):
+    d = np.linalg.norm(points[:, None, :] - coords[None, :, :], axis=-1)
+    rows = [np.flatnonzero(row <= cutoff) for row in d]
+    ptr = np.concatenate(([0], np.cumsum([r.size for r in rows])))
+    idx = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    dist = np.concatenate([d[i, r] for i, r in enumerate(rows)]) if rows else np.zeros(0)
+    return ptr, idx, dist
+
+
+def assert_same_csr(got, want):
+    np.testing.assert_array_equal(got[0], want[0])
+    np.testing.assert_array_equal(got[1], want[1])
+    np.testing.assert_allclose(got[2], want[2], rtol=0.0, atol=1e-12)
+
+
+@pytest.mark.parametrize("cutoff,radius", [(4.0, None), (4.0, 9.5), (6.0, 2.5)])
+def test_query_matches_brute_force(query_path, cutoff, radius):
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(-10.0, 10.0, (300, 3))
+    points = rng.uniform(-14.0, 14.0, (45, 3))
+    grid = CellList(coords, cutoff)
+    got = grid.query(points, radius)
+    assert_same_csr(got, brute_force(points, coords, cutoff if radius is None else radius))
+
+
+def test_float32_query(query_path):
+    rng = np.random.default_rng(1)
+    coords = rng.uniform(0.0, 20.0, (200, 3)).astype(np.float32)
+    points = rng.uniform(0.0, 20.0, (30, 3)).astype(np.float32)
+    ptr, idx, dist = CellList(coords, 5.0).query(points)
+    assert dist.dtype == np.float32
+    want = brute_force(points, coords, np.float32(5.0))
+    np.testing.assert_array_equal(ptr, want[0])
+    np.testing.assert_array_equal(idx, want[1])
+    np.testing.assert_allclose(dist, want[2], rtol=1e-6)
+
+
+def test_points_at_cutoff_are_included(query_path):
+    coords = np.array([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [0.0, 3.0, 4.0], [0.0, 0.0, 2.5]])
+    points = np.array([[0.0, 0.0, 0.0]])
+    ptr, idx, dist = CellList(coords, 2.0).query(points)
+    np.testing.assert_array_equal(idx, [0, 1])
+    np.testing.assert_array_equal(dist, [0.0, 2.0])
+    ptr, idx, dist = CellList(coords, 2.0).query(points, 5.0)
+    np.testing.assert_array_equal(idx, [0, 1, 2, 3])
+    assert dist[2] == 5.0
+
+
+def test_empty_inputs(query_path):
+    coords = np.random.default_rng(2).normal(size=(10, 3))
+    ptr, idx, dist = CellList(coords, 3.0).query(np.zeros((0, 3)))
+    np.testing.assert_array_equal(ptr, [0])
+    assert idx.size == 0 and dist.size == 0
+    ptr, idx, dist = neighbor_pairs(coords[:4], np.zeros((0, 3)), 3.0)
+    np.testing.assert_array_equal(ptr, np.zeros(5))
+    assert idx.size == 0 and dist.size == 0
+    with pytest.raises(ValueError):
+        CellList(coords, 0.0)
+
+
+def test_structure_cache_follows_set_coords(chain):
+    st = chain(40, 3)
+    grid = structure_cell_list(st, 5.0)
+    assert structure_cell_list(st, 5.0) is grid
+    moved = st.coords + np.random.default_rng(4).normal(0.0, 3.0, st.coords.shape)
+    st.set_coords(moved)
+    fresh = structure_cell_list(st, 5.0)
+    assert fresh is not grid
+    assert fresh.matches(moved)
+    points = np.random.default_rng(5).uniform(-10.0, 10.0, (20, 3))
+    assert_same_csr(fresh.query(points), brute_force(points, moved, 5.0))
+
+
+@pytest.mark.parametrize("max_pairs", [1, 50, 1 << 20])
+def test_pairwise_distances(max_pairs):
+    rng = np.random.default_rng(6)
+    A = rng.normal(size=(23, 3))
+    B = rng.normal(size=(17, 3))
+    d = pairwise_distances(A, B, max_pairs=max_pairs)
+    np.testing.assert_array_equal(d, np.linalg.norm(A[:, None, :] - B[None, :, :], axis=-1))
+    assert pairwise_distances(A[:0], B).shape == (0, 17)
+    assert pairwise_distances(A.astype(np.float32), B.astype(np.float32)).dtype == np.float32
@@ -0,0 +1,92 @@
+"""
+Native PDB/mmCIF readers
+原生PDB/mmCIF读取器
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.io.pdb import load_atom_arrays, load_pdb_atoms
+
+PDB = """\
+HEADER    TEST
+ATOM      1  N   ALA A   1      11.104  13.207   2.100  1.00 20.00           N
+ATOM      2  CA AALA A   1      12.000  14.000   3.000  0.40 20.00           C
+ATOM      3  CA BALA A   1      12.500  14.500   3.500  0.60 20.00           C
+ATOM      4  C   ALA A   1      13.000  15.000   4.000  1.00 20.00
+ATOM      5  N   GLY B   2      -1.000  -2.000  -3.000  1.00 20.00           N
+HETATM    6 FE   LIG A 900       0.125   0.250   0.375  1.00 20.00          FE
+HETATM    7  O   HOH A1000       5.000   5.000   5.000  1.00 20.00           O
+END
+"""
+
+CIF = """\
+data_test
+loop_
+_atom_site.group_PDB
+_atom_site.id
+_atom_site.type_symbol
+_atom_site.label_atom_id
+_atom_site.label_alt_id
+_atom_site.label_comp_id
+_atom_site.label_asym_id
+_atom_site.label_seq_id
+_atom_site.pdbx_PDB_ins_code
+_atom_site.Cartn_x
+_atom_site.Cartn_y
+_atom_site.Cartn_z
+_atom_site.occupancy
+_atom_site.B_iso_or_equiv
+_atom_site.auth_seq_id
+_atom_site.auth_asym_id
+_atom_site.pdbx_PDB_model_num
+ATOM 1 N N . ALA A 1 ? 11.104 13.207 2.100 1.00 20.00 1 A 1
+ATOM 2 C CA A ALA A 1 ? 12.000 14.000 3.000 0.40 20.00 1 A 1
+ATOM 3 C CA B ALA A 1 ? 12.500 14.500 3.500 0.60 20.00 1 A 1
+ATOM 4 C C . ALA A 1 ? 13.000 15.000 4.000 1.00 20.00 1 A 1
+ATOM 5 N N . GLY B 2 ? -1.000 -2.000 -3.000 1.00 20.00 2 B 1
+HETATM 6 Fe FE . LIG A . ? 0.125 0.250 0.375 1.00 20.00 900 A 1
+HETATM 7 O O . HOH A . ? 5.000 5.000 5.000 1.00 20.00 1000 A 1
+#
+"""
+
+
+@pytest.fixture(params=["pdb", "cif"])
+def path(request, tmp_path):
+    p = tmp_path / f"test.{request.param}"
+    p.write_text(PDB if request.param == "pdb" else CIF)
+    return str(p)
+
+
+def test_reads_protein_atoms(path):
+    atoms = load_atom_arrays(path)
+    # the higher-occupancy alternate location is kept / 保留占有率更高的备用位置
+    assert atoms.coords.dtype == np.float32
+    assert np.array_equal(
+        atoms.coords,
+        np.array([[11.104, 13.207, 2.1], [12.5, 14.5, 3.5], [13.0, 15.0, 4.0], [-1.0, -2.0, -3.0]], dtype=np.float32),
+    )
+    assert atoms.elements.tolist() == ["N", "C", "C", "N"]
+    assert atoms.atom_names.tolist() == ["N", "CA", "C", "N"]
+    assert atoms.chain_ids.tolist() == ["A", "A", "A", "B"]
+    assert atoms.resids.tolist() == [1, 1, 1, 2]
+
+
+def test_hetero_residues_and_chain_filter(path):
+    coords, elements, meta = load_pdb_atoms(path, chain_id="A", only_protein=False)
+    assert elements == ["N", "C", "C", "FE", "O"]
+    assert [m["hetflag"] for m in meta] == ["", "", "", "H_LIG", "W"]
+    assert [m["resname"] for m in meta] == ["ALA", "ALA", "ALA", "LIG", "HOH"]
+    assert np.allclose(coords[3], [0.125, 0.25, 0.375])
+
+
+def test_matches_biopython(path):
+    pytest.importorskip("Bio.PDB")
+    from gaussbio3d.io.pdb import _load_pdb_atoms_biopython
+
+    for kw in (dict(), dict(only_protein=False), dict(chain_id="B")):
+        a = load_pdb_atoms(path, **kw)
+        b = _load_pdb_atoms_biopython(path, **kw)
+        assert np.array_equal(a[0], b[0])
+        assert a[1] == b[1]
+        assert a[2] == b[2]
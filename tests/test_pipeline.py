@@ -0,0 +1,53 @@
+"""
+Projectors: incremental PCA against exact PCA, clamping and persistence
+投影器：增量PCA与精确PCA的对比、主成分数截断与持久化
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.core.pipeline import IncrementalPCAProjector, PCAProjector
+
+
+def _exact_pca(X, k):
+    mean = X.mean(axis=0)
+    _, S, Vt = np.linalg.svd(X - mean, full_matrices=False)
+    return (X - mean) @ Vt[:k].T, S[:k] ** 2 / (X.shape[0] - 1)
+
+
+@pytest.fixture
+def X():
+    rng = np.random.default_rng(0)
+    # low-rank signal plus noise / 低秩信号加噪声
+    return rng.normal(size=(300, 6)) @ rng.normal(size=(6, 40)) * 3.0 + rng.normal(size=(300, 40)) * 0.01
+
+
+def test_incremental_matches_exact_pca(X):
+    proj = IncrementalPCAProjector(n_components=6, whiten=False, batch_size=37).fit(X)
+    ref, var = _exact_pca(X, 6)
+    Y = proj.transform(X)
+    # components are defined up to sign / 主成分仅在符号意义下确定
+    Y = Y * np.sign(np.sum(Y * ref, axis=0))
+    assert np.allclose(Y, ref, atol=1e-6 * np.abs(ref).max())
+    assert np.allclose(proj.explained_variance_, var, rtol=1e-6)
+
+
+def test_state_round_trip(X, tmp_path):
+    proj = IncrementalPCAProjector(n_components=4).fit(X)
+    path = proj.save(str(tmp_path / "proj.npz"))
+    loaded = IncrementalPCAProjector.load(path)
+    assert np.array_equal(loaded.transform(X), proj.transform(X))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_pca_projector_clamps_components(X):
+    proj = PCAProjector(n_components=256)
+    with pytest.warns(UserWarning, match="n_components=256"):
+        proj.fit(X[:20])
+    assert proj.n_components_ == 20
+    assert proj.transform(X).shape == (300, 20)
+
+
+def test_pca_projector_rejects_empty():
+    with pytest.raises(ValueError):
+        PCAProjector(n_components=2).fit(np.zeros((0, 5)))
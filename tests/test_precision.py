@@ -0,0 +1,48 @@
+"""
+float32 precision mode against the float64 reference
+float32精度模式与float64参考的对比
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.core.backends import available_backends, get_backend
+from gaussbio3d.core.pairwise_gli import compute_pairwise_node_gli, float32_origin
+
+# Documented bound (MgliConfig.dtype): |ΔGLI| <= 2e-4 per segment pair
+# 文档中的误差界（MgliConfig.dtype）：每个线段对 |ΔGLI| <= 2e-4
+BOUND = 2e-4
+
+# PDB-scale coordinates far from the origin / 远离原点的PDB尺度坐标
+FAR = np.array([812.0, -455.0, 1203.0])
+
+BACKENDS = [name for name in ("numpy", "numba") if name in available_backends()]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("signed", [False, True])
+def test_segment_pairs_within_bound(chain, backend, signed):
+    A = chain(80, 1, shift=FAR)
+    B = chain(60, 2, shift=FAR + 4.0)
+    fn = get_backend(backend).matrix
+    ref = fn(A.segment_starts, A.segment_ends, B.segment_starts, B.segment_ends, signed=signed)
+    # the float32 path re-centers before casting / float32路径在转换前重新居中
+    origin = float32_origin(A.coords, np.dtype(np.float32))
+    cast = [(x - origin).astype(np.float32) for x in (A.segment_starts, A.segment_ends, B.segment_starts, B.segment_ends)]
+    out = fn(*cast, signed=signed)
+    assert out.dtype == np.float32
+    assert np.isfinite(out).all()
+    assert np.abs(out.astype(np.float64) - ref).max() <= BOUND
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("self_mode", [False, True])
+def test_node_gli_within_bound(chain, backend, self_mode):
+    A = chain(90, 3, shift=FAR)
+    B = None if self_mode else chain(70, 4, shift=FAR + 3.0)
+    g64, r64 = compute_pairwise_node_gli(A, B, signed=True, backend=backend, dtype="float64")
+    g32, r32 = compute_pairwise_node_gli(A, B, signed=True, backend=backend, dtype="float32")
+    assert g32.dtype == np.float32 and r32.dtype == np.float32
+    # node values are means over segment pairs / 节点值为线段对的平均
+    assert np.abs(g32.astype(np.float64) - g64).max() <= BOUND
+    assert np.abs(r32.astype(np.float64) - r64).max() <= 1e-3
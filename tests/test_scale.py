@@ -0,0 +1,46 @@
+"""
+Radial scale schemes
+径向尺度方案
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.config import MgliConfig
+from gaussbio3d.core.scale import BinningScaleScheme, RBFScaleScheme, scale_scheme
+
+
+@pytest.mark.parametrize("centers", [[5.0], [5.0, 5.0], [2.0, 2.0, 2.0]])
+def test_rbf_sigma_falls_back_for_single_or_repeated_centers(centers):
+    scheme = RBFScaleScheme(centers)
+    assert scheme.sigma == 1.0
+    r = np.linspace(0.0, 10.0, 11)
+    idx, ks, w = scheme.entries(r)
+    assert np.isfinite(w).all()
+    assert scheme.support() > max(centers)
+
+
+def test_rbf_config_with_repeated_centers():
+    scheme = scale_scheme(MgliConfig(distance_bins=[5.0, 5.0], use_rbf=True))
+    for _, mask, w in scheme.masks(np.array([4.0, 5.0, 6.0])):
+        assert mask.all() and np.isfinite(w).all()
+
+
+@pytest.mark.parametrize("sigma", [0.0, -1.0])
+def test_rbf_rejects_nonpositive_sigma(sigma):
+    with pytest.raises(ValueError, match="sigma"):
+        RBFScaleScheme([1.0, 2.0], sigma=sigma)
+
+
+def test_entries_match_masks():
+    r = np.random.default_rng(0).uniform(0.0, 12.0, 500)
+    for scheme in (
+        BinningScaleScheme([0.0, 3.0, 6.0, 10.0]),
+        RBFScaleScheme([2.0, 5.0, 8.0], sigma=1.5, cutoff=2.0),
+    ):
+        idx, ks, w = scheme.entries(r)
+        for k, mask, wk in scheme.masks(r):
+            sel = idx[ks == k]
+            assert np.array_equal(sel, np.flatnonzero(mask))
+            if w is not None:
+                assert np.allclose(w[ks == k], wk[mask])
@@ -0,0 +1,94 @@
+"""
+FeatureSchema columns against per-complex descriptors
+FeatureSchema列与逐复合物描述符的对比
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.config import MgliConfig
+from gaussbio3d.features.descriptor import _build_group_indices, global_mgli_descriptor
+from gaussbio3d.features.schema import OTHER, FeatureSchema, descriptor_batch
+
+
+@pytest.fixture
+def pairs(chain):
+    # each complex covers different element groups / 各复合物覆盖不同的元素组
+    return [
+        (chain(40, 1, elements="CN"), chain(15, 2, elements="OP", shift=2.0)),
+        (chain(35, 3, elements="CO"), chain(12, 4, elements="PS", shift=2.0)),
+        (chain(30, 5, elements="NS"), None),
+    ]
+
+
+def _cells(A, B, config):
+    """Descriptor of one complex by (group_A, group_B) name / 按 (组A, 组B) 名称索引的单个复合物描述符"""
+    B_ = A if B is None else B
+    ga, _ = _build_group_indices(A, config.group_mode_A)
+    gb, _ = _build_group_indices(B_, config.group_mode_B)
+    feat = global_mgli_descriptor(A, B, config)
+    cube = feat.reshape(len(ga), len(gb), -1)
+    return {(a, b): cube[i, j] for a, i in ga.items() for b, j in gb.items()}
+
+
+@pytest.mark.parametrize("options", [dict(), dict(max_distance=8.0, sparse_pairs=True, distance_bins=[0.0, 4.0, 8.0])])
+def test_batch_places_each_complex_in_fixed_columns(pairs, options):
+    config = MgliConfig(**options)
+    schema = FeatureSchema.from_structures(config, pairs)
+    assert sorted(schema.groups_A) == ["C", "N", "O", "S"]
+    assert sorted(schema.groups_B) == ["N", "O", "P", "S"]
+    batch = descriptor_batch(pairs, config, schema)
+    assert batch.shape == (3, schema.n_features)
+    G_A, G_B, K, S = schema.shape
+    for row, (A, B) in zip(batch, pairs):
+        cube = row.reshape(G_A, G_B, K * S)
+        cells = _cells(A, B, config)
+        for (a, b), values in cells.items():
+            np.testing.assert_allclose(cube[schema.names_A.index(a), schema.names_B.index(b)], values, atol=1e-12)
+        # groups absent from this complex stay zero / 本复合物中不存在的组保持为0
+        present = np.zeros((G_A, G_B), dtype=bool)
+        for a, b in cells:
+            present[schema.names_A.index(a), schema.names_B.index(b)] = True
+        assert not cube[~present].any()
+    # columns() and column() follow the same layout / columns() 与 column() 使用相同布局
+    names = schema.columns()
+    assert names[schema.column("N", "S", K - 1, config.stats[-1])] == f"N|S|{K - 1}|{config.stats[-1]}"
+
+
+def test_catch_all_group(pairs):
+    config = MgliConfig(stats=["sum", "max"])
+    # "P" and "S" of side B both fall into its catch-all / B侧的 "P" 与 "S" 均归入兜底组
+    schema = FeatureSchema.from_config(config, ["C", "O"], ["Q"])
+    A, B = pairs[1]
+    row = descriptor_batch([(A, B)], config, schema)[0]
+    G_A, G_B, K, S = schema.shape
+    cube = row.reshape(G_A, G_B, K, S)
+    cells = {key: v.reshape(K, S) for key, v in _cells(A, B, config).items()}
+    star = schema.names_B.index(OTHER)
+    assert not cube[:, schema.names_B.index("Q")].any()
+    for a in ("C", "O"):
+        merged = cube[schema.names_A.index(a), star]
+        np.testing.assert_allclose(merged[:, 0], cells[(a, "P")][:, 0] + cells[(a, "S")][:, 0], atol=1e-12)
+        np.testing.assert_allclose(merged[:, 1], np.maximum(cells[(a, "P")][:, 1], cells[(a, "S")][:, 1]), atol=1e-12)
+
+    strict = FeatureSchema.from_config(config, ["C", "O"], ["Q"], other=False)
+    with pytest.raises(ValueError):
+        descriptor_batch([(A, B)], config, strict)
+
+
+def test_schema_round_trip_and_check(pairs, tmp_path):
+    config = MgliConfig(signed=True)
+    schema = FeatureSchema.from_structures(config, pairs)
+    loaded = FeatureSchema.load(schema.save(str(tmp_path / "schema.json")))
+    assert loaded == schema
+    assert loaded.make_config(n_jobs=2).n_jobs == 2
+    np.testing.assert_array_equal(descriptor_batch(pairs, loaded.make_config(), loaded), descriptor_batch(pairs, config, schema))
+    with pytest.raises(ValueError, match="signed"):
+        descriptor_batch(pairs, MgliConfig(), schema)
+    # execution options do not change the layout / 执行选项不改变布局
+    schema.check(MgliConfig(signed=True, n_jobs=4, memory_budget="1MB"))
+    out = schema.allocate(4)
+    with pytest.raises(ValueError):
+        descriptor_batch(pairs, config, schema, out=out)
+    with pytest.raises(ValueError):
+        FeatureSchema.from_config(config, ["C", OTHER])
@@ -0,0 +1,63 @@
+"""
+Sparse-pair features against the dense path
+稀疏节点对特征与稠密路径的对比
+"""
+
+import numpy as np
+import pytest
+
+from gaussbio3d.config import MgliConfig
+from gaussbio3d.features.descriptor import global_mgli_descriptor
+from gaussbio3d.features.neighborhood import interaction_radius
+from gaussbio3d.features.node_features import node_mgli_features
+
+STATS = ["mean", "min", "max", "median", "std", "sum"]
+
+
+@pytest.fixture
+def pair(chain):
+    return chain(90, 11), chain(50, 12, shift=2.0)
+
+
+@pytest.mark.parametrize(
+    "scales",
+    [
+        dict(distance_bins=[0.0, 3.0, 6.0, 8.0]),
+        dict(distance_bins=[2.0, 4.0, 6.0], use_rbf=True, rbf_sigma=1.0, rbf_cutoff=2.0),
+    ],
+)
+@pytest.mark.parametrize("self_mode", [False, True])
+def test_sparse_matches_dense_within_support(pair, scales, self_mode):
+    A, B = pair
+    B = None if self_mode else B
+    dense = MgliConfig(max_distance=8.0, stats=STATS, **scales)
+    sparse = MgliConfig(max_distance=8.0, stats=STATS, sparse_pairs=True, **scales)
+    assert np.allclose(global_mgli_descriptor(A, B, sparse), global_mgli_descriptor(A, B, dense), atol=1e-12)
+    assert np.allclose(node_mgli_features(A, B, sparse), node_mgli_features(A, B, dense), atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "scales",
+    [
+        dict(distance_bins=[0.0, 3.0, 6.0, 10.0, 20.0]),
+        dict(distance_bins=[2.0, 4.0, 6.0], use_rbf=True),
+    ],
+)
+def test_sparse_beyond_support_raises(pair, scales):
+    # pairs between max_distance and the last scale would be dropped
+    # max_distance与最后一个尺度之间的节点对会被丢弃
+    A, B = pair
+    config = MgliConfig(max_distance=12.0, sparse_pairs=True, **scales)
+    with pytest.raises(ValueError, match="max_distance"):
+        global_mgli_descriptor(A, B, config)
+    with pytest.raises(ValueError, match="max_distance"):
+        node_mgli_features(A, B, config)
+    with pytest.raises(ValueError, match="max_distance"):
+        interaction_radius(config)
+
+
+def test_sparse_without_cutoff_stores_every_pair(pair):
+    A, B = pair
+    kw = dict(distance_bins=[0.0, 3.0, 6.0, 10.0, 20.0], stats=STATS)
+    dense, sparse = MgliConfig(**kw), MgliConfig(sparse_pairs=True, **kw)
+    assert np.allclose(global_mgli_descriptor(A, B, sparse), global_mgli_descriptor(A, B, dense), atol=1e-12)
@@ -0,0 +1,138 @@
+"""
+Binary structure files and the parse cache
+二进制结构文件与解析缓存
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from gaussbio3d.core.geometry import Structure
+from gaussbio3d.io.structure_file import load_structure, read_header, save_structure
+from gaussbio3d.molecules.protein import Protein
+
+PDB = """\
+ATOM      1  N   ALA A   1      11.104  13.207   2.100  1.00 20.00           N
+ATOM      2  CA  ALA A   1      12.000  14.000   3.000  1.00 20.00           C
+ATOM      3  C   ALA A   1      13.000  15.000   4.000  1.00 20.00           C
+ATOM      4  N   GLY A   2      14.000  15.500   4.500  1.00 20.00           N
+ATOM      5  CA  GLY A   2      15.000  16.000   5.000  1.00 20.00           C
+ATOM      6  C   GLY A   2      16.000  16.500   5.500  1.00 20.00           C
+ATOM      7  N   LEU A   3      17.000  17.000   6.000  1.00 20.00           N
+ATOM      8  CA  LEU A   3      18.000  17.500   6.500  1.00 20.00           C
+ATOM      9  CB  LEU A   3      18.500  18.500   7.000  1.00 20.00           C
+END
+"""
+
+
+@pytest.fixture
+def built(chain):
+    st = chain(30, 7)
+    st.metadata.update(name="chain", tags=["a", "b"])
+    for i, node in enumerate(st.nodes):
+        node.metadata["resid"] = i // 3
+        if i % 5 == 0:
+            node.metadata["flag"] = [True, 1, 1.0][i % 3]
+    return st
+
+
+def assert_same(a, b):
+    np.testing.assert_array_equal(b.coords, a.coords)
+    np.testing.assert_array_equal(b.node_ids, a.node_ids)
+    np.testing.assert_array_equal(b.segment_starts, a.segment_starts)
+    np.testing.assert_array_equal(b.segment_ends, a.segment_ends)
+    np.testing.assert_array_equal(b.segment_node_ids, a.segment_node_ids)
+    for x, y in zip(a.node_segment_csr(), b.node_segment_csr()):
+        np.testing.assert_array_equal(y, x)
+    assert [n.element for n in b.nodes] == [n.element for n in a.nodes]
+    assert [n.group for n in b.nodes] == [n.group for n in a.nodes]
+    assert b.metadata == a.metadata
+    for key in ("resid", "flag"):
+        got, want = b.node_metadata(key), a.node_metadata(key)
+        assert got == want
+        assert [type(v) for v in got] == [type(v) for v in want]
+    assert [c.curve_type for c in b.curves] == [c.curve_type for c in a.curves]
+
+
+def assert_same_protein(a, b):
+    np.testing.assert_array_equal(b.coords, a.coords)
+    np.testing.assert_array_equal(b.segment_node_ids, a.segment_node_ids)
+    assert [n.group for n in b.nodes] == [n.group for n in a.nodes]
+    assert b.node_metadata("resname") == a.node_metadata("resname")
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(built, tmp_path, mmap):
+    path = save_structure(built, str(tmp_path / "s.gb3d"), extra=dict(note=1))
+    assert read_header(path)["extra"] == dict(note=1)
+    out = load_structure(path, mmap=mmap)
+    assert type(out) is Structure
+    assert isinstance(out._coords, np.memmap) == mmap
+    assert_same(built, out)
+
+
+def test_writes_stay_private_to_the_mapping(built, tmp_path):
+    path = built.save(str(tmp_path / "s.gb3d"))
+    out = Structure.load(path)
+    moved = out.coords + 1.0
+    out.set_coords(moved)
+    out.nodes[0].coord = [9.0, 9.0, 9.0]
+    out.nodes[1].metadata["resid"] = 99
+    np.testing.assert_array_equal(out.coords[1:], moved[1:])
+    np.testing.assert_array_equal(out.coords[0], [9.0, 9.0, 9.0])
+    assert out.node_metadata("resid")[1] == 99
+    # the file keeps the saved values / 文件保持保存时的数值
+    again = Structure.load(path)
+    assert_same(built, again)
+    # growing a mapped structure copies it out of the mapping / 扩展映射结构会将其复制出映射
+    out.add_nodes(np.zeros((2, 3)), ["C", "N"])
+    assert out.n_nodes == built.n_nodes + 2
+    assert_same(built, Structure.load(path))
+
+
+def test_load_as_subclass(built, tmp_path):
+    path = save_structure(built, str(tmp_path / "s.gb3d"))
+    assert type(load_structure(path, cls=Protein)) is Protein
+    assert type(Protein.load(path)) is Protein
+    assert_same(built, Protein.load(path))
+    prot = Protein()
+    prot.add_nodes(built.coords, ["C"] * built.n_nodes)
+    p2 = save_structure(prot, str(tmp_path / "p.gb3d"))
+    # the saved class is restored by default / 默认恢复保存时的类
+    assert type(load_structure(p2)) is Protein
+
+
+def test_parse_cache_follows_the_source(tmp_path, monkeypatch):
+    src = tmp_path / "p.pdb"
+    src.write_text(PDB)
+    cache = str(tmp_path / "cache")
+    calls = []
+    build = Protein._build_from_pdb.__func__
+
+    def counted(cls, path, chain_id):
+        calls.append(path)
+        return build(cls, path, chain_id)
+
+    monkeypatch.setattr(Protein, "_build_from_pdb", classmethod(counted))
+    first = Protein.from_pdb(str(src), cache=cache)
+    second = Protein.from_pdb(str(src), cache=cache)
+    assert len(calls) == 1
+    assert type(second) is Protein
+    assert_same_protein(first, second)
+
+    # same bytes, new mtime: the SHA-1 still matches / 内容相同、mtime变化：SHA-1仍一致
+    st = os.stat(src)
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    Protein.from_pdb(str(src), cache=cache)
+    assert len(calls) == 1
+
+    # edited source: rebuilt / 源文件被修改：重新构建
+    src.write_text(PDB.replace("11.104", "21.104"))
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+    third = Protein.from_pdb(str(src), cache=cache)
+    assert len(calls) == 2
+    assert np.isclose(third.coords[0, 0], 21.104)
+    assert_same_protein(third, Protein.from_pdb(str(src), cache=cache))
+    assert len(calls) == 2
+
@@ -0,0 +1,89 @@
+"""
+Tiled (memory_budget) features against the dense path
+分块（memory_budget）特征与稠密路径的对比
+"""
+
+import numpy as np
+import pytest
+
+import gaussbio3d.features.descriptor as descriptor
+from gaussbio3d.config import MgliConfig
+from gaussbio3d.features.descriptor import global_mgli_descriptor
+from gaussbio3d.features.node_features import node_mgli_features
+
+BINS = [0.0, 3.0, 6.0, 9.0]
+# small enough to force several row tiles / 足够小以产生多个行分块
+BUDGET = 20000
+
+
+@pytest.fixture
+def pair(chain):
+    return chain(120, 1, "CNO", open_ends=False), chain(70, 2, "CS", shift=3.0)
+
+
+@pytest.mark.parametrize("use_rbf", [False, True])
+@pytest.mark.parametrize("max_distance", [None, 8.0])
+@pytest.mark.parametrize("self_mode", [False, True])
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_tiled_matches_dense(pair, use_rbf, max_distance, self_mode, dtype):
+    A, B = pair
+    B = None if self_mode else B
+    kw = dict(distance_bins=BINS, max_distance=max_distance, use_rbf=use_rbf, dtype=dtype)
+    dense, tiled = MgliConfig(**kw), MgliConfig(memory_budget=BUDGET, **kw)
+    tol = 1e-5 if dtype == "float32" else 1e-12
+
+    d, dt = global_mgli_descriptor(A, B, dense), global_mgli_descriptor(A, B, tiled)
+    assert d.dtype == dt.dtype and d.shape == dt.shape
+    assert np.abs(d - dt).max() <= tol
+
+    n, nt = node_mgli_features(A, B, dense), node_mgli_features(A, B, tiled)
+    assert n.dtype == nt.dtype and n.shape == nt.shape
+    assert np.abs(n - nt).max() <= tol
+
+
+def test_checkpoint_resume(pair, tmp_path, monkeypatch):
+    A, B = pair
+    kw = dict(distance_bins=BINS, memory_budget=BUDGET, checkpoint_dir=str(tmp_path))
+    d1 = global_mgli_descriptor(A, B, MgliConfig(**kw))
+    files = sorted(tmp_path.glob("*.npz"))
+    assert len(files) > 1
+    for f in files[::2]:
+        f.unlink()
+
+    calls = []
+    tiles = descriptor.iter_pairwise_node_gli_tiles
+
+    def spy(*args, **kwargs):
+        for tile in tiles(*args, **kwargs):
+            calls.append(tile)
+            yield tile
+
+    monkeypatch.setattr(descriptor, "iter_pairwise_node_gli_tiles", spy)
+    d2 = global_mgli_descriptor(A, B, MgliConfig(n_jobs=2, **kw))
+    assert np.array_equal(d1, d2)
+    # only the removed tiles are recomputed / 仅重新计算被删除的分块
+    assert len(calls) == len(files[::2])
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_process_tiles_share_one_pool(pair, monkeypatch):
+    from gaussbio3d.core import pairwise_gli
+    from gaussbio3d.core.pairwise_gli import compute_pairwise_node_gli, iter_pairwise_node_gli_tiles
+
+    A, B = pair
+    publish = pairwise_gli.SharedArrays.publish
+    published = []
+
+    def spy(arrays, empty=None):
+        published.append(sorted(arrays))
+        return publish(arrays, empty=empty)
+
+    monkeypatch.setattr(pairwise_gli.SharedArrays, "publish", spy)
+    ref, _ = compute_pairwise_node_gli(A, B, signed=True)
+    tiles = list(iter_pairwise_node_gli_tiles(A, B, 25, signed=True, n_jobs=2, executor="process"))
+    assert len(tiles) == 5
+    assert np.allclose(np.vstack([t[2] for t in tiles]), ref)
+    # segment arrays once, then one output buffer per tile
+    # 线段数组只发布一次，之后每个分块一个输出缓冲区
+    assert sum(bool(names) for names in published) == 1
+    assert len(published) == 1 + len(tiles)